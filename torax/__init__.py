@@ -26,7 +26,11 @@ from torax.config.config_loader import import_module
 from torax.interpolated_param import InterpolatedVarSingleAxis
 from torax.interpolated_param import InterpolatedVarTimeRho
 from torax.interpolated_param import InterpolationMode
+from torax.orchestration.parameter_scan import run_parameter_scan
+from torax.orchestration.run_simulation import resume_from_checkpoint
 from torax.orchestration.run_simulation import run_simulation
+from torax.orchestration.run_simulation import run_simulation_batch
+from torax.orchestration.run_simulation import run_simulation_streaming
 from torax.output_tools.output import StateHistory
 from torax.state import SimError
 from torax.torax_pydantic.model_config import ToraxConfig
@@ -42,7 +46,11 @@ __all__ = [
     'InterpolatedVarSingleAxis',
     'InterpolatedVarTimeRho',
     'InterpolationMode',
+    'resume_from_checkpoint',
+    'run_parameter_scan',
     'run_simulation',
+    'run_simulation_batch',
+    'run_simulation_streaming',
     'SimError',
     'ToraxConfig',
     'StateHistory',
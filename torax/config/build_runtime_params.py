@@ -21,15 +21,35 @@ DynamicRuntimeParamsSlice to use during time t of the sim.
 This module also provides a method
 `get_consistent_dynamic_runtime_params_slice_and_geometry` which returns a
 DynamicRuntimeParamsSlice and a corresponding geometry with consistent Ip.
+`CompiledDynamicRuntimeParamsSliceProvider` is a jitted variant of the provider
+with the time interpolation of all parameters precomputed into packed tables.
 """
+from collections.abc import Sequence
+import functools
+from typing import TypeAlias
+
 import chex
+import jax
+from jax import numpy as jnp
+import numpy as np
+from torax import interpolated_param
+from torax import jax_utils
 from torax.config import runtime_params_slice
 from torax.geometry import geometry
 from torax.geometry import geometry_provider as geometry_provider_lib
+from torax.torax_pydantic import interpolated_param_1d
+from torax.torax_pydantic import interpolated_param_2d
 from torax.torax_pydantic import model_config
 import typing_extensions
 
 
+_TimeVaryingParam: TypeAlias = (
+    interpolated_param_1d.TimeVaryingScalar
+    | interpolated_param_2d.TimeVaryingArray
+)
+_GRID_TYPES = ('cell', 'face', 'face_right')
+
+
 def build_static_params_from_config(
     config: model_config.ToraxConfig,
 ) -> runtime_params_slice.StaticRuntimeParamsSlice:
@@ -119,6 +139,226 @@ class DynamicRuntimeParamsSliceProvider:
     )
 
 
+class CompiledDynamicRuntimeParamsSliceProvider(
+    DynamicRuntimeParamsSliceProvider
+):
+  """DynamicRuntimeParamsSliceProvider with precomputed interpolation tables.
+
+  At construction, all time-varying parameters of the config are sampled into
+  a packed `_InterpolationTable`. Calls are jitted, so the nested pydantic
+  config is only walked once when tracing. Each call then runs a single
+  compiled function which interpolates all parameters at once and assembles
+  the slice from the interpolated values.
+
+  The config must not contain JAX tracers, e.g. this provider cannot be built
+  for the members of a batch in `run_simulation_batch`.
+  """
+
+  def __init__(
+      self,
+      torax_config: model_config.ToraxConfig,
+  ):
+    """Constructs a CompiledDynamicRuntimeParamsSliceProvider."""
+    super().__init__(torax_config)
+    self._leaves, self._treedef = jax.tree.flatten(
+        torax_config, is_leaf=_is_time_varying_param
+    )
+    # Arrays without a grid cannot be interpolated, and would raise an error
+    # if they are used.
+    self._param_indices = [
+        i
+        for i, leaf in enumerate(self._leaves)
+        if isinstance(leaf, interpolated_param_1d.TimeVaryingScalar)
+        or (
+            isinstance(leaf, interpolated_param_2d.TimeVaryingArray)
+            and leaf.grid is not None
+        )
+    ]
+    self._table = _InterpolationTable(
+        [self._leaves[i] for i in self._param_indices]
+    )
+    self._jitted_call = jax.jit(self._build_slice)
+
+  def __call__(
+      self,
+      t: chex.Numeric,
+  ) -> runtime_params_slice.DynamicRuntimeParamsSlice:
+    """Returns a runtime_params_slice.DynamicRuntimeParamsSlice to use during time t of the sim."""
+    return self._jitted_call(jnp.asarray(t, dtype=jax_utils.get_dtype()))
+
+  def _build_slice(
+      self,
+      t: jax.Array,
+  ) -> runtime_params_slice.DynamicRuntimeParamsSlice:
+    """Builds the slice from the parameters interpolated with the table."""
+    leaves = list(self._leaves)
+    for i, param in zip(
+        self._param_indices, self._table.interpolate(t), strict=True
+    ):
+      leaves[i] = param
+    torax_config = jax.tree.unflatten(self._treedef, leaves)
+    return DynamicRuntimeParamsSliceProvider(torax_config)(t)
+
+
+class _InterpolationTable:
+  """Time interpolation of many parameters packed into single arrays.
+
+  All parameters are sampled at the union of their time knots. Between two
+  consecutive knots, piecewise-linear parameters are linear and step
+  parameters are constant, so interpolating the samples on the union grid
+  gives the same values as interpolating each parameter separately. The
+  samples are packed into one array per interpolation mode, so that all
+  parameters are interpolated with a single search and gather.
+
+  Parameters which are constant in time are not packed, and are returned as
+  they are, so that their values remain compile-time constants.
+  """
+
+  def __init__(self, params: Sequence[_TimeVaryingParam]):
+    self._params = params
+    knots = [np.zeros(0)]
+    for param in params:
+      if isinstance(param, interpolated_param_1d.TimeVaryingScalar):
+        knots.append(param.time)
+      else:
+        knots.append(np.array(list(param.value.keys())))
+    dtype = jax_utils.get_np_dtype()
+    times = np.unique(np.concatenate(knots).astype(dtype))
+    if times.size == 0:
+      times = np.zeros(1, dtype=dtype)
+    self._times = times
+    # A step parameter is constant on each interval (times[i-1], times[i]],
+    # and the last row covers times after times[-1].
+    step_times = np.append(times, times[-1] + 1.0)
+
+    # For each parameter, a mapping from grid type (None for scalars) to the
+    # interpolation mode, offset and shape in the packed table.
+    self._layout = []
+    columns = {
+        interpolated_param.InterpolationMode.PIECEWISE_LINEAR: [],
+        interpolated_param.InterpolationMode.STEP: [],
+    }
+    sizes = dict.fromkeys(columns, 0)
+    for param in params:
+      param_samples = {}
+      for grid_type, mode, sample in _samplers(param):
+        sample_times = (
+            step_times
+            if mode == interpolated_param.InterpolationMode.STEP
+            else times
+        )
+        param_samples[grid_type] = (
+            mode,
+            np.stack([np.asarray(sample(x)) for x in sample_times]),
+        )
+      if all(
+          np.all(samples == samples[0])
+          for _, samples in param_samples.values()
+      ):
+        self._layout.append(None)
+        continue
+      entries = {}
+      for grid_type, (mode, samples) in param_samples.items():
+        shape = samples.shape[1:]
+        columns[mode].append(samples.reshape(len(samples), -1))
+        entries[grid_type] = (mode, sizes[mode], shape)
+        sizes[mode] += int(np.prod(shape))
+      self._layout.append(entries)
+
+    self._linear_table = _concatenate(
+        columns[interpolated_param.InterpolationMode.PIECEWISE_LINEAR],
+        len(times),
+        dtype,
+    )
+    self._step_table = _concatenate(
+        columns[interpolated_param.InterpolationMode.STEP],
+        len(step_times),
+        dtype,
+    )
+
+  def interpolate(self, t: jax.Array) -> list[_TimeVaryingParam]:
+    """Returns copies of the parameters with their values fixed at time t."""
+    values = {
+        interpolated_param.InterpolationMode.PIECEWISE_LINEAR: (
+            self._interpolate_linear(t)
+        ),
+        # The row of a step parameter is the number of knots before t.
+        interpolated_param.InterpolationMode.STEP: jnp.asarray(
+            self._step_table
+        )[jnp.searchsorted(self._times, t, side='left')],
+    }
+    params = []
+    for param, entries in zip(self._params, self._layout, strict=True):
+      if entries is None:
+        params.append(param)
+        continue
+      param_values = {}
+      for grid_type, (mode, offset, shape) in entries.items():
+        size = int(np.prod(shape))
+        param_values[grid_type] = values[mode][offset : offset + size].reshape(
+            shape
+        )
+      if isinstance(param, interpolated_param_1d.TimeVaryingScalar):
+        value = param_values[None]
+        if param.is_bool_param:
+          value = jnp.bool_(value > 0.5)
+        params.append(param.with_fixed_value(value))
+      else:
+        params.append(param.with_fixed_values(param_values))
+    return params
+
+  def _interpolate_linear(self, t: jax.Array) -> jax.Array:
+    """Piecewise-linear interpolation of all rows of the linear table."""
+    if len(self._times) == 1:
+      return jnp.asarray(self._linear_table[0])
+    upper = jnp.clip(
+        jnp.searchsorted(self._times, t, side='right'), 1, len(self._times) - 1
+    )
+    lower = upper - 1
+    times = jnp.asarray(self._times)
+    # Clipping the weight gives constant extrapolation outside of the knots.
+    weight = jnp.clip(
+        (t - times[lower]) / (times[upper] - times[lower]), 0.0, 1.0
+    )
+    table = jnp.asarray(self._linear_table)
+    return table[lower] + weight * (table[upper] - table[lower])
+
+
+def _is_time_varying_param(x) -> bool:
+  return isinstance(
+      x,
+      (
+          interpolated_param_1d.TimeVaryingScalar,
+          interpolated_param_2d.TimeVaryingArray,
+      ),
+  )
+
+
+def _samplers(param: _TimeVaryingParam):
+  """Yields the grid type, time interpolation mode and sampling function."""
+  if isinstance(param, interpolated_param_1d.TimeVaryingScalar):
+    # Sample the raw values, the bool conversion is applied after the
+    # interpolation.
+    interpolated_var = interpolated_param.InterpolatedVarSingleAxis(
+        value=(param.time, param.value),
+        interpolation_mode=param.interpolation_mode,
+    )
+    yield None, param.interpolation_mode, interpolated_var.get_value
+  else:
+    for grid_type in _GRID_TYPES:
+      yield grid_type, param.time_interpolation_mode, functools.partial(
+          param.get_value, grid_type=grid_type
+      )
+
+
+def _concatenate(
+    columns: list[np.ndarray], num_rows: int, dtype: np.dtype
+) -> np.ndarray:
+  if not columns:
+    return np.zeros((num_rows, 0), dtype=dtype)
+  return np.concatenate(columns, axis=1).astype(dtype)
+
+
 def get_consistent_dynamic_runtime_params_slice_and_geometry(
     *,
     t: chex.Numeric,
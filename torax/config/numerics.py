@@ -54,7 +54,8 @@ class Numerics(torax_pydantic.BaseModelFrozen):
     exact_t_final: If True, ensures that the simulation end time is exactly
       `t_final`, by adapting the final `dt` to match.
     max_dt: Maximum timesteps allowed in the simulation. This is only used with
-      the `chi_time_step_calculator` time_step_calculator.
+      the `chi_time_step_calculator` and `pi_time_step_calculator`
+      time_step_calculators.
     min_dt: Minimum timestep allowed in simulation.
     chi_timestep_prefactor: Prefactor in front of chi_timestep_calculator base
       timestep dt=dx^2/(2*chi). In most use-cases can be increased further above
@@ -81,6 +82,18 @@ class Numerics(torax_pydantic.BaseModelFrozen):
       temperature internal boundary conditions.
     adaptive_n_source_prefactor: Prefactor for adaptive source term for setting
       density internal boundary conditions.
+    compiled_loop: If True, the whole time evolution runs inside a single
+      jitted `jax.lax.while_loop`, writing into preallocated history buffers.
+      This removes the per-step dispatch and host synchronization overhead, at
+      the cost of a longer compilation and no per-step progress reporting.
+    compiled_loop_max_steps: Upper bound on the number of steps stored by the
+      compiled loop. The history buffer capacity is the minimum of this value
+      and the number of steps of size `min_dt` needed to reach `t_final`. If
+      the capacity is reached before `t_final`, the simulation stops early.
+    compiled_runtime_params: If True, the time interpolation of all runtime
+      params is precomputed into packed tables, and the dynamic runtime params
+      slice is built by a single jitted function. See
+      `build_runtime_params.CompiledDynamicRuntimeParamsSliceProvider`.
   """
 
   t_initial: torax_pydantic.Second = 0.0
@@ -102,6 +115,9 @@ class Numerics(torax_pydantic.BaseModelFrozen):
   )
   adaptive_T_source_prefactor: pydantic.PositiveFloat = 2.0e10
   adaptive_n_source_prefactor: pydantic.PositiveFloat = 2.0e8
+  compiled_loop: bool = False
+  compiled_loop_max_steps: pydantic.PositiveInt = 10_000
+  compiled_runtime_params: bool = False
 
   @pydantic.model_validator(mode='after')
   def model_validation(self) -> Self:
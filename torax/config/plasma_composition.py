@@ -16,6 +16,7 @@
 import functools
 
 import chex
+from jax import numpy as jnp
 import numpy as np
 from torax import array_typing
 from torax import constants
@@ -83,12 +84,12 @@ class IonMixture(torax_pydantic.BaseModelFrozen):
       A DynamicIonMixture object.
     """
     ions = self.species.keys()
-    fractions = np.array([self.species[ion].get_value(t) for ion in ions])
+    fractions = jnp.array([self.species[ion].get_value(t) for ion in ions])
     Z_override = None if not self.Z_override else self.Z_override.get_value(t)
 
     if not self.A_override:
       As = np.array([constants.ION_PROPERTIES_DICT[ion].A for ion in ions])
-      avg_A = np.sum(As * fractions)
+      avg_A = jnp.sum(As * fractions)
     else:
       avg_A = self.A_override.get_value(t)
 
@@ -14,6 +14,7 @@
 
 from absl.testing import absltest
 from absl.testing import parameterized
+import chex
 import numpy as np
 from torax.config import build_runtime_params
 from torax.config import profile_conditions as profile_conditions_lib
@@ -52,6 +53,39 @@ class RuntimeParamsSliceTest(parameterized.TestCase):
         dynamic_runtime_params_slice.profile_conditions.T_i_right_bc, 3.0
     )
 
+  @parameterized.parameters(-1.0, 0.0, 0.5, 1.0, 2.0, 3.0, 4.0, 7.0)
+  def test_compiled_provider_matches_provider(self, t):
+    config = default_configs.get_default_config_dict()
+    config['profile_conditions'] = {
+        'T_i_right_bc': {0.0: 2.0, 4.0: 4.0},
+        'n_e_right_bc': ({1.0: 6.0e20, 3.0: 8.0e20}, 'step'),
+        'T_e': {0.0: {0.0: 10.0, 1.0: 1.0}, 2.0: {0.0: 20.0, 1.0: 2.0}},
+        'Ip': {0.0: 10e6, 1.0: 12e6, 5.0: 15e6},
+    }
+    config['pedestal'] = {
+        'pedestal_model': 'set_T_ped_n_ped',
+        'set_pedestal': {0.0: True, 2.5: False},
+        'T_e_ped': ({0.0: 1.0, 2.0: 2.0}, 'step'),
+    }
+    torax_config = model_config.ToraxConfig.from_dict(config)
+    provider = (
+        build_runtime_params.DynamicRuntimeParamsSliceProvider.from_config(
+            torax_config
+        )
+    )
+    compiled_provider = (
+        build_runtime_params.CompiledDynamicRuntimeParamsSliceProvider(
+            torax_config
+        )
+    )
+
+    expected = provider(t=t)
+    dynamic_runtime_params_slice = compiled_provider(t=t)
+
+    chex.assert_trees_all_close(
+        dynamic_runtime_params_slice, expected, rtol=1e-12
+    )
+
   def test_boundary_conditions_are_time_dependent(self):
     """Tests that the boundary conditions are time dependent params."""
     # All of the following parameters are time-dependent fields, but they can
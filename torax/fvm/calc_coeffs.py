@@ -19,6 +19,7 @@ import jax
 import jax.numpy as jnp
 from torax import constants
 from torax import jax_utils
+from torax import profiling
 from torax import state
 from torax.config import runtime_params_slice
 from torax.core_profiles import updaters
@@ -226,6 +227,7 @@ def calc_coeffs(
     evolving_names: tuple[str, ...],
     use_pereverzev: bool = False,
     explicit_call: bool = False,
+    core_transport: state.CoreTransport | None = None,
 ) -> block_1d_coeffs.Block1DCoeffs:
   """Calculates Block1DCoeffs for the time step described by `core_profiles`.
 
@@ -257,6 +259,8 @@ def calc_coeffs(
       explicit component of the PDE. Then calculates a reduced Block1DCoeffs if
       theta_implicit=1. This saves computation for the default fully implicit
       implementation.
+    core_transport: If set, these transport coefficients are used instead of
+      calling the transport model.
 
   Returns:
     coeffs: Block1DCoeffs containing the coefficients at this time step.
@@ -265,13 +269,17 @@ def calc_coeffs(
   # If we are fully implicit and we are making a call for calc_coeffs for the
   # explicit components of the PDE, only return a cheaper reduced Block1DCoeffs
   if explicit_call and static_runtime_params_slice.solver.theta_implicit == 1.0:
-    return _calc_coeffs_reduced(
+    return profiling.timed(
+        profiling.CALC_COEFFS,
+        _calc_coeffs_reduced,
         geo,
         core_profiles,
         evolving_names,
     )
   else:
-    return _calc_coeffs_full(
+    return profiling.timed(
+        profiling.CALC_COEFFS,
+        _calc_coeffs_full,
         static_runtime_params_slice,
         dynamic_runtime_params_slice,
         geo,
@@ -282,6 +290,7 @@ def calc_coeffs(
         pedestal_model,
         evolving_names,
         use_pereverzev,
+        core_transport,
     )
 
 
@@ -306,6 +315,7 @@ def _calc_coeffs_full(
     pedestal_model: pedestal_model_lib.PedestalModel,
     evolving_names: tuple[str, ...],
     use_pereverzev: bool = False,
+    core_transport: state.CoreTransport | None = None,
 ) -> block_1d_coeffs.Block1DCoeffs:
   """Calculates Block1DCoeffs for the time step described by `core_profiles`.
 
@@ -333,6 +343,8 @@ def _calc_coeffs_full(
     evolving_names: The names of the evolving variables in the order that their
       coefficients should be written to `coeffs`.
     use_pereverzev: Toggle whether to calculate Pereverzev terms
+    core_transport: If set, these transport coefficients are used instead of
+      calling the transport model.
 
   Returns:
     coeffs: Block1DCoeffs containing the coefficients at this time step.
@@ -360,7 +372,9 @@ def _calc_coeffs_full(
   )
 
   # Calculate the implicit source profiles and combines with the explicit
-  merged_source_profiles = source_profile_builders.build_source_profiles(
+  merged_source_profiles = profiling.timed(
+      profiling.SOURCE_PROFILES,
+      source_profile_builders.build_source_profiles,
       source_models=source_models,
       dynamic_runtime_params_slice=dynamic_runtime_params_slice,
       static_runtime_params_slice=static_runtime_params_slice,
@@ -426,9 +440,17 @@ def _calc_coeffs_full(
   tic_dens_el = geo.vpr
 
   # Diffusion term coefficients
-  transport_coeffs = transport_model(
-      dynamic_runtime_params_slice, geo, core_profiles, pedestal_model_output
-  )
+  if core_transport is None:
+    transport_coeffs = profiling.timed(
+        profiling.TRANSPORT_MODEL,
+        transport_model,
+        dynamic_runtime_params_slice,
+        geo,
+        core_profiles,
+        pedestal_model_output,
+    )
+  else:
+    transport_coeffs = core_transport
   chi_face_ion = transport_coeffs.chi_face_ion
   chi_face_el = transport_coeffs.chi_face_el
   d_face_el = transport_coeffs.d_face_el
@@ -27,3 +27,39 @@ class InitialGuessMode(enum.Enum):
 
   # Use the linear solver to guess x_new
   LINEAR = 1
+
+
+@enum.unique
+class LinearSolveMethod(enum.Enum):
+  """Methods for solving the linear systems of the theta method."""
+
+  # Dense LU solve of the full matrix.
+  DENSE = 'dense'
+
+  # Block Thomas algorithm on the couplings between neighbouring cells. Exact
+  # for the linear theta method, which only couples neighbouring cells.
+  BLOCK_TRIDIAGONAL = 'block_tridiagonal'
+
+
+@enum.unique
+class JacobianMethod(enum.Enum):
+  """Methods for computing the Jacobian of the Newton-Raphson residual."""
+
+  # Forward-mode differentiation with one Jacobian-vector product per unknown.
+  DENSE = 'dense'
+
+  # Compressed Jacobian-vector products over a coloring of the banded local
+  # couplings, with the transport smoothing applied exactly. The number of
+  # Jacobian-vector products is independent of the grid size.
+  COLORED = 'colored'
+
+
+@enum.unique
+class KrylovMethod(enum.Enum):
+  """Krylov methods for the matrix-free Newton-Krylov linear solves."""
+
+  # Restarted generalized minimal residual method.
+  GMRES = 'gmres'
+
+  # Biconjugate gradient stabilized method.
+  BICGSTAB = 'bicgstab'
@@ -22,7 +22,9 @@ import jax
 from jax import numpy as jnp
 from torax import jax_utils
 from torax.fvm import block_1d_coeffs
+from torax.fvm import block_tridiagonal
 from torax.fvm import cell_variable
+from torax.fvm import enums
 from torax.fvm import fvm_conversions
 from torax.fvm import residual_and_loss
 
@@ -33,6 +35,7 @@ from torax.fvm import residual_and_loss
         'convection_dirichlet_mode',
         'convection_neumann_mode',
         'theta_implicit',
+        'linear_solve_method',
     ],
 )
 def implicit_solve_block(
@@ -44,6 +47,9 @@ def implicit_solve_block(
     theta_implicit: float = 1.0,
     convection_dirichlet_mode: str = 'ghost',
     convection_neumann_mode: str = 'ghost',
+    linear_solve_method: enums.LinearSolveMethod = (
+        enums.LinearSolveMethod.DENSE
+    ),
 ) -> tuple[cell_variable.CellVariable, ...]:
   # pyformat: disable  # pyformat removes line breaks needed for readability
   """Runs one time step of an implicit solver on the equation defined by `coeffs`.
@@ -68,6 +74,8 @@ def implicit_solve_block(
       `dirichlet_mode` argument.
     convection_neumann_mode: See docstring of the `convection_terms` function,
       `neumann_mode` argument.
+    linear_solve_method: Method used to solve the linear system. See
+      `block_tridiagonal.solve`.
 
   Returns:
     x_new: Tuple, with x_new[i] giving channel i of x at the next time step
@@ -98,7 +106,9 @@ def implicit_solve_block(
   )
 
   rhs = jnp.dot(rhs_mat, x_old_vec) + rhs_vec - lhs_vec
-  x_new = jnp.linalg.solve(lhs_mat, rhs)
+  x_new = block_tridiagonal.solve(
+      lhs_mat, rhs, num_channels=len(x_old), method=linear_solve_method
+  )
 
   # Create updated CellVariable instances based on state_plus_dt which has
   # updated boundary conditions and prescribed profiles.
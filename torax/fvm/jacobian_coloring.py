@@ -0,0 +1,149 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Jacobians of sparse functions from compressed forward-mode derivatives.
+
+If the sparsity pattern of a Jacobian is known, columns which never have a
+nonzero entry in the same row can share a single Jacobian-vector product: the
+seed vector is the sum of the unit vectors of the columns, and each entry of
+the resulting compressed column belongs to one known column. Grouping the
+columns is a coloring of the column intersection graph. For the banded
+couplings of the fvm, the number of colors is independent of the grid size, so
+a Jacobian costs a handful of Jacobian-vector products instead of one per
+unknown.
+
+The sparsity patterns are numpy arrays, built at trace time from the static
+grid shapes.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+import jax
+from jax import numpy as jnp
+import numpy as np
+
+
+def band_pattern(
+    out_positions: np.ndarray,
+    in_positions: np.ndarray,
+    half_width: float,
+) -> np.ndarray:
+  """Returns the sparsity pattern of couplings within a distance on the grid.
+
+  Near the edges of the grid, the window of coupled inputs is shifted inwards
+  rather than truncated, to account for one-sided stencils such as the
+  extrapolations to the magnetic axis. This does not increase the number of
+  colors, which is set by the width of the window.
+
+  Args:
+    out_positions: Grid position of each output, in units of the cell width.
+    in_positions: Grid position of each input, in units of the cell width.
+    half_width: Maximum distance between a coupled output and input, away from
+      the edges of the grid.
+
+  Returns:
+    Boolean array of shape `(len(out_positions), len(in_positions))`, True
+    where the output may depend on the input.
+  """
+  centers = np.clip(
+      out_positions,
+      np.min(in_positions) + half_width,
+      np.max(in_positions) - half_width,
+  )
+  distance = np.abs(centers[:, np.newaxis] - in_positions[np.newaxis, :])
+  return distance <= half_width
+
+
+def grid_positions(
+    num_channels: int, num_points: int, offset: float
+) -> np.ndarray:
+  """Returns the grid positions of a channel-major vector of grid values.
+
+  Args:
+    num_channels: Number of channels concatenated in the vector.
+    num_points: Number of grid points per channel.
+    offset: Position of the first grid point, e.g. 0.5 for cell centers and 0
+      for faces.
+
+  Returns:
+    Array of shape `(num_channels * num_points,)`.
+  """
+  return np.tile(np.arange(num_points) + offset, num_channels)
+
+
+def color_columns(pattern: np.ndarray) -> np.ndarray:
+  """Colors the columns of a sparsity pattern.
+
+  Two columns get different colors if they both have a nonzero entry in some
+  row. The columns are colored greedily in order, which is optimal for banded
+  patterns.
+
+  Args:
+    pattern: Boolean sparsity pattern of shape `(num_outputs, num_inputs)`.
+
+  Returns:
+    Integer array of shape `(num_inputs,)` with the color of each column. The
+    colors are numbered from 0.
+  """
+  pattern = np.asarray(pattern, dtype=bool)
+  num_inputs = pattern.shape[1]
+  conflicts = (pattern.T.astype(np.int32) @ pattern.astype(np.int32)) > 0
+  colors = np.full(num_inputs, -1, dtype=np.int32)
+  for j in range(num_inputs):
+    used = colors[np.logical_and(conflicts[j], colors >= 0)]
+    color = 0
+    while np.any(used == color):
+      color += 1
+    colors[j] = color
+  return colors
+
+
+def colored_jacobian(
+    fun: Callable[[jax.Array], tuple[jax.Array, Any]],
+    x: jax.Array,
+    pattern: np.ndarray,
+) -> tuple[jax.Array, Any]:
+  """Computes a sparse Jacobian from compressed Jacobian-vector products.
+
+  Entries of the Jacobian outside of `pattern` are not computed. If they are
+  nonzero, they are added to the entry of the same row in the column of the
+  same color which lies inside of the pattern, if any.
+
+  Args:
+    fun: Function of a vector, returning a vector and an auxiliary output.
+    x: Point at which to compute the Jacobian.
+    pattern: Boolean array of shape `(num_outputs, num_inputs)`, True where the
+      Jacobian may be nonzero.
+
+  Returns:
+    jacobian: Array of shape `(num_outputs, num_inputs)`.
+    aux: The auxiliary output of `fun` at `x`.
+  """
+  colors = color_columns(pattern)
+  num_colors = int(colors.max()) + 1
+  seeds = jnp.asarray(
+      colors[np.newaxis, :] == np.arange(num_colors)[:, np.newaxis],
+      dtype=x.dtype,
+  )
+
+  def jvp(seed):
+    return jax.jvp(fun, (x,), (seed,), has_aux=True)
+
+  # The primal outputs do not depend on the seed, so are computed once.
+  _, compressed, aux = jax.vmap(jvp, out_axes=(None, 0, None))(seeds)
+  # compressed[c, i] is the sum of the Jacobian entries of row i over the
+  # columns of color c.
+  jacobian = jnp.where(pattern, compressed.T[:, colors], 0.0)
+  return jacobian, aux
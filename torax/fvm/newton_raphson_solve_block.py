@@ -18,16 +18,17 @@ See function docstring for details.
 """
 
 import functools
-from typing import Callable, Final
+from typing import Any, Callable, Final
 
 from absl import logging
 import jax
 from jax import numpy as jnp
-import numpy as np
 from torax import jax_utils
+from torax import profiling
 from torax import state as state_module
 from torax.config import runtime_params_slice
 from torax.fvm import block_1d_coeffs
+from torax.fvm import block_tridiagonal
 from torax.fvm import calc_coeffs
 from torax.fvm import cell_variable
 from torax.fvm import enums
@@ -46,6 +47,11 @@ from torax.transport_model import transport_model as transport_model_lib
 # cases with bad numerics.
 MIN_DELTA: Final[float] = 1e-7
 
+# With frozen transport, the Newton iterations at frozen transport coefficients
+# stop once they reduced the residual by this factor, since the equation is
+# only an approximation until the coefficients are updated.
+FROZEN_TRANSPORT_FORCING: Final[float] = 0.1
+
 
 def _log_iterations(
     residual: jax.Array,
@@ -103,10 +109,23 @@ def newton_raphson_solve_block(
     delta_reduction_factor: float,
     tau_min: float,
     log_iterations: bool = False,
+    jacobian_method: enums.JacobianMethod = enums.JacobianMethod.DENSE,
+    jacobian_bandwidth: int = 2,
+    jacobian_reuse: bool = False,
+    jacobian_reuse_contraction: float = 0.5,
+    broyden_update: bool = False,
+    jacobian_cache: state_module.JacobianCache | None = None,
+    krylov_method: enums.KrylovMethod | None = None,
+    krylov_tol: float = 1e-6,
+    krylov_restart: int = 20,
+    krylov_maxiter: int = 20,
+    frozen_transport: bool = False,
+    frozen_transport_maxiter: int = 10,
 ) -> tuple[
     tuple[cell_variable.CellVariable, ...],
     state_module.SolverNumericOutputs,
     block_1d_coeffs.AuxiliaryOutput,
+    state_module.JacobianCache | None,
 ]:
   # pyformat: disable  # pyformat removes line breaks needed for reability
   """Runs one time step of a Newton-Raphson based root-finding on the equation defined by `coeffs`.
@@ -135,6 +154,30 @@ def newton_raphson_solve_block(
   stop. If residual > tol then the function exits with an error flag, producing
   either a warning or recalculation with a lower dt.
 
+  With `jacobian_reuse`, this is a modified Newton method: the Jacobian and
+  its factorization are kept across iterations, and across time steps through
+  `jacobian_cache`, as long as each iteration reduces the residual by at least
+  the factor `jacobian_reuse_contraction`. Otherwise the Jacobian is evaluated
+  afresh at the next iteration, and a step with a reused Jacobian which does
+  not reduce the residual is discarded. With `broyden_update`, the reused
+  Jacobian is improved by a Broyden rank-one update after each step.
+
+  With `krylov_method`, this is a Jacobian-free Newton-Krylov method: the
+  Jacobian is never formed, and each linear system is solved iteratively with
+  Jacobian-vector products of the residual. The Krylov iterations are
+  preconditioned by the linear theta-method matrix, i.e. the Jacobian at frozen
+  coefficients, which is factored with the block Thomas algorithm.
+
+  With `frozen_transport`, the Newton iterations are first done with lagged
+  transport coefficients: the transport model is evaluated once at the start
+  of each outer fixed-point iteration, and the equation with these frozen
+  coefficients is solved by Newton iterations which neither evaluate nor
+  differentiate the transport model. The outer iterations stop when the
+  residual with the updated coefficients is below tol, or when it stops
+  decreasing, in which case the remaining error is removed by Newton
+  iterations on the full equation. The converged solution is thus the same,
+  but stiff transport models are evaluated far less often.
+
   Args:
     dt: Discrete time step.
     static_runtime_params_slice: Static runtime parameters. Changes to these
@@ -181,6 +224,34 @@ def newton_raphson_solve_block(
       routine resets at a lower timestep.
     log_iterations: If true, output diagnostic information from within iteration
       loop.
+    jacobian_method: How the Jacobian of the residual is computed.
+    jacobian_bandwidth: Bandwidth of the local couplings assumed by the
+      `colored` Jacobian method. See
+      `residual_and_loss.theta_method_block_jacobian_colored`.
+    jacobian_reuse: If True, reuse the Jacobian across iterations and time
+      steps while the residual contracts quickly enough.
+    jacobian_reuse_contraction: With `jacobian_reuse`, the Jacobian is
+      evaluated afresh after an iteration which reduced the residual by less
+      than this factor.
+    broyden_update: With `jacobian_reuse`, apply Broyden rank-one updates to
+      the reused Jacobian.
+    jacobian_cache: With `jacobian_reuse`, the Jacobian of the previous time
+      step. If None or invalid, the first iteration evaluates the Jacobian.
+    krylov_method: If set, solve the linear systems with this matrix-free
+      Krylov method instead of forming the Jacobian. `jacobian_method`,
+      `jacobian_reuse` and the `linear_solve_method` of the solver are then
+      not used.
+    krylov_tol: Relative tolerance of the Krylov solves.
+    krylov_restart: Size of the Krylov subspace before GMRES restarts.
+    krylov_maxiter: Maximum number of Krylov iterations. For GMRES, the
+      maximum number of restarts.
+    frozen_transport: If True, start with outer iterations which update the
+      transport coefficients, each followed by Newton iterations at frozen
+      transport coefficients.
+    frozen_transport_maxiter: With `frozen_transport`, the maximum number of
+      outer iterations, i.e. of evaluations of the transport coefficients
+      after the initial guess. Each outer iteration does up to `maxiter` Newton
+      iterations.
 
   Returns:
     x_new: Tuple, with x_new[i] giving channel i of x at the next time step
@@ -188,9 +259,19 @@ def newton_raphson_solve_block(
       error info. For the error, 0 signifies residual < tol at exit, 1 signifies
       residual > tol, steps became small.
     aux_output: Extra auxiliary output from calc_coeffs.
+    jacobian_cache: With `jacobian_reuse`, the Jacobian to start the next time
+      step from. None otherwise.
   """
   # pyformat: enable
 
+  if krylov_method is not None and jacobian_reuse:
+    raise ValueError('jacobian_reuse is not supported with krylov_method.')
+  if frozen_transport and (krylov_method is not None or jacobian_reuse):
+    raise ValueError(
+        'frozen_transport is not supported with krylov_method or'
+        ' jacobian_reuse.'
+    )
+
   coeffs_old = coeffs_callback(
       dynamic_runtime_params_slice_t,
       geo_t,
@@ -257,8 +338,18 @@ def newton_raphson_solve_block(
       evolving_names=evolving_names,
       pedestal_model=pedestal_model,
   )
+  match jacobian_method:
+    case enums.JacobianMethod.DENSE:
+      jacobian_fun = residual_and_loss.theta_method_block_jacobian
+    case enums.JacobianMethod.COLORED:
+      jacobian_fun = functools.partial(
+          residual_and_loss.theta_method_block_jacobian_colored,
+          bandwidth=jacobian_bandwidth,
+      )
+    case _:
+      raise ValueError(f'Unknown Jacobian method: {jacobian_method}')
   jacobian_fun = functools.partial(
-      residual_and_loss.theta_method_block_jacobian,
+      jacobian_fun,
       dt=dt,
       static_runtime_params_slice=static_runtime_params_slice,
       dynamic_runtime_params_slice_t_plus_dt=dynamic_runtime_params_slice_t_plus_dt,
@@ -273,31 +364,106 @@ def newton_raphson_solve_block(
       coeffs_old=coeffs_old,
   )
 
+  if krylov_method is None:
+    krylov_step_fun = None
+  else:
+    krylov_step_fun = functools.partial(
+        residual_and_loss.theta_method_block_krylov_step,
+        dt=dt,
+        static_runtime_params_slice=static_runtime_params_slice,
+        dynamic_runtime_params_slice_t_plus_dt=dynamic_runtime_params_slice_t_plus_dt,
+        geo_t_plus_dt=geo_t_plus_dt,
+        x_old=x_old,
+        core_profiles_t_plus_dt=core_profiles_t_plus_dt,
+        transport_model=transport_model,
+        explicit_source_profiles=explicit_source_profiles,
+        source_models=source_models,
+        coeffs_old=coeffs_old,
+        evolving_names=evolving_names,
+        pedestal_model=pedestal_model,
+        krylov_method=krylov_method,
+        krylov_tol=krylov_tol,
+        krylov_restart=krylov_restart,
+        krylov_maxiter=krylov_maxiter,
+    )
+
   cond_fun = functools.partial(cond, tol=tol, tau_min=tau_min, maxiter=maxiter)
-  delta_cond_fun = functools.partial(
-      delta_cond,
-      residual_fun=residual_fun,
-  )
   body_fun = functools.partial(
       body,
       jacobian_fun=jacobian_fun,
-      delta_cond_fun=delta_cond_fun,
+      residual_fun=residual_fun,
+      delta_cond_fun=delta_cond,
       delta_reduction_factor=delta_reduction_factor,
       log_iterations=log_iterations,
+      num_channels=len(x_old),
+      linear_solve_method=(
+          static_runtime_params_slice.solver.linear_solve_method
+      ),
+      jacobian_reuse=jacobian_reuse,
+      jacobian_reuse_contraction=jacobian_reuse_contraction,
+      broyden_update=broyden_update,
+      krylov_step_fun=krylov_step_fun,
   )
 
   # initialize state dict being passed around Newton-Raphson iterations
-  residual_vec_init_x_new, aux_output_init_x_new = residual_fun(init_x_new_vec)
-  initial_state = {
-      'x': init_x_new_vec,
-      'iterations': jnp.array(0, dtype=jax_utils.get_int_dtype()),
-      'residual': residual_vec_init_x_new,
-      'last_tau': jnp.array(1.0, dtype=jax_utils.get_dtype()),
-      'aux_output': aux_output_init_x_new,
-  }
+  if frozen_transport:
+    transport_fun = functools.partial(
+        residual_and_loss.theta_method_block_transport,
+        static_runtime_params_slice=static_runtime_params_slice,
+        dynamic_runtime_params_slice_t_plus_dt=dynamic_runtime_params_slice_t_plus_dt,
+        geo_t_plus_dt=geo_t_plus_dt,
+        core_profiles_t_plus_dt=core_profiles_t_plus_dt,
+        transport_model=transport_model,
+        evolving_names=evolving_names,
+        pedestal_model=pedestal_model,
+    )
+    initial_state, frozen_state = _frozen_transport_iterations(
+        init_x_new_vec=init_x_new_vec,
+        residual_fun=residual_fun,
+        jacobian_fun=jacobian_fun,
+        transport_fun=transport_fun,
+        cond_fun=cond_fun,
+        body_fun=body_fun,
+        tol=tol,
+        frozen_transport_maxiter=frozen_transport_maxiter,
+        log_iterations=log_iterations,
+    )
+  else:
+    residual_vec_init_x_new, aux_output_init_x_new = profiling.timed(
+        profiling.RESIDUAL, residual_fun, init_x_new_vec
+    )
+    initial_state = {
+        'x': init_x_new_vec,
+        'iterations': jnp.array(0, dtype=jax_utils.get_int_dtype()),
+        'residual': residual_vec_init_x_new,
+        'last_tau': jnp.array(1.0, dtype=jax_utils.get_dtype()),
+        'aux_output': aux_output_init_x_new,
+    }
+    frozen_state = None
+  if jacobian_reuse:
+    if jacobian_cache is None:
+      jacobian_cache = state_module.JacobianCache.placeholder(
+          init_x_new_vec.size
+      )
+    # The placeholder is replaced by the identity to keep its factorization
+    # finite. It is never used, as the first iteration then refreshes.
+    cached_jacobian = jnp.where(
+        jacobian_cache.valid,
+        jacobian_cache.jacobian,
+        jnp.eye(init_x_new_vec.size, dtype=init_x_new_vec.dtype),
+    )
+    initial_state |= {
+        'jacobian': cached_jacobian,
+        'factors': block_tridiagonal.factor(
+            cached_jacobian,
+            num_channels=len(x_old),
+            method=static_runtime_params_slice.solver.linear_solve_method,
+        ),
+        'refresh': jnp.logical_not(jacobian_cache.valid),
+    }
 
   # log initial state if requested
-  if log_iterations:
+  if log_iterations and not jax_utils.is_tracer(initial_state):
     _log_iterations(
         residual=residual_scalar(initial_state['residual']),
         iterations=initial_state['iterations'],
@@ -329,12 +495,42 @@ def newton_raphson_solve_block(
           lambda: 1,  # Called when False
       ),
   )
+  if frozen_state is None:
+    inner_solver_iterations = output_state['iterations']
+    transport_evaluations_saved = 0
+  else:
+    inner_solver_iterations = (
+        output_state['iterations'] + frozen_state['inner_iterations']
+    )
+    # Each Newton iteration at frozen transport avoids evaluating the
+    # transport model for at least the Jacobian and one residual, at the cost
+    # of one evaluation per outer iteration.
+    transport_evaluations_saved = (
+        2 * frozen_state['inner_iterations'] - frozen_state['outer_iterations']
+    )
   solver_numeric_outputs = state_module.SolverNumericOutputs(
-      inner_solver_iterations=int(output_state['iterations']),
+      inner_solver_iterations=inner_solver_iterations,
       solver_error_state=error,
       outer_solver_iterations=1,
+      transport_evaluations_saved=transport_evaluations_saved,
   )
 
+  if jacobian_reuse:
+    # Only keep a Jacobian evaluated or updated in this step, and only if the
+    # step converged.
+    valid = jnp.logical_and(
+        jnp.logical_and(
+            error != 1, jnp.all(jnp.isfinite(output_state['jacobian']))
+        ),
+        jnp.logical_or(jacobian_cache.valid, output_state['iterations'] > 0),
+    )
+    jacobian_cache_new = state_module.JacobianCache(
+        jacobian=jnp.where(valid, output_state['jacobian'], 0.0),
+        valid=valid,
+    )
+  else:
+    jacobian_cache_new = None
+
   coeffs_final = coeffs_callback(
       dynamic_runtime_params_slice_t_plus_dt,
       geo_t_plus_dt,
@@ -343,11 +539,167 @@ def newton_raphson_solve_block(
       allow_pereverzev=True,
   )
 
-  return x_new, solver_numeric_outputs, coeffs_final.auxiliary_outputs
+  return (
+      x_new,
+      solver_numeric_outputs,
+      coeffs_final.auxiliary_outputs,
+      jacobian_cache_new,
+  )
+
+
+def _frozen_transport_iterations(
+    init_x_new_vec: jax.Array,
+    residual_fun: Callable[..., Any],
+    jacobian_fun: Callable[..., Any],
+    transport_fun: Callable[[jax.Array], state_module.CoreTransport],
+    cond_fun: Callable[[dict[str, Any]], Any],
+    body_fun: Callable[..., dict[str, Any]],
+    tol: float,
+    frozen_transport_maxiter: int,
+    log_iterations: bool,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+  """Outer fixed-point iterations on the transport coefficients.
+
+  Args:
+    init_x_new_vec: The initial guess of x_new.
+    residual_fun: The residual, with an optional `core_transport` argument.
+    jacobian_fun: The Jacobian of the residual, with an optional
+      `core_transport` argument.
+    transport_fun: The transport coefficients as a function of x_new.
+    cond_fun: The exit condition of the Newton iterations, with a `tol`
+      argument.
+    body_fun: A Newton iteration, with `jacobian_fun` and `residual_fun`
+      arguments.
+    tol: Tolerance of the mean absolute residual.
+    frozen_transport_maxiter: Maximum number of outer iterations.
+    log_iterations: Whether to log the outer iterations.
+
+  Returns:
+    initial_state: The initial state of the Newton iterations on the full
+      equation, at the best x_new found, with the residual at up to date
+      transport coefficients.
+    frozen_state: The final state of the outer iterations, with the total
+      number of Newton iterations at frozen transport in `inner_iterations`
+      and the number of outer iterations in `outer_iterations`.
+  """
+  core_transport = profiling.timed(
+      profiling.TRANSPORT_MODEL, transport_fun, init_x_new_vec
+  )
+  residual, aux_output = profiling.timed(
+      profiling.RESIDUAL,
+      residual_fun,
+      init_x_new_vec,
+      core_transport=core_transport,
+  )
+  int_dtype = jax_utils.get_int_dtype()
+  initial_frozen_state = {
+      'x': init_x_new_vec,
+      'residual': residual,
+      'aux_output': aux_output,
+      'core_transport': core_transport,
+      'outer_iterations': jnp.array(0, dtype=int_dtype),
+      'inner_iterations': jnp.array(0, dtype=int_dtype),
+      'stalled': jnp.array(False),
+  }
+
+  def outer_cond(frozen_state):
+    return jnp.bool_(
+        jnp.logical_and(
+            jnp.logical_and(
+                residual_scalar(frozen_state['residual']) > tol,
+                frozen_state['outer_iterations'] < frozen_transport_maxiter,
+            ),
+            jnp.logical_not(frozen_state['stalled']),
+        )
+    )
+
+  def outer_body(frozen_state):
+    frozen_body_fun = functools.partial(
+        body_fun,
+        jacobian_fun=functools.partial(
+            jacobian_fun, core_transport=frozen_state['core_transport']
+        ),
+        residual_fun=functools.partial(
+            residual_fun, core_transport=frozen_state['core_transport']
+        ),
+    )
+    # The coefficients are up to date at x, so the residual at frozen
+    # transport is the full residual.
+    inner_tol = jnp.maximum(
+        tol, FROZEN_TRANSPORT_FORCING * residual_scalar(frozen_state['residual'])
+    )
+    inner_state = jax_utils.py_while(
+        functools.partial(cond_fun, tol=inner_tol),
+        frozen_body_fun,
+        {
+            'x': frozen_state['x'],
+            'iterations': jnp.array(0, dtype=int_dtype),
+            'residual': frozen_state['residual'],
+            'last_tau': jnp.array(1.0, dtype=jax_utils.get_dtype()),
+            'aux_output': frozen_state['aux_output'],
+        },
+    )
+    # The outputs are checked for NaNs below.
+    with jax_utils.enable_errors(False):
+      core_transport = profiling.timed(
+          profiling.TRANSPORT_MODEL, transport_fun, inner_state['x']
+      )
+      residual, aux_output = profiling.timed(
+          profiling.RESIDUAL,
+          residual_fun,
+          inner_state['x'],
+          core_transport=core_transport,
+      )
+    # Only accept the update if it reduces the full residual, which is False
+    # for NaNs, otherwise fall back to Newton iterations on the full equation.
+    improved = residual_scalar(residual) < residual_scalar(
+        frozen_state['residual']
+    )
+    new_state = jax.tree.map(
+        lambda new, old: jnp.where(improved, new, old),
+        {
+            'x': inner_state['x'],
+            'residual': residual,
+            'aux_output': aux_output,
+            'core_transport': core_transport,
+        },
+        {
+            'x': frozen_state['x'],
+            'residual': frozen_state['residual'],
+            'aux_output': frozen_state['aux_output'],
+            'core_transport': frozen_state['core_transport'],
+        },
+    )
+    new_state |= {
+        'outer_iterations': frozen_state['outer_iterations'] + 1,
+        'inner_iterations': (
+            frozen_state['inner_iterations'] + inner_state['iterations']
+        ),
+        'stalled': jnp.logical_not(improved),
+    }
+    if log_iterations and not jax_utils.is_tracer(new_state):
+      logging.info(
+          'Transport update: %d. Residual: %.16f',
+          new_state['outer_iterations'],
+          residual_scalar(new_state['residual']),
+      )
+    return new_state
+
+  frozen_state = jax_utils.py_while(
+      outer_cond, outer_body, initial_frozen_state
+  )
+  initial_state = {
+      'x': frozen_state['x'],
+      'iterations': jnp.array(0, dtype=int_dtype),
+      'residual': frozen_state['residual'],
+      'last_tau': jnp.array(1.0, dtype=jax_utils.get_dtype()),
+      'aux_output': frozen_state['aux_output'],
+  }
+  return initial_state, frozen_state
 
 
 def residual_scalar(x):
-  return np.mean(np.abs(x))
+  return jnp.mean(jnp.abs(x))
 
 
 def cond(
@@ -371,18 +723,27 @@ def cond(
 def body(
     input_state: dict[str, jax.Array],
     jacobian_fun,
+    residual_fun,
     delta_cond_fun,
     delta_reduction_factor,
     log_iterations,
+    num_channels: int,
+    linear_solve_method: enums.LinearSolveMethod = (
+        enums.LinearSolveMethod.DENSE
+    ),
+    jacobian_reuse: bool = False,
+    jacobian_reuse_contraction: float = 0.5,
+    broyden_update: bool = False,
+    krylov_step_fun: Callable[[jax.Array], jax.Array] | None = None,
 ) -> dict[str, jax.Array]:
   """Calculates next guess in Newton-Raphson iteration."""
 
   delta_body_fun = functools.partial(
       delta_body,
+      residual_fun=residual_fun,
       delta_reduction_factor=delta_reduction_factor,
   )
 
-  a_mat, _ = jacobian_fun(input_state['x'])  # Ignore the aux output here.
   rhs = -input_state['residual']
   # delta = x_new - x_old
   # tau = delta/delta0, where delta0 is the delta that sets the linearized
@@ -390,12 +751,63 @@ def body(
   # conditions of reduced residual and valid state quantities.
   # If tau < taumin while residual > tol, then the routine exits with an
   # error flag, leading to either a warning or recalculation at lower dt
+  if jacobian_reuse:
+
+    def evaluate_jacobian():
+      # Ignore the aux output here.
+      a_mat, _ = profiling.timed(
+          profiling.JACOBIAN, jacobian_fun, input_state['x']
+      )
+      return a_mat, profiling.timed(
+          profiling.LINEAR_SOLVE,
+          block_tridiagonal.factor,
+          a_mat,
+          num_channels=num_channels,
+          method=linear_solve_method,
+      )
+
+    a_mat, factors = jax_utils.py_cond(
+        input_state['refresh'],
+        evaluate_jacobian,
+        lambda: (input_state['jacobian'], input_state['factors']),
+    )
+    delta = profiling.timed(
+        profiling.LINEAR_SOLVE,
+        block_tridiagonal.solve_factored,
+        factors,
+        rhs,
+        num_channels=num_channels,
+        method=linear_solve_method,
+    )
+  elif krylov_step_fun is not None:
+    delta = profiling.timed(
+        profiling.LINEAR_SOLVE, krylov_step_fun, input_state['x']
+    )
+  else:
+    # Ignore the aux output here.
+    a_mat, _ = profiling.timed(
+        profiling.JACOBIAN, jacobian_fun, input_state['x']
+    )
+    delta = profiling.timed(
+        profiling.LINEAR_SOLVE,
+        block_tridiagonal.solve,
+        a_mat,
+        rhs,
+        num_channels=num_channels,
+        method=linear_solve_method,
+    )
+  residual_new, aux_output_new = profiling.timed(
+      profiling.RESIDUAL,
+      _residual_without_errors,
+      residual_fun,
+      input_state['x'] + delta,
+  )
   initial_delta_state = {
       'x': input_state['x'],
-      'delta': jnp.linalg.solve(a_mat, rhs),
+      'delta': delta,
       'residual_old': input_state['residual'],
-      'residual_new': input_state['residual'],
-      'aux_output_new': input_state['aux_output'],
+      'residual_new': residual_new,
+      'aux_output_new': aux_output_new,
       'tau': jnp.array(1.0, dtype=jax_utils.get_dtype()),
   }
   output_delta_state = jax_utils.py_while(
@@ -414,7 +826,18 @@ def body(
       'last_tau': output_delta_state['tau'],
       'aux_output': output_delta_state['aux_output_new'],
   }
-  if log_iterations:
+  if jacobian_reuse:
+    output_state = _update_reused_jacobian(
+        input_state=input_state,
+        output_state=output_state,
+        jacobian=a_mat,
+        factors=factors,
+        num_channels=num_channels,
+        linear_solve_method=linear_solve_method,
+        jacobian_reuse_contraction=jacobian_reuse_contraction,
+        broyden_update=broyden_update,
+    )
+  if log_iterations and not jax_utils.is_tracer(output_state):
     _log_iterations(
         residual=residual_scalar(output_state['residual']),
         iterations=output_state['iterations'],
@@ -424,32 +847,112 @@ def body(
   return output_state
 
 
+def _update_reused_jacobian(
+    input_state: dict[str, Any],
+    output_state: dict[str, Any],
+    jacobian: jax.Array,
+    factors: Any,
+    num_channels: int,
+    linear_solve_method: enums.LinearSolveMethod,
+    jacobian_reuse_contraction: float,
+    broyden_update: bool,
+) -> dict[str, Any]:
+  """Decides whether to keep the Jacobian for the next Newton iteration.
+
+  Args:
+    input_state: The state at the start of the iteration.
+    output_state: The state after the Newton step with `jacobian`.
+    jacobian: The Jacobian used for the step.
+    factors: The factorization of `jacobian`.
+    num_channels: Number of evolving channels.
+    linear_solve_method: The linear solve method of the factorization.
+    jacobian_reuse_contraction: The Jacobian is evaluated afresh after a step
+      which reduced the residual by less than this factor.
+    broyden_update: Whether to apply a Broyden rank-one update to the kept
+      Jacobian.
+
+  Returns:
+    `output_state` with the Jacobian for the next iteration. A step with a
+    reused Jacobian which did not reduce the residual is discarded.
+  """
+  reused = jnp.logical_not(input_state['refresh'])
+  contraction = residual_scalar(output_state['residual']) / residual_scalar(
+      input_state['residual']
+  )
+  # NaN residuals compare False, so are neither accepted nor contracting.
+  accept = jnp.logical_or(jnp.logical_not(reused), contraction < 1.0)
+  refresh = jnp.logical_not(contraction <= jacobian_reuse_contraction)
+  output_state = output_state | {
+      'x': jnp.where(accept, output_state['x'], input_state['x']),
+      'residual': jnp.where(
+          accept, output_state['residual'], input_state['residual']
+      ),
+      'aux_output': jax.tree.map(
+          lambda new, old: jnp.where(accept, new, old),
+          output_state['aux_output'],
+          input_state['aux_output'],
+      ),
+      # A poor step with a reused Jacobian is no reason to give up, since the
+      # next iteration evaluates the Jacobian afresh.
+      'last_tau': jnp.where(reused, 1.0, output_state['last_tau']),
+      'jacobian': jacobian,
+      'factors': factors,
+      'refresh': refresh,
+  }
+  if not broyden_update:
+    return output_state
+
+  delta_x = output_state['x'] - input_state['x']
+  delta_x_squared = jnp.sum(delta_x**2)
+
+  def update():
+    # Broyden's "good" update, the least change to the Jacobian for which the
+    # step satisfies the secant equation.
+    delta_residual = output_state['residual'] - input_state['residual']
+    updated = jacobian + jnp.outer(
+        delta_residual - jacobian @ delta_x, delta_x / delta_x_squared
+    )
+    return updated, block_tridiagonal.factor(
+        updated, num_channels=num_channels, method=linear_solve_method
+    )
+
+  jacobian, factors = jax_utils.py_cond(
+      jnp.logical_and(
+          jnp.logical_and(accept, jnp.logical_not(refresh)),
+          delta_x_squared > 0.0,
+      ),
+      update,
+      lambda: (jacobian, factors),
+  )
+  return output_state | {'jacobian': jacobian, 'factors': factors}
+
+
+def _residual_without_errors(
+    residual_fun: Callable[[jax.Array], tuple[jax.Array, Any]],
+    x: jax.Array,
+) -> tuple[jax.Array, Any]:
+  """Evaluates the residual at `x` with sanity checking disabled."""
+  # Avoid sanity checking inside residual, since we directly
+  # afterwards check sanity on the output (NaN checking)
+  # TODO(b/312453092) consider instead sanity-checking x_new
+  with jax_utils.enable_errors(False):
+    return residual_fun(x)
+
+
 def delta_cond(
     delta_state: dict[str, jax.Array],
-    residual_fun: Callable[[jax.Array], jax.Array],
 ) -> bool:
   """Check if delta obtained from Newton step is valid.
 
   Args:
     delta_state: see `delta_body`.
-    residual_fun: Residual function.
 
   Returns:
     True if the new value of `x` causes any NaNs or has increased the residual
     relative to the old value of `x`.
   """
-  x_old = delta_state['x']
-  x_new = x_old + delta_state['delta']
-  residual_vec_x_old = delta_state['residual_old']
-  residual_scalar_x_old = residual_scalar(residual_vec_x_old)
-  # Avoid sanity checking inside residual, since we directly
-  # afterwards check sanity on the output (NaN checking)
-  # TODO(b/312453092) consider instead sanity-checking x_new
-  with jax_utils.enable_errors(False):
-    residual_vec_x_new, aux_output_x_new = residual_fun(x_new)
-    residual_scalar_x_new = residual_scalar(residual_vec_x_new)
-    delta_state['residual_new'] = residual_vec_x_new
-    delta_state['aux_output_new'] = aux_output_x_new
+  residual_scalar_x_old = residual_scalar(delta_state['residual_old'])
+  residual_scalar_x_new = residual_scalar(delta_state['residual_new'])
   return jnp.bool_(
       jnp.logical_and(
           jnp.max(delta_state['delta']) > MIN_DELTA,
@@ -462,12 +965,23 @@ def delta_cond(
 
 
 def delta_body(
-    input_delta_state: dict[str, jax.Array], delta_reduction_factor: float
+    input_delta_state: dict[str, jax.Array],
+    residual_fun: Callable[[jax.Array], tuple[jax.Array, Any]],
+    delta_reduction_factor: float,
 ) -> dict[str, jax.Array]:
   """Reduces step size for this Newton iteration."""
 
+  delta = input_delta_state['delta'] * delta_reduction_factor
+  residual_new, aux_output_new = profiling.timed(
+      profiling.RESIDUAL,
+      _residual_without_errors,
+      residual_fun,
+      input_delta_state['x'] + delta,
+  )
   return input_delta_state | dict(
-      delta=input_delta_state['delta'] * delta_reduction_factor,
+      delta=delta,
+      residual_new=residual_new,
+      aux_output_new=aux_output_new,
       tau=jnp.array(input_delta_state['tau'][...], dtype=jax_utils.get_dtype())
       * delta_reduction_factor,
   )
@@ -20,6 +20,7 @@ Residual functions are for use with e.g. the Newton-Raphson method
 while loss functions can be minimized using any optimization method.
 """
 
+import dataclasses
 import functools
 from typing import TypeAlias
 
@@ -27,15 +28,19 @@ import chex
 import jax
 from jax import numpy as jnp
 import jaxopt
+import numpy as np
 from torax import jax_utils
 from torax import state
 from torax.config import runtime_params_slice
 from torax.core_profiles import updaters
 from torax.fvm import block_1d_coeffs
+from torax.fvm import block_tridiagonal
 from torax.fvm import calc_coeffs
 from torax.fvm import cell_variable
 from torax.fvm import discrete_system
+from torax.fvm import enums
 from torax.fvm import fvm_conversions
+from torax.fvm import jacobian_coloring
 from torax.geometry import geometry
 from torax.pedestal_model import pedestal_model as pedestal_model_lib
 from torax.sources import source_models as source_models_lib
@@ -190,6 +195,78 @@ def theta_method_matrix_equation(
   return lhs_mat, lhs_vec, rhs_mat, rhs_vec
 
 
+def _theta_method_block_matrix_equation(
+    x_new_guess_vec: jax.Array,
+    dt: jax.Array,
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    dynamic_runtime_params_slice_t_plus_dt: runtime_params_slice.DynamicRuntimeParamsSlice,
+    geo_t_plus_dt: geometry.Geometry,
+    x_old: tuple[cell_variable.CellVariable, ...],
+    core_profiles_t_plus_dt: state.CoreProfiles,
+    transport_model: transport_model_lib.TransportModel,
+    explicit_source_profiles: source_profiles.SourceProfiles,
+    source_models: source_models_lib.SourceModels,
+    coeffs_old: Block1DCoeffs,
+    evolving_names: tuple[str, ...],
+    pedestal_model: pedestal_model_lib.PedestalModel,
+    core_transport: state.CoreTransport | None = None,
+) -> tuple[
+    tuple[jax.Array, jax.Array, jax.Array, jax.Array], AuxiliaryOutput
+]:
+  """Theta-method matrix equation with the coefficients at a guess of x_new.
+
+  See `theta_method_block_residual` for the arguments.
+
+  Returns:
+    matrix_equation: The outputs of `theta_method_matrix_equation`.
+    aux_output: The auxiliary outputs of the coefficients at x_new_guess_vec.
+  """
+  # Prepare core_profiles_t_plus_dt for calc_coeffs. Explanation:
+  # 1. The original (before iterative solving) core_profiles_t_plus_dt contained
+  #    updated boundary conditions and prescribed profiles.
+  # 2. Before calling calc_coeffs, we need to update the evolving subset of the
+  #    core_profiles_t_plus_dt CellVariables with the current x_new_guess.
+  # 3. Ion and impurity density and charge states are also updated here, since
+  #    they are state dependent (on n_e and T_e).
+  x_new_guess = fvm_conversions.vec_to_cell_variable_tuple(
+      x_new_guess_vec, core_profiles_t_plus_dt, evolving_names
+  )
+  core_profiles_t_plus_dt = updaters.update_core_profiles_during_step(
+      x_new_guess,
+      static_runtime_params_slice,
+      dynamic_runtime_params_slice_t_plus_dt,
+      geo_t_plus_dt,
+      core_profiles_t_plus_dt,
+      evolving_names,
+  )
+  coeffs_new = calc_coeffs.calc_coeffs(
+      static_runtime_params_slice=static_runtime_params_slice,
+      dynamic_runtime_params_slice=dynamic_runtime_params_slice_t_plus_dt,
+      geo=geo_t_plus_dt,
+      core_profiles=core_profiles_t_plus_dt,
+      transport_model=transport_model,
+      explicit_source_profiles=explicit_source_profiles,
+      source_models=source_models,
+      evolving_names=evolving_names,
+      use_pereverzev=False,
+      pedestal_model=pedestal_model,
+      core_transport=core_transport,
+  )
+
+  lhs_mat, lhs_vec, rhs_mat, rhs_vec = theta_method_matrix_equation(
+      dt=dt,
+      x_old=x_old,
+      x_new_guess=x_new_guess,
+      coeffs_old=coeffs_old,
+      coeffs_new=coeffs_new,
+      theta_implicit=static_runtime_params_slice.solver.theta_implicit,
+      convection_dirichlet_mode=static_runtime_params_slice.solver.convection_dirichlet_mode,
+      convection_neumann_mode=static_runtime_params_slice.solver.convection_neumann_mode,
+  )
+
+  return (lhs_mat, lhs_vec, rhs_mat, rhs_vec), coeffs_new.auxiliary_outputs
+
+
 @functools.partial(
     jax_utils.jit,
     static_argnames=[
@@ -214,6 +291,7 @@ def theta_method_block_residual(
     coeffs_old: Block1DCoeffs,
     evolving_names: tuple[str, ...],
     pedestal_model: pedestal_model_lib.PedestalModel,
+    core_transport: state.CoreTransport | None = None,
 ) -> tuple[jax.Array, AuxiliaryOutput]:
   """Residual of theta-method equation for core profiles at next time-step.
 
@@ -245,58 +323,253 @@ def theta_method_block_residual(
     evolving_names: The names of variables within the core profiles that should
       evolve.
     pedestal_model: Model of the pedestal's behavior.
+    core_transport: If set, these transport coefficients are used instead of
+      calling the transport model, i.e. the transport is frozen.
 
   Returns:
     residual: Vector residual between LHS and RHS of the theta method equation.
   """
   x_old_vec = jnp.concatenate([var.value for var in x_old])
-  # Prepare core_profiles_t_plus_dt for calc_coeffs. Explanation:
-  # 1. The original (before iterative solving) core_profiles_t_plus_dt contained
-  #    updated boundary conditions and prescribed profiles.
-  # 2. Before calling calc_coeffs, we need to update the evolving subset of the
-  #    core_profiles_t_plus_dt CellVariables with the current x_new_guess.
-  # 3. Ion and impurity density and charge states are also updated here, since
-  #    they are state dependent (on n_e and T_e).
-  x_new_guess = fvm_conversions.vec_to_cell_variable_tuple(
-      x_new_guess_vec, core_profiles_t_plus_dt, evolving_names
+  (lhs_mat, lhs_vec, rhs_mat, rhs_vec), aux_output = (
+      _theta_method_block_matrix_equation(
+          x_new_guess_vec=x_new_guess_vec,
+          dt=dt,
+          static_runtime_params_slice=static_runtime_params_slice,
+          dynamic_runtime_params_slice_t_plus_dt=dynamic_runtime_params_slice_t_plus_dt,
+          geo_t_plus_dt=geo_t_plus_dt,
+          x_old=x_old,
+          core_profiles_t_plus_dt=core_profiles_t_plus_dt,
+          transport_model=transport_model,
+          explicit_source_profiles=explicit_source_profiles,
+          source_models=source_models,
+          coeffs_old=coeffs_old,
+          evolving_names=evolving_names,
+          pedestal_model=pedestal_model,
+          core_transport=core_transport,
+      )
   )
-  core_profiles_t_plus_dt = updaters.update_core_profiles_during_step(
-      x_new_guess,
+
+  lhs = jnp.dot(lhs_mat, x_new_guess_vec) + lhs_vec
+  rhs = jnp.dot(rhs_mat, x_old_vec) + rhs_vec
+
+  residual = lhs - rhs
+  return residual, aux_output
+
+
+@functools.partial(
+    jax_utils.jit,
+    static_argnames=[
+        'static_runtime_params_slice',
+        'transport_model',
+        'source_models',
+        'evolving_names',
+        'pedestal_model',
+    ],
+)
+def theta_method_block_jacobian(*args, **kwargs):
+  return jax.jacfwd(theta_method_block_residual, has_aux=True)(*args, **kwargs)
+
+
+@functools.partial(
+    jax_utils.jit,
+    static_argnames=[
+        'static_runtime_params_slice',
+        'transport_model',
+        'evolving_names',
+        'pedestal_model',
+    ],
+)
+def theta_method_block_transport(
+    x_new_guess_vec: jax.Array,
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    dynamic_runtime_params_slice_t_plus_dt: runtime_params_slice.DynamicRuntimeParamsSlice,
+    geo_t_plus_dt: geometry.Geometry,
+    core_profiles_t_plus_dt: state.CoreProfiles,
+    transport_model: transport_model_lib.TransportModel,
+    evolving_names: tuple[str, ...],
+    pedestal_model: pedestal_model_lib.PedestalModel,
+) -> state.CoreTransport:
+  """Transport coefficients at a guess of x_new.
+
+  These are the coefficients which `theta_method_block_residual` computes
+  internally, such that passing them as its `core_transport` gives the same
+  residual at x_new_guess_vec.
+
+  Args:
+    x_new_guess_vec: Flattened array of current guess of x_new for all evolving
+      core profiles.
+    static_runtime_params_slice: Static runtime parameters.
+    dynamic_runtime_params_slice_t_plus_dt: Runtime parameters for time t + dt.
+    geo_t_plus_dt: The geometry at time t + dt.
+    core_profiles_t_plus_dt: Core plasma profiles which contain all available
+      prescribed quantities at the end of the time step.
+    transport_model: Turbulent transport model callable.
+    evolving_names: The names of variables within the core profiles that should
+      evolve.
+    pedestal_model: Model of the pedestal's behavior.
+
+  Returns:
+    The transport coefficients at x_new_guess_vec.
+  """
+  core_profiles = updaters.update_core_profiles_during_step(
+      fvm_conversions.vec_to_cell_variable_tuple(
+          x_new_guess_vec, core_profiles_t_plus_dt, evolving_names
+      ),
       static_runtime_params_slice,
       dynamic_runtime_params_slice_t_plus_dt,
       geo_t_plus_dt,
       core_profiles_t_plus_dt,
       evolving_names,
   )
-  coeffs_new = calc_coeffs.calc_coeffs(
+  pedestal_model_output = pedestal_model(
+      dynamic_runtime_params_slice_t_plus_dt, geo_t_plus_dt, core_profiles
+  )
+  return transport_model(
+      dynamic_runtime_params_slice_t_plus_dt,
+      geo_t_plus_dt,
+      core_profiles,
+      pedestal_model_output,
+  )
+
+
+@functools.partial(
+    jax_utils.jit,
+    static_argnames=[
+        'static_runtime_params_slice',
+        'transport_model',
+        'source_models',
+        'evolving_names',
+        'pedestal_model',
+        'krylov_method',
+        'krylov_restart',
+        'krylov_maxiter',
+    ],
+)
+def theta_method_block_krylov_step(
+    x_new_guess_vec: jax.Array,
+    dt: jax.Array,
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    dynamic_runtime_params_slice_t_plus_dt: runtime_params_slice.DynamicRuntimeParamsSlice,
+    geo_t_plus_dt: geometry.Geometry,
+    x_old: tuple[cell_variable.CellVariable, ...],
+    core_profiles_t_plus_dt: state.CoreProfiles,
+    transport_model: transport_model_lib.TransportModel,
+    explicit_source_profiles: source_profiles.SourceProfiles,
+    source_models: source_models_lib.SourceModels,
+    coeffs_old: Block1DCoeffs,
+    evolving_names: tuple[str, ...],
+    pedestal_model: pedestal_model_lib.PedestalModel,
+    krylov_method: enums.KrylovMethod,
+    krylov_tol: jax.Array | float,
+    krylov_restart: int,
+    krylov_maxiter: int,
+) -> jax.Array:
+  """Newton step for `theta_method_block_residual` without its Jacobian.
+
+  Solves `J delta = -R(x_new_guess_vec)` with a Krylov method, where the
+  Jacobian J is only applied through Jacobian-vector products of the residual
+  R. The Krylov method is preconditioned by the left-hand side matrix of the
+  theta method at x_new_guess_vec, i.e. the Jacobian at frozen coefficients.
+  It only couples neighbouring cells, so is factored with the block Thomas
+  algorithm.
+
+  Args:
+    x_new_guess_vec: Flattened array of current guess of x_new for all evolving
+      core profiles.
+    dt: Time step duration.
+    static_runtime_params_slice: Static runtime parameters.
+    dynamic_runtime_params_slice_t_plus_dt: Runtime parameters for time t + dt.
+    geo_t_plus_dt: The geometry at time t + dt.
+    x_old: The starting x defined as a tuple of CellVariables.
+    core_profiles_t_plus_dt: Core plasma profiles which contain all available
+      prescribed quantities at the end of the time step.
+    transport_model: Turbulent transport model callable.
+    explicit_source_profiles: Pre-calculated sources implemented as explicit
+      sources in the PDE.
+    source_models: Collection of source callables to generate source PDE
+      coefficients.
+    coeffs_old: The coefficients calculated at x_old.
+    evolving_names: The names of variables within the core profiles that should
+      evolve.
+    pedestal_model: Model of the pedestal's behavior.
+    krylov_method: The Krylov method.
+    krylov_tol: Relative tolerance of the Krylov method.
+    krylov_restart: Size of the Krylov subspace before GMRES restarts.
+    krylov_maxiter: Maximum number of iterations, or of restarts for GMRES.
+
+  Returns:
+    delta: The approximate Newton step.
+  """
+  kwargs = dict(
+      dt=dt,
       static_runtime_params_slice=static_runtime_params_slice,
-      dynamic_runtime_params_slice=dynamic_runtime_params_slice_t_plus_dt,
-      geo=geo_t_plus_dt,
-      core_profiles=core_profiles_t_plus_dt,
+      dynamic_runtime_params_slice_t_plus_dt=dynamic_runtime_params_slice_t_plus_dt,
+      geo_t_plus_dt=geo_t_plus_dt,
+      x_old=x_old,
+      core_profiles_t_plus_dt=core_profiles_t_plus_dt,
       transport_model=transport_model,
       explicit_source_profiles=explicit_source_profiles,
       source_models=source_models,
+      coeffs_old=coeffs_old,
       evolving_names=evolving_names,
-      use_pereverzev=False,
       pedestal_model=pedestal_model,
   )
-
-  lhs_mat, lhs_vec, rhs_mat, rhs_vec = theta_method_matrix_equation(
-      dt=dt,
-      x_old=x_old,
-      x_new_guess=x_new_guess,
-      coeffs_old=coeffs_old,
-      coeffs_new=coeffs_new,
-      theta_implicit=static_runtime_params_slice.solver.theta_implicit,
-      convection_dirichlet_mode=static_runtime_params_slice.solver.convection_dirichlet_mode,
-      convection_neumann_mode=static_runtime_params_slice.solver.convection_neumann_mode,
+  residual, jacobian_vector_product = jax.linearize(
+      lambda x: theta_method_block_residual(x, **kwargs)[0], x_new_guess_vec
+  )
+  (lhs_mat, _, _, _), _ = _theta_method_block_matrix_equation(
+      x_new_guess_vec, **kwargs
+  )
+  factors = block_tridiagonal.factor(
+      lhs_mat,
+      num_channels=len(evolving_names),
+      method=enums.LinearSolveMethod.BLOCK_TRIDIAGONAL,
   )
 
-  lhs = jnp.dot(lhs_mat, x_new_guess_vec) + lhs_vec
-  rhs = jnp.dot(rhs_mat, x_old_vec) + rhs_vec
+  def preconditioner(vec: jax.Array) -> jax.Array:
+    return block_tridiagonal.solve_factored(
+        factors,
+        vec,
+        num_channels=len(evolving_names),
+        method=enums.LinearSolveMethod.BLOCK_TRIDIAGONAL,
+    )
 
-  residual = lhs - rhs
-  return residual, coeffs_new.auxiliary_outputs
+  # The preconditioned right-hand side, the step of the linear theta method
+  # with the coefficients at x_new_guess_vec, is a good initial guess.
+  x0 = preconditioner(-residual)
+  match krylov_method:
+    case enums.KrylovMethod.GMRES:
+      delta, _ = jax.scipy.sparse.linalg.gmres(
+          jacobian_vector_product,
+          -residual,
+          x0=x0,
+          tol=krylov_tol,
+          restart=krylov_restart,
+          maxiter=krylov_maxiter,
+          M=preconditioner,
+      )
+    case enums.KrylovMethod.BICGSTAB:
+      delta, _ = jax.scipy.sparse.linalg.bicgstab(
+          jacobian_vector_product,
+          -residual,
+          x0=x0,
+          tol=krylov_tol,
+          maxiter=krylov_maxiter,
+          M=preconditioner,
+      )
+    case _:
+      raise ValueError(f'Unknown Krylov method: {krylov_method}')
+  return delta
+
+
+# Transport coefficients entering the theta-method equation. The other fields
+# of CoreTransport are only outputs.
+_TRANSPORT_COEFF_NAMES = (
+    'chi_face_ion',
+    'chi_face_el',
+    'd_face_el',
+    'v_face_el',
+)
 
 
 @functools.partial(
@@ -307,10 +580,199 @@ def theta_method_block_residual(
         'source_models',
         'evolving_names',
         'pedestal_model',
+        'bandwidth',
     ],
 )
-def theta_method_block_jacobian(*args, **kwargs):
-  return jax.jacfwd(theta_method_block_residual, has_aux=True)(*args, **kwargs)
+def theta_method_block_jacobian_colored(
+    x_new_guess_vec: jax.Array,
+    dt: jax.Array,
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    dynamic_runtime_params_slice_t_plus_dt: runtime_params_slice.DynamicRuntimeParamsSlice,
+    geo_t_plus_dt: geometry.Geometry,
+    x_old: tuple[cell_variable.CellVariable, ...],
+    core_profiles_t_plus_dt: state.CoreProfiles,
+    transport_model: transport_model_lib.TransportModel,
+    explicit_source_profiles: source_profiles.SourceProfiles,
+    source_models: source_models_lib.SourceModels,
+    coeffs_old: Block1DCoeffs,
+    evolving_names: tuple[str, ...],
+    pedestal_model: pedestal_model_lib.PedestalModel,
+    bandwidth: int,
+    core_transport: state.CoreTransport | None = None,
+) -> tuple[jax.Array, AuxiliaryOutput]:
+  """Jacobian of `theta_method_block_residual` from compressed JVPs.
+
+  Apart from the smoothing of the transport coefficients, the residual in a
+  cell only depends on the profiles in a few neighbouring cells. Writing the
+  residual as R(x, T), with T the transport coefficients, the Jacobian is
+
+    dR/dx + sum_c dR/dT_c K_c dt_c/dx,
+
+  where dR/dx is taken at frozen transport coefficients, t_c(x) are the
+  unsmoothed transport coefficients and K_c the smoothing matrix. dR/dx,
+  dR/dT_c and dt_c/dx are banded and are recovered from a number of
+  Jacobian-vector products independent of the grid size, see
+  `jacobian_coloring`. The dense smoothing matrix is then applied exactly.
+
+  Args:
+    x_new_guess_vec: Flattened array of current guess of x_new for all evolving
+      core profiles.
+    dt: Time step duration.
+    static_runtime_params_slice: Static runtime parameters.
+    dynamic_runtime_params_slice_t_plus_dt: Runtime parameters for time t + dt.
+    geo_t_plus_dt: The geometry at time t + dt.
+    x_old: The starting x defined as a tuple of CellVariables.
+    core_profiles_t_plus_dt: Core plasma profiles which contain all available
+      prescribed quantities at the end of the time step.
+    transport_model: Turbulent transport model callable.
+    explicit_source_profiles: Pre-calculated sources implemented as explicit
+      sources in the PDE.
+    source_models: Collection of source callables to generate source PDE
+      coefficients.
+    coeffs_old: The coefficients calculated at x_old.
+    evolving_names: The names of variables within the core profiles that should
+      evolve.
+    pedestal_model: Model of the pedestal's behavior.
+    bandwidth: Number of neighbouring cells on each side through which the
+      residual in a cell depends on the profiles, excluding the transport
+      smoothing. The unsmoothed transport coefficients on a face are assumed to
+      depend on the `2 * bandwidth` closest cells. Couplings further away are
+      not computed exactly but lumped into the computed entries.
+    core_transport: If set, the Jacobian dR/dx of the residual with these
+      frozen transport coefficients, which does not evaluate the transport
+      model.
+
+  Returns:
+    jacobian: The Jacobian of the residual with respect to x_new_guess_vec.
+    aux_output: The auxiliary output of the residual at x_new_guess_vec.
+  """
+  residual_fun = functools.partial(
+      theta_method_block_residual,
+      dt=dt,
+      static_runtime_params_slice=static_runtime_params_slice,
+      dynamic_runtime_params_slice_t_plus_dt=dynamic_runtime_params_slice_t_plus_dt,
+      geo_t_plus_dt=geo_t_plus_dt,
+      x_old=x_old,
+      core_profiles_t_plus_dt=core_profiles_t_plus_dt,
+      transport_model=transport_model,
+      explicit_source_profiles=explicit_source_profiles,
+      source_models=source_models,
+      coeffs_old=coeffs_old,
+      evolving_names=evolving_names,
+      pedestal_model=pedestal_model,
+  )
+
+  def local_fun(x_vec):
+    """Residual at frozen transport and the unsmoothed transport."""
+    core_profiles = updaters.update_core_profiles_during_step(
+        fvm_conversions.vec_to_cell_variable_tuple(
+            x_vec, core_profiles_t_plus_dt, evolving_names
+        ),
+        static_runtime_params_slice,
+        dynamic_runtime_params_slice_t_plus_dt,
+        geo_t_plus_dt,
+        core_profiles_t_plus_dt,
+        evolving_names,
+    )
+    pedestal_model_output = pedestal_model(
+        dynamic_runtime_params_slice_t_plus_dt, geo_t_plus_dt, core_profiles
+    )
+    unsmoothed = transport_model.call_unsmoothed(
+        dynamic_runtime_params_slice_t_plus_dt,
+        geo_t_plus_dt,
+        core_profiles,
+        pedestal_model_output,
+    )
+    smoothing_matrix = transport_model_lib.build_smoothing_matrix(
+        geo_t_plus_dt,
+        dynamic_runtime_params_slice_t_plus_dt,
+        pedestal_model_output,
+    )
+    core_transport = jax.lax.stop_gradient(
+        transport_model_lib.smooth_coeffs(smoothing_matrix, unsmoothed)
+    )
+    residual, aux_output = residual_fun(x_vec, core_transport=core_transport)
+    out = jnp.concatenate(
+        [residual]
+        + [getattr(unsmoothed, name) for name in _TRANSPORT_COEFF_NAMES]
+    )
+    return out, (aux_output, core_transport, unsmoothed, smoothing_matrix)
+
+  num_channels = len(evolving_names)
+  num_cells = x_new_guess_vec.shape[0] // num_channels
+  num_faces = num_cells + 1
+  num_coeffs = len(_TRANSPORT_COEFF_NAMES)
+  cell_positions = jacobian_coloring.grid_positions(num_channels, num_cells, 0.5)
+  if core_transport is not None:
+    return jacobian_coloring.colored_jacobian(
+        functools.partial(residual_fun, core_transport=core_transport),
+        x_new_guess_vec,
+        jacobian_coloring.band_pattern(
+            cell_positions, cell_positions, bandwidth
+        ),
+    )
+  face_positions = jacobian_coloring.grid_positions(num_coeffs, num_faces, 0.0)
+
+  local_pattern = np.concatenate([
+      jacobian_coloring.band_pattern(
+          cell_positions, cell_positions, bandwidth
+      ),
+      jacobian_coloring.band_pattern(
+          face_positions, cell_positions, bandwidth - 0.5
+      ),
+  ])
+  local_jacobian, (aux_output, core_transport, unsmoothed, smoothing_matrix) = (
+      jacobian_coloring.colored_jacobian(
+          local_fun, x_new_guess_vec, local_pattern
+      )
+  )
+  num_residuals = x_new_guess_vec.shape[0]
+  frozen_transport_jacobian = local_jacobian[:num_residuals]
+  unsmoothed_jacobian = local_jacobian[num_residuals:].reshape(
+      num_coeffs, num_faces, num_residuals
+  )
+
+  def transport_fun(coeffs_vec):
+    """Residual as a function of the transport coefficients."""
+    coeffs = coeffs_vec.reshape(num_coeffs, num_faces)
+    return residual_fun(
+        x_new_guess_vec,
+        core_transport=dataclasses.replace(
+            core_transport,
+            **dict(zip(_TRANSPORT_COEFF_NAMES, coeffs)),
+        ),
+    )
+
+  # The theta-method equation in a cell depends on the coefficients on its two
+  # faces.
+  transport_jacobian, _ = jacobian_coloring.colored_jacobian(
+      transport_fun,
+      jnp.concatenate(
+          [getattr(core_transport, name) for name in _TRANSPORT_COEFF_NAMES]
+      ),
+      jacobian_coloring.band_pattern(cell_positions, face_positions, 0.5),
+  )
+  transport_jacobian = transport_jacobian.reshape(
+      num_residuals, num_coeffs, num_faces
+  )
+
+  # Coefficients which are all zero are left unsmoothed, see
+  # `transport_model_lib.smooth_coeffs`.
+  smoothing_matrices = jnp.stack([
+      jnp.where(
+          jnp.all(getattr(unsmoothed, name) == 0.0),
+          jnp.eye(num_faces),
+          smoothing_matrix,
+      )
+      for name in _TRANSPORT_COEFF_NAMES
+  ])
+  jacobian = frozen_transport_jacobian + jnp.einsum(
+      'icf,cfg,cgj->ij',
+      transport_jacobian,
+      smoothing_matrices,
+      unsmoothed_jacobian,
+  )
+  return jacobian, aux_output
 
 
 @functools.partial(
@@ -0,0 +1,123 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from absl.testing import absltest
+from absl.testing import parameterized
+import jax
+import numpy as np
+from torax.fvm import block_tridiagonal
+from torax.fvm import enums
+
+
+def _random_channel_major_matrix(
+    num_cells: int, num_channels: int, seed: int = 0
+) -> np.ndarray:
+  """Returns a diagonally dominant matrix with tridiagonal channel blocks."""
+  rng = np.random.default_rng(seed)
+  band = np.abs(np.arange(num_cells)[:, None] - np.arange(num_cells)) <= 1
+  blocks = [
+      [rng.normal(size=(num_cells, num_cells)) * band] * num_channels
+      for _ in range(num_channels)
+  ]
+  mat = np.block(blocks)
+  mat += np.eye(num_cells * num_channels) * 4 * num_channels
+  return mat
+
+
+class BlockTridiagonalTest(parameterized.TestCase):
+
+  @parameterized.parameters(
+      dict(num_cells=1, num_channels=1),
+      dict(num_cells=5, num_channels=1),
+      dict(num_cells=4, num_channels=3),
+      dict(num_cells=25, num_channels=4),
+  )
+  def test_solve_matches_dense_solve(self, num_cells, num_channels):
+    mat = _random_channel_major_matrix(num_cells, num_channels)
+    vec = np.random.default_rng(1).normal(size=num_cells * num_channels)
+
+    x = jax.jit(
+        block_tridiagonal.solve, static_argnames=['num_channels', 'method']
+    )(
+        mat,
+        vec,
+        num_channels=num_channels,
+        method=enums.LinearSolveMethod.BLOCK_TRIDIAGONAL,
+    )
+
+    np.testing.assert_allclose(x, np.linalg.solve(mat, vec), rtol=1e-10)
+
+  def test_extract_blocks(self):
+    num_cells = 4
+    num_channels = 2
+    mat = _random_channel_major_matrix(num_cells, num_channels)
+
+    lower, diag, upper = block_tridiagonal.extract_blocks(mat, num_channels)
+
+    for i in range(num_cells):
+      for a in range(num_channels):
+        for b in range(num_channels):
+          row = a * num_cells + i
+          col = b * num_cells
+          self.assertEqual(diag[i, a, b], mat[row, col + i])
+          if i > 0:
+            self.assertEqual(lower[i, a, b], mat[row, col + i - 1])
+          if i < num_cells - 1:
+            self.assertEqual(upper[i, a, b], mat[row, col + i + 1])
+    np.testing.assert_array_equal(lower[0], 0.0)
+    np.testing.assert_array_equal(upper[-1], 0.0)
+
+  def test_entries_outside_band_are_ignored(self):
+    num_cells = 6
+    num_channels = 2
+    mat = _random_channel_major_matrix(num_cells, num_channels)
+    vec = np.random.default_rng(1).normal(size=num_cells * num_channels)
+    far_mat = mat.copy()
+    far_mat[0, num_cells - 1] = 1.0
+    far_mat[num_cells + 3, 0] = -1.0
+
+    x = block_tridiagonal.solve(
+        far_mat,
+        vec,
+        num_channels=num_channels,
+        method=enums.LinearSolveMethod.BLOCK_TRIDIAGONAL,
+    )
+
+    np.testing.assert_allclose(x, np.linalg.solve(mat, vec), rtol=1e-10)
+
+  def test_dense_solve(self):
+    mat = _random_channel_major_matrix(3, 2)
+    vec = np.ones(6)
+
+    x = block_tridiagonal.solve(mat, vec, num_channels=2)
+
+    np.testing.assert_allclose(x, np.linalg.solve(mat, vec))
+
+  @parameterized.parameters(
+      enums.LinearSolveMethod.DENSE,
+      enums.LinearSolveMethod.BLOCK_TRIDIAGONAL,
+  )
+  def test_factored_solve_matches_solve(self, method):
+    num_cells = 7
+    num_channels = 3
+    mat = _random_channel_major_matrix(num_cells, num_channels)
+    factors = block_tridiagonal.factor(mat, num_channels, method)
+
+    for seed in range(2):
+      vec = np.random.default_rng(seed).normal(size=num_cells * num_channels)
+      x = block_tridiagonal.solve_factored(factors, vec, num_channels, method)
+      np.testing.assert_allclose(x, np.linalg.solve(mat, vec), rtol=1e-10)
+
+
+if __name__ == '__main__':
+  absltest.main()
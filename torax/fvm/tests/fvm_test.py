@@ -24,6 +24,7 @@ from torax.core_profiles import initialization
 from torax.fvm import block_1d_coeffs
 from torax.fvm import calc_coeffs
 from torax.fvm import cell_variable
+from torax.fvm import enums
 from torax.fvm import implicit_solve_block
 from torax.fvm import residual_and_loss
 from torax.sources import runtime_params as source_runtime_params
@@ -616,6 +617,140 @@ class FVMTest(parameterized.TestCase):
       )
       self.assertGreater(jnp.abs(jnp.sum(residual)), 0.0)
 
+  def _get_residual_kwargs(self, smoothing_width):
+    """Returns a guess of x_new and the other arguments of the residual."""
+    torax_config = model_config.ToraxConfig.from_dict(
+        dict(
+            numerics=dict(
+                evolve_ion_heat=True,
+                evolve_electron_heat=True,
+                evolve_current=True,
+                evolve_density=True,
+            ),
+            profile_conditions=dict(),
+            plasma_composition=dict(),
+            geometry=dict(geometry_type='circular', n_rho=10),
+            pedestal=dict(),
+            sources=default_sources.get_default_source_config(),
+            neoclassical=dict(bootstrap_current=dict()),
+            solver=dict(solver_type='newton_raphson'),
+            transport=dict(
+                transport_model='CGM', smoothing_width=smoothing_width
+            ),
+            time_step_calculator=dict(),
+        )
+    )
+    dynamic_runtime_params_slice = (
+        build_runtime_params.DynamicRuntimeParamsSliceProvider.from_config(
+            torax_config
+        )(
+            t=torax_config.numerics.t_initial,
+        )
+    )
+    static_runtime_params_slice = (
+        build_runtime_params.build_static_params_from_config(torax_config)
+    )
+    source_models = source_models_lib.SourceModels(
+        sources=torax_config.sources, neoclassical=torax_config.neoclassical,
+    )
+    pedestal_model = torax_config.pedestal.build_pedestal_model()
+    transport_model = torax_config.transport.build_transport_model()
+    geo = torax_config.geometry.build_provider(torax_config.numerics.t_initial)
+    core_profiles = initialization.initial_core_profiles(
+        static_runtime_params_slice,
+        dynamic_runtime_params_slice,
+        geo,
+        source_models,
+    )
+    explicit_source_profiles = source_profile_builders.build_source_profiles(
+        dynamic_runtime_params_slice=dynamic_runtime_params_slice,
+        static_runtime_params_slice=static_runtime_params_slice,
+        geo=geo,
+        core_profiles=core_profiles,
+        source_models=source_models,
+        explicit=True,
+    )
+    evolving_names = ('T_i', 'T_e', 'psi', 'n_e')
+    coeffs_old = calc_coeffs.calc_coeffs(
+        static_runtime_params_slice=static_runtime_params_slice,
+        dynamic_runtime_params_slice=dynamic_runtime_params_slice,
+        geo=geo,
+        core_profiles=core_profiles,
+        transport_model=transport_model,
+        explicit_source_profiles=explicit_source_profiles,
+        source_models=source_models,
+        pedestal_model=pedestal_model,
+        evolving_names=evolving_names,
+    )
+    x_old = tuple(core_profiles[name] for name in evolving_names)
+    # Perturb the profiles such that the Jacobian is not evaluated at the
+    # initial state.
+    x_new_guess_vec = jnp.concatenate([x.value for x in x_old]) * (
+        1.0 + 0.1 * jnp.sin(jnp.arange(40.0))
+    )
+    kwargs = dict(
+        dt=jnp.array(0.1),
+        static_runtime_params_slice=static_runtime_params_slice,
+        dynamic_runtime_params_slice_t_plus_dt=dynamic_runtime_params_slice,
+        geo_t_plus_dt=geo,
+        x_old=x_old,
+        core_profiles_t_plus_dt=core_profiles,
+        transport_model=transport_model,
+        explicit_source_profiles=explicit_source_profiles,
+        source_models=source_models,
+        coeffs_old=coeffs_old,
+        evolving_names=evolving_names,
+        pedestal_model=pedestal_model,
+    )
+    return x_new_guess_vec, kwargs
+
+  @parameterized.parameters(0.0, 0.1)
+  def test_colored_jacobian_matches_dense_jacobian(self, smoothing_width):
+    x_new_guess_vec, kwargs = self._get_residual_kwargs(smoothing_width)
+
+    dense_jacobian, _ = residual_and_loss.theta_method_block_jacobian(
+        x_new_guess_vec, **kwargs
+    )
+    colored_jacobian, _ = (
+        residual_and_loss.theta_method_block_jacobian_colored(
+            x_new_guess_vec, bandwidth=2, **kwargs
+        )
+    )
+
+    np.testing.assert_allclose(
+        colored_jacobian,
+        dense_jacobian,
+        atol=1e-12 * np.abs(dense_jacobian).max(),
+    )
+
+
+  @parameterized.parameters(
+      enums.KrylovMethod.GMRES, enums.KrylovMethod.BICGSTAB
+  )
+  def test_krylov_step_matches_newton_step(self, krylov_method):
+    x_new_guess_vec, kwargs = self._get_residual_kwargs(smoothing_width=0.1)
+    jacobian, _ = residual_and_loss.theta_method_block_jacobian(
+        x_new_guess_vec, **kwargs
+    )
+    residual, _ = residual_and_loss.theta_method_block_residual(
+        x_new_guess_vec, **kwargs
+    )
+
+    delta = residual_and_loss.theta_method_block_krylov_step(
+        x_new_guess_vec,
+        krylov_method=krylov_method,
+        krylov_tol=1e-10,
+        krylov_restart=20,
+        krylov_maxiter=20,
+        **kwargs,
+    )
+
+    np.testing.assert_allclose(
+        delta,
+        np.linalg.solve(jacobian, -residual),
+        atol=1e-8 * np.abs(delta).max(),
+    )
+
 
 if __name__ == '__main__':
   absltest.main()
@@ -0,0 +1,81 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from absl.testing import absltest
+from absl.testing import parameterized
+import jax
+from jax import numpy as jnp
+import numpy as np
+from torax.fvm import jacobian_coloring
+
+
+def _stencil_fun(x):
+  """Nonlinear function of two channels coupling cells up to 2 apart."""
+  a, b = jnp.split(x, 2)
+  a_pad = jnp.pad(a, 2)
+  b_pad = jnp.pad(b, 2)
+  out_a = a**2 * a_pad[:-4] + jnp.sin(b_pad[4:]) + a_pad[1:-3] * b
+  out_b = jnp.exp(b_pad[3:-1]) * a + b_pad[:-4] ** 3
+  return jnp.concatenate([out_a, out_b]), jnp.sum(x)
+
+
+class JacobianColoringTest(parameterized.TestCase):
+
+  @parameterized.parameters(
+      dict(num_channels=1, bandwidth=1, expected_num_colors=3),
+      dict(num_channels=2, bandwidth=2, expected_num_colors=10),
+      dict(num_channels=4, bandwidth=2, expected_num_colors=20),
+  )
+  def test_number_of_colors_of_banded_pattern(
+      self, num_channels, bandwidth, expected_num_colors
+  ):
+    positions = jacobian_coloring.grid_positions(num_channels, 25, 0.5)
+    pattern = jacobian_coloring.band_pattern(positions, positions, bandwidth)
+    colors = jacobian_coloring.color_columns(pattern)
+    self.assertEqual(colors.max() + 1, expected_num_colors)
+    # No row has two entries of the same color.
+    for row in pattern:
+      self.assertLen(np.unique(colors[row]), np.sum(row))
+
+  def test_colored_jacobian_matches_dense_jacobian(self):
+    x = jnp.linspace(0.1, 1.0, 16)
+    positions = jacobian_coloring.grid_positions(2, 8, 0.5)
+    pattern = jacobian_coloring.band_pattern(positions, positions, 2)
+
+    jacobian, aux = jacobian_coloring.colored_jacobian(_stencil_fun, x, pattern)
+
+    np.testing.assert_allclose(
+        jacobian, jax.jacfwd(lambda x: _stencil_fun(x)[0])(x), rtol=1e-12
+    )
+    np.testing.assert_allclose(aux, jnp.sum(x))
+
+  def test_couplings_outside_of_pattern_are_lumped(self):
+    x = jnp.linspace(0.1, 1.0, 16)
+    positions = jacobian_coloring.grid_positions(2, 8, 0.5)
+    pattern = jacobian_coloring.band_pattern(positions, positions, 1)
+    dense_jacobian = jax.jacfwd(lambda x: _stencil_fun(x)[0])(x)
+
+    jacobian, _ = jacobian_coloring.colored_jacobian(_stencil_fun, x, pattern)
+
+    self.assertFalse(np.allclose(jacobian, dense_jacobian))
+    np.testing.assert_array_equal(jacobian[~pattern], 0.0)
+
+  def test_band_pattern_is_shifted_inwards_at_edges(self):
+    positions = jacobian_coloring.grid_positions(1, 6, 0.5)
+    pattern = jacobian_coloring.band_pattern(positions, positions, 1)
+    np.testing.assert_array_equal(pattern[0], [1, 1, 1, 0, 0, 0])
+    np.testing.assert_array_equal(pattern[2], [0, 1, 1, 1, 0, 0])
+    np.testing.assert_array_equal(pattern[5], [0, 0, 0, 1, 1, 1])
+
+if __name__ == '__main__':
+  absltest.main()
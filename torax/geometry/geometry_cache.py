@@ -0,0 +1,255 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache of processed `StandardGeometry` objects.
+
+Building a `StandardGeometry` from a CHEASE, FBT or EQDSK file involves
+parsing the file, computing flux surface averages and smoothing, which is
+repeated by every run even if the inputs are unchanged. When the
+`TORAX_GEOMETRY_CACHE_DIR` environment variable is set, the built geometries
+are stored as `.npz` files in that directory, keyed by a digest of the
+geometry files and of all the geometry construction parameters, so that runs
+on the same equilibrium skip the geometry construction.
+
+The total size of the cache is bounded by `TORAX_GEOMETRY_CACHE_MAX_BYTES`
+(1 GiB by default), evicting the least recently used entries first.
+"""
+
+from collections.abc import Callable, Sequence
+import dataclasses
+import enum
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any
+import zipfile
+
+import numpy as np
+import pydantic
+import torax
+from torax.geometry import geometry
+from torax.geometry import standard_geometry
+from torax.torax_pydantic import torax_pydantic
+
+
+CACHE_DIR_ENV = 'TORAX_GEOMETRY_CACHE_DIR'
+CACHE_MAX_BYTES_ENV = 'TORAX_GEOMETRY_CACHE_MAX_BYTES'
+_DEFAULT_MAX_BYTES = 1 << 30
+# Bump when the layout of the cache entries changes.
+_CACHE_FORMAT_VERSION = 1
+_METADATA_KEY = '__metadata__'
+_SUFFIX = '.npz'
+# Config fields which do not affect the built geometry. The geometry
+# directory is covered by the digests of the geometry files instead.
+_EXCLUDED_FIELDS = ('geometry_directory', 'max_workers')
+
+
+def get_cache_dir() -> str | None:
+  """Returns the geometry cache directory, or None if caching is disabled."""
+  cache_dir = os.environ.get(CACHE_DIR_ENV)
+  if not cache_dir:
+    return None
+  return os.path.expanduser(cache_dir)
+
+
+def _get_max_bytes() -> int:
+  if CACHE_MAX_BYTES_ENV not in os.environ:
+    return _DEFAULT_MAX_BYTES
+  return int(os.environ[CACHE_MAX_BYTES_ENV])
+
+
+def cached_build(
+    config: pydantic.BaseModel,
+    build_fn: Callable[[], standard_geometry.StandardGeometry],
+    geometry_files: Sequence[str] = (),
+) -> standard_geometry.StandardGeometry:
+  """Builds a geometry with `build_fn`, using the on-disk cache if enabled.
+
+  Args:
+    config: The geometry config. All fields except those which do not affect
+      the built geometry are part of the cache key.
+    build_fn: Builds the geometry on a cache miss.
+    geometry_files: Paths of the files read by `build_fn`. Their contents are
+      part of the cache key.
+
+  Returns:
+    The geometry, either loaded from the cache or built with `build_fn`.
+  """
+  cache_dir = get_cache_dir()
+  if cache_dir is None:
+    return build_fn()
+
+  path = os.path.join(
+      cache_dir, get_cache_key(config, geometry_files) + _SUFFIX
+  )
+  try:
+    geo = load_geometry(path)
+  except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+    # Missing, concurrently evicted or corrupt entry.
+    pass
+  else:
+    logging.info('Loaded geometry from cache: %s', path)
+    # Update the modification time, which is used for the LRU eviction.
+    os.utime(path)
+    return geo
+
+  geo = build_fn()
+  os.makedirs(cache_dir, exist_ok=True)
+  save_geometry(geo, path)
+  _evict(cache_dir, max_bytes=_get_max_bytes(), keep=path)
+  return geo
+
+
+def get_cache_key(
+    config: pydantic.BaseModel,
+    geometry_files: Sequence[str] = (),
+) -> str:
+  """Returns the cache key of a geometry config and its geometry files."""
+  hasher = hashlib.sha256()
+  _update_hash(hasher, _CACHE_FORMAT_VERSION)
+  _update_hash(hasher, torax.__version__)
+  _update_hash(hasher, type(config).__qualname__)
+  _update_hash(
+      hasher, config.model_dump(exclude=set(_EXCLUDED_FIELDS))
+  )
+  for geometry_file in geometry_files:
+    _update_hash(hasher, _file_digest(geometry_file))
+  return hasher.hexdigest()
+
+
+def _file_digest(path: str) -> str:
+  file_hasher = hashlib.sha256()
+  with open(path, 'rb') as f:
+    for block in iter(lambda: f.read(1 << 20), b''):
+      file_hasher.update(block)
+  return file_hasher.hexdigest()
+
+
+def _update_hash(hasher: Any, value: Any):
+  """Updates a hash with a nested structure of dicts, sequences and arrays."""
+  if isinstance(value, dict):
+    hasher.update(b'{')
+    for k in sorted(value, key=str):
+      _update_hash(hasher, k)
+      _update_hash(hasher, value[k])
+    hasher.update(b'}')
+  elif isinstance(value, (list, tuple)):
+    hasher.update(b'[')
+    for v in value:
+      _update_hash(hasher, v)
+    hasher.update(b']')
+  elif isinstance(value, np.ndarray):
+    value = np.ascontiguousarray(value)
+    hasher.update(f'array({value.dtype.str}, {value.shape})'.encode())
+    if value.dtype.hasobject:
+      _update_hash(hasher, value.tolist())
+    else:
+      hasher.update(value.tobytes())
+  else:
+    hasher.update(f'{type(value).__name__}({value!r})'.encode())
+
+
+def save_geometry(geo: standard_geometry.StandardGeometry, path: str):
+  """Atomically saves a geometry to an `.npz` file."""
+  arrays = {}
+  metadata = {}
+  for field in dataclasses.fields(geo):
+    value = getattr(geo, field.name)
+    if value is None:
+      metadata[field.name] = {'kind': 'none'}
+    elif isinstance(value, geometry.GeometryType):
+      metadata[field.name] = {'kind': 'geometry_type', 'value': value.value}
+    elif isinstance(value, torax_pydantic.Grid1D):
+      metadata[field.name] = {'kind': 'grid', 'nx': value.nx, 'dx': value.dx}
+    elif isinstance(value, np.generic):
+      metadata[field.name] = {'kind': 'numpy_scalar'}
+      arrays[field.name] = np.asarray(value)
+    # Checked after numpy scalars, since np.float64 subclasses float.
+    elif isinstance(value, (bool, int, float)) and not isinstance(
+        value, enum.Enum
+    ):
+      metadata[field.name] = {'kind': type(value).__name__, 'value': value}
+    elif hasattr(value, '__array__'):
+      metadata[field.name] = {'kind': 'array'}
+      arrays[field.name] = np.asarray(value)
+    else:
+      raise TypeError(
+          f'Cannot cache geometry field {field.name} of type {type(value)}.'
+      )
+  arrays[_METADATA_KEY] = np.asarray(
+      json.dumps({'class': type(geo).__qualname__, 'fields': metadata})
+  )
+
+  # Write to a temporary file first, so that concurrent runs never read a
+  # partially written entry.
+  with tempfile.NamedTemporaryFile(
+      dir=os.path.dirname(path), suffix='.tmp', delete=False
+  ) as f:
+    np.savez(f, **arrays)
+  os.replace(f.name, path)
+
+
+def load_geometry(path: str) -> standard_geometry.StandardGeometry:
+  """Loads a geometry saved with `save_geometry`."""
+  with np.load(path, allow_pickle=False) as data:
+    metadata = json.loads(data[_METADATA_KEY].item())
+    if metadata['class'] != standard_geometry.StandardGeometry.__qualname__:
+      raise ValueError(f'Unexpected geometry class: {metadata["class"]}')
+    kwargs = {}
+    for name, field_metadata in metadata['fields'].items():
+      match field_metadata['kind']:
+        case 'none':
+          kwargs[name] = None
+        case 'geometry_type':
+          kwargs[name] = geometry.GeometryType(field_metadata['value'])
+        case 'grid':
+          kwargs[name] = torax_pydantic.Grid1D(
+              nx=field_metadata['nx'], dx=field_metadata['dx']
+          )
+        case 'bool' | 'int' | 'float':
+          kwargs[name] = field_metadata['value']
+        case 'numpy_scalar':
+          kwargs[name] = data[name][()]
+        case 'array':
+          kwargs[name] = data[name]
+        case kind:
+          raise ValueError(f'Unknown field kind {kind} for {name}.')
+  return standard_geometry.StandardGeometry(**kwargs)
+
+
+def _evict(cache_dir: str, max_bytes: int, keep: str):
+  """Removes the least recently used entries until below `max_bytes`."""
+  entries = []
+  for entry in os.scandir(cache_dir):
+    if not entry.name.endswith(_SUFFIX):
+      continue
+    try:
+      stat = entry.stat()
+    except FileNotFoundError:
+      continue
+    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+  total_bytes = sum(size for _, size, _ in entries)
+  for _, size, path in sorted(entries):
+    if total_bytes <= max_bytes:
+      break
+    if path == keep:
+      continue
+    try:
+      os.remove(path)
+    except FileNotFoundError:
+      pass
+    total_bytes -= size
@@ -96,15 +96,23 @@ def _load_eqdsk_data(file_path: str) -> dict[str, np.ndarray]:
   return eqdsk_data.__dict__  # dict(eqdsk_data)
 
 
+def get_geometry_file_path(
+    geometry_dir: str | None,
+    geometry_file: str,
+) -> str:
+  """Returns the path of a geometry file, using the default dir if None."""
+  if geometry_dir is None:
+    geometry_dir = os.path.join(torax.__path__[0], 'data/third_party/geo')
+  return os.path.join(geometry_dir, geometry_file)
+
+
 def load_geo_data(
     geometry_dir: str | None,
     geometry_file: str,
     geometry_source: GeometrySource,
 ) -> dict[str, np.ndarray]:
   """Loads the data from a CHEASE file into a dictionary."""
-  if geometry_dir is None:
-    geometry_dir = os.path.join(torax.__path__[0], 'data/third_party/geo')
-  filepath = os.path.join(geometry_dir, geometry_file)
+  filepath = get_geometry_file_path(geometry_dir, geometry_file)
 
   # initialize geometry from file
   match geometry_source:
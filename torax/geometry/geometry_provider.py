@@ -19,9 +19,12 @@ protocol defined here.
 """
 from collections.abc import Mapping
 import dataclasses
+import functools
 from typing import Protocol, Type
 
 import chex
+import jax
+from jax import numpy as jnp
 import numpy as np
 from torax import interpolated_param
 from torax import jax_utils
@@ -104,9 +107,50 @@ class ConstantGeometryProvider(GeometryProvider):
     return self._geo.torax_mesh
 
 
+@dataclasses.dataclass(frozen=True)
+class _PackedValues:
+  """Time-varying values of a TimeDependentGeometryProvider in one table.
+
+  Attributes:
+    times: The times of the geometries, of shape `(n_times,)`.
+    table: The values of all fields at each time, flattened and concatenated
+      along the last axis, of shape `(n_times, total_len)`.
+    layout: The name, start and stop columns in `table`, and shape of each
+      field.
+  """
+
+  times: jax.Array
+  table: jax.Array
+  layout: tuple[tuple[str, int, int, tuple[int, ...]], ...]
+
+
+@functools.partial(jax_utils.jit, static_argnames=['layout'])
+def _interpolate_packed_values(
+    t: chex.Numeric,
+    times: jax.Array,
+    table: jax.Array,
+    layout: tuple[tuple[str, int, int, tuple[int, ...]], ...],
+) -> dict[str, jax.Array]:
+  """Interpolates all columns of a packed table in time at once."""
+  if times.shape[0] == 1:
+    row = table[0]
+  else:
+    # The index and weight of `t` are shared by all columns.
+    row = jax.vmap(jnp.interp, in_axes=(None, None, 1))(t, times, table)
+  return {
+      name: row[start:stop].reshape(shape)
+      for name, start, stop, shape in layout
+  }
+
+
 @chex.dataclass(frozen=True)
 class TimeDependentGeometryProvider:
-  """A geometry provider which holds values to interpolate based on time."""
+  """A geometry provider which holds values to interpolate based on time.
+
+  All time-varying values are packed into a single table on first use, and
+  interpolated with a single jitted call per geometry, instead of one call per
+  field. The provider can be called with a traced time inside `jax.jit`.
+  """
 
   geometry_type: geometry.GeometryType
   torax_mesh: torax_pydantic.Grid1D
@@ -192,10 +236,52 @@ class TimeDependentGeometryProvider:
       ))
     return cls(**kwargs)
 
+  @functools.cached_property
+  def _packed_values(self) -> _PackedValues:
+    """Returns the time-varying values packed into a single table."""
+    names = []
+    shapes = []
+    times = None
+    columns = []
+    for attr in dataclasses.fields(self):
+      value = getattr(self, attr.name)
+      if not isinstance(value, interpolated_param.InterpolatedVarSingleAxis):
+        continue
+      param = value.param
+      if not isinstance(
+          param, interpolated_param.PiecewiseLinearInterpolatedParam
+      ):
+        raise ValueError(
+            f'{attr.name} must be interpolated piecewise linearly in time.'
+        )
+      if times is None:
+        times = np.asarray(param.xs)
+      elif not np.array_equal(param.xs, times):
+        raise ValueError('All geometry values must be given at the same times.')
+      names.append(attr.name)
+      shapes.append(np.shape(param.ys)[1:])
+      columns.append(np.asarray(param.ys).reshape(len(times), -1))
+    offsets = np.cumsum([0] + [column.shape[1] for column in columns])
+    layout = tuple(
+        (name, int(start), int(stop), shape)
+        for name, start, stop, shape in zip(
+            names, offsets[:-1], offsets[1:], shapes
+        )
+    )
+    return _PackedValues(
+        times=jnp.asarray(times),
+        table=jnp.asarray(np.concatenate(columns, axis=1)),
+        layout=layout,
+    )
+
   def _get_geometry_base(
       self, t: chex.Numeric, geometry_class: Type[geometry.Geometry]
   ):
     """Returns a Geometry instance of the given type at the given time."""
+    packed_values = self._packed_values
+    values = _interpolate_packed_values(
+        t, packed_values.times, packed_values.table, packed_values.layout
+    )
     kwargs = {
         'geometry_type': self.geometry_type,
         'torax_mesh': self.torax_mesh,
@@ -219,7 +305,7 @@ class TimeDependentGeometryProvider:
         if self._z_magnetic_axis is None:
           kwargs[attr.name] = None
           continue
-      kwargs[attr.name] = getattr(self, attr.name).get_value(t)
+      kwargs[attr.name] = values[attr.name]
     return geometry_class(**kwargs)  # pytype: disable=wrong-keyword-args
 
   def __call__(self, t: chex.Numeric) -> geometry.Geometry:
@@ -15,12 +15,16 @@
 """Pydantic model for geometry."""
 
 from collections.abc import Callable, Mapping
+from concurrent import futures
 import functools
 import inspect
+import multiprocessing
 from typing import Annotated, Any, Literal, TypeAlias, TypeVar
 import pydantic
 from torax.geometry import circular_geometry
 from torax.geometry import geometry
+from torax.geometry import geometry_cache
+from torax.geometry import geometry_loader
 from torax.geometry import geometry_provider
 from torax.geometry import standard_geometry
 from torax.torax_pydantic import torax_pydantic
@@ -113,7 +117,17 @@ class CheaseConfig(torax_pydantic.BaseModelFrozen):
     return self
 
   def build_geometry(self) -> standard_geometry.StandardGeometry:
+    return geometry_cache.cached_build(
+        self,
+        self._build_geometry,
+        geometry_files=[
+            geometry_loader.get_geometry_file_path(
+                self.geometry_directory, self.geometry_file
+            )
+        ],
+    )
 
+  def _build_geometry(self) -> standard_geometry.StandardGeometry:
     return standard_geometry.build_standard_geometry(
         _apply_relevant_kwargs(
             standard_geometry.StandardGeometryIntermediates.from_chease,
@@ -183,7 +197,17 @@ class FBTConfig(torax_pydantic.BaseModelFrozen):
     return self
 
   def build_geometry(self) -> standard_geometry.StandardGeometry:
+    # LY and L objects given as dicts are part of the config itself.
+    geometry_files = [
+        geometry_loader.get_geometry_file_path(self.geometry_directory, obj)
+        for obj in (self.LY_object, self.L_object)
+        if isinstance(obj, str)
+    ]
+    return geometry_cache.cached_build(
+        self, self._build_geometry, geometry_files=geometry_files
+    )
 
+  def _build_geometry(self) -> standard_geometry.StandardGeometry:
     return standard_geometry.build_standard_geometry(
         _apply_relevant_kwargs(
             standard_geometry.StandardGeometryIntermediates.from_fbt_single_slice,
@@ -228,6 +252,9 @@ class EQDSKConfig(torax_pydantic.BaseModelFrozen):
     last_surface_factor: Multiplication factor of the boundary poloidal flux,
       used for the contour defining geometry terms at the LCFS on the TORAX
       grid. Needed to avoid divergent integrations in diverted geometries.
+    max_workers: Maximum number of worker processes used to compute the flux
+      surface averages of time-dependent geometries, with one EQDSK file per
+      task. If 1, the files are processed sequentially in this process.
   """
 
   geometry_type: Annotated[Literal['eqdsk'], TIME_INVARIANT] = 'eqdsk'
@@ -238,13 +265,30 @@ class EQDSKConfig(torax_pydantic.BaseModelFrozen):
   geometry_file: str = 'EQDSK_ITERhybrid_COCOS02.eqdsk'
   n_surfaces: pydantic.PositiveInt = 100
   last_surface_factor: torax_pydantic.OpenUnitInterval = 0.99
+  max_workers: Annotated[pydantic.PositiveInt, TIME_INVARIANT] = 1
+
+  def build_intermediates(
+      self,
+  ) -> standard_geometry.StandardGeometryIntermediates:
+    return _apply_relevant_kwargs(
+        standard_geometry.StandardGeometryIntermediates.from_eqdsk,
+        self.__dict__,
+    )
 
   def build_geometry(self) -> standard_geometry.StandardGeometry:
+    return geometry_cache.cached_build(
+        self,
+        self._build_geometry,
+        geometry_files=[
+            geometry_loader.get_geometry_file_path(
+                self.geometry_directory, self.geometry_file
+            )
+        ],
+    )
+
+  def _build_geometry(self) -> standard_geometry.StandardGeometry:
     return standard_geometry.build_standard_geometry(
-        _apply_relevant_kwargs(
-            standard_geometry.StandardGeometryIntermediates.from_eqdsk,
-            self.__dict__,
-        )
+        self.build_intermediates()
     )
 
 
@@ -302,10 +346,9 @@ class Geometry(torax_pydantic.BaseModelFrozen):
           )
 
     if isinstance(self.geometry_configs, dict):
-      geometries = {
-          time: config.config.build_geometry()
-          for time, config in self.geometry_configs.items()
-      }
+      geometries = _build_geometries({
+          time: config.config for time, config in self.geometry_configs.items()
+      })
       provider = (
           geometry_provider.TimeDependentGeometryProvider.create_provider
           if self.geometry_type == geometry.GeometryType.CIRCULAR
@@ -318,6 +361,41 @@ class Geometry(torax_pydantic.BaseModelFrozen):
     return provider(geometries)  # pytype: disable=attribute-error
 
 
+def _build_geometries(
+    configs: Mapping[
+        float, CircularConfig | CheaseConfig | FBTConfig | EQDSKConfig
+    ],
+) -> dict[float, geometry.Geometry]:
+  """Builds the geometries of time-dependent geometry configs."""
+  first_config = next(iter(configs.values()))
+  if (
+      not isinstance(first_config, EQDSKConfig)
+      or first_config.max_workers == 1
+      or len(configs) == 1
+      # Cached geometries are loaded without computing the intermediates.
+      or geometry_cache.get_cache_dir() is not None
+  ):
+    return {time: config.build_geometry() for time, config in configs.items()}
+
+  # The flux surface averages only use NumPy and SciPy, so they are computed
+  # in the worker processes. The geometries are then built in this process.
+  # Forking a process which has initialized JAX is unsafe, so the workers are
+  # forked from a server process which imports this module once.
+  context = multiprocessing.get_context('forkserver')
+  context.set_forkserver_preload([__name__])
+  with futures.ProcessPoolExecutor(
+      max_workers=min(first_config.max_workers, len(configs)),
+      mp_context=context,
+  ) as executor:
+    intermediates = executor.map(
+        EQDSKConfig.build_intermediates, configs.values()
+    )
+    return {
+        time: standard_geometry.build_standard_geometry(intermediate)
+        for time, intermediate in zip(configs, intermediates)
+    }
+
+
 def _conform_user_data(data: dict[str, Any]) -> dict[str, Any]:
   """Conform the user geometry dict to the pydantic model."""
 
@@ -18,6 +18,7 @@ This is a geometry object that is used for most geometries sources
 CHEASE, FBT, etc.
 """
 from collections.abc import Mapping
+from collections.abc import Sequence
 import dataclasses
 import logging
 
@@ -654,17 +655,6 @@ class StandardGeometryIntermediates:
       `build_standard_geometry`.
     """
 
-    def calculate_area(x, z):
-      """Gauss-shoelace formula (https://en.wikipedia.org/wiki/Shoelace_formula)."""
-      n = len(x)
-      area = 0.0
-      for i in range(n):
-        j = (i + 1) % n  # roll over at n
-        area += x[i] * z[j]
-        area -= z[i] * x[j]
-      area = abs(area) / 2.0
-      return area
-
     eqfile = geometry_loader.load_geo_data(
         geometry_directory, geometry_file, geometry_loader.GeometrySource.EQDSK
     )
@@ -730,20 +720,23 @@ class StandardGeometryIntermediates:
         n_surfaces,
     )
 
-    surfaces = []
     cg_psi = contourpy.contour_generator(X, Z, masked_psi_eqdsk_2dgrid)
 
-    # Skip magnetic axis since no contour is defined there.
-    for _, _psi in enumerate(psi_interpolant[1:]):
-      vertices = cg_psi.create_contour(_psi)
+    # Skip magnetic axis since no contour is defined there. All contours are
+    # generated in a single call.
+    contours = []
+    for _psi, vertices in zip(
+        psi_interpolant[1:], cg_psi.multi_lines(psi_interpolant[1:])
+    ):
       if not vertices:
         raise ValueError(f"""
             Valid contour not found for EQDSK geometry for psi value {_psi}.
             Possible reason is too many surfaces requested.
             Try reducing n_surfaces from the current value of {n_surfaces}.
             """)
-      x_surface, z_surface = vertices[0].T[0], vertices[0].T[1]
-      surfaces.append((x_surface, z_surface))
+      contours.append(vertices[0])
+    x_surface, z_surface, lengths = _pad_contours(contours)
+    valid = np.arange(x_surface.shape[1]) < lengths[:, None]
 
     # -----------------------------------------------------------
     # --------- Compute Flux surface averages and 1D profiles ---------
@@ -752,102 +745,102 @@ class StandardGeometryIntermediates:
     # --- Toroidal plasma current
     # --- Integral dl/Bp
     # -----------------------------------------------------------
-
-    # Gathering area for profiles
-    areas, volumes = np.empty(len(surfaces) + 1), np.empty(len(surfaces) + 1)
-    R_inboard, R_outboard = np.empty(len(surfaces) + 1), np.empty(
-        len(surfaces) + 1
+    # All surfaces are computed at once on the padded (surface, vertex)
+    # arrays. Padded vertices have zero line elements, so they do not
+    # contribute to the contour integrals.
+
+    # dl, line elements on which we will integrate
+    surface_dl = np.where(
+        valid,
+        np.sqrt(
+            _contour_gradient(x_surface, lengths) ** 2
+            + _contour_gradient(z_surface, lengths) ** 2
+        ),
+        0.0,
     )
-    flux_surf_avg_1_over_R2_eqdsk = np.empty(len(surfaces) + 1)  # <1/R**2>
-    flux_surf_avg_Bp2_eqdsk = np.empty(len(surfaces) + 1)  # <Bp**2>
-    flux_surf_avg_RBp_eqdsk = np.empty(len(surfaces) + 1)  # <|grad(psi)|>
-    flux_surf_avg_R2Bp2_eqdsk = np.empty(len(surfaces) + 1)  # <|grad(psi)|**2>
-    int_dl_over_Bp_eqdsk = np.empty(
-        len(surfaces) + 1
-    )  # int(Rdl / | grad(psi) |)
-    Ip_eqdsk = np.empty(len(surfaces) + 1)  # Toroidal plasma current
-    delta_upper_face_eqdsk = np.empty(len(surfaces) + 1)  # Upper face delta
-    delta_lower_face_eqdsk = np.empty(len(surfaces) + 1)  # Lower face delta
-    elongation = np.empty(len(surfaces) + 1)  # Elongation
-
-    # ---- Compute
-    for n, (x_surface, z_surface) in enumerate(surfaces):
-
-      # dl, line elements on which we will integrate
-      surface_dl = np.sqrt(
-          np.gradient(x_surface) ** 2 + np.gradient(z_surface) ** 2
-      )
 
-      # calculating gradient of psi in 2D
-      surface_dpsi_x = psi_spline_fit.ev(x_surface, z_surface, dx=1)
-      surface_dpsi_z = psi_spline_fit.ev(x_surface, z_surface, dy=1)
-      surface_abs_grad_psi = np.sqrt(surface_dpsi_x**2 + surface_dpsi_z**2)
-
-      # Poloidal field strength Bp = |grad(psi)| / R
-      surface_Bpol = surface_abs_grad_psi / x_surface
-      surface_int_dl_over_bpol = np.sum(
-          surface_dl / surface_Bpol
-      )  # This is denominator of all FSA
-
-      # plasma current
-      surface_int_bpol_dl = np.sum(surface_Bpol * surface_dl)
-
-      # 4 FSA, < 1/ R^2>, < | grad psi | >, < B_pol^2>, < | grad psi |^2 >
-      # where FSA(G) = int (G dl / Bpol) / (int (dl / Bpol))
-      surface_FSA_int_one_over_r2 = (
-          np.sum(1 / x_surface**2 * surface_dl / surface_Bpol)
-          / surface_int_dl_over_bpol
-      )
-      surface_FSA_abs_grad_psi = (
-          np.sum(surface_abs_grad_psi * surface_dl / surface_Bpol)
-          / surface_int_dl_over_bpol
-      )
-      surface_FSA_Bpol_squared = (
-          np.sum(surface_Bpol * surface_dl) / surface_int_dl_over_bpol
-      )
-      surface_FSA_abs_grad_psi2 = (
-          np.sum(surface_abs_grad_psi**2 * surface_dl / surface_Bpol)
-          / surface_int_dl_over_bpol
-      )
+    # calculating gradient of psi in 2D, with one spline evaluation for the
+    # vertices of all surfaces.
+    surface_dpsi_x = psi_spline_fit.ev(x_surface, z_surface, dx=1)
+    surface_dpsi_z = psi_spline_fit.ev(x_surface, z_surface, dy=1)
+    surface_abs_grad_psi = np.sqrt(surface_dpsi_x**2 + surface_dpsi_z**2)
+
+    # Poloidal field strength Bp = |grad(psi)| / R
+    surface_Bpol = surface_abs_grad_psi / x_surface
+    surface_dl_over_bpol = surface_dl / surface_Bpol
+    # This is denominator of all FSA
+    surface_int_dl_over_bpol = np.sum(surface_dl_over_bpol, axis=1)
+
+    # plasma current
+    surface_int_bpol_dl = np.sum(surface_Bpol * surface_dl, axis=1)
+
+    # 4 FSA, < 1/ R^2>, < | grad psi | >, < B_pol^2>, < | grad psi |^2 >
+    # where FSA(G) = int (G dl / Bpol) / (int (dl / Bpol))
+    surface_FSA_int_one_over_r2 = (
+        np.sum(1 / x_surface**2 * surface_dl_over_bpol, axis=1)
+        / surface_int_dl_over_bpol
+    )
+    surface_FSA_abs_grad_psi = (
+        np.sum(surface_abs_grad_psi * surface_dl_over_bpol, axis=1)
+        / surface_int_dl_over_bpol
+    )
+    surface_FSA_Bpol_squared = surface_int_bpol_dl / surface_int_dl_over_bpol
+    surface_FSA_abs_grad_psi2 = (
+        np.sum(surface_abs_grad_psi**2 * surface_dl_over_bpol, axis=1)
+        / surface_int_dl_over_bpol
+    )
 
-      # volumes and areas
-      area = calculate_area(x_surface, z_surface)
-      volume = area * 2 * np.pi * R_major
-
-      # Triangularity
-      idx_upperextent = np.argmax(z_surface)
-      idx_lowerextent = np.argmin(z_surface)
-
-      R_major_local = (x_surface.max() + x_surface.min()) / 2.0
-      a_minor_local = (x_surface.max() - x_surface.min()) / 2.0
-
-      X_upperextent = x_surface[idx_upperextent]
-      X_lowerextent = x_surface[idx_lowerextent]
-
-      Z_upperextent = z_surface[idx_upperextent]
-      Z_lowerextent = z_surface[idx_lowerextent]
-
-      # (RMAJ - X_upperextent) / RMIN
-      surface_delta_upper_face = (R_major_local - X_upperextent) / a_minor_local
-      surface_delta_lower_face = (R_major_local - X_lowerextent) / a_minor_local
-
-      # Append to lists.
-      # Start with n=1 since n=0 is the magnetic axis with no contour defined.
-      areas[n + 1] = area
-      volumes[n + 1] = volume
-      R_inboard[n + 1] = x_surface.min()
-      R_outboard[n + 1] = x_surface.max()
-      int_dl_over_Bp_eqdsk[n + 1] = surface_int_dl_over_bpol
-      flux_surf_avg_1_over_R2_eqdsk[n + 1] = surface_FSA_int_one_over_r2
-      flux_surf_avg_RBp_eqdsk[n + 1] = surface_FSA_abs_grad_psi
-      flux_surf_avg_R2Bp2_eqdsk[n + 1] = surface_FSA_abs_grad_psi2
-      flux_surf_avg_Bp2_eqdsk[n + 1] = surface_FSA_Bpol_squared
-      Ip_eqdsk[n + 1] = surface_int_bpol_dl / constants.CONSTANTS.mu0
-      delta_upper_face_eqdsk[n + 1] = surface_delta_upper_face
-      delta_lower_face_eqdsk[n + 1] = surface_delta_lower_face
-      elongation[n + 1] = (Z_upperextent - Z_lowerextent) / (
-          2.0 * a_minor_local
-      )
+    # volumes and areas
+    area = _calculate_area(x_surface, z_surface, lengths)
+    volume = area * 2 * np.pi * R_major
+
+    # Triangularity
+    idx_upperextent = np.argmax(np.where(valid, z_surface, -np.inf), axis=1)
+    idx_lowerextent = np.argmin(np.where(valid, z_surface, np.inf), axis=1)
+
+    x_surface_max = np.max(np.where(valid, x_surface, -np.inf), axis=1)
+    x_surface_min = np.min(np.where(valid, x_surface, np.inf), axis=1)
+    R_major_local = (x_surface_max + x_surface_min) / 2.0
+    a_minor_local = (x_surface_max - x_surface_min) / 2.0
+
+    surfaces = np.arange(len(lengths))
+    X_upperextent = x_surface[surfaces, idx_upperextent]
+    X_lowerextent = x_surface[surfaces, idx_lowerextent]
+
+    Z_upperextent = z_surface[surfaces, idx_upperextent]
+    Z_lowerextent = z_surface[surfaces, idx_lowerextent]
+
+    # Gathering area for profiles.
+    # Index 0 is the magnetic axis with no contour defined, set below.
+    def _with_axis(surface_values: np.ndarray) -> np.ndarray:
+      return np.concatenate([np.empty(1), surface_values])
+
+    areas = _with_axis(area)
+    volumes = _with_axis(volume)
+    R_inboard = _with_axis(x_surface_min)
+    R_outboard = _with_axis(x_surface_max)
+    # int(Rdl / | grad(psi) |)
+    int_dl_over_Bp_eqdsk = _with_axis(surface_int_dl_over_bpol)
+    # <1/R**2>
+    flux_surf_avg_1_over_R2_eqdsk = _with_axis(surface_FSA_int_one_over_r2)
+    # <|grad(psi)|>
+    flux_surf_avg_RBp_eqdsk = _with_axis(surface_FSA_abs_grad_psi)
+    # <|grad(psi)|**2>
+    flux_surf_avg_R2Bp2_eqdsk = _with_axis(surface_FSA_abs_grad_psi2)
+    # <Bp**2>
+    flux_surf_avg_Bp2_eqdsk = _with_axis(surface_FSA_Bpol_squared)
+    # Toroidal plasma current
+    Ip_eqdsk = _with_axis(surface_int_bpol_dl / constants.CONSTANTS.mu0)
+    # (RMAJ - X_upperextent) / RMIN
+    delta_upper_face_eqdsk = _with_axis(
+        (R_major_local - X_upperextent) / a_minor_local
+    )
+    delta_lower_face_eqdsk = _with_axis(
+        (R_major_local - X_lowerextent) / a_minor_local
+    )
+    elongation = _with_axis(
+        (Z_upperextent - Z_lowerextent) / (2.0 * a_minor_local)
+    )
 
     # Now set n=0 quantities. StandardGeometryIntermediate values at the
     # magnetic axis are prescribed, since a contour cannot be defined there.
@@ -929,6 +922,77 @@ class StandardGeometryIntermediates:
     )
 
 
+def _pad_contours(
+    contours: Sequence[np.ndarray],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+  """Packs ragged contours into padded arrays.
+
+  Args:
+    contours: Contours as arrays of shape `(num_vertices, 2)` of (R, Z)
+      vertices. The number of vertices can differ between contours.
+
+  Returns:
+    x: R of the vertices, shape `(num_contours, max_num_vertices)`. Padded
+      entries repeat the last vertex of the contour.
+    z: Z of the vertices, with the same shape and padding as `x`.
+    lengths: Number of vertices of each contour.
+  """
+  lengths = np.array([len(contour) for contour in contours])
+  indices = np.minimum(np.arange(lengths.max()), lengths[:, None] - 1)
+  vertices = np.concatenate(contours)
+  offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+  padded = vertices[offsets[:, None] + indices]
+  return padded[..., 0], padded[..., 1], lengths
+
+
+def _contour_gradient(y: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+  """Row-wise `np.gradient` of padded contour arrays.
+
+  Central differences are used for inner vertices, and one-sided differences
+  at the first and last vertex of each contour, as in `np.gradient`.
+
+  Args:
+    y: Padded values, shape `(num_contours, max_num_vertices)`.
+    lengths: Number of vertices of each contour.
+
+  Returns:
+    The gradient along each contour. Values at padded entries are undefined.
+  """
+  index = np.arange(y.shape[1])
+  upper = np.minimum(index + 1, lengths[:, None] - 1)
+  lower = np.maximum(index - 1, 0)
+  lower = np.minimum(lower, upper)
+  spacing = np.maximum(upper - lower, 1)
+  return (
+      np.take_along_axis(y, upper, axis=1)
+      - np.take_along_axis(y, lower, axis=1)
+  ) / spacing
+
+
+def _calculate_area(
+    x: np.ndarray, z: np.ndarray, lengths: np.ndarray
+) -> np.ndarray:
+  """Gauss-shoelace formula (https://en.wikipedia.org/wiki/Shoelace_formula).
+
+  Args:
+    x: Padded R of the contour vertices, shape `(num_contours,
+      max_num_vertices)`.
+    z: Padded Z of the contour vertices, with the same shape as `x`.
+    lengths: Number of vertices of each contour.
+
+  Returns:
+    The area enclosed by each contour.
+  """
+  index = np.arange(x.shape[1])
+  valid = index < lengths[:, None]
+  # Roll over at the last vertex of each contour.
+  next_index = np.where(index + 1 < lengths[:, None], index + 1, 0)
+  x_next = np.take_along_axis(x, next_index, axis=1)
+  z_next = np.take_along_axis(z, next_index, axis=1)
+  area = np.sum(np.where(valid, x * z_next - z * x_next, 0.0), axis=1)
+  return np.abs(area) / 2.0
+
+
 def build_standard_geometry(
     intermediate: StandardGeometryIntermediates,
 ) -> StandardGeometry:
@@ -0,0 +1,118 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import dataclasses
+import os
+from unittest import mock
+
+from absl.testing import absltest
+from absl.testing import parameterized
+import numpy as np
+from torax.geometry import geometry_cache
+from torax.geometry import geometry_loader
+from torax.geometry import pydantic_model
+from torax.geometry import standard_geometry
+
+
+class GeometryCacheTest(parameterized.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.cache_dir = self.create_tempdir().full_path
+    self.enter_context(
+        mock.patch.dict(
+            os.environ, {geometry_cache.CACHE_DIR_ENV: self.cache_dir}
+        )
+    )
+
+  def _assert_geometries_equal(self, geo1, geo2):
+    for field in dataclasses.fields(geo1):
+      value1 = getattr(geo1, field.name)
+      value2 = getattr(geo2, field.name)
+      with self.subTest(field=field.name):
+        self.assertIs(type(value2), type(value1))
+        if isinstance(value1, np.ndarray):
+          np.testing.assert_array_equal(value2, value1)
+        else:
+          self.assertEqual(value2, value1)
+
+  @parameterized.parameters(
+      pydantic_model.CheaseConfig,
+      pydantic_model.EQDSKConfig,
+  )
+  def test_cached_geometry_matches_built_geometry(self, config_class):
+    config = config_class(n_rho=10)
+    with mock.patch.dict(os.environ, {geometry_cache.CACHE_DIR_ENV: ''}):
+      expected = config.build_geometry()
+
+    geo = config.build_geometry()
+    with mock.patch.object(
+        standard_geometry, 'build_standard_geometry', autospec=True
+    ) as mock_build:
+      cached_geo = config.build_geometry()
+
+    mock_build.assert_not_called()
+    self._assert_geometries_equal(geo, expected)
+    self._assert_geometries_equal(cached_geo, expected)
+
+  def _get_entry_path(self, config):
+    geometry_file = geometry_loader.get_geometry_file_path(
+        config.geometry_directory, config.geometry_file
+    )
+    key = geometry_cache.get_cache_key(config, [geometry_file])
+    return os.path.join(self.cache_dir, key + '.npz')
+
+  def test_cache_key_depends_on_construction_params(self):
+    config = pydantic_model.CheaseConfig(n_rho=10)
+
+    self.assertEqual(
+        self._get_entry_path(config),
+        self._get_entry_path(pydantic_model.CheaseConfig(n_rho=10)),
+    )
+    self.assertNotEqual(
+        self._get_entry_path(config),
+        self._get_entry_path(pydantic_model.CheaseConfig(n_rho=12)),
+    )
+    self.assertNotEqual(
+        self._get_entry_path(config),
+        self._get_entry_path(
+            pydantic_model.CheaseConfig(n_rho=10, hires_factor=2)
+        ),
+    )
+
+  def test_least_recently_used_entry_is_evicted(self):
+    config1 = pydantic_model.CheaseConfig(n_rho=10)
+    config2 = pydantic_model.CheaseConfig(n_rho=12)
+    config3 = pydantic_model.CheaseConfig(n_rho=14)
+    config1.build_geometry()
+    config2.build_geometry()
+    os.utime(self._get_entry_path(config1), (1.0, 1.0))
+    os.utime(self._get_entry_path(config2), (2.0, 2.0))
+    # A cache hit makes config1 the most recently used entry.
+    config1.build_geometry()
+    entry_size = os.path.getsize(self._get_entry_path(config1))
+
+    # Only leave room for two entries.
+    with mock.patch.dict(
+        os.environ,
+        {geometry_cache.CACHE_MAX_BYTES_ENV: str(int(2.5 * entry_size))},
+    ):
+      config3.build_geometry()
+
+    self.assertTrue(os.path.exists(self._get_entry_path(config1)))
+    self.assertFalse(os.path.exists(self._get_entry_path(config2)))
+    self.assertTrue(os.path.exists(self._get_entry_path(config3)))
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -14,7 +14,10 @@ import dataclasses
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import dataclasses
+
 from absl.testing import absltest
+import jax
 import numpy as np
 from torax.geometry import geometry
 from torax.geometry import geometry_provider
@@ -45,6 +48,38 @@ class GeometryProviderTest(absltest.TestCase):
     np.testing.assert_allclose(geo.a_minor, 1.5)
     np.testing.assert_allclose(geo.B_0, 5.9)
 
+  def test_time_dependent_geometry_matches_interpolating_each_field(self):
+    geos = {
+        0.0: geometry_pydantic_model.CircularConfig(
+            R_major=6.2, a_minor=2.0, B_0=5.3
+        ).build_geometry(),
+        4.0: geometry_pydantic_model.CircularConfig(
+            R_major=7.4, a_minor=1.0, B_0=6.5, elongation_LCFS=1.5
+        ).build_geometry(),
+        10.0: geometry_pydantic_model.CircularConfig(
+            R_major=6.8, a_minor=1.5, B_0=5.9
+        ).build_geometry(),
+    }
+    provider = geometry_provider.TimeDependentGeometryProvider.create_provider(
+        geos
+    )
+    jitted_provider = jax.jit(provider)
+
+    for t in (-1.0, 2.5, 4.0, 7.3, 12.0):
+      geo = provider(t)
+      jitted_geo = jitted_provider(t)
+      for attr in dataclasses.fields(provider):
+        value = getattr(provider, attr.name)
+        if not hasattr(value, "get_value"):
+          continue
+        with self.subTest(t=t, name=attr.name):
+          np.testing.assert_array_equal(
+              getattr(geo, attr.name), value.get_value(t)
+          )
+          np.testing.assert_allclose(
+              getattr(jitted_geo, attr.name), value.get_value(t)
+          )
+
   def test_time_dependent_different_types(self):
     geo_0 = geometry_pydantic_model.CircularConfig().build_geometry()
     geo_1 = dataclasses.replace(geo_0, geometry_type=geometry.GeometryType.FBT)
@@ -14,6 +14,7 @@
 
 from absl.testing import absltest
 from absl.testing import parameterized
+import chex
 import numpy as np
 from torax.config import build_runtime_params
 from torax.geometry import geometry_provider
@@ -88,6 +89,24 @@ class PydanticModelTest(parameterized.TestCase):
     self.assertIsInstance(geo_provider(t=0), standard_geometry.StandardGeometry)
     np.testing.assert_array_equal(geo_provider.torax_mesh.nx, 10)
 
+  def test_build_time_dependent_geometry_from_eqdsk_with_workers(self):
+    config = {
+        'geometry_type': 'eqdsk',
+        'n_surfaces': 30,
+        'geometry_configs': {
+            0.0: {'geometry_file': 'eqdsk_cocos02.eqdsk'},
+            1.0: {'geometry_file': 'EQDSK_ITERhybrid_COCOS02.eqdsk'},
+        },
+    }
+    geo_provider = pydantic_model.Geometry.from_dict(config).build_provider
+
+    config['max_workers'] = 2
+    pool_geo_provider = pydantic_model.Geometry.from_dict(
+        config
+    ).build_provider
+
+    chex.assert_trees_all_close(pool_geo_provider(t=0.5), geo_provider(t=0.5))
+
   @parameterized.parameters([
       dict(param='n_rho', value=5),
       dict(param='Ip_from_parameters', value=True),
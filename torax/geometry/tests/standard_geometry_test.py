@@ -78,6 +78,33 @@ class GeometryTest(parameterized.TestCase):
     config = geometry_pydantic_model.EQDSKConfig(geometry_file=geometry_file)
     config.build_geometry()
 
+  def test_padded_contour_helpers_match_per_contour_computation(self):
+    rng = np.random.default_rng(0)
+    contours = []
+    for num_vertices in (3, 7, 5):
+      angle = np.sort(rng.uniform(0, 2 * np.pi, num_vertices))
+      contours.append(
+          np.stack([6.0 + np.cos(angle), rng.uniform(1, 2) * np.sin(angle)], 1)
+      )
+
+    x, z, lengths = standard_geometry._pad_contours(contours)
+    gradient = standard_geometry._contour_gradient(x, lengths)
+    area = standard_geometry._calculate_area(x, z, lengths)
+
+    np.testing.assert_array_equal(lengths, [3, 7, 5])
+    for i, contour in enumerate(contours):
+      n = len(contour)
+      np.testing.assert_array_equal(x[i, :n], contour[:, 0])
+      np.testing.assert_array_equal(z[i, :n], contour[:, 1])
+      np.testing.assert_allclose(gradient[i, :n], np.gradient(contour[:, 0]))
+      # Shoelace formula with an explicit roll over.
+      x_next = np.roll(contour[:, 0], -1)
+      z_next = np.roll(contour[:, 1], -1)
+      np.testing.assert_allclose(
+          area[i],
+          np.abs(np.sum(contour[:, 0] * z_next - contour[:, 1] * x_next)) / 2,
+      )
+
   def test_access_z_magnetic_axis_raises_error_for_chease_geometry(self):
     """Test that accessing z_magnetic_axis raises error for CHEASE geometry."""
     geo = geometry_pydantic_model.CheaseConfig().build_geometry()
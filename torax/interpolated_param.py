@@ -184,6 +184,17 @@ class PiecewiseLinearInterpolatedParam(InterpolatedParamBase):
         raise ValueError(f'ys must be either 1D or 2D. Given: {self.ys.shape}.')
 
 
+class ConstantInterpolatedParam(InterpolatedParamBase):
+  """Parameter with the same value at any input."""
+
+  def __init__(self, value: chex.Array):
+    self._value = value
+
+  def get_value(self, x: chex.Numeric) -> chex.Array:
+    del x  # Unused.
+    return self._value
+
+
 @jax_utils.jit
 def step_interpolate(
     padded_xs: jax.Array, padded_ys: jax.Array, x: jax.Array
@@ -173,6 +173,11 @@ def jit(*args, **kwargs) -> Callable[..., Any]:
   return args[0]
 
 
+def is_tracer(x: Any) -> bool:
+  """Returns True if any leaf of the pytree `x` is a JAX tracer."""
+  return any(isinstance(leaf, jax.core.Tracer) for leaf in jax.tree.leaves(x))
+
+
 def py_while(
     cond_fun: Callable[[T], BooleanNumeric],
     body_fun: Callable[[T], T],
@@ -185,6 +190,9 @@ def py_while(
   compile it, etc.) without having to pay the high compile time cost
   of jax.lax.while_loop.
 
+  If `init_val` contains JAX tracers, i.e. the loop is being traced as part of
+  a larger compiled function, `jax.lax.while_loop` is used instead.
+
   Args:
     cond_fun: function of type ``a -> Bool``.
     body_fun: function of type ``a -> a``.
@@ -198,6 +206,8 @@ def py_while(
   .. _Haskell-like type signature: https://wiki.haskell.org/Type_signature
   """
 
+  if is_tracer(init_val):
+    return jax.lax.while_loop(cond_fun, body_fun, init_val)
   val = init_val
   while cond_fun(val):
     val = body_fun(val)
@@ -213,6 +223,9 @@ def py_fori_loop(
   Jax-compatible in the future, if we want to expand the scope of the jit
   compilation.
 
+  If `init_val` or the loop bounds contain JAX tracers, `jax.lax.fori_loop` is
+  used instead.
+
   Args:
     lower: lower integer of loop
     upper: upper integer of loop. upper<=lower will produce no iterations.
@@ -226,6 +239,8 @@ def py_fori_loop(
 
   .. _Haskell-like type signature: https://wiki.haskell.org/Type_signature
   """
+  if is_tracer((lower, upper, init_val)):
+    return jax.lax.fori_loop(lower, upper, body_fun, init_val)
   val = init_val
   for i in range(lower, upper):
     val = body_fun(i, val)
@@ -244,6 +259,8 @@ def py_cond(
   Jax-compatible in the future, if we want to expand the scope of the jit
   compilation.
 
+  If `cond` is a JAX tracer, `jax.lax.cond` is used instead.
+
   Args:
     cond: The condition
     true_fun: Function to be called if cond==True.
@@ -252,6 +269,8 @@ def py_cond(
   Returns:
     The output from either true_fun or false_fun.
   """
+  if is_tracer(cond):
+    return jax.lax.cond(cond, true_fun, false_fun)
   if cond:
     return true_fun()
   else:
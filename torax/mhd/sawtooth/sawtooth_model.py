@@ -71,12 +71,14 @@ class SawtoothModel(stepper.Solver):
       core_transport_t: state.CoreTransport,
       explicit_source_profiles: source_profiles_lib.SourceProfiles,
       evolving_names: tuple[str, ...],
+      jacobian_cache_t: state.JacobianCache | None = None,
   ) -> tuple[
       tuple[cell_variable.CellVariable, ...],
       source_profiles_lib.SourceProfiles,
       base_conductivity.Conductivity,
       state.CoreTransport,
       state.SolverNumericOutputs,
+      state.JacobianCache | None,
   ]:
     """Applies the sawtooth model and outputs new state attributes if triggered.
 
@@ -102,6 +104,8 @@ class SawtoothModel(stepper.Solver):
       core_transport_t: Transport coefficients at time t.
       explicit_source_profiles: Explicit source profiles at time t.
       evolving_names: Names of evolving variables.
+      jacobian_cache_t: Jacobian carried over between PDE steps, returned
+        unchanged.
 
     Returns:
       Updated tuple of evolving CellVariables from CoreProfiles
@@ -109,6 +113,7 @@ class SawtoothModel(stepper.Solver):
       Conductivity consistent with redistributed state.
       Transport coefficients consistent with redistributed state.
       SolverNumericOutputs indicating a sawtooth crash.
+      The unchanged jacobian_cache_t.
     """
 
     trigger_sawtooth, rho_norm_q1 = self._trigger_model(
@@ -201,7 +206,7 @@ class SawtoothModel(stepper.Solver):
 
     # Return redistributed state attributes if triggered, otherwise return
     # unchanged state attributes.
-    return jax.lax.cond(
+    outputs = jax.lax.cond(
         trigger_sawtooth,
         _redistribute_state,
         lambda: (
@@ -214,6 +219,7 @@ class SawtoothModel(stepper.Solver):
             state.SolverNumericOutputs(),
         ),
     )
+    return *outputs, jacobian_cache_t
 
   def __hash__(self) -> int:
     return hash((
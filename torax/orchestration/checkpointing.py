@@ -0,0 +1,162 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Binary checkpoints of the simulation loop.
+
+Unlike a `FileRestart`, which rebuilds the initial state from the profiles
+saved in an output file, a checkpoint holds every leaf of the `ToraxSimState`
+and `PostProcessedOutputs` pytrees, including the solver outputs, the Jacobian
+cache and the time step controller state. A simulation resumed from a
+checkpoint continues exactly as the simulation which wrote it.
+
+The leaves are written as arrays of a single uncompressed `.npz` file, along
+with the pickled tree structure. Only load checkpoints from trusted sources.
+"""
+
+import dataclasses
+import os
+import pickle
+from typing import Any
+
+import jax
+from jax import numpy as jnp
+import numpy as np
+from torax.config import runtime_params_slice
+from torax.orchestration import sim_state
+from torax.output_tools import post_processing
+
+
+# Bumped on incompatible changes of the checkpoint layout.
+_VERSION = 1
+_METADATA = 'metadata'
+
+# Kinds of leaves.
+_JAX = 'jax'
+_NUMPY = 'numpy'
+_PYTHON = 'python'
+
+
+@dataclasses.dataclass(frozen=True)
+class Checkpoint:
+  """State of the simulation loop after a time step.
+
+  Attributes:
+    sim_state: The state after the time step, including the Jacobian cache and
+      the time step controller state.
+    post_processed_outputs: The post-processed outputs of the state, which
+      carry the cumulative quantities, e.g. `E_fusion`.
+    num_steps: Number of time steps taken since the start of the simulation.
+    static_runtime_params_slice: The static runtime params of the simulation,
+      which must match those of the resumed simulation.
+  """
+
+  sim_state: sim_state.ToraxSimState
+  post_processed_outputs: post_processing.PostProcessedOutputs
+  num_steps: int
+  static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice
+
+
+def save_checkpoint(path: str, checkpoint: Checkpoint):
+  """Writes a checkpoint to a file.
+
+  The file is first written next to `path` and then moved in place, such that
+  an interrupted write leaves a previous checkpoint at `path` intact.
+
+  Args:
+    path: Path of the checkpoint file.
+    checkpoint: The checkpoint to write.
+  """
+  leaves, treedef = jax.tree.flatten(
+      (checkpoint.sim_state, checkpoint.post_processed_outputs)
+  )
+  # Copies all device arrays to the host at once.
+  host_leaves = jax.device_get(leaves)
+  arrays = {}
+  leaf_specs = []
+  for i, (leaf, host_leaf) in enumerate(zip(leaves, host_leaves)):
+    if isinstance(leaf, jax.Array):
+      arrays[f'leaf_{i}'] = host_leaf
+      leaf_specs.append((_JAX, leaf.weak_type))
+    elif isinstance(leaf, (np.ndarray, np.generic)):
+      arrays[f'leaf_{i}'] = host_leaf
+      leaf_specs.append((_NUMPY, None))
+    else:
+      # Python scalars and enums.
+      leaf_specs.append((_PYTHON, leaf))
+  metadata = {
+      'version': _VERSION,
+      'treedef': treedef,
+      'leaf_specs': leaf_specs,
+      'num_steps': checkpoint.num_steps,
+      'static_runtime_params_slice': checkpoint.static_runtime_params_slice,
+  }
+  arrays[_METADATA] = np.frombuffer(pickle.dumps(metadata), dtype=np.uint8)
+
+  tmp_path = path + '.tmp'
+  with open(tmp_path, 'wb') as f:
+    np.savez(f, **arrays)
+    f.flush()
+    os.fsync(f.fileno())
+  os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+  """Reads a checkpoint written by `save_checkpoint`.
+
+  Args:
+    path: Path of the checkpoint file.
+
+  Returns:
+    The checkpoint. Its leaves have the same types, dtypes and weak types as
+    those of the saved checkpoint, so that the jitted functions of the
+    simulation are not recompiled when resuming.
+
+  Raises:
+    ValueError: If the file was written by an incompatible version of TORAX.
+  """
+  with np.load(path, allow_pickle=False) as data:
+    metadata = pickle.loads(data[_METADATA].tobytes())
+    if metadata['version'] != _VERSION:
+      raise ValueError(
+          f'The checkpoint {path} has version {metadata["version"]}, expected'
+          f' {_VERSION}.'
+      )
+    leaves = [
+        _restore_leaf(kind, value, data.get(f'leaf_{i}'))
+        for i, (kind, value) in enumerate(metadata['leaf_specs'])
+    ]
+  state, post_processed_outputs = jax.tree.unflatten(
+      metadata['treedef'], leaves
+  )
+  return Checkpoint(
+      sim_state=state,
+      post_processed_outputs=post_processed_outputs,
+      num_steps=metadata['num_steps'],
+      static_runtime_params_slice=metadata['static_runtime_params_slice'],
+  )
+
+
+def _restore_leaf(kind: str, value: Any, array: np.ndarray | None) -> Any:
+  """Rebuilds a leaf from its kind and saved value."""
+  if kind == _PYTHON:
+    return value
+  if kind == _NUMPY:
+    return array
+  # Weakly typed scalars, e.g. from Python floats, are rebuilt from a Python
+  # scalar, as the dtype promotion of their operations differs.
+  if value and array.ndim == 0:
+    weak_leaf = jnp.asarray(array.item())
+    if weak_leaf.dtype == array.dtype:
+      return weak_leaf
+  return jnp.asarray(array)
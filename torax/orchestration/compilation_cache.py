@@ -0,0 +1,129 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Management of the JAX persistent compilation cache for TORAX runs.
+
+The persistent cache stores the compiled XLA executables of the jitted
+functions of a simulation on disk, so that new processes running a config with
+the same static runtime params and grid shapes skip compilation. See
+https://torax.readthedocs.io/en/latest/cache.html.
+"""
+
+from collections.abc import Iterator
+import contextlib
+import dataclasses
+import os
+
+from absl import logging
+import jax
+
+
+CACHE_DIR_ENV = 'TORAX_COMPILATION_CACHE_DIR'
+
+_COMPILE_REQUESTS_EVENT = '/jax/compilation_cache/compile_requests_use_cache'
+_CACHE_HITS_EVENT = '/jax/compilation_cache/cache_hits'
+
+
+@dataclasses.dataclass
+class CompilationCacheStats:
+  """Persistent compilation cache usage.
+
+  Attributes:
+    compile_requests: Number of compilations which looked up the cache.
+    cache_hits: Number of executables loaded from the cache.
+  """
+
+  compile_requests: int = 0
+  cache_hits: int = 0
+
+  @property
+  def cache_misses(self) -> int:
+    """Number of executables compiled and written to the cache."""
+    return self.compile_requests - self.cache_hits
+
+
+# Stats of the active `track_cache_usage` contexts.
+_active_stats: list[CompilationCacheStats] = []
+_listener_registered = False
+
+
+def _on_event(event: str, **kwargs):
+  del kwargs  # Unused.
+  if event == _COMPILE_REQUESTS_EVENT:
+    for stats in _active_stats:
+      stats.compile_requests += 1
+  elif event == _CACHE_HITS_EVENT:
+    for stats in _active_stats:
+      stats.cache_hits += 1
+
+
+def initialize_cache(cache_dir: str | None = None) -> str | None:
+  """Enables the JAX persistent compilation cache.
+
+  A simulation consists of many jitted functions which are each fast to
+  compile, so the cache is configured to store all executables regardless of
+  their compile time and size. This must be called before the first
+  compilation in the process.
+
+  Args:
+    cache_dir: The cache directory. Defaults to the
+      `TORAX_COMPILATION_CACHE_DIR` environment variable. If neither is set,
+      the JAX cache options, e.g. from `--jax_compilation_cache_dir`, are left
+      as they are.
+
+  Returns:
+    The cache directory, or None if no cache directory is configured, in which
+    case the cache stays disabled.
+  """
+  if cache_dir is None:
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+  if not cache_dir:
+    return jax.config.jax_compilation_cache_dir or None
+  jax.config.update('jax_compilation_cache_dir', cache_dir)
+  jax.config.update('jax_persistent_cache_min_compile_time_secs', 0.0)
+  jax.config.update('jax_persistent_cache_min_entry_size_bytes', -1)
+  logging.info('Using the persistent compilation cache in %s.', cache_dir)
+  return cache_dir
+
+
+def is_cache_enabled() -> bool:
+  """Returns whether a persistent compilation cache directory is set."""
+  return bool(jax.config.jax_compilation_cache_dir)
+
+
+@contextlib.contextmanager
+def track_cache_usage() -> Iterator[CompilationCacheStats]:
+  """Counts the persistent compilation cache lookups within the context.
+
+  Example:
+
+  with compilation_cache.track_cache_usage() as stats:
+    run_simulation.run_simulation(torax_config)
+  print(stats.cache_hits, stats.cache_misses)
+
+  Yields:
+    The stats, updated while the context is active.
+  """
+  global _listener_registered
+  if not _listener_registered:
+    # JAX has no public API to unregister a listener, so a single listener
+    # dispatches to the active contexts.
+    jax.monitoring.register_event_listener(_on_event)
+    _listener_registered = True
+  stats = CompilationCacheStats()
+  _active_stats.append(stats)
+  try:
+    yield stats
+  finally:
+    _active_stats.remove(stats)
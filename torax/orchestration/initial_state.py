@@ -87,6 +87,10 @@ def _get_initial_state(
           sigma_face=initial_core_profiles.sigma_face),
   )
 
+  x_initial = tuple(
+      initial_core_profiles[name] for name in step_fn.solver.evolving_names
+  )
+
   return sim_state.ToraxSimState(
       t=jnp.array(dynamic_runtime_params_slice.numerics.t_initial),
       dt=jnp.zeros(()),
@@ -100,6 +104,10 @@ def _get_initial_state(
           inner_solver_iterations=0,
       ),
       geometry=geo,
+      jacobian_cache=step_fn.solver.initial_jacobian_cache(geo),
+      time_step_controller=step_fn.time_step_calculator.initial_controller_state(
+          x_initial
+      ),
   )
 
 
@@ -112,9 +120,10 @@ def get_initial_state_and_post_processed_outputs_from_file(
     step_fn: step_function.SimulationStepFn,
 ) -> tuple[sim_state.ToraxSimState, post_processing.PostProcessedOutputs]:
   """Returns the initial state and post processed outputs from a file."""
-  data_tree = output.load_state_file(file_restart.filename)
-  # Find the closest time in the given dataset.
-  data_tree = data_tree.sel(time=file_restart.time, method='nearest')
+  # Only the closest time in the given dataset is read.
+  data_tree = output.load_state_file_time_slice(
+      file_restart.filename, file_restart.time
+  )
   t_restart = data_tree.time.item()
   profiles_dataset = data_tree.children[output.PROFILES].dataset
   profiles_dataset = profiles_dataset.squeeze()
@@ -175,6 +184,10 @@ def get_initial_state_and_post_processed_outputs_from_file(
   inner_solver_iterations = int(
       numerics_dataset[output.INNER_SOLVER_ITERATIONS]
   )
+  # Not present in files written before it was added.
+  transport_evaluations_saved = int(
+      numerics_dataset.get(output.TRANSPORT_EVALUATIONS_SAVED, 0)
+  )
   return (
       dataclasses.replace(
           initial_state,
@@ -183,6 +196,7 @@ def get_initial_state_and_post_processed_outputs_from_file(
               sawtooth_crash=sawtooth_crash,
               outer_solver_iterations=outer_solver_iterations,
               inner_solver_iterations=inner_solver_iterations,
+              transport_evaluations_saved=transport_evaluations_saved,
           ),
       ),
       post_processed_outputs,
@@ -0,0 +1,234 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Parameter scans over configs which cannot be batched with jax.vmap.
+
+`run_simulation.run_simulation_batch` runs configs which only differ in
+numeric values as a single vmapped program. Scans over values which change the
+`StaticRuntimeParamsSlice`, e.g. the evolved equations, the sources or the
+solver, instead need a separate compilation per static configuration. This
+module runs such scans in a pool of processes sharing the persistent
+compilation cache, compiling each distinct configuration once.
+"""
+
+from collections.abc import Mapping, Sequence
+import contextlib
+import copy
+import itertools
+import multiprocessing
+import os
+import pathlib
+import tempfile
+from typing import Any
+
+from absl import logging
+import jax
+import numpy as np
+from torax.config import build_runtime_params
+from torax.config import config_loader
+from torax.orchestration import compilation_cache
+from torax.orchestration import run_simulation
+from torax.output_tools import output
+from torax.torax_pydantic import model_config
+import xarray as xr
+
+
+# Name of the dimension along which the runs of a scan are stacked.
+SCAN = 'scan'
+
+
+def run_parameter_scan(
+    base_config: Mapping[str, Any] | str | pathlib.Path,
+    parameter_grid: Mapping[str, Sequence[Any]],
+    num_processes: int | None = None,
+    cache_dir: str | None = None,
+) -> xr.DataTree:
+  """Runs a simulation for each point of a parameter grid.
+
+  The runs are dispatched to a pool of processes, which share the persistent
+  compilation cache. Runs which lead to the same compiled programs, i.e. with
+  the same static runtime params, models and array shapes, are grouped, and
+  the cache is prewarmed once per group before the runs start, such that each
+  distinct configuration is only compiled once.
+
+  Example:
+
+  data_tree = run_parameter_scan(
+      'examples/iterhybrid_rampup.py',
+      {
+          'sources.generic_heat.P_total': [20e6, 40e6],
+          'numerics.evolve_density': [False, True],
+      },
+  )
+  data_tree.scalars.Q_fusion.sel(time=80.0, method='nearest')
+
+  Args:
+    base_config: The config dict, or the path to a config file with a `CONFIG`
+      dict, which the scan parameters are applied to.
+    parameter_grid: Mapping from the path of a config field, with `.`
+      separating the nested keys of the config dict, to the values to scan
+      over. The scan runs the outer product of all values, with the last
+      parameter varying fastest.
+    num_processes: Number of worker processes. Defaults to the number of CPUs.
+    cache_dir: The persistent compilation cache directory of the workers.
+      Defaults to the cache directory configured in this process, see
+      `compilation_cache.initialize_cache`. If none is configured, a temporary
+      directory is used for the duration of the scan.
+
+  Returns:
+    The outputs of all runs, as returned by
+    `StateHistory.simulation_output_to_xr`, stacked along a `scan` dimension.
+    Each scan parameter is a coordinate along the `scan` dimension, and the
+    config of each run is saved in the `config` variable. The time coordinate
+    is the union of the times of all runs, with missing values filled with
+    NaN.
+  """
+  if isinstance(base_config, (str, pathlib.Path)):
+    config_module = config_loader.import_module(base_config)
+    if 'CONFIG' not in config_module:
+      raise ValueError(
+          f'The file {base_config} is an invalid Torax config file, as it'
+          ' does not have a `CONFIG` variable defined.'
+      )
+    base_config = config_module['CONFIG']
+  if not parameter_grid:
+    raise ValueError('parameter_grid must not be empty.')
+
+  names = list(parameter_grid)
+  points = list(itertools.product(*parameter_grid.values()))
+  config_dicts = [
+      _apply_overrides(base_config, dict(zip(names, point)))
+      for point in points
+  ]
+  # Validates all configs before starting any run.
+  torax_configs = [
+      model_config.ToraxConfig.from_dict(config_dict)
+      for config_dict in config_dicts
+  ]
+
+  groups = {}
+  for i, torax_config in enumerate(torax_configs):
+    groups.setdefault(_compilation_key(torax_config), []).append(i)
+  # Configs run by a single process are compiled by that run.
+  prewarm_indices = [
+      indices[0] for indices in groups.values() if len(indices) > 1
+  ]
+  logging.info(
+      'Running a scan of %d configs with %d distinct compilations.',
+      len(config_dicts),
+      len(groups),
+  )
+
+  with contextlib.ExitStack() as stack:
+    if cache_dir is None:
+      cache_dir = compilation_cache.initialize_cache()
+    if cache_dir is None:
+      cache_dir = stack.enter_context(tempfile.TemporaryDirectory())
+    # Important to use 'spawn' over 'forkserver' as JAX is not fork-safe.
+    mp_context = multiprocessing.get_context('spawn')
+    pool = stack.enter_context(
+        mp_context.Pool(
+            processes=num_processes or os.cpu_count(),
+            initializer=compilation_cache.initialize_cache,
+            initargs=(cache_dir,),
+        )
+    )
+    pool.map(
+        _prewarm, [config_dicts[i] for i in prewarm_indices], chunksize=1
+    )
+    data_trees = pool.map(_run, config_dicts, chunksize=1)
+
+  coords = {}
+  for name, values in zip(names, zip(*points)):
+    if all(_is_scalar(value) for value in values):
+      coords[name] = (SCAN, np.asarray(values))
+    else:
+      coords[name] = (SCAN, np.asarray([str(value) for value in values]))
+  data_tree = _stack_data_trees(data_trees, coords)
+  root_dataset = data_tree.to_dataset(inherit=False)
+  root_dataset[output.CONFIG] = xr.DataArray(
+      [torax_config.model_dump_json() for torax_config in torax_configs],
+      dims=[SCAN],
+  )
+  data_tree.dataset = root_dataset
+  return data_tree
+
+
+def _prewarm(config_dict: Mapping[str, Any]):
+  run_simulation.prewarm_compilation_cache(
+      model_config.ToraxConfig.from_dict(config_dict)
+  )
+
+
+def _run(config_dict: Mapping[str, Any]) -> xr.DataTree:
+  torax_config = model_config.ToraxConfig.from_dict(config_dict)
+  history = run_simulation.run_simulation(torax_config, progress_bar=False)
+  return history.simulation_output_to_xr()
+
+
+def _apply_overrides(
+    config: Mapping[str, Any], overrides: Mapping[str, Any]
+) -> dict[str, Any]:
+  """Returns a copy of a config dict with the overrides at `.` paths."""
+  config = copy.deepcopy(dict(config))
+  for path, value in overrides.items():
+    *keys, last_key = path.split('.')
+    node = config
+    for key in keys:
+      node = node.setdefault(key, {})
+      if not isinstance(node, dict):
+        raise ValueError(
+            f'Cannot set {path}: {key} is not a dict in the config.'
+        )
+    node[last_key] = copy.deepcopy(value)
+  return config
+
+
+def _compilation_key(torax_config: model_config.ToraxConfig) -> Any:
+  """Returns a key which is equal for configs with the same compilations."""
+  leaves, treedef = jax.tree.flatten(torax_config)
+  return (
+      build_runtime_params.build_static_params_from_config(torax_config),
+      treedef,
+      tuple(
+          (type(leaf), np.shape(leaf), getattr(leaf, 'dtype', None))
+          for leaf in leaves
+      ),
+  )
+
+
+def _is_scalar(value: Any) -> bool:
+  return isinstance(value, (bool, int, float, str, np.number, np.bool_))
+
+
+def _stack_data_trees(
+    data_trees: Sequence[xr.DataTree], coords: Mapping[str, Any]
+) -> xr.DataTree:
+  """Stacks output data trees along the scan dimension."""
+
+  # Only indexed coordinates are inherited by the child nodes, so the scan
+  # coordinates are added to each node.
+  def _stack_datasets(*datasets: xr.Dataset) -> xr.Dataset:
+    stacked_dataset = xr.concat(
+        datasets,
+        dim=SCAN,
+        data_vars='all',
+        coords='minimal',
+        compat='override',
+        join='outer',
+        combine_attrs='drop_conflicts',
+    )
+    return stacked_dataset.assign_coords(coords)
+
+  return xr.map_over_datasets(_stack_datasets, *data_trees)
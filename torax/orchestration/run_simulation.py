@@ -24,35 +24,532 @@ new_sim_outputs = torax.run_simulation(torax_config)
 ```
 """
 
+import contextlib
+from typing import Any, Sequence
+
+from absl import logging
+import jax
+from jax import numpy as jnp
+import numpy as np
+from torax import profiling
 from torax import sim
+from torax import state
 from torax.config import build_runtime_params
+from torax.config import runtime_params_slice
+from torax.fvm import calc_coeffs
+from torax.fvm import residual_and_loss
+from torax.geometry import geometry_provider as geometry_provider_lib
+from torax.orchestration import checkpointing
+from torax.orchestration import compilation_cache
 from torax.orchestration import initial_state as initial_state_lib
+from torax.orchestration import sim_state
 from torax.orchestration import step_function
 from torax.output_tools import output
+from torax.output_tools import post_processing
+from torax.output_tools import streaming_output
 from torax.sources import source_models as source_models_lib
+from torax.sources import source_profile_builders
+from torax.time_step_calculator import chi_time_step_calculator
+from torax.time_step_calculator import pi_time_step_calculator
 from torax.torax_pydantic import model_config
 
 
+# The jitted functions whose compilations are counted for each stage when
+# `output.record_performance` is set.
+_JITTED_STAGE_FUNCTIONS = (
+    (profiling.SOURCE_PROFILES, source_profile_builders.build_source_profiles),
+    (
+        profiling.SOURCE_PROFILES,
+        source_profile_builders.add_profile_independent_source_profiles,
+    ),
+    (
+        profiling.TRANSPORT_MODEL,
+        step_function._calculate_transport_coeffs,  # pylint: disable=protected-access
+    ),
+    (
+        profiling.TIME_STEP_CALCULATOR,
+        chi_time_step_calculator.ChiTimeStepCalculator.next_dt,
+    ),
+    (
+        profiling.TIME_STEP_CALCULATOR,
+        pi_time_step_calculator.PITimeStepCalculator.next_dt,
+    ),
+    (profiling.CALC_COEFFS, calc_coeffs._calc_coeffs_full),  # pylint: disable=protected-access
+    (profiling.CALC_COEFFS, calc_coeffs._calc_coeffs_reduced),  # pylint: disable=protected-access
+    (profiling.RESIDUAL, residual_and_loss.theta_method_block_residual),
+    (profiling.JACOBIAN, residual_and_loss.theta_method_block_jacobian),
+    (
+        profiling.JACOBIAN,
+        residual_and_loss.theta_method_block_jacobian_colored,
+    ),
+    (
+        profiling.LINEAR_SOLVE,
+        residual_and_loss.theta_method_block_krylov_step,
+    ),
+    (profiling.SAWTOOTH, step_function._sawtooth_step),  # pylint: disable=protected-access
+    (profiling.POST_PROCESSING, post_processing.make_post_processed_outputs),
+)
+
+
 def run_simulation(
     torax_config: model_config.ToraxConfig,
     log_timestep_info: bool = False,
     progress_bar: bool = True,
 ) -> output.StateHistory:
   """Runs a TORAX simulation using the config and returns the outputs."""
+  return _run_simulation(
+      torax_config,
+      log_timestep_info=log_timestep_info,
+      progress_bar=progress_bar,
+  )
+
+
+def resume_from_checkpoint(
+    torax_config: model_config.ToraxConfig,
+    checkpoint_file: str,
+    log_timestep_info: bool = False,
+    progress_bar: bool = True,
+) -> output.StateHistory:
+  """Resumes a TORAX simulation from a checkpoint and returns the outputs.
+
+  Checkpoints are written by simulations with `output.checkpoint_file` set.
+  The simulation continues from the checkpointed state exactly as the
+  simulation which wrote it, without rebuilding the initial state. The config
+  must have the same static runtime params as the checkpointed simulation, but
+  may differ in dynamic values, e.g. a later `numerics.t_final`.
+
+  Args:
+    torax_config: The config of the simulation.
+    checkpoint_file: Path of the checkpoint file.
+    log_timestep_info: See `run_simulation`.
+    progress_bar: See `run_simulation`.
+
+  Returns:
+    The outputs of the simulation from the checkpointed state onwards. The
+    first time slice is the checkpointed state.
+
+  Raises:
+    ValueError: If the static runtime params of the config differ from those
+      of the checkpointed simulation.
+  """
+  checkpoint = checkpointing.load_checkpoint(checkpoint_file)
+  if (
+      build_runtime_params.build_static_params_from_config(torax_config)
+      != checkpoint.static_runtime_params_slice
+  ):
+    raise ValueError(
+        f'The checkpoint {checkpoint_file} was written by a simulation with'
+        ' different static runtime params.'
+    )
+  return _run_simulation(
+      torax_config,
+      log_timestep_info=log_timestep_info,
+      progress_bar=progress_bar,
+      checkpoint=checkpoint,
+  )
+
+
+def _run_simulation(
+    torax_config: model_config.ToraxConfig,
+    log_timestep_info: bool,
+    progress_bar: bool,
+    checkpoint: checkpointing.Checkpoint | None = None,
+) -> output.StateHistory:
+  """Runs a simulation from its initial state or from a checkpoint."""
+  if torax_config.numerics.compiled_loop and (
+      checkpoint is not None or torax_config.output.checkpoint_file
+  ):
+    raise ValueError(
+        'Checkpoints are not supported with numerics.compiled_loop=True.'
+    )
+  if torax_config.output.record_performance:
+    performance_context = profiling.track_performance(_JITTED_STAGE_FUNCTIONS)
+  else:
+    performance_context = contextlib.nullcontext()
+  with (
+      compilation_cache.track_cache_usage() as cache_stats,
+      performance_context as performance_stats,
+  ):
+    static_runtime_params_slice = (
+        build_runtime_params.build_static_params_from_config(torax_config)
+    )
+    geometry_provider = torax_config.geometry.build_provider
+    step_fn = _build_step_fn(torax_config, static_runtime_params_slice)
+
+    dynamic_runtime_params_slice_provider = (
+        _build_dynamic_runtime_params_slice_provider(torax_config)
+    )
+
+    if checkpoint is None:
+      initial_state, post_processed_outputs, restart_case = _get_initial_state(
+          torax_config,
+          static_runtime_params_slice,
+          dynamic_runtime_params_slice_provider,
+          geometry_provider,
+          step_fn,
+      )
+      initial_num_steps = 0
+    else:
+      initial_state = checkpoint.sim_state
+      post_processed_outputs = checkpoint.post_processed_outputs
+      restart_case = True
+      initial_num_steps = checkpoint.num_steps
+
+    if torax_config.numerics.compiled_loop:
+      state_history, post_processed_outputs_history, sim_error = sim._run_simulation_compiled(  # pylint: disable=protected-access
+          static_runtime_params_slice=static_runtime_params_slice,
+          dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+          geometry_provider=geometry_provider,
+          initial_state=initial_state,
+          initial_post_processed_outputs=post_processed_outputs,
+          restart_case=restart_case,
+          step_fn=step_fn,
+          max_steps=torax_config.numerics.compiled_loop_max_steps,
+          output_config=torax_config.output,
+      )
+    else:
+      state_history, post_processed_outputs_history, sim_error = sim._run_simulation(  # pylint: disable=protected-access
+          static_runtime_params_slice=static_runtime_params_slice,
+          dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+          geometry_provider=geometry_provider,
+          initial_state=initial_state,
+          initial_post_processed_outputs=post_processed_outputs,
+          restart_case=restart_case,
+          step_fn=step_fn,
+          log_timestep_info=log_timestep_info,
+          progress_bar=progress_bar,
+          output_config=torax_config.output,
+          initial_num_steps=initial_num_steps,
+      )
+
+  if compilation_cache.is_cache_enabled():
+    logging.info(
+        'Persistent compilation cache: %d hits, %d misses.',
+        cache_stats.cache_hits,
+        cache_stats.cache_misses,
+    )
+  else:
+    cache_stats = None
+
+  return output.StateHistory(
+      state_history=state_history,
+      post_processed_outputs_history=post_processed_outputs_history,
+      sim_error=sim_error,
+      torax_config=torax_config,
+      compilation_cache_stats=cache_stats,
+      performance_stats=performance_stats,
+  )
+
+
+def run_simulation_streaming(
+    torax_config: model_config.ToraxConfig,
+    output_file: str,
+    chunk_size: int = 16,
+    log_timestep_info: bool = False,
+    progress_bar: bool = True,
+) -> state.SimError:
+  """Runs a TORAX simulation, streaming the outputs to a NetCDF file.
+
+  Unlike `run_simulation`, the history is not kept in memory. Each state is
+  appended to `output_file` as the simulation progresses, in chunks of
+  `chunk_size` time slices, so memory use is bounded for long simulations. The
+  file follows the schema of `StateHistory.simulation_output_to_xr` and can be
+  loaded with `output.load_state_file`, also while the simulation is running
+  or after a crash.
+
+  Args:
+    torax_config: The config of the simulation.
+    output_file: Path of the NetCDF output file.
+    chunk_size: Number of time slices written to the file at once.
+    log_timestep_info: See `run_simulation`.
+    progress_bar: See `run_simulation`.
+
+  Returns:
+    The sim error state.
+
+  Raises:
+    ValueError: If `numerics.compiled_loop` is set, since the compiled loop
+      keeps its history on device until the end of the simulation.
+  """
+  if torax_config.numerics.compiled_loop:
+    raise ValueError(
+        'Streaming output is not supported with numerics.compiled_loop=True.'
+    )
+  static_runtime_params_slice = (
+      build_runtime_params.build_static_params_from_config(torax_config)
+  )
+  geometry_provider = torax_config.geometry.build_provider
+  step_fn = _build_step_fn(torax_config, static_runtime_params_slice)
+  dynamic_runtime_params_slice_provider = (
+      _build_dynamic_runtime_params_slice_provider(torax_config)
+  )
+  initial_state, post_processed_outputs, restart_case = _get_initial_state(
+      torax_config,
+      static_runtime_params_slice,
+      dynamic_runtime_params_slice_provider,
+      geometry_provider,
+      step_fn,
+  )
+
+  with streaming_output.StreamingOutputWriter(
+      output_file, torax_config, chunk_size=chunk_size
+  ) as output_writer:
+    _, _, sim_error = sim._run_simulation(  # pylint: disable=protected-access
+        static_runtime_params_slice=static_runtime_params_slice,
+        dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+        geometry_provider=geometry_provider,
+        initial_state=initial_state,
+        initial_post_processed_outputs=post_processed_outputs,
+        restart_case=restart_case,
+        step_fn=step_fn,
+        log_timestep_info=log_timestep_info,
+        progress_bar=progress_bar,
+        output_writer=output_writer,
+        output_config=torax_config.output,
+    )
+    output_writer.close(sim_error)
+  return sim_error
+
+
+def prewarm_compilation_cache(
+    torax_config: model_config.ToraxConfig,
+) -> compilation_cache.CompilationCacheStats:
+  """Compiles the simulation of a config without running it.
+
+  With the persistent compilation cache enabled (see
+  `compilation_cache.initialize_cache`), the compiled executables are written
+  to the cache, so that later processes running a config with the same static
+  runtime params and grid shapes skip compilation.
+
+  With `numerics.compiled_loop`, the whole simulation loop is compiled ahead of
+  time. Otherwise, the initial state is built and a single step is taken,
+  which compiles the jitted functions of the step function. Functions only
+  called in rare cases, e.g. when the time step is reduced, may still be
+  compiled during the simulation.
+
+  Args:
+    torax_config: The config to compile the simulation for.
+
+  Returns:
+    The compilation cache usage while compiling.
+  """
+  with compilation_cache.track_cache_usage() as cache_stats:
+    static_runtime_params_slice = (
+        build_runtime_params.build_static_params_from_config(torax_config)
+    )
+    geometry_provider = torax_config.geometry.build_provider
+    step_fn = _build_step_fn(torax_config, static_runtime_params_slice)
+    dynamic_runtime_params_slice_provider = (
+        _build_dynamic_runtime_params_slice_provider(torax_config)
+    )
+    initial_state, post_processed_outputs, _ = _get_initial_state(
+        torax_config,
+        static_runtime_params_slice,
+        dynamic_runtime_params_slice_provider,
+        geometry_provider,
+        step_fn,
+    )
+
+    if torax_config.numerics.compiled_loop:
+      # pylint: disable=protected-access
+      capacity = sim._history_capacity(
+          initial_state=initial_state,
+          dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+          max_steps=torax_config.numerics.compiled_loop_max_steps,
+      )
+      initial_state, post_processed_outputs = jax.tree.map(
+          jnp.asarray, (initial_state, post_processed_outputs)
+      )
+      sim._compile_loop(
+          static_runtime_params_slice=static_runtime_params_slice,
+          dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+          geometry_provider=geometry_provider,
+          initial_state=initial_state,
+          initial_post_processed_outputs=post_processed_outputs,
+          step_fn=step_fn,
+          capacity=capacity,
+      )
+      # pylint: enable=protected-access
+    else:
+      step_fn(
+          static_runtime_params_slice,
+          dynamic_runtime_params_slice_provider,
+          geometry_provider,
+          initial_state,
+          post_processed_outputs,
+      )
+  return cache_stats
+
+
+def run_simulation_batch(
+    torax_configs: Sequence[model_config.ToraxConfig],
+) -> tuple[output.StateHistory, ...]:
+  """Runs a batch of TORAX simulations as a single vmapped program.
+
+  The configs must only differ in numeric values which end up in the
+  `DynamicRuntimeParamsSlice`, e.g. heating powers, Ip waveforms or density
+  targets. Config values leading to a different `StaticRuntimeParamsSlice`,
+  different model choices, a different geometry or different array shapes
+  (e.g. number of time points in a time-varying parameter) are not supported.
+
+  All members advance together through the compiled simulation loop (see
+  `numerics.compiled_loop`) under `jax.vmap`. Members that finish or fail are
+  masked out until the whole batch is done.
+
+  Args:
+    torax_configs: The configs of the batch members.
+
+  Returns:
+    The output StateHistory of each member, in the order of `torax_configs`.
+
+  Raises:
+    ValueError: If the configs differ in more than numeric dynamic values, or
+      if restarts are requested.
+  """
+  if not torax_configs:
+    raise ValueError('torax_configs must not be empty.')
+  reference_config = torax_configs[0]
+  for torax_config in torax_configs:
+    if torax_config.restart and torax_config.restart.do_restart:
+      raise ValueError('Restarts are not supported in batched simulations.')
+    if torax_config.output.checkpoint_file:
+      raise ValueError('Checkpoints are not supported in batched simulations.')
+
+  static_runtime_params_slice = (
+      build_runtime_params.build_static_params_from_config(reference_config)
+  )
+  for torax_config in torax_configs[1:]:
+    if (
+        build_runtime_params.build_static_params_from_config(torax_config)
+        != static_runtime_params_slice
+    ):
+      raise ValueError(
+          'All configs in a batch must have the same static runtime params.'
+      )
+  batched_params, make_config = _batch_configs(torax_configs)
+
+  geometry_provider = reference_config.geometry.build_provider
+  step_fn = _build_step_fn(reference_config, static_runtime_params_slice)
+
+  initial_states = []
+  initial_post_processed_outputs = []
+  capacity = 1
+  for torax_config in torax_configs:
+    dynamic_runtime_params_slice_provider = (
+        build_runtime_params.DynamicRuntimeParamsSliceProvider.from_config(
+            torax_config
+        )
+    )
+    initial_state, post_processed_outputs = (
+        initial_state_lib.get_initial_state_and_post_processed_outputs(
+            t=torax_config.numerics.t_initial,
+            static_runtime_params_slice=static_runtime_params_slice,
+            dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+            geometry_provider=geometry_provider,
+            step_fn=step_fn,
+        )
+    )
+    initial_states.append(initial_state)
+    initial_post_processed_outputs.append(post_processed_outputs)
+    capacity = max(
+        capacity,
+        sim._history_capacity(  # pylint: disable=protected-access
+            initial_state=initial_state,
+            dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+            max_steps=torax_config.numerics.compiled_loop_max_steps,
+        ),
+    )
+
+  results = sim._run_simulation_batch(  # pylint: disable=protected-access
+      static_runtime_params_slice=static_runtime_params_slice,
+      make_dynamic_runtime_params_slice_provider=lambda params: (
+          build_runtime_params.DynamicRuntimeParamsSliceProvider.from_config(
+              make_config(params)
+          )
+      ),
+      batched_params=batched_params,
+      geometry_provider=geometry_provider,
+      initial_states=initial_states,
+      initial_post_processed_outputs=initial_post_processed_outputs,
+      step_fn=step_fn,
+      capacity=capacity,
+      output_configs=[torax_config.output for torax_config in torax_configs],
+  )
+  return tuple(
+      output.StateHistory(
+          state_history=state_history,
+          post_processed_outputs_history=post_processed_outputs_history,
+          sim_error=sim_error,
+          torax_config=torax_config,
+      )
+      for torax_config, (
+          state_history,
+          post_processed_outputs_history,
+          sim_error,
+      ) in zip(torax_configs, results)
+  )
+
+
+def _get_initial_state(
+    torax_config: model_config.ToraxConfig,
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    dynamic_runtime_params_slice_provider: build_runtime_params.DynamicRuntimeParamsSliceProvider,
+    geometry_provider: geometry_provider_lib.GeometryProvider,
+    step_fn: step_function.SimulationStepFn,
+) -> tuple[
+    sim_state.ToraxSimState, post_processing.PostProcessedOutputs, bool
+]:
+  """Returns the initial state and outputs, and whether this is a restart."""
+  if torax_config.restart and torax_config.restart.do_restart:
+    initial_state, post_processed_outputs = (
+        initial_state_lib.get_initial_state_and_post_processed_outputs_from_file(
+            t_initial=torax_config.numerics.t_initial,
+            file_restart=torax_config.restart,
+            static_runtime_params_slice=static_runtime_params_slice,
+            dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+            geometry_provider=geometry_provider,
+            step_fn=step_fn,
+        )
+    )
+    return initial_state, post_processed_outputs, True
+  initial_state, post_processed_outputs = (
+      initial_state_lib.get_initial_state_and_post_processed_outputs(
+          t=torax_config.numerics.t_initial,
+          static_runtime_params_slice=static_runtime_params_slice,
+          dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+          geometry_provider=geometry_provider,
+          step_fn=step_fn,
+      )
+  )
+  return initial_state, post_processed_outputs, False
+
+
+def _build_dynamic_runtime_params_slice_provider(
+    torax_config: model_config.ToraxConfig,
+) -> build_runtime_params.DynamicRuntimeParamsSliceProvider:
+  """Builds the provider, with precomputed tables if configured."""
+  if torax_config.numerics.compiled_runtime_params:
+    return build_runtime_params.CompiledDynamicRuntimeParamsSliceProvider(
+        torax_config
+    )
+  return build_runtime_params.DynamicRuntimeParamsSliceProvider.from_config(
+      torax_config
+  )
+
+
+def _build_step_fn(
+    torax_config: model_config.ToraxConfig,
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+) -> step_function.SimulationStepFn:
+  """Builds the models and the step function from a config."""
   # TODO(b/384767453): Remove the need for the step_fn and stepper to take the
   # transport model and pedestal model.
   transport_model = torax_config.transport.build_transport_model()
   pedestal_model = torax_config.pedestal.build_pedestal_model()
-
-  geometry_provider = torax_config.geometry.build_provider
   source_models = source_models_lib.SourceModels(
       torax_config.sources, neoclassical=torax_config.neoclassical
   )
 
-  static_runtime_params_slice = (
-      build_runtime_params.build_static_params_from_config(torax_config)
-  )
-
   solver = torax_config.solver.build_solver(
       static_runtime_params_slice=static_runtime_params_slice,
       transport_model=transport_model,
@@ -67,7 +564,7 @@ def run_simulation(
       pedestal_model=pedestal_model,
   )
 
-  step_fn = step_function.SimulationStepFn(
+  return step_function.SimulationStepFn(
       solver=solver,
       time_step_calculator=torax_config.time_step_calculator.time_step_calculator,
       transport_model=transport_model,
@@ -75,51 +572,92 @@ def run_simulation(
       mhd_models=mhd_models,
   )
 
-  dynamic_runtime_params_slice_provider = (
-      build_runtime_params.DynamicRuntimeParamsSliceProvider.from_config(
-          torax_config
-      )
-  )
 
-  if torax_config.restart and torax_config.restart.do_restart:
-    initial_state, post_processed_outputs = (
-        initial_state_lib.get_initial_state_and_post_processed_outputs_from_file(
-            t_initial=torax_config.numerics.t_initial,
-            file_restart=torax_config.restart,
-            static_runtime_params_slice=static_runtime_params_slice,
-            dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
-            geometry_provider=geometry_provider,
-            step_fn=step_fn,
-        )
-    )
-    restart_case = True
-  else:
-    initial_state, post_processed_outputs = (
-        initial_state_lib.get_initial_state_and_post_processed_outputs(
-            t=torax_config.numerics.t_initial,
-            static_runtime_params_slice=static_runtime_params_slice,
-            dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
-            geometry_provider=geometry_provider,
-            step_fn=step_fn,
-        )
-    )
-    restart_case = False
+def _batch_configs(
+    torax_configs: Sequence[model_config.ToraxConfig],
+) -> tuple[list[np.ndarray], Any]:
+  """Splits configs into batched varying leaves and a shared structure.
 
-  state_history, post_processed_outputs_history, sim_error = sim._run_simulation(  # pylint: disable=protected-access
-      static_runtime_params_slice=static_runtime_params_slice,
-      dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
-      geometry_provider=geometry_provider,
-      initial_state=initial_state,
-      initial_post_processed_outputs=post_processed_outputs,
-      restart_case=restart_case,
-      step_fn=step_fn,
-      log_timestep_info=log_timestep_info,
-      progress_bar=progress_bar,
+  Leaves which are equal across all configs are kept as they are, so that they
+  remain concrete Python values when tracing. Only the leaves that differ are
+  stacked along a new leading batch dimension.
+
+  Args:
+    torax_configs: The configs to batch.
+
+  Returns:
+    batched_params: The stacked leaves which differ between configs.
+    make_config: Function rebuilding a config from a member's slice of
+      `batched_params`.
+
+  Raises:
+    ValueError: If the configs have different structures, or differ in
+      non-numeric values, array shapes or geometry.
+  """
+  paths_and_leaves, treedef = jax.tree_util.tree_flatten_with_path(
+      torax_configs[0]
   )
+  paths = [path for path, _ in paths_and_leaves]
+  all_leaves = [[leaf for _, leaf in paths_and_leaves]]
+  for torax_config in torax_configs[1:]:
+    leaves, config_treedef = jax.tree.flatten(torax_config)
+    if config_treedef != treedef:
+      raise ValueError(
+          'All configs in a batch must have the same structure, e.g. the same'
+          ' models and the same set of time-dependent parameters.'
+      )
+    all_leaves.append(leaves)
 
-  return output.StateHistory(
-      state_history=state_history,
-      post_processed_outputs_history=post_processed_outputs_history,
-      sim_error=sim_error,
-      torax_config=torax_config,
+  shared_leaves = list(all_leaves[0])
+  varying_indices = []
+  for i, path in enumerate(paths):
+    values = [leaves[i] for leaves in all_leaves]
+    if all(_leaves_equal(values[0], value) for value in values[1:]):
+      continue
+    name = jax.tree_util.keystr(path)
+    if name.startswith('.geometry'):
+      raise ValueError(
+          f'All configs in a batch must have the same geometry, got different'
+          f' values for {name}.'
+      )
+    if not all(_is_numeric(value) for value in values):
+      raise ValueError(
+          f'Configs in a batch may only differ in numeric values, got'
+          f' different values for {name}: {values[0]} and others.'
+      )
+    if len({np.shape(value) for value in values}) > 1:
+      raise ValueError(
+          f'Configs in a batch must have the same array shapes, got different'
+          f' shapes for {name}.'
+      )
+    varying_indices.append(i)
+
+  batched_params = [
+      np.stack([np.asarray(leaves[i]) for leaves in all_leaves])
+      for i in varying_indices
+  ]
+
+  def make_config(params: list[jax.Array]) -> model_config.ToraxConfig:
+    leaves = list(shared_leaves)
+    for i, value in zip(varying_indices, params, strict=True):
+      leaves[i] = value
+    return jax.tree.unflatten(treedef, leaves)
+
+  return batched_params, make_config
+
+
+def _leaves_equal(a: Any, b: Any) -> bool:
+  if isinstance(a, (np.ndarray, jax.Array)) or isinstance(
+      b, (np.ndarray, jax.Array)
+  ):
+    return np.shape(a) == np.shape(b) and np.array_equal(a, b)
+  return type(a) is type(b) and a == b
+
+
+def _is_numeric(value: Any) -> bool:
+  if isinstance(value, (bool, int, float, np.number, np.bool_)):
+    return True
+  return isinstance(value, (np.ndarray, jax.Array)) and (
+      np.issubdtype(value.dtype, np.number)
+      or np.issubdtype(value.dtype, np.bool_)
   )
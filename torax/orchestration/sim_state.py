@@ -46,6 +46,11 @@ class ToraxSimState:
       the explicit and implicit profiles.
     geometry: Geometry at this time step used for the simulation.
     solver_numeric_outputs: Numerical quantities related to the solver.
+    jacobian_cache: Jacobian carried over to the next time step by solvers
+      which reuse it, None otherwise. Not recorded in the simulation history.
+    time_step_controller: State of the time step calculator carried over to
+      the next time step by calculators which adapt dt to the past time steps,
+      None otherwise. Not recorded in the simulation history.
   """
 
   t: jax.Array
@@ -55,6 +60,8 @@ class ToraxSimState:
   core_sources: source_profiles.SourceProfiles
   geometry: geometry.Geometry
   solver_numeric_outputs: state.SolverNumericOutputs
+  jacobian_cache: state.JacobianCache | None = None
+  time_step_controller: state.TimeStepControllerState | None = None
 
   def check_for_errors(self) -> state.SimError:
     """Checks for errors in the simulation state."""
@@ -16,9 +16,12 @@
 
 import dataclasses
 import functools
+from typing import TypeVar
+
 import jax
 import jax.numpy as jnp
 from torax import jax_utils
+from torax import profiling
 from torax import state
 from torax.config import build_runtime_params
 from torax.config import runtime_params_slice
@@ -37,12 +40,26 @@ from torax.stepper import stepper as solver_lib
 from torax.time_step_calculator import time_step_calculator as ts
 from torax.transport_model import transport_model as transport_model_lib
 
+T = TypeVar('T')
+
 
 def _check_for_errors(
     output_state: sim_state.ToraxSimState,
     post_processed_outputs: post_processing.PostProcessedOutputs,
-) -> state.SimError:
-  """Checks for errors in the simulation state."""
+) -> state.SimError | jax.Array:
+  """Checks for errors in the simulation state.
+
+  Args:
+    output_state: State at the end of the time step.
+    post_processed_outputs: Post-processed outputs at the end of the time step.
+
+  Returns:
+    The SimError. If the inputs are being traced as part of a compiled
+    simulation loop, the integer value of the SimError is returned as an array
+    instead.
+  """
+  if jax_utils.is_tracer((output_state, post_processed_outputs)):
+    return _traced_error_code(output_state, post_processed_outputs)
   state_error = output_state.check_for_errors()
   if state_error != state.SimError.NO_ERROR:
     return state_error
@@ -50,6 +67,47 @@ def _check_for_errors(
     return post_processed_outputs.check_for_errors()
 
 
+def _traced_error_code(
+    output_state: sim_state.ToraxSimState,
+    post_processed_outputs: post_processing.PostProcessedOutputs,
+) -> jax.Array:
+  """Traceable equivalent of `_check_for_errors`, returning the error value."""
+  core_profiles = output_state.core_profiles
+  any_leaf = lambda fn, tree: jnp.any(
+      jnp.array([jnp.any(fn(x)) for x in jax.tree.leaves(tree)])
+  )
+  negative_profiles = any_leaf(
+      lambda x: x < 0.0,
+      (
+          core_profiles.T_i,
+          core_profiles.T_e,
+          core_profiles.n_e,
+          core_profiles.n_i,
+          core_profiles.n_impurity,
+      ),
+  )
+  quasineutrality_satisfied = jnp.allclose(
+      core_profiles.n_i.value * core_profiles.Z_i
+      + core_profiles.n_impurity.value * core_profiles.Z_impurity,
+      core_profiles.n_e.value,
+  )
+  return jnp.select(
+      [
+          negative_profiles,
+          any_leaf(jnp.isnan, output_state),
+          jnp.logical_not(quasineutrality_satisfied),
+          any_leaf(jnp.isnan, post_processed_outputs),
+      ],
+      [
+          state.SimError.NEGATIVE_CORE_PROFILES.value,
+          state.SimError.NAN_DETECTED.value,
+          state.SimError.QUASINEUTRALITY_BROKEN.value,
+          state.SimError.NAN_DETECTED.value,
+      ],
+      default=state.SimError.NO_ERROR.value,
+  )
+
+
 class SimulationStepFn:
   """Advances the TORAX simulation one time step.
 
@@ -160,18 +218,20 @@ class SimulationStepFn:
         - cumulative quantities.
       SimError indicating if an error has occurred during simulation.
     """
-    dynamic_runtime_params_slice_t, geo_t = (
-        build_runtime_params.get_consistent_dynamic_runtime_params_slice_and_geometry(
-            t=input_state.t,
-            dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
-            geometry_provider=geometry_provider,
-        )
+    dynamic_runtime_params_slice_t, geo_t = profiling.timed(
+        profiling.RUNTIME_PARAMS,
+        build_runtime_params.get_consistent_dynamic_runtime_params_slice_and_geometry,
+        t=input_state.t,
+        dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+        geometry_provider=geometry_provider,
     )
 
     # This only computes sources set to explicit in the
     # DynamicSourceConfigSlice. All implicit sources will have their profiles
     # set to 0.
-    explicit_source_profiles = source_profile_builders.build_source_profiles(
+    explicit_source_profiles = profiling.timed(
+        profiling.SOURCE_PROFILES,
+        source_profile_builders.build_source_profiles,
         dynamic_runtime_params_slice=dynamic_runtime_params_slice_t,
         static_runtime_params_slice=static_runtime_params_slice,
         geo=geo_t,
@@ -186,38 +246,112 @@ class SimulationStepFn:
     # of a full PDE solve, the step_fn will return early with a state following
     # sawtooth redistribution, at a t+dt set by the sawtooth model
     # configuration.
-    if (self.mhd_models.sawtooth is not None) and (
-        not input_state.solver_numeric_outputs.sawtooth_crash
-    ):
+    if self.mhd_models.sawtooth is not None:
       assert dynamic_runtime_params_slice_t.mhd.sawtooth is not None
       dt_crash = dynamic_runtime_params_slice_t.mhd.sawtooth.crash_step_duration
       dynamic_runtime_params_slice_t_plus_crash_dt, geo_t_plus_crash_dt = (
-          build_runtime_params.get_consistent_dynamic_runtime_params_slice_and_geometry(
+          profiling.timed(
+              profiling.RUNTIME_PARAMS,
+              build_runtime_params.get_consistent_dynamic_runtime_params_slice_and_geometry,
               t=input_state.t + dt_crash,
               dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
               geometry_provider=geometry_provider,
           )
       )
-      # If no sawtooth crash is triggered, output_state and
-      # post_processed_outputs will be the same as the input state and
-      # previous_post_processed_outputs.
-      output_state, post_processed_outputs = _sawtooth_step(
-          sawtooth_solver=self.mhd_models.sawtooth,
-          static_runtime_params_slice=static_runtime_params_slice,
-          dynamic_runtime_params_slice_t=dynamic_runtime_params_slice_t,
-          dynamic_runtime_params_slice_t_plus_crash_dt=dynamic_runtime_params_slice_t_plus_crash_dt,
-          geo_t=geo_t,
-          geo_t_plus_crash_dt=geo_t_plus_crash_dt,
-          explicit_source_profiles=explicit_source_profiles,
-          input_state=input_state,
-          input_post_processed_outputs=previous_post_processed_outputs,
-      )
-      # If a sawtooth crash was carried out, we exit early with the post-crash
-      # state, post-processed outputs, and the error state.
-      if output_state.solver_numeric_outputs.sawtooth_crash:
-        error_state = _check_for_errors(output_state, post_processed_outputs)
-        return output_state, post_processed_outputs, error_state
+      if jax_utils.is_tracer(input_state):
+        # When traced as part of a compiled simulation loop the sawtooth and
+        # PDE branches are both staged and selected with a lax.cond.
+        output_state, post_processed_outputs = profiling.timed(
+            profiling.SAWTOOTH,
+            _sawtooth_step,
+            sawtooth_solver=self.mhd_models.sawtooth,
+            static_runtime_params_slice=static_runtime_params_slice,
+            dynamic_runtime_params_slice_t=dynamic_runtime_params_slice_t,
+            dynamic_runtime_params_slice_t_plus_crash_dt=dynamic_runtime_params_slice_t_plus_crash_dt,
+            geo_t=geo_t,
+            geo_t_plus_crash_dt=geo_t_plus_crash_dt,
+            explicit_source_profiles=explicit_source_profiles,
+            input_state=input_state,
+            input_post_processed_outputs=previous_post_processed_outputs,
+        )
+        crash = jnp.logical_and(
+            output_state.solver_numeric_outputs.sawtooth_crash,
+            jnp.logical_not(input_state.solver_numeric_outputs.sawtooth_crash),
+        )
+        output_state, post_processed_outputs = jax.lax.cond(
+            crash,
+            lambda: (output_state, post_processed_outputs),
+            lambda: _cast_like(
+                self._pde_step(
+                    static_runtime_params_slice,
+                    dynamic_runtime_params_slice_t,
+                    dynamic_runtime_params_slice_provider,
+                    geo_t,
+                    geometry_provider,
+                    input_state,
+                    previous_post_processed_outputs,
+                    explicit_source_profiles,
+                ),
+                (output_state, post_processed_outputs),
+            ),
+        )
+        return (
+            output_state,
+            post_processed_outputs,
+            _check_for_errors(output_state, post_processed_outputs),
+        )
+      elif not input_state.solver_numeric_outputs.sawtooth_crash:
+        # If no sawtooth crash is triggered, output_state and
+        # post_processed_outputs will be the same as the input state and
+        # previous_post_processed_outputs.
+        output_state, post_processed_outputs = profiling.timed(
+            profiling.SAWTOOTH,
+            _sawtooth_step,
+            sawtooth_solver=self.mhd_models.sawtooth,
+            static_runtime_params_slice=static_runtime_params_slice,
+            dynamic_runtime_params_slice_t=dynamic_runtime_params_slice_t,
+            dynamic_runtime_params_slice_t_plus_crash_dt=dynamic_runtime_params_slice_t_plus_crash_dt,
+            geo_t=geo_t,
+            geo_t_plus_crash_dt=geo_t_plus_crash_dt,
+            explicit_source_profiles=explicit_source_profiles,
+            input_state=input_state,
+            input_post_processed_outputs=previous_post_processed_outputs,
+        )
+        # If a sawtooth crash was carried out, we exit early with the post-crash
+        # state, post-processed outputs, and the error state.
+        if output_state.solver_numeric_outputs.sawtooth_crash:
+          error_state = _check_for_errors(output_state, post_processed_outputs)
+          return output_state, post_processed_outputs, error_state
+
+    output_state, post_processed_outputs = self._pde_step(
+        static_runtime_params_slice,
+        dynamic_runtime_params_slice_t,
+        dynamic_runtime_params_slice_provider,
+        geo_t,
+        geometry_provider,
+        input_state,
+        previous_post_processed_outputs,
+        explicit_source_profiles,
+    )
+
+    return (
+        output_state,
+        post_processed_outputs,
+        _check_for_errors(output_state, post_processed_outputs),
+    )
 
+  def _pde_step(
+      self,
+      static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+      dynamic_runtime_params_slice_t: runtime_params_slice.DynamicRuntimeParamsSlice,
+      dynamic_runtime_params_slice_provider: build_runtime_params.DynamicRuntimeParamsSliceProvider,
+      geo_t: geometry.Geometry,
+      geometry_provider: geometry_provider_lib.GeometryProvider,
+      input_state: sim_state.ToraxSimState,
+      previous_post_processed_outputs: post_processing.PostProcessedOutputs,
+      explicit_source_profiles: source_profiles_lib.SourceProfiles,
+  ) -> tuple[sim_state.ToraxSimState, post_processing.PostProcessedOutputs]:
+    """Advances the core profiles one time step with the PDE solver."""
     dt = self.init_time_step_calculator(
         dynamic_runtime_params_slice_t,
         geo_t,
@@ -267,7 +401,21 @@ class SimulationStepFn:
           )
       )
 
-    output_state, post_processed_outputs = _finalize_outputs(
+    intermediate_state = dataclasses.replace(
+        intermediate_state,
+        time_step_controller=self._time_step_calculator.update_controller_state(
+            input_state.time_step_controller,
+            x_old=tuple(
+                input_state.core_profiles[name]
+                for name in self.solver.evolving_names
+            ),
+            x_new=x_new,
+            dt=intermediate_state.dt,
+            solver_numeric_outputs=intermediate_state.solver_numeric_outputs,
+        ),
+    )
+
+    return _finalize_outputs(
         x_new=x_new,
         static_runtime_params_slice=self.solver.static_runtime_params_slice,
         dynamic_runtime_params_slice_t_plus_dt=dynamic_runtime_params_slice_t_plus_dt,
@@ -277,12 +425,6 @@ class SimulationStepFn:
         input_post_processed_outputs=previous_post_processed_outputs,
     )
 
-    return (
-        output_state,
-        post_processed_outputs,
-        _check_for_errors(output_state, post_processed_outputs),
-    )
-
   def init_time_step_calculator(
       self,
       dynamic_runtime_params_slice_t: runtime_params_slice.DynamicRuntimeParamsSlice,
@@ -307,7 +449,9 @@ class SimulationStepFn:
     # Stepper / CoeffsCallback. We should still refactor the design to more
     # explicitly calculate transport coeffs at delta_t = 0 in only one place,
     # so that we have some flexibility in where to place the jit boundaries.
-    transport_coeffs = _calculate_transport_coeffs(
+    transport_coeffs = profiling.timed(
+        profiling.TRANSPORT_MODEL,
+        _calculate_transport_coeffs,
         self.pedestal_model,
         self.transport_model,
         dynamic_runtime_params_slice_t,
@@ -316,11 +460,14 @@ class SimulationStepFn:
     )
 
     # initialize new dt and reset solver iterations.
-    dt = self._time_step_calculator.next_dt(
+    dt = profiling.timed(
+        profiling.TIME_STEP_CALCULATOR,
+        self._time_step_calculator.next_dt,
         dynamic_runtime_params_slice_t,
         geo_t,
         input_state.core_profiles,
         transport_coeffs,
+        controller_state=input_state.time_step_controller,
     )
 
     crosses_t_final = (
@@ -337,7 +484,9 @@ class SimulationStepFn:
         dynamic_runtime_params_slice_t.numerics.t_final - input_state.t,
         dt,
     )
-    if jnp.any(jnp.isnan(dt)):
+    # A NaN dt inside a compiled loop propagates to a NaN state, which is
+    # reported as a SimError by the loop.
+    if not jax_utils.is_tracer(dt) and jnp.any(jnp.isnan(dt)):
       raise ValueError('dt is NaN.')
 
     return dt
@@ -398,7 +547,9 @@ class SimulationStepFn:
 
     # Initial trial for solver. If did not converge (can happen for nonlinear
     # step with large dt) we apply the adaptive time step routine if requested.
-    x_new, intermediate_state = self._solver(
+    x_new, intermediate_state = profiling.timed(
+        profiling.SOLVER,
+        self._solver,
         t=input_state.t,
         dt=dt,
         static_runtime_params_slice=static_runtime_params_slice,
@@ -411,6 +562,7 @@ class SimulationStepFn:
         core_sources_t=input_state.core_sources,
         core_transport_t=input_state.core_transport,
         explicit_source_profiles=explicit_source_profiles,
+        jacobian_cache_t=input_state.jacobian_cache,
     )
     intermediate_state = dataclasses.replace(
         intermediate_state,
@@ -481,12 +633,17 @@ class SimulationStepFn:
             sim_state.ToraxSimState,
             runtime_params_slice.DynamicRuntimeParamsSlice,
         ],
-    ) -> bool:
-      if updated_output[1].solver_numeric_outputs.solver_error_state == 1:
-        do_dt_backtrack = True
-      else:
-        do_dt_backtrack = False
-      return do_dt_backtrack
+    ) -> bool | jax.Array:
+      _, old_state, old_slice = updated_output
+      do_dt_backtrack = old_state.solver_numeric_outputs.solver_error_state == 1
+      if jax_utils.is_tracer(updated_output):
+        # Errors cannot be raised from within a compiled loop, so instead stop
+        # backtracking once the next dt would be below min_dt. The unconverged
+        # solver_error_state is then reported as SimError.REACHED_MIN_DT.
+        numerics = old_slice.numerics
+        next_dt = old_state.dt / numerics.dt_reduction_factor
+        return jnp.logical_and(do_dt_backtrack, next_dt >= numerics.min_dt)
+      return bool(do_dt_backtrack)
 
     # Make a new step with a smaller dt, starting with the original core
     # profiles.
@@ -506,10 +663,11 @@ class SimulationStepFn:
       numerics = old_slice.numerics
 
       dt = old_state.dt / numerics.dt_reduction_factor
-      if jnp.any(jnp.isnan(dt)):
-        raise ValueError('dt is NaN.')
-      if dt < numerics.min_dt:
-        raise ValueError('dt below minimum timestep following adaptation')
+      if not jax_utils.is_tracer(dt):
+        if jnp.any(jnp.isnan(dt)):
+          raise ValueError('dt is NaN.')
+        if dt < numerics.min_dt:
+          raise ValueError('dt below minimum timestep following adaptation')
 
       # Calculate dynamic_runtime_params and geo at t + dt.
       # Update geos with phibdot.
@@ -536,7 +694,9 @@ class SimulationStepFn:
       )
       # The solver returned state is still "intermediate" since the CoreProfiles
       # need to be updated by the evolved CellVariables in x_new
-      x_new, intermediate_state = self._solver(
+      x_new, intermediate_state = profiling.timed(
+          profiling.SOLVER,
+          self._solver,
           t=input_state.t,
           dt=dt,
           static_runtime_params_slice=static_runtime_params_slice,
@@ -549,6 +709,7 @@ class SimulationStepFn:
           core_sources_t=input_state.core_sources,
           core_transport_t=input_state.core_transport,
           explicit_source_profiles=explicit_source_profiles,
+          jacobian_cache_t=input_state.jacobian_cache,
       )
       intermediate_state = dataclasses.replace(
           intermediate_state,
@@ -558,6 +719,8 @@ class SimulationStepFn:
               + 1,
               inner_solver_iterations=old_state.solver_numeric_outputs.inner_solver_iterations
               + intermediate_state.solver_numeric_outputs.inner_solver_iterations,
+              transport_evaluations_saved=old_state.solver_numeric_outputs.transport_evaluations_saved
+              + intermediate_state.solver_numeric_outputs.transport_evaluations_saved,
           ),
       )
 
@@ -654,6 +817,12 @@ def _sawtooth_step(
       core_sources_t=input_state.core_sources,
       core_transport_t=input_state.core_transport,
       explicit_source_profiles=explicit_source_profiles,
+      jacobian_cache_t=input_state.jacobian_cache,
+  )
+  # The time step controller only accounts for the PDE time steps.
+  intermediate_state_candidate = dataclasses.replace(
+      intermediate_state_candidate,
+      time_step_controller=input_state.time_step_controller,
   )
 
   def _make_post_crash_state_and_post_processed_outputs():
@@ -728,12 +897,12 @@ def _get_geo_and_dynamic_runtime_params_at_t_plus_dt_and_phibdot(
       - The geometry of the torus during this time step of the simulation.
       - The geometry of the torus during the next time step of the simulation.
   """
-  dynamic_runtime_params_slice_t_plus_dt, geo_t_plus_dt = (
-      build_runtime_params.get_consistent_dynamic_runtime_params_slice_and_geometry(
-          t=t + dt,
-          dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
-          geometry_provider=geometry_provider,
-      )
+  dynamic_runtime_params_slice_t_plus_dt, geo_t_plus_dt = profiling.timed(
+      profiling.RUNTIME_PARAMS,
+      build_runtime_params.get_consistent_dynamic_runtime_params_slice_and_geometry,
+      t=t + dt,
+      dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+      geometry_provider=geometry_provider,
   )
   if dynamic_runtime_params_slice_t_plus_dt.numerics.calcphibdot:
     geo_t, geo_t_plus_dt = geometry.update_geometries_with_Phibdot(
@@ -749,6 +918,29 @@ def _get_geo_and_dynamic_runtime_params_at_t_plus_dt_and_phibdot(
   )
 
 
+def _cast_like(tree: T, reference: T) -> T:
+  """Casts the leaves of `tree` to the shapes and dtypes of `reference`.
+
+  Used to make the outputs of the different branches of a `jax.lax.cond` or
+  the body of a `jax.lax.while_loop` type-compatible, as the solvers may return
+  Python scalars or weakly typed arrays in numeric outputs.
+
+  Args:
+    tree: Pytree to cast.
+    reference: Pytree with the same structure as `tree`.
+
+  Returns:
+    `tree` with each leaf cast to the dtype of the matching `reference` leaf.
+  """
+  return jax.tree.map(
+      lambda x, ref: jnp.asarray(x, dtype=jnp.result_type(ref)).reshape(
+          jnp.shape(ref)
+      ),
+      tree,
+      reference,
+  )
+
+
 def _finalize_outputs(
     x_new: tuple[cell_variable.CellVariable, ...],
     static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
@@ -774,7 +966,9 @@ def _finalize_outputs(
       intermediate_state,
       core_profiles=final_core_profiles,
   )
-  post_processed_outputs = post_processing.make_post_processed_outputs(
+  post_processed_outputs = profiling.timed(
+      profiling.POST_PROCESSING,
+      post_processing.make_post_processed_outputs,
       sim_state=output_state,
       dynamic_runtime_params_slice=dynamic_runtime_params_slice_t_plus_dt,
       previous_post_processed_outputs=input_post_processed_outputs,
@@ -0,0 +1,70 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+from unittest import mock
+
+from absl.testing import absltest
+import jax
+from torax.orchestration import compilation_cache
+
+
+class CompilationCacheTest(absltest.TestCase):
+
+  def test_track_cache_usage(self):
+    with compilation_cache.track_cache_usage() as outer_stats:
+      jax.monitoring.record_event(
+          '/jax/compilation_cache/compile_requests_use_cache'
+      )
+      with compilation_cache.track_cache_usage() as inner_stats:
+        for _ in range(2):
+          jax.monitoring.record_event(
+              '/jax/compilation_cache/compile_requests_use_cache'
+          )
+          jax.monitoring.record_event('/jax/compilation_cache/cache_hits')
+    jax.monitoring.record_event(
+        '/jax/compilation_cache/compile_requests_use_cache'
+    )
+
+    self.assertEqual(inner_stats.compile_requests, 2)
+    self.assertEqual(inner_stats.cache_hits, 2)
+    self.assertEqual(inner_stats.cache_misses, 0)
+    self.assertEqual(outer_stats.compile_requests, 3)
+    self.assertEqual(outer_stats.cache_hits, 2)
+    self.assertEqual(outer_stats.cache_misses, 1)
+
+  def test_initialize_cache_from_env(self):
+    cache_dir = self.create_tempdir().full_path
+    for name, value in (
+        ('jax_compilation_cache_dir', None),
+        ('jax_persistent_cache_min_compile_time_secs', 1.0),
+        ('jax_persistent_cache_min_entry_size_bytes', 0),
+    ):
+      self.addCleanup(jax.config.update, name, getattr(jax.config, name))
+      jax.config.update(name, value)
+
+    with mock.patch.dict(os.environ, {compilation_cache.CACHE_DIR_ENV: ''}):
+      self.assertIsNone(compilation_cache.initialize_cache())
+      self.assertFalse(compilation_cache.is_cache_enabled())
+    with mock.patch.dict(
+        os.environ, {compilation_cache.CACHE_DIR_ENV: cache_dir}
+    ):
+      self.assertEqual(compilation_cache.initialize_cache(), cache_dir)
+
+    self.assertTrue(compilation_cache.is_cache_enabled())
+    self.assertEqual(jax.config.jax_compilation_cache_dir, cache_dir)
+    self.assertEqual(jax.config.jax_persistent_cache_min_compile_time_secs, 0)
+
+
+if __name__ == '__main__':
+  absltest.main()
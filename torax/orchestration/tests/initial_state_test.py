@@ -149,7 +149,14 @@ def _get_step_fn(torax_config):
   solver.source_models = source_models_lib.SourceModels(
       torax_config.sources, torax_config.neoclassical
   )
-  return mock.create_autospec(step_function.SimulationStepFn, solver=solver)
+  solver.initial_jacobian_cache.return_value = None
+  time_step_calculator = mock.MagicMock()
+  time_step_calculator.initial_controller_state.return_value = None
+  return mock.create_autospec(
+      step_function.SimulationStepFn,
+      solver=solver,
+      time_step_calculator=time_step_calculator,
+  )
 
 
 def _get_geo_and_runtime_params_providers(torax_config):
@@ -0,0 +1,117 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+from absl.testing import absltest
+import numpy as np
+from torax.config import config_loader
+from torax.orchestration import parameter_scan
+from torax.orchestration import run_simulation
+from torax.output_tools import output
+from torax.tests.test_lib import paths
+from torax.torax_pydantic import model_config
+
+
+class ParameterScanTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.config_path = os.path.join(paths.test_data_dir(), 'test_implicit.py')
+    self.base_config = config_loader.import_module(self.config_path)['CONFIG']
+
+  def test_run_parameter_scan_matches_run_simulation(self):
+    parameter_grid = {
+        'numerics.evolve_density': [False, True],
+        'sources.generic_heat.P_total': [60e6, 120e6],
+    }
+
+    data_tree = parameter_scan.run_parameter_scan(
+        self.config_path,
+        parameter_grid,
+        num_processes=2,
+        cache_dir=self.create_tempdir().full_path,
+    )
+
+    profiles = data_tree[output.PROFILES]
+    self.assertEqual(profiles.sizes[parameter_scan.SCAN], 4)
+    np.testing.assert_array_equal(
+        profiles['numerics.evolve_density'].values,
+        [False, False, True, True],
+    )
+    np.testing.assert_array_equal(
+        profiles['sources.generic_heat.P_total'].values,
+        [60e6, 120e6, 60e6, 120e6],
+    )
+    np.testing.assert_array_equal(
+        data_tree[output.NUMERICS][output.SIM_ERROR].values, 0
+    )
+    torax_config = model_config.ToraxConfig.from_dict(
+        parameter_scan._apply_overrides(  # pylint: disable=protected-access
+            self.base_config,
+            {
+                'numerics.evolve_density': True,
+                'sources.generic_heat.P_total': 60e6,
+            },
+        )
+    )
+    self.assertEqual(
+        data_tree[output.CONFIG].values[2], torax_config.model_dump_json()
+    )
+    history = run_simulation.run_simulation(torax_config, progress_bar=False)
+    for name in (output.T_E, output.N_E):
+      np.testing.assert_allclose(
+          profiles[name].isel(scan=2).sel(time=history.times).values,
+          history.simulation_output_to_xr()[output.PROFILES][name].values,
+          rtol=1e-6,
+          err_msg=name,
+      )
+
+  def test_compilation_key_groups_static_configurations(self):
+    keys = []
+    for evolve_density in (False, True):
+      for P_total in (60e6, 120e6):
+        config = parameter_scan._apply_overrides(  # pylint: disable=protected-access
+            self.base_config,
+            {
+                'numerics.evolve_density': evolve_density,
+                'sources.generic_heat.P_total': P_total,
+            },
+        )
+        keys.append(
+            parameter_scan._compilation_key(  # pylint: disable=protected-access
+                model_config.ToraxConfig.from_dict(config)
+            )
+        )
+
+    self.assertEqual(keys[0], keys[1])
+    self.assertEqual(keys[2], keys[3])
+    self.assertNotEqual(keys[0], keys[2])
+
+  def test_apply_overrides_does_not_modify_base_config(self):
+    config = parameter_scan._apply_overrides(  # pylint: disable=protected-access
+        self.base_config,
+        {'numerics.t_final': 2.0, 'transport.chi_min': 0.1},
+    )
+
+    self.assertEqual(config['numerics']['t_final'], 2.0)
+    self.assertEqual(config['transport']['chi_min'], 0.1)
+    self.assertNotEqual(self.base_config['numerics'].get('t_final'), 2.0)
+    with self.assertRaisesRegex(ValueError, 'not a dict'):
+      parameter_scan._apply_overrides(  # pylint: disable=protected-access
+          self.base_config, {'numerics.t_final.value': 2.0}
+      )
+
+
+if __name__ == '__main__':
+  absltest.main()
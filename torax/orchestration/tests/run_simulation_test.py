@@ -17,8 +17,10 @@ import os
 from absl.testing import absltest
 from absl.testing import parameterized
 import numpy as np
+from torax.orchestration import checkpointing
 from torax.orchestration import run_simulation
 from torax.output_tools import output
+from torax.output_tools import streaming_output
 from torax.tests.test_lib import sim_test_case
 import xarray as xr
 
@@ -80,6 +82,268 @@ class RunSimulationTest(sim_test_case.SimTestCase):
 
     xr.map_over_datasets(check_equality, datatree_ref, datatree_new)
 
+  def test_write_stitched_state_file_matches_stitch_state_files(self):
+    torax_config = self._get_torax_config(
+        'test_iterhybrid_rampup_restart.py'
+    )
+    data_tree = run_simulation.run_simulation(
+        torax_config
+    ).simulation_output_to_xr()
+    path = os.path.join(self.create_tempdir().full_path, 'state.nc')
+
+    streaming_output.write_stitched_state_file(
+        torax_config.restart, data_tree, path, chunk_size=4
+    )
+
+    expected_data_tree = output.stitch_state_files(
+        torax_config.restart, data_tree
+    )
+    stitched_data_tree = output.load_state_file(path)
+    np.testing.assert_allclose(
+        stitched_data_tree[output.TIME].values,
+        expected_data_tree[output.TIME].values,
+    )
+    self.assertEqual(
+        stitched_data_tree.numerics[output.SIM_ERROR].values,
+        expected_data_tree.numerics[output.SIM_ERROR].values,
+    )
+    previous_data_tree = output.load_state_file(torax_config.restart.filename)
+    for group in (output.PROFILES, output.SCALARS, output.NUMERICS):
+      dataset = expected_data_tree[group].to_dataset(inherit=False)
+      for name, data_array in dataset.data_vars.items():
+        expected = data_array.values
+        if name not in previous_data_tree[group]:
+          # Variables missing from the previous file are filled with zeros
+          # instead of NaNs.
+          expected = np.nan_to_num(expected, nan=0.0)
+        with self.subTest(group=group, name=name):
+          np.testing.assert_allclose(
+              stitched_data_tree[group][name].values, expected
+          )
+
+  @parameterized.named_parameters(
+      ('linear', 'test_implicit.py'),
+      ('newton_raphson_adaptive_dt', 'test_iterhybrid_rampup_short.py'),
+  )
+  def test_compiled_loop_matches_python_loop(self, config_name: str):
+    torax_config = self._get_torax_config(config_name)
+    history = run_simulation.run_simulation(torax_config)
+
+    torax_config.update_fields({'numerics.compiled_loop': True})
+    compiled_history = run_simulation.run_simulation(torax_config)
+
+    self.assertEqual(compiled_history.sim_error, history.sim_error)
+    np.testing.assert_allclose(compiled_history.times, history.times)
+    profiles = history.simulation_output_to_xr().profiles
+    compiled_profiles = compiled_history.simulation_output_to_xr().profiles
+    for profile in (
+        output.T_I,
+        output.T_E,
+        output.PSI,
+        output.Q,
+        output.N_E,
+    ):
+      with self.subTest(profile=profile):
+        np.testing.assert_allclose(
+            compiled_profiles[profile].values,
+            profiles[profile].values,
+            rtol=1e-6,
+            atol=1e-10,
+        )
+
+  def test_run_simulation_batch_matches_run_simulation(self):
+    torax_configs = []
+    for multiplier in (1.0, 1.5):
+      torax_config = self._get_torax_config('test_implicit.py')
+      torax_config.update_fields({
+          'sources.generic_heat.P_total': 120e6 * multiplier,
+          'profile_conditions.nbar': 0.85 * multiplier,
+      })
+      torax_configs.append(torax_config)
+
+    batch_histories = run_simulation.run_simulation_batch(torax_configs)
+
+    self.assertLen(batch_histories, len(torax_configs))
+    for torax_config, batch_history in zip(torax_configs, batch_histories):
+      history = run_simulation.run_simulation(torax_config)
+      self.assertEqual(batch_history.sim_error, history.sim_error)
+      np.testing.assert_allclose(batch_history.times, history.times)
+      np.testing.assert_allclose(
+          batch_history.core_profiles.T_i.value,
+          history.core_profiles.T_i.value,
+          rtol=1e-6,
+      )
+      np.testing.assert_allclose(
+          batch_history.core_profiles.n_e.value,
+          history.core_profiles.n_e.value,
+          rtol=1e-6,
+      )
+
+  def test_run_simulation_streaming_matches_run_simulation(self):
+    torax_config = self._get_torax_config('test_implicit.py')
+    history = run_simulation.run_simulation(torax_config)
+    data_tree = history.simulation_output_to_xr()
+    output_file = os.path.join(self.create_tempdir().full_path, 'state.nc')
+
+    sim_error = run_simulation.run_simulation_streaming(
+        torax_config, output_file, chunk_size=3
+    )
+
+    self.assertEqual(sim_error, history.sim_error)
+    streamed_data_tree = output.load_state_file(output_file)
+    np.testing.assert_allclose(
+        streamed_data_tree[output.TIME].values, data_tree[output.TIME].values
+    )
+    self.assertEqual(
+        streamed_data_tree.numerics[output.SIM_ERROR].values,
+        history.sim_error.value,
+    )
+    for group in (output.PROFILES, output.SCALARS):
+      dataset = data_tree[group].to_dataset(inherit=False)
+      streamed_dataset = streamed_data_tree[group].to_dataset(inherit=False)
+      self.assertSameElements(
+          streamed_dataset.data_vars, dataset.data_vars
+      )
+      for name, data_array in dataset.data_vars.items():
+        with self.subTest(group=group, name=name):
+          np.testing.assert_allclose(
+              streamed_dataset[name].values, data_array.values
+          )
+
+  def test_resume_from_checkpoint_matches_run_simulation(self):
+    torax_config = self._get_torax_config('test_iterhybrid_rampup.py')
+    checkpoint_file = os.path.join(
+        self.create_tempdir().full_path, 'checkpoint.npz'
+    )
+    torax_config.update_fields({
+        'numerics.t_final': 5.0,
+        'solver.jacobian_reuse': True,
+        'time_step_calculator.calculator_type': 'pi',
+        'output.checkpoint_file': checkpoint_file,
+        'output.checkpoint_every_n_steps': 4,
+    })
+    history = run_simulation.run_simulation(torax_config, progress_bar=False)
+    checkpoint = checkpointing.load_checkpoint(checkpoint_file)
+    self.assertIsNotNone(checkpoint.sim_state.jacobian_cache)
+    self.assertIsNotNone(checkpoint.sim_state.time_step_controller)
+    num_steps = checkpoint.num_steps
+    self.assertBetween(num_steps, 1, len(history.times) - 2)
+
+    resumed_history = run_simulation.resume_from_checkpoint(
+        torax_config, checkpoint_file, progress_bar=False
+    )
+
+    # The resumed simulation continues exactly as the original one.
+    np.testing.assert_array_equal(
+        resumed_history.times, history.times[num_steps:]
+    )
+    for name in ('T_i', 'T_e', 'psi', 'n_e'):
+      np.testing.assert_array_equal(
+          getattr(resumed_history.core_profiles, name).value,
+          getattr(history.core_profiles, name).value[num_steps:],
+          err_msg=name,
+      )
+    for name in ('E_fusion', 'E_aux', 'Q_fusion'):
+      np.testing.assert_array_equal(
+          getattr(resumed_history.post_processed_outputs, name),
+          getattr(history.post_processed_outputs, name)[num_steps:],
+          err_msg=name,
+      )
+    np.testing.assert_array_equal(
+        resumed_history.solver_numeric_outputs.inner_solver_iterations,
+        history.solver_numeric_outputs.inner_solver_iterations[num_steps:],
+    )
+
+    torax_config.update_fields({'numerics.evolve_density': False})
+    with self.assertRaisesRegex(ValueError, 'different static runtime params'):
+      run_simulation.resume_from_checkpoint(torax_config, checkpoint_file)
+
+  @parameterized.named_parameters(
+      ('python_loop', False),
+      ('compiled_loop', True),
+  )
+  def test_output_selection_matches_full_history(self, compiled_loop: bool):
+    torax_config = self._get_torax_config('test_implicit.py')
+    data_tree = run_simulation.run_simulation(
+        torax_config
+    ).simulation_output_to_xr()
+
+    torax_config.update_fields({
+        'numerics.compiled_loop': compiled_loop,
+        'output.save_every_n_steps': 4,
+        'output.variable_groups': ('core_transport', 'geometry'),
+    })
+    history = run_simulation.run_simulation(torax_config)
+    selected_data_tree = history.simulation_output_to_xr()
+
+    # Every 4th step, plus the final state.
+    times = data_tree[output.TIME].values
+    expected_times = np.unique(np.append(times[::4], times[-1]))
+    np.testing.assert_allclose(history.times, expected_times)
+    self.assertIsNone(history.core_sources)
+    self.assertIsNone(history.post_processed_outputs)
+    self.assertNotIn(output.J_BOOTSTRAP, selected_data_tree.profiles)
+    self.assertNotIn(output.Q_FUSION, selected_data_tree.scalars)
+    data_tree = data_tree.sel(time=history.times)
+    for group in (output.PROFILES, output.SCALARS):
+      selected_dataset = selected_data_tree[group].to_dataset(inherit=False)
+      for name, data_array in selected_dataset.data_vars.items():
+        with self.subTest(group=group, name=name):
+          np.testing.assert_allclose(
+              data_array.values,
+              data_tree[group][name].values,
+              rtol=1e-6,
+              atol=1e-10,
+          )
+
+  @parameterized.named_parameters(
+      ('python_loop', False),
+      ('compiled_loop', True),
+  )
+  def test_record_performance(self, compiled_loop: bool):
+    torax_config = self._get_torax_config('test_implicit.py')
+    torax_config.update_fields({
+        'numerics.compiled_loop': compiled_loop,
+        'output.record_performance': True,
+    })
+    history = run_simulation.run_simulation(torax_config)
+    data_tree = history.simulation_output_to_xr()
+    performance = data_tree[output.PERFORMANCE].to_dataset(inherit=False)
+
+    num_steps = len(history.times) - 1
+    self.assertEqual(performance['num_steps'].item(), num_steps)
+    self.assertEqual(
+        performance['newton_iterations'].item(),
+        np.sum(history.solver_numeric_outputs.inner_solver_iterations[1:]),
+    )
+    stage_calls = performance[output.STAGE_CALLS].to_series()
+    stage_time = performance[output.STAGE_TIME].to_series()
+    if compiled_loop:
+      self.assertEqual(stage_calls['compiled_loop'], 1)
+    else:
+      self.assertEqual(stage_calls['solver'], num_steps)
+      self.assertEqual(stage_calls['post_processing'], num_steps)
+      self.assertGreater(stage_time['solver'], 0.0)
+    self.assertLessEqual(
+        stage_time.max(), performance[output.WALL_CLOCK_TIME].item()
+    )
+
+    # Not recorded by default.
+    torax_config.update_fields({'output.record_performance': False})
+    data_tree = run_simulation.run_simulation(
+        torax_config
+    ).simulation_output_to_xr()
+    self.assertNotIn(output.PERFORMANCE, data_tree.children)
+
+  def test_run_simulation_batch_rejects_different_static_params(self):
+    torax_configs = [
+        self._get_torax_config('test_implicit.py'),
+        self._get_torax_config('test_crank_nicolson.py'),
+    ]
+
+    with self.assertRaisesRegex(ValueError, 'same static runtime params'):
+      run_simulation.run_simulation_batch(torax_configs)
+
   @parameterized.named_parameters(
       ('static_geometry_QLKNN', 'test_iterhybrid_rampup.py'),
   )
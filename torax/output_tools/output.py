@@ -23,10 +23,13 @@ import chex
 import jax
 import numpy as np
 from torax import constants
+from torax import profiling
 from torax import state
 from torax.geometry import geometry as geometry_lib
+from torax.orchestration import compilation_cache
 from torax.orchestration import sim_state
 from torax.output_tools import post_processing
+from torax.output_tools import pydantic_model as output_pydantic_model
 from torax.sources import qei_source as qei_source_lib
 from torax.sources import source_profiles
 from torax.torax_pydantic import file_restart as file_restart_pydantic_model
@@ -40,6 +43,7 @@ import os
 PROFILES = "profiles"
 SCALARS = "scalars"
 NUMERICS = "numerics"
+PERFORMANCE = "performance"
 
 # Core profiles.
 T_E = "T_e"
@@ -82,6 +86,7 @@ RHO_NORM = "rho_norm"
 RHO_FACE = "rho_face"
 RHO_CELL = "rho_cell"
 TIME = "time"
+STAGE = "stage"
 
 # Post processed outputs
 Q_FUSION = "Q_fusion"
@@ -91,9 +96,24 @@ Q_FUSION = "Q_fusion"
 SIM_ERROR = "sim_error"
 OUTER_SOLVER_ITERATIONS = "outer_solver_iterations"
 INNER_SOLVER_ITERATIONS = "inner_solver_iterations"
+TRANSPORT_EVALUATIONS_SAVED = "transport_evaluations_saved"
 # Boolean array indicating whether the state corresponds to a
 # post-sawtooth-crash state.
 SAWTOOTH_CRASH = "sawtooth_crash"
+# Persistent compilation cache usage of the run. Only saved if the persistent
+# compilation cache is enabled.
+COMPILATION_CACHE_HITS = "compilation_cache_hits"
+COMPILATION_CACHE_MISSES = "compilation_cache_misses"
+
+# Performance. Only saved if `output.record_performance` is True.
+# Wall clock time of each stage of the time steps called from Python [s].
+STAGE_TIME = "stage_time"
+# Number of timed calls of each stage.
+STAGE_CALLS = "stage_calls"
+# Number of compilations of the jitted functions of each stage.
+STAGE_COMPILES = "stage_compiles"
+# Wall clock time of the simulation [s].
+WALL_CLOCK_TIME = "wall_clock_time"
 
 # ToraxConfig.
 CONFIG = "config"
@@ -131,6 +151,31 @@ def load_state_file(
     raise ValueError(f"File {filepath} does not exist.")
 
 
+def load_state_file_time_slice(
+    filepath: str,
+    time: float,
+) -> xr.DataTree:
+  """Loads the time slice closest to `time` from a state file.
+
+  The file is opened lazily, so only the time coordinate and the selected time
+  slice of each variable are read, independently of the length of the file.
+
+  Args:
+    filepath: Path of the state file.
+    time: The time to load. The closest time in the file is selected.
+
+  Returns:
+    A xr.DataTree with the selected time slice, without a time dimension.
+  """
+  if not os.path.exists(filepath):
+    raise ValueError(f"File {filepath} does not exist.")
+  logging.info("Loading time %f from state file %s", time, filepath)
+  with open(filepath, "rb") as f:
+    with xr.open_datatree(f) as dt_open:
+      data_tree = dt_open.sel(time=time, method="nearest").compute()
+  return data_tree
+
+
 def concat_datatrees(
     tree1: xr.DataTree,
     tree2: xr.DataTree,
@@ -186,17 +231,33 @@ def stitch_state_files(
   Returns:
     A xr.DataTree containing the stitched dataset.
   """
-  previous_datatree = load_state_file(file_restart.filename)
-  # Reduce previous_ds to all times before the first time step in this
-  # sim output. We use ds.time[0] instead of file_restart.time because
-  # we are uncertain if file_restart.time is the exact time of the
-  # first time step in this sim output (it takes the nearest time).
-  previous_datatree = previous_datatree.sel(time=slice(None, datatree.time[0]))
+  if not os.path.exists(file_restart.filename):
+    raise ValueError(f"File {file_restart.filename} does not exist.")
+  # The previous file is opened lazily, so that only the time slices which are
+  # kept are read.
+  with open(file_restart.filename, "rb") as f:
+    with xr.open_datatree(f) as previous_datatree:
+      # The performance of the previous run has no time dimension to stitch.
+      if PERFORMANCE in previous_datatree.children:
+        previous_datatree = previous_datatree.drop_nodes(PERFORMANCE)
+      # Reduce previous_ds to all times before the first time step in this
+      # sim output. We use ds.time[0] instead of file_restart.time because
+      # we are uncertain if file_restart.time is the exact time of the
+      # first time step in this sim output (it takes the nearest time).
+      previous_datatree = previous_datatree.sel(
+          time=slice(None, datatree.time[0])
+      ).compute()
   return concat_datatrees(previous_datatree, datatree)
 
 
 class StateHistory:
-  """A history of the state of the simulation and its error state."""
+  """A history of the state of the simulation and its error state.
+
+  The variable groups which are not selected by `torax_config.output` are set
+  to None and are not saved. States without a geometry have the geometry of
+  the initial state. If the geometry is time-invariant, it is broadcast over
+  time without copies.
+  """
 
   def __init__(
       self,
@@ -206,17 +267,20 @@ class StateHistory:
       ],
       sim_error: state.SimError,
       torax_config: model_config.ToraxConfig,
+      compilation_cache_stats: (
+          compilation_cache.CompilationCacheStats | None
+      ) = None,
+      performance_stats: profiling.PerformanceStats | None = None,
   ):
     self.sim_error = sim_error
     self.torax_config = torax_config
+    self.compilation_cache_stats = compilation_cache_stats
+    self.performance_stats = performance_stats
     solver_numeric_outputs = [
         state.solver_numeric_outputs for state in state_history
     ]
+    variable_groups = torax_config.output.variable_groups
     core_profiles = [state.core_profiles for state in state_history]
-    core_sources = [state.core_sources for state in state_history]
-    transport = [state.core_transport for state in state_history]
-    geometries = [state.geometry for state in state_history]
-    self.geometry = geometry_lib.stack_geometries(geometries)
     stack = lambda *ys: np.stack(ys)
     core_profiles: state.CoreProfiles = jax.tree_util.tree_map(
         stack, *core_profiles
@@ -225,15 +289,33 @@ class StateHistory:
     # This is done to maintain the same external API following an upcoming
     # change to the internal CoreProfiles density units.
     self.core_profiles = _rescale_core_profiles(core_profiles)
-    self.core_sources: source_profiles.SourceProfiles = jax.tree_util.tree_map(
-        stack, *core_sources
-    )
-    self.core_transport: state.CoreTransport = jax.tree_util.tree_map(
-        stack, *transport
-    )
-    self.post_processed_outputs: post_processing.PostProcessedOutputs = (
-        jax.tree_util.tree_map(stack, *post_processed_outputs_history)
-    )
+    self.core_sources: source_profiles.SourceProfiles | None = None
+    if output_pydantic_model.CORE_SOURCES in variable_groups:
+      self.core_sources = jax.tree_util.tree_map(
+          stack, *[state.core_sources for state in state_history]
+      )
+    self.core_transport: state.CoreTransport | None = None
+    if output_pydantic_model.CORE_TRANSPORT in variable_groups:
+      self.core_transport = jax.tree_util.tree_map(
+          stack, *[state.core_transport for state in state_history]
+      )
+    self.post_processed_outputs: (
+        post_processing.PostProcessedOutputs | None
+    ) = None
+    if output_pydantic_model.POST_PROCESSED_OUTPUTS in variable_groups:
+      self.post_processed_outputs = jax.tree_util.tree_map(
+          stack, *post_processed_outputs_history
+      )
+    self.geometry: geometry_lib.Geometry | None = None
+    if output_pydantic_model.GEOMETRY in variable_groups:
+      # Entries without a geometry have the geometry of the initial state.
+      geometries = [state.geometry for state in state_history]
+      if all(geo is None for geo in geometries[1:]):
+        self.geometry = _broadcast_geometry(geometries[0], len(geometries))
+      else:
+        self.geometry = geometry_lib.stack_geometries(
+            [geometries[0] if geo is None else geo for geo in geometries]
+        )
     self.solver_numeric_outputs: state.SolverNumericOutputs = (
         jax.tree_util.tree_map(stack, *solver_numeric_outputs)
     )
@@ -339,6 +421,8 @@ class StateHistory:
   ) -> dict[str, xr.DataArray | None]:
     """Saves the core transport to a dict."""
     xr_dict = {}
+    if self.core_transport is None:
+      return xr_dict
 
     xr_dict[CHI_TURB_I] = self.core_transport.chi_face_ion
     xr_dict[CHI_TURB_E] = self.core_transport.chi_face_el
@@ -373,6 +457,8 @@ class StateHistory:
   ) -> dict[str, xr.DataArray | None]:
     """Saves the core sources to a dict."""
     xr_dict = {}
+    if self.core_sources is None:
+      return xr_dict
 
     xr_dict[qei_source_lib.QeiSource.SOURCE_NAME] = (
         self.core_sources.qei.qei_coef
@@ -412,6 +498,8 @@ class StateHistory:
   ) -> dict[str, xr.DataArray | None]:
     """Saves the post processed outputs to a dict."""
     xr_dict = {}
+    if self.post_processed_outputs is None:
+      return xr_dict
     for field_name, data in dataclasses.asdict(
         self.post_processed_outputs
     ).items():
@@ -423,7 +511,13 @@ class StateHistory:
   ) -> dict[str, xr.DataArray]:
     """Save geometry to a dict. We skip over hires and non-array quantities."""
     xr_dict = {}
-    geometry_attributes = dataclasses.asdict(self.geometry)
+    if self.geometry is None:
+      return xr_dict
+    # Avoid `dataclasses.asdict`, which would copy a broadcast geometry.
+    geometry_attributes = {
+        field.name: getattr(self.geometry, field.name)
+        for field in dataclasses.fields(self.geometry)
+    }
 
     # Get the variables from dataclass fields.
     for field_name, data in geometry_attributes.items():
@@ -433,7 +527,7 @@ class StateHistory:
           or field_name == "geometry_type"
           or field_name == "Ip_from_parameters"
           or field_name == "j_total"
-          or not isinstance(data, jax.Array)
+          or not isinstance(data, (jax.Array, np.ndarray))
       ):
         continue
       if f"{field_name}_face" in geometry_attributes:
@@ -463,6 +557,38 @@ class StateHistory:
 
     return xr_dict
 
+  def _save_performance(self) -> xr.Dataset:
+    """Saves the performance stats to a dataset."""
+    stats = self.performance_stats
+    assert stats is not None
+    stages = list(stats.stages)
+    data_vars = {
+        STAGE_TIME: (
+            [STAGE],
+            np.array([stats.stage_times.get(s, 0.0) for s in stages]),
+            {"units": "s"},
+        ),
+        STAGE_CALLS: (
+            [STAGE],
+            np.array([stats.stage_calls.get(s, 0) for s in stages]),
+        ),
+        STAGE_COMPILES: (
+            [STAGE],
+            np.array([stats.stage_compiles.get(s, 0) for s in stages]),
+        ),
+        WALL_CLOCK_TIME: ((), stats.wall_clock_time, {"units": "s"}),
+    }
+    for name in (
+        profiling.NUM_STEPS,
+        profiling.NEWTON_ITERATIONS,
+        profiling.DT_RETRIES,
+        profiling.TRANSPORT_EVALUATIONS_SAVED,
+    ):
+      data_vars[name] = ((), stats.counters.get(name, 0))
+    return xr.Dataset(
+        data_vars=data_vars, coords={STAGE: np.array(stages, dtype=str)}
+    )
+
   def simulation_output_to_xr(
       self,
       file_restart: file_restart_pydantic_model.FileRestart | None = None,
@@ -488,6 +614,10 @@ class StateHistory:
             the simulation.
         - profiles: Contains data variables for 1D profiles.
         - scalars: Contains data variables for scalars.
+        - performance: Only if `output.record_performance` is True. Contains
+            the wall clock time, calls and compilations of each stage of the
+            time steps along a `stage` dimension, and counters of the
+            simulation.
     """
     # Cleanup structure by excluding QeiInfo from core_sources altogether.
     # Add attribute to dataset variables with explanation of contents + units.
@@ -542,7 +672,19 @@ class StateHistory:
             dims=[TIME],
             name=INNER_SOLVER_ITERATIONS,
         ),
+        TRANSPORT_EVALUATIONS_SAVED: xr.DataArray(
+            self.solver_numeric_outputs.transport_evaluations_saved,
+            dims=[TIME],
+            name=TRANSPORT_EVALUATIONS_SAVED,
+        ),
     }
+    if self.compilation_cache_stats is not None:
+      numerics_dict[COMPILATION_CACHE_HITS] = (
+          self.compilation_cache_stats.cache_hits
+      )
+      numerics_dict[COMPILATION_CACHE_MISSES] = (
+          self.compilation_cache_stats.cache_misses
+      )
     numerics = xr.Dataset(numerics_dict)
     profiles_dict = {
         k: v
@@ -572,9 +714,27 @@ class StateHistory:
     if file_restart is not None and file_restart.stitch:
       data_tree = stitch_state_files(file_restart, data_tree)
 
+    # The performance of this run is not stitched to a previous run.
+    if self.performance_stats is not None:
+      data_tree[PERFORMANCE] = xr.DataTree(dataset=self._save_performance())
+
     return data_tree
 
 
+def _broadcast_geometry(
+    geo: geometry_lib.Geometry, num_times: int
+) -> geometry_lib.Geometry:
+  """Broadcasts a geometry over time, like `stack_geometries` without copies."""
+  broadcast_data = {}
+  for field in dataclasses.fields(geo):
+    value = getattr(geo, field.name)
+    if isinstance(value, chex.Array):
+      value = np.asarray(value)
+      value = np.broadcast_to(value, (num_times,) + value.shape)
+    broadcast_data[field.name] = value
+  return geo.__class__(**broadcast_data)
+
+
 def _rescale_core_profiles(
     core_profiles: state.CoreProfiles,
 ) -> state.CoreProfiles:
@@ -0,0 +1,115 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pydantic config for selecting the recorded simulation outputs."""
+
+from typing import Literal
+
+import numpy as np
+import pydantic
+from torax.torax_pydantic import torax_pydantic
+from typing_extensions import Self
+
+
+# Variable groups which can be left out of the output. The core profiles and
+# numerics are always recorded.
+CORE_TRANSPORT = 'core_transport'
+CORE_SOURCES = 'core_sources'
+POST_PROCESSED_OUTPUTS = 'post_processed_outputs'
+GEOMETRY = 'geometry'
+VariableGroup = Literal[
+    'core_transport', 'core_sources', 'post_processed_outputs', 'geometry'
+]
+ALL_VARIABLE_GROUPS = (
+    CORE_TRANSPORT,
+    CORE_SOURCES,
+    POST_PROCESSED_OUTPUTS,
+    GEOMETRY,
+)
+
+
+class OutputConfig(torax_pydantic.BaseModelFrozen):
+  """Config for the selection of the recorded simulation outputs.
+
+  By default, every time step and all variables are recorded. For long
+  simulations with many small time steps, the history held in memory can be
+  reduced by only recording a subset of the time steps and variable groups.
+  The initial and final states are always recorded.
+
+  Attributes:
+    save_every_n_steps: Only record every n-th time step.
+    output_times: If set, only record the first time step reaching each of
+      these times, in seconds. Must be sorted. Cannot be combined with
+      `save_every_n_steps`.
+    variable_groups: The variable groups to record, among `core_transport`,
+      `core_sources`, `post_processed_outputs` and `geometry`. The core
+      profiles and numerics are always recorded.
+    record_performance: If True, the wall clock time spent in the stages of the
+      time steps, e.g. the transport model and the solver, and counters such
+      as the number of Newton iterations and of compilations are recorded in a
+      `performance` output group. Timing a stage waits for its computation to
+      finish, which slightly slows down the simulation.
+    checkpoint_file: If set, a binary checkpoint of the full simulation state
+      is written to this file every `checkpoint_every_n_steps` time steps,
+      replacing the previous one. The simulation can be resumed exactly from
+      the checkpoint with `torax.resume_from_checkpoint`.
+    checkpoint_every_n_steps: Number of time steps between checkpoints.
+  """
+
+  save_every_n_steps: pydantic.PositiveInt = 1
+  output_times: tuple[float, ...] | None = None
+  variable_groups: tuple[VariableGroup, ...] = ALL_VARIABLE_GROUPS
+  record_performance: bool = False
+  checkpoint_file: str | None = None
+  checkpoint_every_n_steps: pydantic.PositiveInt = 100
+
+  @pydantic.model_validator(mode='after')
+  def _check_fields(self) -> Self:
+    if self.output_times is not None:
+      if self.save_every_n_steps != 1:
+        raise ValueError(
+            'output_times and save_every_n_steps cannot both be set.'
+        )
+      if np.any(np.diff(self.output_times) < 0):
+        raise ValueError(
+            f'output_times must be sorted, got {self.output_times}.'
+        )
+    return self
+
+  def should_checkpoint(self, step: int) -> bool:
+    """Returns whether to write a checkpoint after the given time step."""
+    return (
+        self.checkpoint_file is not None
+        and step % self.checkpoint_every_n_steps == 0
+    )
+
+  def should_save(self, step: int, t_previous: float, t: float) -> bool:
+    """Returns whether to record the state after a time step.
+
+    Args:
+      step: Number of time steps taken, including this one.
+      t_previous: Time before the time step.
+      t: Time after the time step.
+
+    Returns:
+      Whether the state after the time step is recorded. This does not account
+      for the final state, which is always recorded.
+    """
+    if self.output_times is None:
+      return step % self.save_every_n_steps == 0
+    # Record the state if an output time lies in (t_previous, t].
+    return bool(
+        np.searchsorted(self.output_times, t, side='right')
+        > np.searchsorted(self.output_times, t_previous, side='right')
+    )
@@ -0,0 +1,297 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streaming NetCDF output of a simulation while it runs.
+
+`StreamingOutputWriter` appends states to a NetCDF file as the simulation
+progresses, with an unlimited, chunked time dimension. The file follows the
+same DataTree schema as `StateHistory.simulation_output_to_xr`, so it can be
+read back with `output.load_state_file`. Since the file is synced after each
+chunk, the simulation can be monitored while it runs, and the output up to the
+last flushed chunk is recoverable if the simulation crashes.
+"""
+
+import os
+from typing import Any
+
+import netCDF4
+import numpy as np
+from torax import state
+from torax.orchestration import sim_state
+from torax.output_tools import output
+from torax.output_tools import post_processing
+from torax.torax_pydantic import file_restart as file_restart_pydantic_model
+from torax.torax_pydantic import model_config
+import xarray as xr
+
+
+# Groups of the output DataTree written by the streaming writer.
+_GROUPS = (output.NUMERICS, output.PROFILES, output.SCALARS)
+
+
+class StreamingOutputWriter:
+  """Appends simulation states to a NetCDF file during a simulation.
+
+  States are buffered and written in chunks of `chunk_size` time slices. Call
+  `close` at the end of the simulation to flush the remaining states and write
+  the sim error. The writer can also be used as a context manager, in which
+  case it is closed on exit, without a sim error if an exception was raised.
+
+  Attributes:
+    path: Path of the output file.
+    chunk_size: Number of time slices per chunk.
+    num_times: Number of time slices written to the file so far.
+  """
+
+  def __init__(
+      self,
+      path: str,
+      torax_config: model_config.ToraxConfig | None,
+      chunk_size: int = 16,
+  ):
+    """Initializes the writer.
+
+    Args:
+      path: Path of the output file. An existing file is overwritten.
+      torax_config: The config of the simulation, used for the output schema.
+        Only needed to `append` states.
+      chunk_size: Number of time slices buffered before writing to the file.
+        This is also the chunk size of the time dimension in the file.
+    """
+    if chunk_size < 1:
+      raise ValueError(f'chunk_size must be positive, got {chunk_size}.')
+    self.path = path
+    self.chunk_size = chunk_size
+    self.num_times = 0
+    self._torax_config = torax_config
+    self._states: list[sim_state.ToraxSimState] = []
+    self._post_processed_outputs: list[
+        post_processing.PostProcessedOutputs
+    ] = []
+    self._dataset: netCDF4.Dataset | None = None
+
+  def __enter__(self) -> 'StreamingOutputWriter':
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close(None if exc_type else state.SimError.NO_ERROR)
+
+  def append(
+      self,
+      current_state: sim_state.ToraxSimState,
+      post_processed_outputs: post_processing.PostProcessedOutputs,
+  ):
+    """Appends a time slice, writing a chunk to the file when it is full."""
+    self._states.append(current_state)
+    self._post_processed_outputs.append(post_processed_outputs)
+    if len(self._states) >= self.chunk_size:
+      self.flush()
+
+  def flush(self):
+    """Writes the buffered time slices to the file."""
+    if not self._states:
+      return
+    data_tree = output.StateHistory(
+        state_history=tuple(self._states),
+        post_processed_outputs_history=tuple(self._post_processed_outputs),
+        sim_error=state.SimError.NO_ERROR,
+        torax_config=self._torax_config,
+    ).simulation_output_to_xr()
+    self._states = []
+    self._post_processed_outputs = []
+    self.append_data_tree(data_tree)
+
+  def append_data_tree(self, data_tree: xr.DataTree):
+    """Writes the time slices of an output DataTree to the file.
+
+    The buffered states are not flushed first, so this should not be mixed
+    with `append`.
+
+    Args:
+      data_tree: The time slices to write, with the schema of
+        `StateHistory.simulation_output_to_xr`. The time independent variables
+        are only written from the first DataTree written to the file.
+    """
+    if self._dataset is None:
+      self._create_file(data_tree)
+    num_new_times = data_tree.sizes[output.TIME]
+    times = slice(self.num_times, self.num_times + num_new_times)
+    self._dataset.variables[output.TIME][times] = data_tree[output.TIME].values
+    for group_name in _GROUPS:
+      group = self._dataset.groups[group_name]
+      dataset = data_tree[group_name].to_dataset(inherit=False)
+      for name, data_array in dataset.data_vars.items():
+        if output.TIME not in data_array.dims:
+          continue
+        if name not in group.variables:
+          # Outputs which are only saved when nonzero, e.g. the Bohm and
+          # gyro-Bohm transport coefficients, can first appear in a later
+          # chunk.
+          self._create_variable(group, name, data_array)
+          group.variables[name][: self.num_times] = 0
+        group.variables[name][times] = _encode(data_array).values
+      # Outputs which are only saved when nonzero can also be missing from a
+      # later chunk.
+      for name, variable in group.variables.items():
+        if output.TIME in variable.dimensions and name not in dataset:
+          variable[times] = 0
+    self.num_times += num_new_times
+    self._dataset.sync()
+
+  def close(self, sim_error: state.SimError | None = None):
+    """Flushes the remaining time slices and closes the file.
+
+    Args:
+      sim_error: The sim error of the simulation, written to the numerics
+        group. If None, no sim error is written, e.g. if the simulation did not
+        finish.
+    """
+    self.flush()
+    if self._dataset is None:
+      return
+    if sim_error is not None:
+      numerics = self._dataset.groups[output.NUMERICS]
+      if output.SIM_ERROR not in numerics.variables:
+        numerics.createVariable(output.SIM_ERROR, np.int64, ())
+      numerics.variables[output.SIM_ERROR].assignValue(sim_error.value)
+    self._dataset.close()
+    self._dataset = None
+
+  def _create_file(self, data_tree: xr.DataTree):
+    """Creates the file, its dimensions and its time-independent variables."""
+    directory = os.path.dirname(self.path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+    self._dataset = netCDF4.Dataset(self.path, mode='w', format='NETCDF4')
+    self._dataset.setncattr(
+        output.CONFIG, data_tree.attrs[output.CONFIG]
+    )
+    groups = [self._dataset] + [
+        self._dataset.createGroup(name) for name in _GROUPS
+    ]
+    for group in groups:
+      for dim, size in data_tree.sizes.items():
+        group.createDimension(dim, None if dim == output.TIME else size)
+    root_dataset = data_tree.to_dataset(inherit=False)
+    for name, data_array in root_dataset.coords.items():
+      self._create_variable(self._dataset, name, data_array)
+      if output.TIME not in data_array.dims:
+        self._dataset.variables[name][...] = data_array.values
+    for group_name in _GROUPS:
+      dataset = data_tree[group_name].to_dataset(inherit=False)
+      for name, data_array in dataset.data_vars.items():
+        if name == output.SIM_ERROR:
+          continue
+        group = self._dataset.groups[group_name]
+        self._create_variable(group, name, data_array)
+        if output.TIME not in data_array.dims:
+          group.variables[name][...] = _encode(data_array).values
+
+  def _create_variable(
+      self,
+      group: netCDF4.Dataset,
+      name: str,
+      data_array: xr.DataArray,
+  ):
+    """Creates a variable with the dtype and attributes xarray would use."""
+    encoded = _encode(data_array)
+    kwargs: dict[str, Any] = {}
+    if np.issubdtype(encoded.dtype, np.floating):
+      kwargs['fill_value'] = np.nan
+    if output.TIME in encoded.dims:
+      kwargs['chunksizes'] = tuple(
+          self.chunk_size if dim == output.TIME else size
+          for dim, size in zip(encoded.dims, encoded.shape)
+      )
+    variable = group.createVariable(
+        name, encoded.dtype, encoded.dims, **kwargs
+    )
+    variable.setncatts(encoded.attrs)
+
+
+def _encode(data_array: xr.DataArray) -> xr.Variable:
+  """Encodes a DataArray to its on-disk representation, e.g. bools to int8."""
+  return xr.conventions.encode_cf_variable(data_array.variable)
+
+
+def write_stitched_state_file(
+    file_restart: file_restart_pydantic_model.FileRestart,
+    data_tree: xr.DataTree,
+    path: str,
+    chunk_size: int = 16,
+) -> str:
+  """Writes the output of a restarted simulation stitched to a previous file.
+
+  The result is the same as writing `output.stitch_state_files`, but the time
+  slices of the previous state file and of `data_tree` are copied to the
+  output file in chunks of `chunk_size`, so neither history is held in memory
+  as a whole. `data_tree` can itself be lazily opened from a file, also from
+  `path`, since the output is written to a temporary file which replaces
+  `path` at the end. Variables missing from one of the two histories, e.g.
+  outputs added after the previous file was written, are filled with zeros
+  as in `StreamingOutputWriter`, instead of NaNs.
+
+  Args:
+    file_restart: Contains information on the file the simulation was
+      restarted from.
+    data_tree: The output of the restarted simulation.
+    path: Path of the stitched output file.
+    chunk_size: Number of time slices read and written at a time.
+
+  Returns:
+    The path of the stitched output file.
+  """
+  if not os.path.exists(file_restart.filename):
+    raise ValueError(f'File {file_restart.filename} does not exist.')
+  temp_path = path + '.tmp'
+  writer = StreamingOutputWriter(temp_path, None, chunk_size=chunk_size)
+  with open(file_restart.filename, 'rb') as f:
+    with xr.open_datatree(f) as previous_data_tree:
+      # As in `output.stitch_state_files`, the previous file is kept up to and
+      # including the first time of `data_tree`.
+      previous_data_tree = previous_data_tree.sel(
+          time=slice(None, data_tree[output.TIME].values[0])
+      )
+      _append_in_chunks(writer, previous_data_tree, chunk_size)
+      previous_times = previous_data_tree[output.TIME].values
+  last_previous_time = previous_times[-1] if previous_times.size else -np.inf
+  first_new_index = np.searchsorted(
+      data_tree[output.TIME].values, last_previous_time, side='right'
+  )
+  _append_in_chunks(
+      writer, data_tree.isel(time=slice(first_new_index, None)), chunk_size
+  )
+  sim_error = state.SimError(
+      int(data_tree[output.NUMERICS][output.SIM_ERROR].values)
+  )
+  writer.close(sim_error)
+  if output.PERFORMANCE in data_tree.children:
+    data_tree[output.PERFORMANCE].to_dataset(inherit=False).to_netcdf(
+        temp_path, mode='a', group=output.PERFORMANCE
+    )
+  os.replace(temp_path, path)
+  return path
+
+
+def _append_in_chunks(
+    writer: StreamingOutputWriter, data_tree: xr.DataTree, chunk_size: int
+):
+  """Appends the time slices of a possibly lazy DataTree in chunks."""
+  for start in range(0, data_tree.sizes[output.TIME], chunk_size):
+    chunk = data_tree.isel(time=slice(start, start + chunk_size))
+    if output.PERFORMANCE in chunk.children:
+      chunk = chunk.drop_nodes(output.PERFORMANCE)
+    # The on-disk encoding of a loaded file is replaced by that of the writer.
+    chunk = chunk.compute().map_over_datasets(lambda ds: ds.drop_encoding())
+    writer.append_data_tree(chunk)
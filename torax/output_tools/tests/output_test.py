@@ -218,6 +218,18 @@ class StateHistoryTest(parameterized.TestCase):
     loaded_data_tree = output.safe_load_dataset(path)
     xr.testing.assert_equal(loaded_data_tree, data_tree_to_save)
 
+  def test_load_state_file_time_slice(self):
+    data_tree = self.history.simulation_output_to_xr()
+    path = os.path.join(self.create_tempdir().full_path, 'state.nc')
+    data_tree.to_netcdf(path)
+
+    loaded_data_tree = output.load_state_file_time_slice(path, time=0.15)
+
+    xr.testing.assert_equal(
+        loaded_data_tree,
+        output.safe_load_dataset(path).sel(time=0.15, method='nearest'),
+    )
+
   def test_expected_keys_in_child_nodes(self):
     data_tree = self.history.simulation_output_to_xr()
     expected_child_keys = [
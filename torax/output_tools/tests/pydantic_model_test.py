@@ -0,0 +1,79 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from absl.testing import absltest
+from absl.testing import parameterized
+import pydantic
+from torax.output_tools import pydantic_model as output_pydantic_model
+
+
+class PydanticModelTest(parameterized.TestCase):
+
+  def test_default_records_all_steps(self):
+    output_config = output_pydantic_model.OutputConfig()
+    self.assertTrue(output_config.should_save(7, 0.1, 0.2))
+    self.assertSameElements(
+        output_config.variable_groups,
+        output_pydantic_model.ALL_VARIABLE_GROUPS,
+    )
+
+  @parameterized.parameters(
+      (1, False),
+      (2, False),
+      (3, True),
+      (6, True),
+  )
+  def test_save_every_n_steps(self, step, expected):
+    output_config = output_pydantic_model.OutputConfig(save_every_n_steps=3)
+    self.assertEqual(output_config.should_save(step, 0.0, 0.1), expected)
+
+  @parameterized.parameters(
+      (0.0, 0.05, False),
+      (0.05, 0.1, True),
+      (0.1, 0.15, False),
+      (0.15, 0.6, True),
+      (0.6, 0.7, False),
+  )
+  def test_output_times(self, t_previous, t, expected):
+    output_config = output_pydantic_model.OutputConfig(
+        output_times=(0.1, 0.3, 0.5)
+    )
+    self.assertEqual(output_config.should_save(1, t_previous, t), expected)
+
+  def test_should_checkpoint(self):
+    self.assertFalse(output_pydantic_model.OutputConfig().should_checkpoint(100))
+    output_config = output_pydantic_model.OutputConfig(
+        checkpoint_file='/tmp/checkpoint.npz', checkpoint_every_n_steps=5
+    )
+    self.assertFalse(output_config.should_checkpoint(4))
+    self.assertTrue(output_config.should_checkpoint(10))
+
+  def test_unsorted_output_times_raises_error(self):
+    with self.assertRaises(pydantic.ValidationError):
+      output_pydantic_model.OutputConfig(output_times=(0.3, 0.1))
+
+  def test_output_times_and_save_every_n_steps_raises_error(self):
+    with self.assertRaises(pydantic.ValidationError):
+      output_pydantic_model.OutputConfig(
+          output_times=(0.1,), save_every_n_steps=2
+      )
+
+  def test_unknown_variable_group_raises_error(self):
+    with self.assertRaises(pydantic.ValidationError):
+      output_pydantic_model.OutputConfig.from_dict(
+          {'variable_groups': ['core_profiles']}
+      )
+
+
+if __name__ == '__main__':
+  absltest.main()
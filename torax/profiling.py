@@ -0,0 +1,177 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Opt-in timing of the stages of a simulation step.
+
+The stages of a time step, e.g. the transport model or the Jacobian of the
+Newton-Raphson solver, are called through `timed`. This always opens a
+`jax.named_scope` with the stage name, so that the stages can be identified in
+a JAX profiler trace, including inside of compiled functions. While a
+`track_performance` context is active, the stages called from Python are also
+timed: their outputs are blocked on, such that the time includes the
+asynchronously dispatched computation. Blocking on each stage serializes the
+dispatch, so timing is only done on request.
+
+Stages called while tracing, e.g. inside of a compiled simulation loop, are
+not timed, and their time is attributed to the enclosing stage called from
+Python. The time of a stage includes the time of the stages nested within it.
+"""
+
+from collections.abc import Callable, Iterator, Sequence
+import contextlib
+import dataclasses
+import time
+from typing import Any, TypeVar
+
+import jax
+from torax import jax_utils
+
+T = TypeVar('T')
+
+# Stage names.
+RUNTIME_PARAMS = 'runtime_params'
+SOURCE_PROFILES = 'source_profiles'
+TRANSPORT_MODEL = 'transport_model'
+TIME_STEP_CALCULATOR = 'time_step_calculator'
+SOLVER = 'solver'
+CALC_COEFFS = 'calc_coeffs'
+RESIDUAL = 'residual'
+JACOBIAN = 'jacobian'
+LINEAR_SOLVE = 'linear_solve'
+SAWTOOTH = 'sawtooth'
+POST_PROCESSING = 'post_processing'
+COMPILED_LOOP = 'compiled_loop'
+
+# Counter names.
+NUM_STEPS = 'num_steps'
+NEWTON_ITERATIONS = 'newton_iterations'
+DT_RETRIES = 'dt_retries'
+TRANSPORT_EVALUATIONS_SAVED = 'transport_evaluations_saved'
+
+
+@dataclasses.dataclass
+class PerformanceStats:
+  """Timings and counters of the stages of a simulation.
+
+  Attributes:
+    stage_times: Total wall clock time of each stage called from Python, in
+      seconds.
+    stage_calls: Number of timed calls of each stage.
+    stage_compiles: Number of compilations of the jitted functions of each
+      stage.
+    counters: Event counters, e.g. the number of Newton iterations.
+    wall_clock_time: Total wall clock time of the context, in seconds.
+  """
+
+  stage_times: dict[str, float] = dataclasses.field(default_factory=dict)
+  stage_calls: dict[str, int] = dataclasses.field(default_factory=dict)
+  stage_compiles: dict[str, int] = dataclasses.field(default_factory=dict)
+  counters: dict[str, int] = dataclasses.field(default_factory=dict)
+  wall_clock_time: float = 0.0
+
+  @property
+  def stages(self) -> tuple[str, ...]:
+    """Names of the stages which were timed or compiled, in order of use."""
+    return tuple(dict.fromkeys([*self.stage_times, *self.stage_compiles]))
+
+
+# Stats of the active `track_performance` contexts.
+_active_stats: list[PerformanceStats] = []
+
+
+def is_tracking() -> bool:
+  """Returns whether a `track_performance` context is active."""
+  return bool(_active_stats)
+
+
+def _number_of_compiles(
+    functions: Sequence[tuple[str, Callable[..., Any]]],
+) -> dict[str, int]:
+  """Returns the number of compilations of each stage's jitted functions."""
+  compiles = {}
+  for stage, function in functions:
+    # Without compilation, e.g. if TORAX_COMPILATION_ENABLED is False, the
+    # functions are not jitted.
+    if hasattr(function, '_cache_size'):
+      compiles[stage] = compiles.get(stage, 0) + (
+          jax_utils.get_number_of_compiles(function)
+      )
+  return compiles
+
+
+@contextlib.contextmanager
+def track_performance(
+    jitted_functions: Sequence[tuple[str, Callable[..., Any]]] = (),
+) -> Iterator[PerformanceStats]:
+  """Times the stages called through `timed` within the context.
+
+  Example:
+
+  with profiling.track_performance() as stats:
+    run_simulation.run_simulation(torax_config)
+  print(stats.stage_times)
+
+  Args:
+    jitted_functions: Pairs of stage names and jitted functions, whose
+      compilations within the context are counted for the stage. A stage may
+      have several functions.
+
+  Yields:
+    The stats, updated while the context is active.
+  """
+  compiles_before = _number_of_compiles(jitted_functions)
+  stats = PerformanceStats()
+  _active_stats.append(stats)
+  start_time = time.perf_counter()
+  try:
+    yield stats
+  finally:
+    stats.wall_clock_time = time.perf_counter() - start_time
+    _active_stats.remove(stats)
+    for stage, compiles in _number_of_compiles(jitted_functions).items():
+      stats.stage_compiles[stage] = compiles - compiles_before.get(stage, 0)
+
+
+def timed(name: str, fn: Callable[..., T], *args, **kwargs) -> T:
+  """Calls `fn` as the stage `name`, timing it if tracking is active.
+
+  Args:
+    name: Name of the stage.
+    fn: Function to call.
+    *args: Positional arguments of `fn`.
+    **kwargs: Keyword arguments of `fn`.
+
+  Returns:
+    The output of `fn`.
+  """
+  with jax.named_scope(name):
+    if not _active_stats:
+      return fn(*args, **kwargs)
+    start_time = time.perf_counter()
+    output = fn(*args, **kwargs)
+    if jax_utils.is_tracer(output):
+      # Only staged, the computation is timed by the enclosing stage.
+      return output
+    jax.block_until_ready(output)
+    elapsed = time.perf_counter() - start_time
+  for stats in _active_stats:
+    stats.stage_times[name] = stats.stage_times.get(name, 0.0) + elapsed
+    stats.stage_calls[name] = stats.stage_calls.get(name, 0) + 1
+  return output
+
+
+def increment(name: str, value: int = 1):
+  """Adds `value` to the counter `name`, if tracking is active."""
+  for stats in _active_stats:
+    stats.counters[name] = stats.counters.get(name, 0) + int(value)
@@ -32,6 +32,8 @@ import jax
 import torax
 from torax import simulation_app
 from torax.config import config_loader
+from torax.orchestration import compilation_cache
+from torax.orchestration import run_simulation
 from torax.plotting import plotruns_lib
 from torax.torax_pydantic import model_config
 
@@ -99,6 +101,22 @@ _OUTPUT_DIR = flags.DEFINE_string(
     'If provided, overrides the default output directory.',
 )
 
+_STREAM_OUTPUT = flags.DEFINE_bool(
+    'stream_output',
+    False,
+    'If True, appends the output to the output file while the simulation runs'
+    ' instead of writing it at the end, bounding memory use for long runs.',
+)
+
+_PREWARM_CACHE = flags.DEFINE_bool(
+    'prewarm_cache',
+    False,
+    'If True, compiles the simulation of the config into the persistent'
+    ' compilation cache and quits, without running the simulation. The cache'
+    ' directory is set with the TORAX_COMPILATION_CACHE_DIR environment'
+    ' variable or --jax_compilation_cache_dir.',
+)
+
 _PLOT_CONFIG_PATH = flags.DEFINE_string(
     'plot_config',
     'plotting/configs/default_plot_config.py',
@@ -341,6 +359,25 @@ def _post_run_plotting(
       raise ValueError('Unknown command')
 
 
+def _prewarm_cache(config_path: pathlib.Path):
+  """Compiles the simulation of a config into the persistent cache."""
+  if compilation_cache.initialize_cache() is None:
+    raise ValueError(
+        f'--{_PREWARM_CACHE.name} requires a persistent compilation cache'
+        f' directory, set with {compilation_cache.CACHE_DIR_ENV} or'
+        ' --jax_compilation_cache_dir.'
+    )
+  start_time = time.time()
+  torax_config = config_loader.build_torax_config_from_file(config_path)
+  cache_stats = run_simulation.prewarm_compilation_cache(torax_config)
+  simulation_app.log_to_stdout(
+      f'Prewarmed the compilation cache in {time.time() - start_time:.2f}s:'
+      f' {cache_stats.cache_misses} executables compiled,'
+      f' {cache_stats.cache_hits} already cached.',
+      color=simulation_app.AnsiColors.GREEN,
+  )
+
+
 def main(_):
   torax.set_jax_precision()
 
@@ -348,6 +385,10 @@ def main(_):
     raise ValueError(f'--{_CONFIG_PATH.name} must be specified.')
 
   config_path = pathlib.Path(_CONFIG_PATH.value)
+  if _PREWARM_CACHE.value:
+    _prewarm_cache(config_path)
+    return
+  compilation_cache.initialize_cache()
 
   log_sim_progress = _LOG_SIM_PROGRESS.value
   plot_sim_progress = _PLOT_SIM_PROGRESS.value
@@ -511,6 +552,7 @@ def _call_sim_app_main(
       log_sim_progress=log_sim_progress,
       plot_sim_progress=plot_sim_progress,
       log_sim_output=log_sim_output,
+      stream_output=_STREAM_OUTPUT.value,
   )
 
 
@@ -25,18 +25,27 @@ it easier to print error messages in context).
 """
 
 import dataclasses
+import functools
+import math
 import time
+from typing import Any, Callable, Sequence
 
 from absl import logging
 import jax
+from jax import numpy as jnp
 import numpy as np
+from torax import profiling
 from torax import state
 from torax.config import build_runtime_params
 from torax.config import runtime_params_slice
+from torax.geometry import geometry as geometry_lib
 from torax.geometry import geometry_provider as geometry_provider_lib
+from torax.orchestration import checkpointing
 from torax.orchestration import sim_state
 from torax.orchestration import step_function
 from torax.output_tools import post_processing
+from torax.output_tools import pydantic_model as output_pydantic_model
+from torax.output_tools import streaming_output
 import tqdm
 
 
@@ -50,6 +59,9 @@ def _run_simulation(
     step_fn: step_function.SimulationStepFn,
     log_timestep_info: bool = False,
     progress_bar: bool = True,
+    output_writer: streaming_output.StreamingOutputWriter | None = None,
+    output_config: output_pydantic_model.OutputConfig | None = None,
+    initial_num_steps: int = 0,
 ) -> tuple[
     tuple[sim_state.ToraxSimState, ...],
     tuple[post_processing.PostProcessedOutputs, ...],
@@ -96,6 +108,13 @@ def _run_simulation(
     log_timestep_info: If True, logs basic timestep info, like time, dt, on
       every step.
     progress_bar: If True, displays a progress bar.
+    output_writer: If provided, each state is appended to this writer once it
+      is final, and dropped from the returned history to bound memory use.
+      Closing the writer is left to the caller.
+    output_config: Selects the time steps and variable groups recorded in the
+      history, and the checkpoints written. Defaults to recording everything.
+    initial_num_steps: Number of time steps taken to reach `initial_state`,
+      when resuming from a checkpoint.
 
   Returns:
     A tuple of:
@@ -111,6 +130,10 @@ def _run_simulation(
         state is 1, then a trunctated simulation history is returned up until
         the last valid timestep.
       - The sim error state.
+    If `output_writer` is provided, the histories only contain the last state.
+    If `output_config` selects a subset of the time steps, the histories only
+    contain those, plus the initial and final states. See
+    `_reduce_for_history` for the variable groups which are not recorded.
   """
 
   # Provide logging information on precision setting
@@ -136,9 +159,29 @@ def _run_simulation(
       )
   )
 
+  if output_config is None:
+    output_config = output_pydantic_model.OutputConfig()
+  # When streaming, every entry keeps its geometry, since each streamed chunk
+  # needs the radial grid.
+  reference_geometry = (
+      initial_state.geometry if output_writer is None else None
+  )
+
   current_state = initial_state
-  state_history = [current_state]
-  post_processing_history = [initial_post_processed_outputs]
+  post_processed_outputs = initial_post_processed_outputs
+  recorded_state, recorded_post_processed_outputs = _reduce_for_history(
+      initial_state,
+      initial_post_processed_outputs,
+      output_config,
+      reference_geometry=None,
+  )
+  state_history = [recorded_state]
+  post_processing_history = [recorded_post_processed_outputs]
+  # Number of leading entries of the histories already streamed.
+  num_streamed = 0
+  num_steps = initial_num_steps
+  # Whether the current state is the last entry of the histories.
+  current_state_recorded = True
 
   # Set the sim_error to NO_ERROR. If we encounter an error, we will set it to
   # the appropriate error code.
@@ -161,12 +204,12 @@ def _run_simulation(
       if log_timestep_info:
         _log_timestep(current_state)
 
-      current_state, post_processed_outputs, sim_error = step_fn(
+      output_state, output_post_processed_outputs, sim_error = step_fn(
           static_runtime_params_slice,
           dynamic_runtime_params_slice_provider,
           geometry_provider,
           current_state,
-          post_processing_history[-1],
+          post_processed_outputs,
       )
 
       wall_clock_step_times.append(time.time() - step_start_time)
@@ -178,6 +221,13 @@ def _run_simulation(
         sim_error.log_error()
         break
       else:
+        num_steps += 1
+        _count_solver_iterations(output_state.solver_numeric_outputs)
+        current_state_recorded = output_config.should_save(
+            num_steps, current_state.t, output_state.t
+        )
+        current_state = output_state
+        post_processed_outputs = output_post_processed_outputs
         if first_step:
           first_step = False
           if (
@@ -189,8 +239,41 @@ def _run_simulation(
                 state_history[0].core_profiles,
                 vloop_lcfs=current_state.core_profiles.vloop_lcfs,
             )
-        state_history.append(current_state)
-        post_processing_history.append(post_processed_outputs)
+        if current_state_recorded:
+          recorded_state, recorded_post_processed_outputs = (
+              _reduce_for_history(
+                  current_state,
+                  post_processed_outputs,
+                  output_config,
+                  reference_geometry=reference_geometry,
+              )
+          )
+          state_history.append(recorded_state)
+          post_processing_history.append(recorded_post_processed_outputs)
+        if current_state_recorded and output_writer is not None:
+          # States are final once appended. The initial state is only
+          # streamed now since its vloop_lcfs is set after the first step.
+          state_history, post_processing_history = _stream_history(
+              output_writer,
+              state_history,
+              post_processing_history,
+              num_streamed,
+          )
+          num_streamed = 1
+        if output_config.should_checkpoint(num_steps):
+          # Flush the streamed outputs first, so that the output file has no
+          # gap if the simulation is resumed from the checkpoint.
+          if output_writer is not None:
+            output_writer.flush()
+          checkpointing.save_checkpoint(
+              output_config.checkpoint_file,
+              checkpointing.Checkpoint(
+                  sim_state=current_state,
+                  post_processed_outputs=post_processed_outputs,
+                  num_steps=num_steps,
+                  static_runtime_params_slice=static_runtime_params_slice,
+              ),
+          )
         # Calculate progress ratio and update pbar.n
         progress_ratio = (
             float(current_state.t)
@@ -203,6 +286,21 @@ def _run_simulation(
         pbar.set_description(f'Simulating (t={current_state.t:.5f})')
         pbar.refresh()
 
+  # The final state is always recorded.
+  if not current_state_recorded:
+    recorded_state, recorded_post_processed_outputs = _reduce_for_history(
+        current_state,
+        post_processed_outputs,
+        output_config,
+        reference_geometry=reference_geometry,
+    )
+    state_history.append(recorded_state)
+    post_processing_history.append(recorded_post_processed_outputs)
+  if output_writer is not None:
+    state_history, post_processing_history = _stream_history(
+        output_writer, state_history, post_processing_history, num_streamed
+    )
+
   # Log final timestep
   if log_timestep_info and sim_error == state.SimError.NO_ERROR:
     # The "sim_state" here has been updated by the loop above.
@@ -226,7 +324,7 @@ def _run_simulation(
     long_first_step = False
 
   wall_clock_time_elapsed = time.time() - running_main_loop_start_time
-  simulation_time = state_history[-1].t - state_history[0].t
+  simulation_time = state_history[-1].t - initial_state.t
   if long_first_step:
     # Don't include the long first step in the total time logged.
     wall_clock_time_elapsed -= wall_clock_step_times[0]
@@ -238,6 +336,585 @@ def _run_simulation(
   return tuple(state_history), tuple(post_processing_history), sim_error
 
 
+def _reduce_for_history(
+    current_state: sim_state.ToraxSimState,
+    post_processed_outputs: post_processing.PostProcessedOutputs,
+    output_config: output_pydantic_model.OutputConfig,
+    reference_geometry: geometry_lib.Geometry | None,
+) -> tuple[
+    sim_state.ToraxSimState,
+    post_processing.PostProcessedOutputs | None,
+]:
+  """Drops the variable groups which are not recorded from a history entry.
+
+  Args:
+    current_state: The state to record.
+    post_processed_outputs: The post-processed outputs to record.
+    output_config: Selects the recorded variable groups. The core transport
+      and core sources of the state, and the post-processed outputs, are
+      replaced by None if not selected.
+    reference_geometry: The geometry of the initial state, which is always
+      kept since it provides the radial grid. If provided, the geometry of the
+      state is replaced by None if it is not selected, or if it is equal to
+      this geometry, in which case `StateHistory` uses the reference geometry
+      instead. This avoids storing a copy of a time-invariant geometry for
+      every time step.
+
+  Returns:
+    The reduced state and post-processed outputs. The Jacobian cache and the
+    time step controller state, which are only needed to start the next time
+    step, are always dropped.
+  """
+  variable_groups = output_config.variable_groups
+  replacements = {}
+  if current_state.jacobian_cache is not None:
+    replacements['jacobian_cache'] = None
+  if current_state.time_step_controller is not None:
+    replacements['time_step_controller'] = None
+  if output_pydantic_model.CORE_TRANSPORT not in variable_groups:
+    replacements['core_transport'] = None
+  if output_pydantic_model.CORE_SOURCES not in variable_groups:
+    replacements['core_sources'] = None
+  if reference_geometry is not None and (
+      output_pydantic_model.GEOMETRY not in variable_groups
+      or _geometries_equal(current_state.geometry, reference_geometry)
+  ):
+    replacements['geometry'] = None
+  if replacements:
+    current_state = dataclasses.replace(current_state, **replacements)
+  if output_pydantic_model.POST_PROCESSED_OUTPUTS not in variable_groups:
+    post_processed_outputs = None
+  return current_state, post_processed_outputs
+
+
+def _stream_history(
+    output_writer: streaming_output.StreamingOutputWriter,
+    state_history: list[sim_state.ToraxSimState],
+    post_processing_history: list[post_processing.PostProcessedOutputs],
+    num_streamed: int,
+) -> tuple[
+    list[sim_state.ToraxSimState],
+    list[post_processing.PostProcessedOutputs],
+]:
+  """Streams the new history entries and keeps only the last one in memory."""
+  for current_state, post_processed_outputs in zip(
+      state_history[num_streamed:], post_processing_history[num_streamed:]
+  ):
+    output_writer.append(current_state, post_processed_outputs)
+  return state_history[-1:], post_processing_history[-1:]
+
+
+def _run_simulation_compiled(
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    dynamic_runtime_params_slice_provider: build_runtime_params.DynamicRuntimeParamsSliceProvider,
+    geometry_provider: geometry_provider_lib.GeometryProvider,
+    initial_state: sim_state.ToraxSimState,
+    initial_post_processed_outputs: post_processing.PostProcessedOutputs,
+    restart_case: bool,
+    step_fn: step_function.SimulationStepFn,
+    max_steps: int,
+    output_config: output_pydantic_model.OutputConfig | None = None,
+) -> tuple[
+    tuple[sim_state.ToraxSimState, ...],
+    tuple[post_processing.PostProcessedOutputs, ...],
+    state.SimError,
+]:
+  """Runs the transport simulation inside a single jitted while loop.
+
+  This is the compiled counterpart of `_run_simulation`, with the same inputs
+  and outputs. Instead of stepping from Python, the full time evolution is
+  traced once into a `jax.lax.while_loop`. The state and post-processed outputs
+  of each step are written into preallocated buffers with a fixed capacity,
+  which are truncated to the number of steps taken once the loop exits. This
+  removes the per-step dispatch and host synchronization overhead, and makes the
+  whole trajectory differentiable in forward mode.
+
+  The loop exits when the time step calculator determines the sim is done, when
+  an error is detected in the state, or when the buffers are full. In the
+  latter case a warning is logged and the truncated history is returned.
+
+  Args:
+    static_runtime_params_slice: See `_run_simulation`.
+    dynamic_runtime_params_slice_provider: See `_run_simulation`.
+    geometry_provider: See `_run_simulation`.
+    initial_state: See `_run_simulation`.
+    initial_post_processed_outputs: See `_run_simulation`.
+    restart_case: See `_run_simulation`.
+    step_fn: See `_run_simulation`.
+    max_steps: Upper bound on the number of steps stored in the history
+      buffers. The capacity is further limited by the number of steps of size
+      min_dt needed to reach t_final.
+    output_config: See `_run_simulation`. The history buffers hold every step,
+      and the selection is applied when they are copied to the host.
+
+  Returns:
+    See `_run_simulation`.
+  """
+  logging.info('Starting compiled simulation loop.')
+  capacity = _history_capacity(
+      initial_state=initial_state,
+      dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+      max_steps=max_steps,
+  )
+
+  # The loop carry must have fixed dtypes, so convert any Python scalars.
+  initial_state, initial_post_processed_outputs = jax.tree.map(
+      jnp.asarray, (initial_state, initial_post_processed_outputs)
+  )
+  compiled_loop = _compile_loop(
+      static_runtime_params_slice=static_runtime_params_slice,
+      dynamic_runtime_params_slice_provider=dynamic_runtime_params_slice_provider,
+      geometry_provider=geometry_provider,
+      initial_state=initial_state,
+      initial_post_processed_outputs=initial_post_processed_outputs,
+      step_fn=step_fn,
+      capacity=capacity,
+  )
+
+  running_main_loop_start_time = time.time()
+  loop_outputs = jax.device_get(
+      profiling.timed(
+          profiling.COMPILED_LOOP,
+          compiled_loop,
+          initial_state,
+          initial_post_processed_outputs,
+      )
+  )
+  wall_clock_time_elapsed = time.time() - running_main_loop_start_time
+
+  state_history, post_processing_history, sim_error = _unpack_compiled_loop(
+      static_runtime_params_slice,
+      *loop_outputs,
+      restart_case=restart_case,
+      step_fn=step_fn,
+      capacity=capacity,
+      output_config=output_config,
+  )
+  simulation_time = state_history[-1].t - state_history[0].t
+  logging.info(
+      'Simulated %.2fs of physics in %.2fs of wall clock time.',
+      simulation_time,
+      wall_clock_time_elapsed,
+  )
+  return state_history, post_processing_history, sim_error
+
+
+def _compile_loop(
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    dynamic_runtime_params_slice_provider: build_runtime_params.DynamicRuntimeParamsSliceProvider,
+    geometry_provider: geometry_provider_lib.GeometryProvider,
+    initial_state: sim_state.ToraxSimState,
+    initial_post_processed_outputs: post_processing.PostProcessedOutputs,
+    step_fn: step_function.SimulationStepFn,
+    capacity: int,
+) -> jax.stages.Compiled:
+  """Traces and compiles `_compiled_loop` ahead of time for the given inputs."""
+  run_loop = jax.jit(
+      functools.partial(
+          _compiled_loop,
+          static_runtime_params_slice,
+          dynamic_runtime_params_slice_provider,
+          geometry_provider,
+          step_fn=step_fn,
+          capacity=capacity,
+      )
+  )
+  compile_start_time = time.time()
+  compiled_loop = run_loop.lower(
+      initial_state, initial_post_processed_outputs
+  ).compile()
+  logging.info(
+      'Tracing and compiling the simulation loop took %.2fs of wall clock'
+      ' time.',
+      time.time() - compile_start_time,
+  )
+  return compiled_loop
+
+
+def _compiled_loop(
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    dynamic_runtime_params_slice_provider: build_runtime_params.DynamicRuntimeParamsSliceProvider,
+    geometry_provider: geometry_provider_lib.GeometryProvider,
+    initial_state: sim_state.ToraxSimState,
+    initial_post_processed_outputs: post_processing.PostProcessedOutputs,
+    step_fn: step_function.SimulationStepFn,
+    capacity: int,
+) -> tuple[jax.Array, jax.Array, jax.Array, Any, jax.Array]:
+  """Traceable simulation loop writing into preallocated history buffers.
+
+  Args:
+    static_runtime_params_slice: See `_run_simulation`.
+    dynamic_runtime_params_slice_provider: See `_run_simulation`.
+    geometry_provider: See `_run_simulation`.
+    initial_state: Initial state, with array leaves only.
+    initial_post_processed_outputs: Initial post-processed outputs, with array
+      leaves only.
+    step_fn: See `_run_simulation`.
+    capacity: Number of entries in the history buffers, including the initial
+      state.
+
+  Returns:
+    num_steps: Number of valid entries in the history buffers.
+    t: Time of the last valid state.
+    t_final: End time of the simulation.
+    history: Tuple of state and post-processed output buffers.
+    sim_error: SimError value at loop exit.
+  """
+  t_final = dynamic_runtime_params_slice_provider(
+      initial_state.t
+  ).numerics.t_final
+
+  def step(carry):
+    (
+        num_steps,
+        current_state,
+        current_post_processed_outputs,
+        history,
+        _,
+    ) = carry
+    output_state, post_processed_outputs, sim_error = step_fn(
+        static_runtime_params_slice,
+        dynamic_runtime_params_slice_provider,
+        geometry_provider,
+        current_state,
+        current_post_processed_outputs,
+    )
+    sim_error = jnp.asarray(sim_error, dtype=jnp.int32)
+    if static_runtime_params_slice.adaptive_dt:
+      # The adaptive step stopped backtracking at min_dt without converging.
+      sim_error = jnp.where(
+          jnp.logical_and(
+              sim_error == state.SimError.NO_ERROR.value,
+              output_state.solver_numeric_outputs.solver_error_state == 1,
+          ),
+          state.SimError.REACHED_MIN_DT.value,
+          sim_error,
+      )
+    output_state, post_processed_outputs = step_function._cast_like(  # pylint: disable=protected-access
+        (output_state, post_processed_outputs),
+        (current_state, current_post_processed_outputs),
+    )
+    # On error, the written entry is discarded by not advancing num_steps.
+    history = jax.tree.map(
+        lambda buffer, x: buffer.at[num_steps].set(x),
+        history,
+        (
+            dataclasses.replace(
+                output_state, jacobian_cache=None, time_step_controller=None
+            ),
+            post_processed_outputs,
+        ),
+    )
+    valid = sim_error == state.SimError.NO_ERROR.value
+    return (
+        jnp.where(valid, num_steps + 1, num_steps).astype(jnp.int32),
+        output_state,
+        post_processed_outputs,
+        history,
+        sim_error,
+    )
+
+  def not_done(carry):
+    num_steps, current_state, _, _, sim_error = carry
+    return jnp.logical_and(
+        jnp.logical_and(
+            sim_error == state.SimError.NO_ERROR.value,
+            num_steps < capacity,
+        ),
+        step_fn.time_step_calculator.not_done(current_state.t, t_final),
+    )
+
+  # The Jacobian cache and the time step controller state are carried by the
+  # loop but not recorded.
+  history = jax.tree.map(
+      lambda x: jnp.zeros((capacity,) + x.shape, x.dtype).at[0].set(x),
+      (
+          dataclasses.replace(
+              initial_state, jacobian_cache=None, time_step_controller=None
+          ),
+          initial_post_processed_outputs,
+      ),
+  )
+  init_carry = (
+      jnp.array(1, dtype=jnp.int32),
+      initial_state,
+      initial_post_processed_outputs,
+      history,
+      jnp.array(state.SimError.NO_ERROR.value, dtype=jnp.int32),
+  )
+  num_steps, final_state, _, history, sim_error = jax.lax.while_loop(
+      not_done, step, init_carry
+  )
+  return num_steps, final_state.t, t_final, history, sim_error
+
+
+def _run_simulation_batch(
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    make_dynamic_runtime_params_slice_provider: Callable[
+        [Any], build_runtime_params.DynamicRuntimeParamsSliceProvider
+    ],
+    batched_params: Any,
+    geometry_provider: geometry_provider_lib.GeometryProvider,
+    initial_states: Sequence[sim_state.ToraxSimState],
+    initial_post_processed_outputs: Sequence[
+        post_processing.PostProcessedOutputs
+    ],
+    step_fn: step_function.SimulationStepFn,
+    capacity: int,
+    output_configs: (
+        Sequence[output_pydantic_model.OutputConfig] | None
+    ) = None,
+) -> list[
+    tuple[
+        tuple[sim_state.ToraxSimState, ...],
+        tuple[post_processing.PostProcessedOutputs, ...],
+        state.SimError,
+    ]
+]:
+  """Runs a batch of simulations sharing static params with `jax.vmap`.
+
+  The compiled loop of `_run_simulation_compiled` is vmapped over the batch
+  members, so the whole batch runs as one compiled program. Under `vmap`, the
+  while loop runs until every member is done, and members that have finished
+  or failed keep their state unchanged for the remaining iterations.
+
+  Args:
+    static_runtime_params_slice: Static runtime params shared by all members.
+    make_dynamic_runtime_params_slice_provider: Builds the dynamic runtime
+      params provider of a member from its slice of `batched_params`.
+    batched_params: Pytree of arrays with a leading batch dimension,
+      holding the params that differ between members.
+    geometry_provider: Geometry provider shared by all members.
+    initial_states: Initial state of each member.
+    initial_post_processed_outputs: Initial post-processed outputs of each
+      member.
+    step_fn: Step function shared by all members.
+    capacity: Number of entries in the history buffers, including the initial
+      state.
+    output_configs: The output selection of each member, see
+      `_run_simulation`. Defaults to recording everything.
+
+  Returns:
+    For each member, the state history, post-processed outputs history and
+    SimError, as returned by `_run_simulation`.
+  """
+  logging.info(
+      'Starting batched simulation loop with %d members.', len(initial_states)
+  )
+  # The loop carry must have fixed dtypes, so convert any Python scalars.
+  stack = lambda *xs: jnp.stack([jnp.asarray(x) for x in xs])
+  initial_states = jax.tree.map(stack, *initial_states)
+  initial_post_processed_outputs = jax.tree.map(
+      stack, *initial_post_processed_outputs
+  )
+
+  def run_member(params, initial_state, initial_post_processed_outputs):
+    return _compiled_loop(
+        static_runtime_params_slice,
+        make_dynamic_runtime_params_slice_provider(params),
+        geometry_provider,
+        initial_state,
+        initial_post_processed_outputs,
+        step_fn=step_fn,
+        capacity=capacity,
+    )
+
+  run_batch = jax.jit(jax.vmap(run_member))
+  compile_start_time = time.time()
+  compiled_batch = run_batch.lower(
+      batched_params, initial_states, initial_post_processed_outputs
+  ).compile()
+  logging.info(
+      'Tracing and compiling the batched simulation loop took %.2fs of wall'
+      ' clock time.',
+      time.time() - compile_start_time,
+  )
+
+  running_main_loop_start_time = time.time()
+  batch_outputs = jax.device_get(
+      compiled_batch(
+          batched_params, initial_states, initial_post_processed_outputs
+      )
+  )
+  logging.info(
+      'Simulated %d members in %.2fs of wall clock time.',
+      len(batch_outputs[0]),
+      time.time() - running_main_loop_start_time,
+  )
+  num_members = len(batch_outputs[0])
+  if output_configs is None:
+    output_configs = [output_pydantic_model.OutputConfig()] * num_members
+  results = []
+  for i, output_config in enumerate(output_configs):
+    member_outputs = jax.tree.map(lambda x, i=i: x[i], batch_outputs)
+    results.append(
+        _unpack_compiled_loop(
+            static_runtime_params_slice,
+            *member_outputs,
+            restart_case=False,
+            step_fn=step_fn,
+            capacity=capacity,
+            output_config=output_config,
+        )
+    )
+  return results
+
+
+def _unpack_compiled_loop(
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    num_steps: np.ndarray,
+    t: np.ndarray,
+    t_final: np.ndarray,
+    history: Any,
+    sim_error: np.ndarray,
+    restart_case: bool,
+    step_fn: step_function.SimulationStepFn,
+    capacity: int,
+    output_config: output_pydantic_model.OutputConfig | None = None,
+) -> tuple[
+    tuple[sim_state.ToraxSimState, ...],
+    tuple[post_processing.PostProcessedOutputs, ...],
+    state.SimError,
+]:
+  """Converts the host outputs of `_compiled_loop` to per-step histories.
+
+  Only the time steps and variable groups selected by `output_config` are
+  extracted from the history buffers, see `_run_simulation`.
+  """
+  sim_error = state.SimError(int(sim_error))
+  num_steps = int(num_steps)
+  state_buffer, post_processing_buffer = history
+  # The first entry of the buffers is the initial state.
+  _count_solver_iterations(
+      jax.tree.map(
+          lambda x: x[1:num_steps], state_buffer.solver_numeric_outputs
+      )
+  )
+  if sim_error != state.SimError.NO_ERROR:
+    sim_error.log_error()
+  elif step_fn.time_step_calculator.not_done(t, t_final):
+    logging.warning(
+        'The compiled loop history buffers (capacity %d) filled up before'
+        ' t_final was reached. Stopping at t=%.5f. Increase'
+        ' numerics.compiled_loop_max_steps to simulate further.',
+        capacity,
+        t,
+    )
+
+  if output_config is None:
+    output_config = output_pydantic_model.OutputConfig()
+  state_history = []
+  post_processing_history = []
+  reference_geometry = None
+  for i in _recorded_steps(output_config, state_buffer.t[:num_steps]):
+    recorded_state, recorded_post_processed_outputs = _reduce_for_history(
+        jax.tree.map(lambda x, i=i: x[i], state_buffer),
+        jax.tree.map(lambda x, i=i: x[i], post_processing_buffer),
+        output_config,
+        reference_geometry=reference_geometry,
+    )
+    if reference_geometry is None:
+      reference_geometry = recorded_state.geometry
+    state_history.append(recorded_state)
+    post_processing_history.append(recorded_post_processed_outputs)
+
+  if (
+      not restart_case
+      and num_steps > 1
+      and not static_runtime_params_slice.profile_conditions.use_vloop_lcfs_boundary_condition
+  ):
+    # For the Ip BC case, set vloop_lcfs[0] to the same value as
+    # vloop_lcfs[1] due the vloop_lcfs timeseries being underconstrained
+    state_history[0].core_profiles = dataclasses.replace(
+        state_history[0].core_profiles,
+        vloop_lcfs=state_buffer.core_profiles.vloop_lcfs[1],
+    )
+  return tuple(state_history), tuple(post_processing_history), sim_error
+
+
+def _count_solver_iterations(
+    solver_numeric_outputs: state.SolverNumericOutputs,
+):
+  """Adds the solver iterations of time steps to the performance counters.
+
+  Args:
+    solver_numeric_outputs: The solver numeric outputs of a time step, or of
+      several time steps stacked along the leading axis.
+  """
+  if not profiling.is_tracking():
+    return
+  outer_solver_iterations = np.asarray(
+      solver_numeric_outputs.outer_solver_iterations
+  )
+  profiling.increment(profiling.NUM_STEPS, outer_solver_iterations.size)
+  profiling.increment(
+      profiling.NEWTON_ITERATIONS,
+      np.sum(solver_numeric_outputs.inner_solver_iterations),
+  )
+  # Each outer iteration beyond the first is a retry at a reduced dt. Sawtooth
+  # crash steps have no outer iterations.
+  profiling.increment(
+      profiling.DT_RETRIES,
+      np.sum(np.maximum(outer_solver_iterations - 1, 0)),
+  )
+  profiling.increment(
+      profiling.TRANSPORT_EVALUATIONS_SAVED,
+      np.sum(solver_numeric_outputs.transport_evaluations_saved),
+  )
+
+
+def _geometries_equal(
+    geo: geometry_lib.Geometry, other: geometry_lib.Geometry
+) -> bool:
+  """Returns whether two geometries have equal values."""
+  if geo is other:
+    return True
+  leaves, treedef = jax.tree.flatten(geo)
+  other_leaves, other_treedef = jax.tree.flatten(other)
+  return treedef == other_treedef and all(
+      np.array_equal(leaf, other_leaf)
+      for leaf, other_leaf in zip(leaves, other_leaves)
+  )
+
+
+def _recorded_steps(
+    output_config: output_pydantic_model.OutputConfig,
+    times: np.ndarray,
+) -> list[int]:
+  """Returns the indices of the recorded entries of a time history."""
+  indices = [0]
+  for i in range(1, len(times)):
+    if i == len(times) - 1 or output_config.should_save(
+        i, times[i - 1], times[i]
+    ):
+      indices.append(i)
+  return indices
+
+
+def _history_capacity(
+    initial_state: sim_state.ToraxSimState,
+    dynamic_runtime_params_slice_provider: build_runtime_params.DynamicRuntimeParamsSliceProvider,
+    max_steps: int,
+) -> int:
+  """Returns the number of entries to preallocate for a compiled loop.
+
+  Args:
+    initial_state: Initial state of the simulation.
+    dynamic_runtime_params_slice_provider: Provides t_final and min_dt, which
+      bound the number of steps from above.
+    max_steps: User-provided upper bound on the number of steps.
+
+  Returns:
+    The history capacity, including the initial state.
+  """
+  t_initial = float(initial_state.t)
+  numerics = dynamic_runtime_params_slice_provider(t_initial).numerics
+  max_steps_to_t_final = math.ceil(
+      max(numerics.t_final - t_initial, 0.0) / numerics.min_dt
+  )
+  return min(max_steps, max_steps_to_t_final) + 1
+
+
 def _log_timestep(
     current_state: sim_state.ToraxSimState,
 ) -> None:
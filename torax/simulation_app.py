@@ -63,6 +63,7 @@ import numpy as np
 from torax import state
 from torax.geometry import geometry
 from torax.orchestration import run_simulation
+from torax.output_tools import streaming_output
 from torax.torax_pydantic import model_config
 import xarray as xr
 
@@ -102,12 +103,15 @@ def log_to_stdout(
     )
 
 
+def _output_file_name() -> str:
+  return f'{_STATE_HISTORY_FILENAME}_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.nc'  # pylint: disable=g-inconsistent-quotes
+
+
 def _write_simulation_output_to_dir(
     output_dir: str, data_tree: xr.DataTree
 ) -> str:
   """Writes the state history and some geometry information to a NetCDF file."""
-  filename = f'{_STATE_HISTORY_FILENAME}_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.nc'  # pylint: disable=g-inconsistent-quotes
-  output_file = os.path.join(output_dir, filename)
+  output_file = os.path.join(output_dir, _output_file_name())
   return write_output_to_file(output_file, data_tree)
 
 
@@ -159,6 +163,7 @@ def main(
     log_sim_output: bool = False,
     plot_sim_progress: bool = False,
     log_sim_progress_bar: bool = True,
+    stream_output: bool = False,
 ) -> str:
   """Runs a simulation obtained via `get_config`.
 
@@ -180,6 +185,9 @@ def main(
     plot_sim_progress: If True, then a plotting spectator will be attached to
       the sim.
     log_sim_progress_bar: If True, then a progress bar will be logged.
+    stream_output: If True, the output is appended to the output file while
+      the simulation runs instead of being written at the end, and the history
+      is not kept in memory. `log_sim_output` is ignored in this mode.
 
   Returns:
     The output state file path.
@@ -188,6 +196,13 @@ def main(
   torax_config = get_config()
 
   log_to_stdout('Starting simulation.', color=AnsiColors.GREEN)
+  if stream_output:
+    return _stream_simulation_output(
+        torax_config,
+        output_dir=output_dir,
+        log_sim_progress=log_sim_progress,
+        log_sim_progress_bar=log_sim_progress_bar,
+    )
   state_history = run_simulation.run_simulation(
       torax_config, log_sim_progress, progress_bar=log_sim_progress_bar,
   )
@@ -196,10 +211,20 @@ def main(
   if plot_sim_progress:
     raise NotImplementedError('Plotting progress is temporarily disabled.')
 
-  data_tree = state_history.simulation_output_to_xr(torax_config.restart)
+  data_tree = state_history.simulation_output_to_xr()
 
   output_dir = output_dir if output_dir else _DEFAULT_OUTPUT_DIR
-  output_file = _write_simulation_output_to_dir(output_dir, data_tree)
+  if torax_config.restart is not None and torax_config.restart.stitch:
+    # The previous state file is stitched while writing, without loading it.
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = streaming_output.write_stitched_state_file(
+        torax_config.restart,
+        data_tree,
+        os.path.join(output_dir, _output_file_name()),
+    )
+    log_to_stdout(f'{WRITE_PREFIX}{output_file}', AnsiColors.GREEN)
+  else:
+    output_file = _write_simulation_output_to_dir(output_dir, data_tree)
 
   if log_sim_output:
     log_simulation_output_to_stdout(
@@ -208,3 +233,29 @@ def main(
 
   return output_file
 
+
+def _stream_simulation_output(
+    torax_config: model_config.ToraxConfig,
+    output_dir: str | None,
+    log_sim_progress: bool,
+    log_sim_progress_bar: bool,
+) -> str:
+  """Runs a simulation, streaming its output to a file in `output_dir`."""
+  output_dir = output_dir if output_dir else _DEFAULT_OUTPUT_DIR
+  output_file = os.path.join(output_dir, _output_file_name())
+  log_to_stdout(f'Streaming output to {output_file}', AnsiColors.GREEN)
+  run_simulation.run_simulation_streaming(
+      torax_config,
+      output_file,
+      log_timestep_info=log_sim_progress,
+      progress_bar=log_sim_progress_bar,
+  )
+  log_to_stdout('Finished running simulation.', color=AnsiColors.GREEN)
+
+  if torax_config.restart is not None and torax_config.restart.stitch:
+    with xr.open_datatree(output_file) as data_tree:
+      streaming_output.write_stitched_state_file(
+          torax_config.restart, data_tree, output_file
+      )
+  log_to_stdout(f'{WRITE_PREFIX}{output_file}', AnsiColors.GREEN)
+  return output_file
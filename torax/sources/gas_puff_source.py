@@ -76,6 +76,9 @@ class GasPuffSource(source.Source):
   """Gas puff source for the n_e equation."""
 
   SOURCE_NAME: ClassVar[str] = 'gas_puff'
+  PROFILE_INDEPENDENT_MODEL_FUNCS: ClassVar[
+      tuple[source.SourceProfileFunction, ...]
+  ] = (calc_puff_source,)
   model_func: source.SourceProfileFunction = calc_puff_source
 
   @property
@@ -107,6 +107,9 @@ class GenericCurrentSource(source.Source):
   """A generic current density source profile."""
 
   SOURCE_NAME: ClassVar[str] = 'generic_current'
+  PROFILE_INDEPENDENT_MODEL_FUNCS: ClassVar[
+      tuple[source.SourceProfileFunction, ...]
+  ] = (calculate_generic_current,)
   model_func: source.SourceProfileFunction = calculate_generic_current
 
   @property
@@ -111,6 +111,9 @@ class GenericIonElectronHeatSource(source.Source):
   """Generic heat source for both ion and electron heat."""
 
   SOURCE_NAME: ClassVar[str] = 'generic_heat'
+  PROFILE_INDEPENDENT_MODEL_FUNCS: ClassVar[
+      tuple[source.SourceProfileFunction, ...]
+  ] = (default_formula,)
   model_func: source.SourceProfileFunction = default_formula
 
   @property
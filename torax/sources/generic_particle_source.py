@@ -71,6 +71,9 @@ class GenericParticleSource(source.Source):
   """Neutral-beam injection source for the n_e equation."""
 
   SOURCE_NAME: ClassVar[str] = 'generic_particle'
+  PROFILE_INDEPENDENT_MODEL_FUNCS: ClassVar[
+      tuple[source.SourceProfileFunction, ...]
+  ] = (calc_generic_particle_source,)
   model_func: source.SourceProfileFunction = calc_generic_particle_source
 
   @property
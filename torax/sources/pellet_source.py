@@ -68,6 +68,9 @@ class PelletSource(source.Source):
   """Pellet source for the n_e equation."""
 
   SOURCE_NAME: ClassVar[str] = 'pellet'
+  PROFILE_INDEPENDENT_MODEL_FUNCS: ClassVar[
+      tuple[source.SourceProfileFunction, ...]
+  ] = (calc_pellet_source,)
   model_func: source.SourceProfileFunction = calc_pellet_source
 
   @property
@@ -90,11 +90,17 @@ class Source(abc.ABC):
       the output shape returned by `output_shape`.
     model_func: The function used when the the runtime type is set to
       "MODEL_BASED". If not provided, then it defaults to returning zeros.
+    PROFILE_INDEPENDENT_MODEL_FUNCS: Model functions whose profiles only depend
+      on the runtime params and the geometry, and not on the core profiles,
+      the conductivity or the profiles of other sources.
     affected_core_profiles_ints: Derived property from the
       affected_core_profiles. Integer values of those enums.
   """
 
   SOURCE_NAME: ClassVar[str] = 'source'
+  PROFILE_INDEPENDENT_MODEL_FUNCS: ClassVar[
+      tuple[SourceProfileFunction, ...]
+  ] = ()
   model_func: SourceProfileFunction | None = None
 
   @property
@@ -107,6 +113,28 @@ class Source(abc.ABC):
   def affected_core_profiles(self) -> tuple[AffectedCoreProfile, ...]:
     """Returns the core profiles affected by this source."""
 
+  def is_profile_independent(
+      self,
+      static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+  ) -> bool:
+    """Returns whether the profile is independent of the core profiles.
+
+    The profiles of such sources are the same for all core profiles at a given
+    time, so implicit ones only need to be computed once per time step instead
+    of in every iteration of the solver.
+
+    Args:
+      static_runtime_params_slice: Static runtime parameters.
+
+    Returns:
+      True in PRESCRIBED and ZERO mode, and in MODEL_BASED mode if the model
+      function is in `PROFILE_INDEPENDENT_MODEL_FUNCS`.
+    """
+    mode = static_runtime_params_slice.sources[self.source_name].mode
+    if mode == runtime_params_lib.Mode.MODEL_BASED.value:
+      return self.model_func in self.PROFILE_INDEPENDENT_MODEL_FUNCS
+    return True
+
   def get_value(
       self,
       static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
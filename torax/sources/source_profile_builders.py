@@ -101,14 +101,31 @@ def build_source_profiles(
             dynamic_runtime_params_slice, geo, core_profiles
         )
     )
-  profiles = source_profiles.SourceProfiles(
-      bootstrap_current=bootstrap_current,
-      qei=qei,
-      T_e=explicit_source_profiles.T_e if explicit_source_profiles else {},
-      T_i=explicit_source_profiles.T_i if explicit_source_profiles else {},
-      n_e=explicit_source_profiles.n_e if explicit_source_profiles else {},
-      psi=explicit_source_profiles.psi if explicit_source_profiles else {},
-  )
+  if explicit_source_profiles:
+    # Implicit profiles in `explicit_source_profiles` were precomputed by
+    # `add_profile_independent_source_profiles`. They are added back in the
+    # order of calculation, which the sums over the profiles depend on.
+    def explicit_only(profiles: dict[str, chex.Array]) -> dict[str, chex.Array]:
+      return {
+          source_name: profile
+          for source_name, profile in profiles.items()
+          if source_name not in static_runtime_params_slice.sources
+          or static_runtime_params_slice.sources[source_name].is_explicit
+      }
+
+    profiles = source_profiles.SourceProfiles(
+        bootstrap_current=bootstrap_current,
+        qei=qei,
+        T_e=explicit_only(explicit_source_profiles.T_e),
+        T_i=explicit_only(explicit_source_profiles.T_i),
+        n_e=explicit_only(explicit_source_profiles.n_e),
+        psi=explicit_only(explicit_source_profiles.psi),
+    )
+  else:
+    profiles = source_profiles.SourceProfiles(
+        bootstrap_current=bootstrap_current,
+        qei=qei,
+    )
   build_standard_source_profiles(
       calculated_source_profiles=profiles,
       static_runtime_params_slice=static_runtime_params_slice,
@@ -118,10 +135,83 @@ def build_source_profiles(
       source_models=source_models,
       explicit=explicit,
       conductivity=conductivity,
+      precomputed_source_profiles=explicit_source_profiles,
   )
   return profiles
 
 
+@functools.partial(
+    jax_utils.jit,
+    static_argnames=[
+        'source_models',
+        'static_runtime_params_slice',
+    ],
+)
+def add_profile_independent_source_profiles(
+    static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+    dynamic_runtime_params_slice_t_plus_dt: runtime_params_slice.DynamicRuntimeParamsSlice,
+    geo_t_plus_dt: geometry.Geometry,
+    core_profiles_t_plus_dt: state.CoreProfiles,
+    source_models: source_models_lib.SourceModels,
+    explicit_source_profiles: source_profiles.SourceProfiles,
+) -> source_profiles.SourceProfiles:
+  """Adds the implicit profiles which are independent of the core profiles.
+
+  Implicit source profiles are computed with the live core profiles in every
+  iteration of the solver, see `build_source_profiles`. The profiles of
+  implicit sources in PRESCRIBED or ZERO mode, or with a model function which
+  only depends on the time and the geometry (see
+  `Source.is_profile_independent`), are the same in every iteration, so they
+  can be computed once per time step instead.
+
+  Args:
+    static_runtime_params_slice: Static runtime parameters.
+    dynamic_runtime_params_slice_t_plus_dt: Runtime parameters at time t + dt.
+    geo_t_plus_dt: Geometry at time t + dt.
+    core_profiles_t_plus_dt: Core profiles with the prescribed values at time t
+      + dt. Not used by the profile-independent sources.
+    source_models: Source models used to compute the source profiles.
+    explicit_source_profiles: The explicit source profiles.
+
+  Returns:
+    The explicit source profiles, with the profiles of the implicit
+    profile-independent sources at time t + dt added. `build_source_profiles`
+    uses these instead of computing them again when given these as its
+    `explicit_source_profiles`. Only valid for the implicit side of the theta
+    method, so only used with `theta_implicit=1`.
+  """
+  profiles = source_profiles.SourceProfiles(
+      bootstrap_current=explicit_source_profiles.bootstrap_current,
+      qei=explicit_source_profiles.qei,
+      T_e=dict(explicit_source_profiles.T_e),
+      T_i=dict(explicit_source_profiles.T_i),
+      n_e=dict(explicit_source_profiles.n_e),
+      psi=dict(explicit_source_profiles.psi),
+  )
+  for source_name, source in source_models.standard_sources.items():
+    if static_runtime_params_slice.sources[
+        source_name
+    ].is_explicit or not source.is_profile_independent(
+        static_runtime_params_slice
+    ):
+      continue
+    value = source.get_value(
+        static_runtime_params_slice,
+        dynamic_runtime_params_slice_t_plus_dt,
+        geo_t_plus_dt,
+        core_profiles_t_plus_dt,
+        None,
+        None,
+    )
+    _update_standard_source_profiles(
+        profiles,
+        source_name,
+        source.affected_core_profiles,
+        value,
+    )
+  return profiles
+
+
 def build_standard_source_profiles(
     *,
     calculated_source_profiles: source_profiles.SourceProfiles,
@@ -134,8 +224,13 @@ def build_standard_source_profiles(
     conductivity: conductivity_base.Conductivity | None = None,
     calculate_anyway: bool = False,
     psi_only: bool = False,
+    precomputed_source_profiles: source_profiles.SourceProfiles | None = None,
 ):
-  """Updates calculated_source_profiles with standard source profiles."""
+  """Updates calculated_source_profiles with standard source profiles.
+
+  Profiles found in `precomputed_source_profiles` are used instead of being
+  computed again, see `add_profile_independent_source_profiles`.
+  """
   def calculate_source(source_name, source):
     static_source_runtime_params = static_runtime_params_slice.sources[
         source_name
@@ -143,14 +238,20 @@ def build_standard_source_profiles(
     if (
         explicit == static_source_runtime_params.is_explicit
     ) | calculate_anyway:
-      value = source.get_value(
-          static_runtime_params_slice,
-          dynamic_runtime_params_slice,
-          geo,
-          core_profiles,
-          calculated_source_profiles,
-          conductivity,
+      value = _get_precomputed_profiles(
+          precomputed_source_profiles,
+          source_name,
+          source.affected_core_profiles,
       )
+      if value is None:
+        value = source.get_value(
+            static_runtime_params_slice,
+            dynamic_runtime_params_slice,
+            geo,
+            core_profiles,
+            calculated_source_profiles,
+            conductivity,
+        )
       _update_standard_source_profiles(
           calculated_source_profiles,
           source_name,
@@ -187,6 +288,31 @@ def build_standard_source_profiles(
     calculate_source(source_name, source)
 
 
+def _get_precomputed_profiles(
+    precomputed_source_profiles: source_profiles.SourceProfiles | None,
+    source_name: str,
+    affected_core_profiles: tuple[source_lib.AffectedCoreProfile, ...],
+) -> tuple[chex.Array, ...] | None:
+  """Returns the precomputed profiles of a source, or None if missing."""
+  if precomputed_source_profiles is None:
+    return None
+  profiles = []
+  for affected_core_profile in affected_core_profiles:
+    match affected_core_profile:
+      case source_lib.AffectedCoreProfile.PSI:
+        source_profiles_dict = precomputed_source_profiles.psi
+      case source_lib.AffectedCoreProfile.NE:
+        source_profiles_dict = precomputed_source_profiles.n_e
+      case source_lib.AffectedCoreProfile.TEMP_ION:
+        source_profiles_dict = precomputed_source_profiles.T_i
+      case source_lib.AffectedCoreProfile.TEMP_EL:
+        source_profiles_dict = precomputed_source_profiles.T_e
+    if source_name not in source_profiles_dict:
+      return None
+    profiles.append(source_profiles_dict[source_name])
+  return tuple(profiles)
+
+
 def _update_standard_source_profiles(
     calculated_source_profiles: source_profiles.SourceProfiles,
     source_name: str,
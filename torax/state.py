@@ -217,12 +217,68 @@ class SolverNumericOutputs:
       across all iterations of the solver.
     sawtooth_crash: True if a sawtooth model is active and the solver step
       corresponds to a sawtooth crash step.
+    transport_evaluations_saved: Estimated number of transport model
+      evaluations avoided by solver iterations at frozen transport
+      coefficients, across all iterations of the solver.
   """
 
   outer_solver_iterations: int = 0
   solver_error_state: int = 0
   inner_solver_iterations: int = 0
   sawtooth_crash: bool = False
+  transport_evaluations_saved: int = 0
+
+
+@chex.dataclass
+class JacobianCache:
+  """Jacobian of the theta-method residual carried over between time steps.
+
+  Used by the Newton-Raphson solver with `jacobian_reuse`, to start a time step
+  from the Jacobian of the previous one.
+
+  Attributes:
+    jacobian: The last Jacobian used by the solver, of shape `(n, n)` with `n`
+      the number of evolving variables times the number of cells.
+    valid: False if `jacobian` is a placeholder which must not be reused, e.g.
+      before the first step or after a failed step.
+  """
+
+  jacobian: jax.Array
+  valid: jax.Array
+
+  @classmethod
+  def placeholder(cls, size: int) -> typing_extensions.Self:
+    """Returns an invalid cache with a Jacobian of shape `(size, size)`."""
+    return cls(
+        jacobian=jnp.zeros((size, size)),
+        valid=jnp.array(False),
+    )
+
+
+@chex.dataclass
+class TimeStepControllerState:
+  """State carried between time steps by error-controlled time stepping.
+
+  Attributes:
+    rate: Mean rate of change of the evolving variables over the last time
+      step, concatenated over the evolving channels.
+    dt: Duration of the last time step.
+    error: Estimated local error of the last time step, relative to the
+      requested tolerance. Zero while it cannot be estimated yet.
+    previous_error: `error` of the time step before the last one.
+    solver_iterations: Number of inner solver iterations of the last time step.
+    backtracked: Whether dt had to be reduced for the last time step to
+      converge.
+    num_steps: Number of time steps solved so far.
+  """
+
+  rate: jax.Array
+  dt: jax.Array
+  error: jax.Array
+  previous_error: jax.Array
+  solver_iterations: jax.Array
+  backtracked: jax.Array
+  num_steps: jax.Array
 
 
 @enum.unique
@@ -233,6 +289,7 @@ class SimError(enum.Enum):
   NAN_DETECTED = 1
   QUASINEUTRALITY_BROKEN = 2
   NEGATIVE_CORE_PROFILES = 3
+  REACHED_MIN_DT = 4
 
   def log_error(self):
     match self:
@@ -245,6 +302,12 @@ class SimError(enum.Enum):
             Simulation stopped due to NaNs in state.
             Output file contains all profiles up to the last valid step.
             """)
+      case SimError.REACHED_MIN_DT:
+        logging.error("""
+            Simulation stopped due to the solver not converging before the
+            adaptive time step reached min_dt.
+            Output file contains all profiles up to the last valid step.
+            """)
       case SimError.QUASINEUTRALITY_BROKEN:
         logging.error("""
             Simulation stopped due to quasineutrality being violated.
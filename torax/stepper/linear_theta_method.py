@@ -42,12 +42,14 @@ class LinearThetaMethod(stepper_lib.Solver):
       core_transport_t: state.CoreTransport,
       explicit_source_profiles: source_profiles.SourceProfiles,
       evolving_names: tuple[str, ...],
+      jacobian_cache_t: state.JacobianCache | None = None,
   ) -> tuple[
       tuple[cell_variable.CellVariable, ...],
       source_profiles.SourceProfiles,
       conductivity_base.Conductivity,
       state.CoreTransport,
       state.SolverNumericOutputs,
+      state.JacobianCache | None,
   ]:
     """See Solver._x_new docstring."""
 
@@ -119,4 +121,5 @@ class LinearThetaMethod(stepper_lib.Solver):
         core_conductivity,
         core_transport,
         solver_numeric_outputs,
+        jacobian_cache_t,
     )
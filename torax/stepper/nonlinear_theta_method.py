@@ -38,6 +38,15 @@ class DynamicOptimizerRuntimeParams(runtime_params.DynamicRuntimeParams):
   loss_tol: float
 
 
+@chex.dataclass(frozen=True)
+class StaticNewtonRaphsonRuntimeParams(runtime_params.StaticRuntimeParams):
+  jacobian_method: enums.JacobianMethod
+  jacobian_bandwidth: int
+  jacobian_reuse: bool
+  broyden_update: bool
+  frozen_transport: bool
+
+
 @chex.dataclass(frozen=True)
 class DynamicNewtonRaphsonRuntimeParams(runtime_params.DynamicRuntimeParams):
   log_iterations: bool
@@ -47,6 +56,27 @@ class DynamicNewtonRaphsonRuntimeParams(runtime_params.DynamicRuntimeParams):
   residual_coarse_tol: float
   delta_reduction_factor: float
   tau_min: float
+  jacobian_reuse_contraction: float
+  frozen_transport_max_iterations: int
+
+
+@chex.dataclass(frozen=True)
+class StaticNewtonKrylovRuntimeParams(runtime_params.StaticRuntimeParams):
+  krylov_method: enums.KrylovMethod
+  krylov_restart: int
+  krylov_max_iterations: int
+
+
+@chex.dataclass(frozen=True)
+class DynamicNewtonKrylovRuntimeParams(runtime_params.DynamicRuntimeParams):
+  log_iterations: bool
+  initial_guess_mode: int
+  maxiter: int
+  residual_tol: float
+  residual_coarse_tol: float
+  delta_reduction_factor: float
+  tau_min: float
+  krylov_tol: float
 
 
 class NonlinearThetaMethod(stepper.Solver):
@@ -76,12 +106,14 @@ class NonlinearThetaMethod(stepper.Solver):
       core_transport_t: state.CoreTransport,
       explicit_source_profiles: source_profiles.SourceProfiles,
       evolving_names: tuple[str, ...],
+      jacobian_cache_t: state.JacobianCache | None = None,
   ) -> tuple[
       tuple[cell_variable.CellVariable, ...],
       source_profiles.SourceProfiles,
       conductivity_base.Conductivity,
       state.CoreTransport,
       state.SolverNumericOutputs,
+      state.JacobianCache | None,
   ]:
     """See Solver._x_new docstring."""
 
@@ -102,6 +134,7 @@ class NonlinearThetaMethod(stepper.Solver):
         core_conductivity,
         core_transport,
         solver_numeric_outputs,
+        jacobian_cache,
     ) = self._x_new_helper(
         dt=dt,
         static_runtime_params_slice=static_runtime_params_slice,
@@ -114,6 +147,7 @@ class NonlinearThetaMethod(stepper.Solver):
         explicit_source_profiles=explicit_source_profiles,
         coeffs_callback=coeffs_callback,
         evolving_names=evolving_names,
+        jacobian_cache_t=jacobian_cache_t,
     )
 
     return (
@@ -122,6 +156,7 @@ class NonlinearThetaMethod(stepper.Solver):
         core_conductivity,
         core_transport,
         solver_numeric_outputs,
+        jacobian_cache,
     )
 
   @abc.abstractmethod
@@ -138,12 +173,14 @@ class NonlinearThetaMethod(stepper.Solver):
       explicit_source_profiles: source_profiles.SourceProfiles,
       coeffs_callback: calc_coeffs.CoeffsCallback,
       evolving_names: tuple[str, ...],
+      jacobian_cache_t: state.JacobianCache | None = None,
   ) -> tuple[
       tuple[cell_variable.CellVariable, ...],
       source_profiles.SourceProfiles,
       conductivity_base.Conductivity,
       state.CoreTransport,
       state.SolverNumericOutputs,
+      state.JacobianCache | None,
   ]:
     """Final implementation of x_new after callback has been created etc."""
     ...
@@ -173,12 +210,14 @@ class OptimizerThetaMethod(NonlinearThetaMethod):
       explicit_source_profiles: source_profiles.SourceProfiles,
       coeffs_callback: calc_coeffs.CoeffsCallback,
       evolving_names: tuple[str, ...],
+      jacobian_cache_t: state.JacobianCache | None = None,
   ) -> tuple[
       tuple[cell_variable.CellVariable, ...],
       source_profiles.SourceProfiles,
       conductivity_base.Conductivity,
       state.CoreTransport,
       state.SolverNumericOutputs,
+      state.JacobianCache | None,
   ]:
     """Final implementation of x_new after callback has been created etc."""
     solver_params = dynamic_runtime_params_slice_t.solver
@@ -216,6 +255,7 @@ class OptimizerThetaMethod(NonlinearThetaMethod):
         core_conductivity,
         core_transport,
         solver_numeric_outputs,
+        jacobian_cache_t,
     )
 
 
@@ -227,6 +267,18 @@ class NewtonRaphsonThetaMethod(NonlinearThetaMethod):
     callback_class: Which class should be used to calculate the coefficients.
   """
 
+  def initial_jacobian_cache(
+      self, geo: geometry.Geometry
+  ) -> state.JacobianCache | None:
+    """See Solver.initial_jacobian_cache docstring."""
+    static_solver_params = self.static_runtime_params_slice.solver
+    assert isinstance(static_solver_params, StaticNewtonRaphsonRuntimeParams)
+    if not static_solver_params.jacobian_reuse or not self.evolving_names:
+      return None
+    return state.JacobianCache.placeholder(
+        len(self.evolving_names) * geo.torax_mesh.nx
+    )
+
   def _x_new_helper(
       self,
       dt: jax.Array,
@@ -240,16 +292,20 @@ class NewtonRaphsonThetaMethod(NonlinearThetaMethod):
       explicit_source_profiles: source_profiles.SourceProfiles,
       coeffs_callback: calc_coeffs.CoeffsCallback,
       evolving_names: tuple[str, ...],
+      jacobian_cache_t: state.JacobianCache | None = None,
   ) -> tuple[
       tuple[cell_variable.CellVariable, ...],
       source_profiles.SourceProfiles,
       conductivity_base.Conductivity,
       state.CoreTransport,
       state.SolverNumericOutputs,
+      state.JacobianCache | None,
   ]:
     """Final implementation of x_new after callback has been created etc."""
     solver_params = dynamic_runtime_params_slice_t.solver
     assert isinstance(solver_params, DynamicNewtonRaphsonRuntimeParams)
+    static_solver_params = static_runtime_params_slice.solver
+    assert isinstance(static_solver_params, StaticNewtonRaphsonRuntimeParams)
     # disable error checking in residual, since Newton-Raphson routine has
     # error checking based on result of each linear step
 
@@ -258,6 +314,93 @@ class NewtonRaphsonThetaMethod(NonlinearThetaMethod):
         x_new,
         solver_numeric_outputs,
         (core_sources, core_conductivity, core_transport),
+        jacobian_cache,
+    ) = newton_raphson_solve_block.newton_raphson_solve_block(
+        dt=dt,
+        static_runtime_params_slice=static_runtime_params_slice,
+        dynamic_runtime_params_slice_t=dynamic_runtime_params_slice_t,
+        dynamic_runtime_params_slice_t_plus_dt=dynamic_runtime_params_slice_t_plus_dt,
+        geo_t=geo_t,
+        geo_t_plus_dt=geo_t_plus_dt,
+        x_old=tuple([core_profiles_t[name] for name in evolving_names]),
+        core_profiles_t=core_profiles_t,
+        core_profiles_t_plus_dt=core_profiles_t_plus_dt,
+        transport_model=self.transport_model,
+        pedestal_model=self.pedestal_model,
+        explicit_source_profiles=explicit_source_profiles,
+        source_models=self.source_models,
+        coeffs_callback=coeffs_callback,
+        evolving_names=evolving_names,
+        log_iterations=solver_params.log_iterations,
+        initial_guess_mode=enums.InitialGuessMode(
+            solver_params.initial_guess_mode
+        ),
+        maxiter=solver_params.maxiter,
+        tol=solver_params.residual_tol,
+        coarse_tol=solver_params.residual_coarse_tol,
+        delta_reduction_factor=solver_params.delta_reduction_factor,
+        tau_min=solver_params.tau_min,
+        jacobian_method=static_solver_params.jacobian_method,
+        jacobian_bandwidth=static_solver_params.jacobian_bandwidth,
+        jacobian_reuse=static_solver_params.jacobian_reuse,
+        jacobian_reuse_contraction=solver_params.jacobian_reuse_contraction,
+        broyden_update=static_solver_params.broyden_update,
+        jacobian_cache=jacobian_cache_t,
+        frozen_transport=static_solver_params.frozen_transport,
+        frozen_transport_maxiter=solver_params.frozen_transport_max_iterations,
+    )
+    return (
+        x_new,
+        core_sources,
+        core_conductivity,
+        core_transport,
+        solver_numeric_outputs,
+        jacobian_cache,
+    )
+
+
+class NewtonKrylovThetaMethod(NonlinearThetaMethod):
+  """Nonlinear theta method using Jacobian-free Newton-Krylov.
+
+  Attributes:
+    transport_model: A TransportModel subclass, calculates transport coeffs.
+    callback_class: Which class should be used to calculate the coefficients.
+  """
+
+  def _x_new_helper(
+      self,
+      dt: jax.Array,
+      static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+      dynamic_runtime_params_slice_t: runtime_params_slice.DynamicRuntimeParamsSlice,
+      dynamic_runtime_params_slice_t_plus_dt: runtime_params_slice.DynamicRuntimeParamsSlice,
+      geo_t: geometry.Geometry,
+      geo_t_plus_dt: geometry.Geometry,
+      core_profiles_t: state.CoreProfiles,
+      core_profiles_t_plus_dt: state.CoreProfiles,
+      explicit_source_profiles: source_profiles.SourceProfiles,
+      coeffs_callback: calc_coeffs.CoeffsCallback,
+      evolving_names: tuple[str, ...],
+      jacobian_cache_t: state.JacobianCache | None = None,
+  ) -> tuple[
+      tuple[cell_variable.CellVariable, ...],
+      source_profiles.SourceProfiles,
+      conductivity_base.Conductivity,
+      state.CoreTransport,
+      state.SolverNumericOutputs,
+      state.JacobianCache | None,
+  ]:
+    """Final implementation of x_new after callback has been created etc."""
+    solver_params = dynamic_runtime_params_slice_t.solver
+    assert isinstance(solver_params, DynamicNewtonKrylovRuntimeParams)
+    static_solver_params = static_runtime_params_slice.solver
+    assert isinstance(static_solver_params, StaticNewtonKrylovRuntimeParams)
+
+    # Unpack the outputs of the newton_raphson_solve_block.
+    (
+        x_new,
+        solver_numeric_outputs,
+        (core_sources, core_conductivity, core_transport),
+        _,
     ) = newton_raphson_solve_block.newton_raphson_solve_block(
         dt=dt,
         static_runtime_params_slice=static_runtime_params_slice,
@@ -283,6 +426,10 @@ class NewtonRaphsonThetaMethod(NonlinearThetaMethod):
         coarse_tol=solver_params.residual_coarse_tol,
         delta_reduction_factor=solver_params.delta_reduction_factor,
         tau_min=solver_params.tau_min,
+        krylov_method=static_solver_params.krylov_method,
+        krylov_tol=solver_params.krylov_tol,
+        krylov_restart=static_solver_params.krylov_restart,
+        krylov_maxiter=static_solver_params.krylov_max_iterations,
     )
     return (
         x_new,
@@ -290,4 +437,5 @@ class NewtonRaphsonThetaMethod(NonlinearThetaMethod):
         core_conductivity,
         core_transport,
         solver_numeric_outputs,
+        jacobian_cache_t,
     )
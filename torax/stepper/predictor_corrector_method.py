@@ -86,6 +86,9 @@ def predictor_corrector_method(
         convection_neumann_mode=(
             static_runtime_params_slice.solver.convection_neumann_mode
         ),
+        linear_solve_method=(
+            static_runtime_params_slice.solver.linear_solve_method
+        ),
     )
 
   # jax.lax.fori_loop jits the function by default. Need to explicitly avoid
@@ -14,6 +14,7 @@
 
 """Pydantic config for Stepper."""
 import abc
+import dataclasses
 import functools
 from typing import Literal
 
@@ -28,6 +29,7 @@ from torax.stepper import runtime_params
 from torax.stepper import stepper as solver_lib
 from torax.torax_pydantic import torax_pydantic
 from torax.transport_model import transport_model as transport_model_lib
+import typing_extensions
 
 # pylint: disable=invalid-name
 
@@ -50,6 +52,13 @@ class BaseSolver(torax_pydantic.BaseModelFrozen, abc.ABC):
       the nonlinear solver for the optional initial guess from the linear solver
     chi_pereverzev: (deliberately) large heat conductivity for Pereverzev rule.
     D_pereverzev: (deliberately) large particle diffusion for Pereverzev rule.
+    linear_solve_method: Method for solving the linear systems of the theta
+      method. `dense` uses a dense LU solve. `block_tridiagonal` uses the block
+      Thomas algorithm, which scales linearly with the number of cells and is
+      exact for the linear solver. For the Newton-Raphson solver, Jacobian
+      entries coupling cells further apart than nearest neighbours (e.g. from
+      transport smoothing or non-local sources) are dropped, giving an inexact
+      Newton step.
   """
 
   theta_implicit: torax_pydantic.UnitInterval = 1.0
@@ -62,6 +71,7 @@ class BaseSolver(torax_pydantic.BaseModelFrozen, abc.ABC):
   use_pereverzev: bool = False
   chi_pereverzev: pydantic.PositiveFloat = 20.0
   D_pereverzev: pydantic.NonNegativeFloat = 10.0
+  linear_solve_method: enums.LinearSolveMethod = enums.LinearSolveMethod.DENSE
 
   @property
   @abc.abstractmethod
@@ -76,6 +86,7 @@ class BaseSolver(torax_pydantic.BaseModelFrozen, abc.ABC):
         convection_neumann_mode=self.convection_neumann_mode,
         use_pereverzev=self.use_pereverzev,
         use_predictor_corrector=self.use_predictor_corrector,
+        linear_solve_method=self.linear_solve_method,
     )
 
   @abc.abstractmethod
@@ -144,6 +155,30 @@ class NewtonRaphsonThetaMethod(BaseSolver):
     delta_reduction_factor: The delta reduction factor for the Newton-Raphson
       solver.
     tau_min: The minimum value of tau for the Newton-Raphson solver.
+    jacobian_method: How the Jacobian of the residual is computed. `dense`
+      differentiates with respect to each unknown. `colored` recovers the
+      Jacobian from a number of compressed Jacobian-vector products independent
+      of the grid size, using the banded structure of the residual, and applies
+      the transport smoothing exactly.
+    jacobian_bandwidth: For the `colored` Jacobian, the number of neighbouring
+      cells on each side through which the residual in a cell depends on the
+      profiles, excluding the transport smoothing. Couplings further away are
+      lumped into the computed entries, making the Newton step inexact.
+    jacobian_reuse: If True, use a modified Newton method which reuses the
+      Jacobian and its factorization across iterations and time steps, and
+      only evaluates it afresh when the residual stops contracting quickly
+      enough.
+    jacobian_reuse_contraction: With `jacobian_reuse`, the Jacobian is
+      evaluated afresh after an iteration which reduced the mean absolute
+      residual by less than this factor.
+    broyden_update: With `jacobian_reuse`, improve the reused Jacobian with a
+      Broyden rank-one update after each iteration.
+    frozen_transport: If True, start each solve with outer fixed-point
+      iterations on the transport coefficients, each followed by Newton
+      iterations at frozen transport coefficients, which neither evaluate nor
+      differentiate the transport model.
+    frozen_transport_max_iterations: With `frozen_transport`, the maximum
+      number of outer iterations per solve.
   """
 
   solver_type: Literal['newton_raphson'] = 'newton_raphson'
@@ -154,11 +189,38 @@ class NewtonRaphsonThetaMethod(BaseSolver):
   residual_coarse_tol: float = 1e-2
   delta_reduction_factor: float = 0.5
   tau_min: float = 0.01
+  jacobian_method: enums.JacobianMethod = enums.JacobianMethod.DENSE
+  jacobian_bandwidth: pydantic.PositiveInt = 2
+  jacobian_reuse: bool = False
+  jacobian_reuse_contraction: pydantic.PositiveFloat = 0.5
+  broyden_update: bool = False
+  frozen_transport: bool = False
+  frozen_transport_max_iterations: pydantic.PositiveInt = 10
+
+  @pydantic.model_validator(mode='after')
+  def _check_frozen_transport(self) -> typing_extensions.Self:
+    if self.frozen_transport and self.jacobian_reuse:
+      raise ValueError(
+          'frozen_transport is not supported together with jacobian_reuse.'
+      )
+    return self
 
   @property
   def linear_solver(self) -> bool:
     return self.initial_guess_mode == enums.InitialGuessMode.LINEAR
 
+  def build_static_params(
+      self,
+  ) -> nonlinear_theta_method.StaticNewtonRaphsonRuntimeParams:
+    return nonlinear_theta_method.StaticNewtonRaphsonRuntimeParams(
+        **dataclasses.asdict(super().build_static_params()),
+        jacobian_method=self.jacobian_method,
+        jacobian_bandwidth=self.jacobian_bandwidth,
+        jacobian_reuse=self.jacobian_reuse,
+        broyden_update=self.broyden_update,
+        frozen_transport=self.frozen_transport,
+    )
+
   @functools.cached_property
   def build_dynamic_params(
       self,
@@ -174,6 +236,8 @@ class NewtonRaphsonThetaMethod(BaseSolver):
         n_corrector_steps=self.n_corrector_steps,
         delta_reduction_factor=self.delta_reduction_factor,
         tau_min=self.tau_min,
+        jacobian_reuse_contraction=self.jacobian_reuse_contraction,
+        frozen_transport_max_iterations=self.frozen_transport_max_iterations,
     )
 
   def build_solver(
@@ -191,6 +255,90 @@ class NewtonRaphsonThetaMethod(BaseSolver):
     )
 
 
+class NewtonKrylovThetaMethod(BaseSolver):
+  """Model for the Jacobian-free Newton-Krylov solver.
+
+  Same as the Newton-Raphson solver, except that the Jacobian is never formed.
+  Each Newton update is solved with a Krylov method using Jacobian-vector
+  products of the residual, preconditioned by the linear theta-method matrix.
+
+  Attributes:
+    solver_type: The type of solver to use, hardcoded to 'newton_krylov'.
+    log_iterations: If True, log internal iterations in the Newton solver.
+    initial_guess_mode: The initial guess mode for the Newton solver.
+    n_max_iterations: The maximum number of Newton iterations.
+    residual_tol: The tolerance for the Newton solver.
+    residual_coarse_tol: The coarse tolerance for the Newton solver.
+    delta_reduction_factor: The delta reduction factor for the Newton solver.
+    tau_min: The minimum value of tau for the Newton solver.
+    krylov_method: The Krylov method, `gmres` or `bicgstab`.
+    krylov_tol: The relative tolerance of the Krylov solve of each Newton
+      update.
+    krylov_restart: The size of the Krylov subspace before GMRES restarts.
+    krylov_max_iterations: The maximum number of Krylov iterations per Newton
+      update. For GMRES, the maximum number of restarts.
+  """
+
+  solver_type: Literal['newton_krylov'] = 'newton_krylov'
+  log_iterations: bool = False
+  initial_guess_mode: enums.InitialGuessMode = enums.InitialGuessMode.LINEAR
+  n_max_iterations: pydantic.NonNegativeInt = 30
+  residual_tol: float = 1e-5
+  residual_coarse_tol: float = 1e-2
+  delta_reduction_factor: float = 0.5
+  tau_min: float = 0.01
+  krylov_method: enums.KrylovMethod = enums.KrylovMethod.GMRES
+  krylov_tol: pydantic.PositiveFloat = 1e-6
+  krylov_restart: pydantic.PositiveInt = 20
+  krylov_max_iterations: pydantic.PositiveInt = 20
+
+  @property
+  def linear_solver(self) -> bool:
+    return self.initial_guess_mode == enums.InitialGuessMode.LINEAR
+
+  def build_static_params(
+      self,
+  ) -> nonlinear_theta_method.StaticNewtonKrylovRuntimeParams:
+    return nonlinear_theta_method.StaticNewtonKrylovRuntimeParams(
+        **dataclasses.asdict(super().build_static_params()),
+        krylov_method=self.krylov_method,
+        krylov_restart=self.krylov_restart,
+        krylov_max_iterations=self.krylov_max_iterations,
+    )
+
+  @functools.cached_property
+  def build_dynamic_params(
+      self,
+  ) -> nonlinear_theta_method.DynamicNewtonKrylovRuntimeParams:
+    return nonlinear_theta_method.DynamicNewtonKrylovRuntimeParams(
+        chi_pereverzev=self.chi_pereverzev,
+        D_pereverzev=self.D_pereverzev,
+        log_iterations=self.log_iterations,
+        initial_guess_mode=self.initial_guess_mode.value,
+        maxiter=self.n_max_iterations,
+        residual_tol=self.residual_tol,
+        residual_coarse_tol=self.residual_coarse_tol,
+        n_corrector_steps=self.n_corrector_steps,
+        delta_reduction_factor=self.delta_reduction_factor,
+        tau_min=self.tau_min,
+        krylov_tol=self.krylov_tol,
+    )
+
+  def build_solver(
+      self,
+      static_runtime_params_slice: runtime_params_slice.StaticRuntimeParamsSlice,
+      transport_model: transport_model_lib.TransportModel,
+      source_models: source_models_lib.SourceModels,
+      pedestal_model: pedestal_model_lib.PedestalModel,
+  ) -> nonlinear_theta_method.NewtonKrylovThetaMethod:
+    return nonlinear_theta_method.NewtonKrylovThetaMethod(
+        static_runtime_params_slice=static_runtime_params_slice,
+        transport_model=transport_model,
+        source_models=source_models,
+        pedestal_model=pedestal_model,
+    )
+
+
 class OptimizerThetaMethod(BaseSolver):
   """Model for nonlinear OptimizerThetaMethod solver.
 
@@ -239,5 +387,8 @@ class OptimizerThetaMethod(BaseSolver):
 
 
 SolverConfig = (
-    LinearThetaMethod | NewtonRaphsonThetaMethod | OptimizerThetaMethod
+    LinearThetaMethod
+    | NewtonRaphsonThetaMethod
+    | NewtonKrylovThetaMethod
+    | OptimizerThetaMethod
 )
@@ -13,6 +13,7 @@
 # limitations under the License.
 """Runtime params for the stepper."""
 import chex
+from torax.fvm import enums
 
 
 @chex.dataclass(frozen=True)
@@ -24,6 +25,7 @@ class StaticRuntimeParams:
   convection_neumann_mode: str
   use_pereverzev: bool
   use_predictor_corrector: bool
+  linear_solve_method: enums.LinearSolveMethod
 
 
 @chex.dataclass(frozen=True)
@@ -89,6 +89,7 @@ class Solver(abc.ABC):
       core_sources_t: source_profiles.SourceProfiles,
       core_transport_t: state.CoreTransport,
       explicit_source_profiles: source_profiles.SourceProfiles,
+      jacobian_cache_t: state.JacobianCache | None = None,
   ) -> tuple[
       tuple[cell_variable.CellVariable, ...],
       sim_state.ToraxSimState,
@@ -122,6 +123,8 @@ class Solver(abc.ABC):
         or were independent of the core profiles. Because they were calculated
         outside the possibly-JAX-jitted solver logic, they can be calculated in
         non-JAX-friendly ways.
+      jacobian_cache_t: Jacobian carried over from the previous time step, see
+        `initial_jacobian_cache`.
 
     Returns:
       x_new: Tuple containing new cell-grid values of the evolving variables.
@@ -133,6 +136,22 @@ class Solver(abc.ABC):
     # This base class method can be completely overriden by a subclass, but
     # most can make use of the boilerplate here and just implement `_x_new`.
 
+    # The implicit profiles which don't depend on the core profiles are the
+    # same in every iteration of the solver, so they are computed once here.
+    # With theta_implicit < 1, the coefficients at time t also use the implicit
+    # profiles, at time t, so they are not precomputed.
+    if static_runtime_params_slice.solver.theta_implicit == 1.0:
+      explicit_source_profiles = (
+          source_profile_builders.add_profile_independent_source_profiles(
+              static_runtime_params_slice=static_runtime_params_slice,
+              dynamic_runtime_params_slice_t_plus_dt=dynamic_runtime_params_slice_t_plus_dt,
+              geo_t_plus_dt=geo_t_plus_dt,
+              core_profiles_t_plus_dt=core_profiles_t_plus_dt,
+              source_models=self.source_models,
+              explicit_source_profiles=explicit_source_profiles,
+          )
+      )
+
     # Don't call solver functions on an empty list
     if self.evolving_names:
       (
@@ -141,6 +160,7 @@ class Solver(abc.ABC):
           core_conductivity,
           core_transport,
           solver_numeric_output,
+          jacobian_cache,
       ) = self._x_new(
           dt=dt,
           static_runtime_params_slice=static_runtime_params_slice,
@@ -154,6 +174,7 @@ class Solver(abc.ABC):
           core_transport_t=core_transport_t,
           explicit_source_profiles=explicit_source_profiles,
           evolving_names=self.evolving_names,
+          jacobian_cache_t=jacobian_cache_t,
       )
     else:
       x_new = tuple()
@@ -178,6 +199,7 @@ class Solver(abc.ABC):
       )
       core_transport = state.CoreTransport.zeros(geo_t)
       solver_numeric_output = state.SolverNumericOutputs()
+      jacobian_cache = jacobian_cache_t
 
     core_profiles_t_plus_dt = dataclasses.replace(
         core_profiles_t_plus_dt,
@@ -193,6 +215,7 @@ class Solver(abc.ABC):
         core_sources=core_sources,
         geometry=geo_t_plus_dt,
         solver_numeric_outputs=solver_numeric_output,
+        jacobian_cache=jacobian_cache,
     )
 
     return (
@@ -200,6 +223,24 @@ class Solver(abc.ABC):
         intermediate_state,
     )
 
+  def initial_jacobian_cache(
+      self, geo: geometry.Geometry
+  ) -> state.JacobianCache | None:
+    """Returns the Jacobian cache of the initial state.
+
+    Solvers which carry their Jacobian over between time steps return a
+    placeholder with the shape of their Jacobian, so that the simulation state
+    keeps the same structure over all time steps.
+
+    Args:
+      geo: Geometry of the torus.
+
+    Returns:
+      The initial `jacobian_cache_t`, None if the solver does not use it.
+    """
+    del geo  # Unused.
+    return None
+
   def _x_new(
       self,
       dt: jax.Array,
@@ -214,12 +255,14 @@ class Solver(abc.ABC):
       core_transport_t: state.CoreTransport,
       explicit_source_profiles: source_profiles.SourceProfiles,
       evolving_names: tuple[str, ...],
+      jacobian_cache_t: state.JacobianCache | None = None,
   ) -> tuple[
       tuple[cell_variable.CellVariable, ...],
       source_profiles.SourceProfiles,
       conductivity_base.Conductivity,
       state.CoreTransport,
       state.SolverNumericOutputs,
+      state.JacobianCache | None,
   ]:
     """Calculates new values of the changing variables.
 
@@ -247,6 +290,7 @@ class Solver(abc.ABC):
       core_transport_t: transport coefficients at time t.
       explicit_source_profiles: see the docstring of __call__
       evolving_names: The names of core_profiles variables that should evolve.
+      jacobian_cache_t: see the docstring of __call__
 
     Returns:
       x_new: The values of the evolving variables at time t + dt.
@@ -254,6 +298,8 @@ class Solver(abc.ABC):
       core_conductivity: Conductivity for time t+dt.
       core_transport: Transport coefficients for time t+dt.
       solver_numeric_output: Error and iteration info.
+      jacobian_cache: Jacobian to carry over to the next time step. Solvers
+        which do not use it return `jacobian_cache_t`.
     """
 
     raise NotImplementedError(
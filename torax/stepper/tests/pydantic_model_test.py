@@ -15,6 +15,7 @@ from unittest import mock
 from absl.testing import absltest
 from absl.testing import parameterized
 from torax.config import runtime_params_slice
+from torax.fvm import enums
 from torax.sources import source_models as source_models_lib
 from torax.stepper import linear_theta_method
 from torax.stepper import nonlinear_theta_method
@@ -35,6 +36,11 @@ class PydanticModelTest(parameterized.TestCase):
           solver_type='newton_raphson',
           expected_type=nonlinear_theta_method.NewtonRaphsonThetaMethod,
       ),
+      dict(
+          testcase_name='newton_krylov',
+          solver_type='newton_krylov',
+          expected_type=nonlinear_theta_method.NewtonKrylovThetaMethod,
+      ),
       dict(
           testcase_name='optimizer',
           solver_type='optimizer',
@@ -72,6 +78,82 @@ class PydanticModelTest(parameterized.TestCase):
     self.assertIsInstance(solver, expected_type)
     self.assertEqual(torax_config.solver.theta_implicit, 0.5)
 
+  def test_newton_raphson_static_params(self):
+    config = default_configs.get_default_config_dict()
+    config['solver'] = {
+        'solver_type': 'newton_raphson',
+        'jacobian_method': 'colored',
+        'jacobian_bandwidth': 3,
+    }
+    torax_config = model_config.ToraxConfig.from_dict(config)
+
+    static_params = torax_config.solver.build_static_params()
+
+    self.assertIsInstance(
+        static_params, nonlinear_theta_method.StaticNewtonRaphsonRuntimeParams
+    )
+    self.assertEqual(static_params.jacobian_method, enums.JacobianMethod.COLORED)
+    self.assertEqual(static_params.jacobian_bandwidth, 3)
+    self.assertFalse(static_params.jacobian_reuse)
+    self.assertFalse(static_params.broyden_update)
+
+  def test_newton_raphson_jacobian_reuse_params(self):
+    config = default_configs.get_default_config_dict()
+    config['solver'] = {
+        'solver_type': 'newton_raphson',
+        'jacobian_reuse': True,
+        'jacobian_reuse_contraction': 0.8,
+        'broyden_update': True,
+    }
+    torax_config = model_config.ToraxConfig.from_dict(config)
+
+    static_params = torax_config.solver.build_static_params()
+    dynamic_params = torax_config.solver.build_dynamic_params
+
+    self.assertTrue(static_params.jacobian_reuse)
+    self.assertTrue(static_params.broyden_update)
+    self.assertEqual(dynamic_params.jacobian_reuse_contraction, 0.8)
+
+  def test_newton_raphson_frozen_transport_params(self):
+    config = default_configs.get_default_config_dict()
+    config['solver'] = {
+        'solver_type': 'newton_raphson',
+        'frozen_transport': True,
+        'frozen_transport_max_iterations': 5,
+    }
+    torax_config = model_config.ToraxConfig.from_dict(config)
+
+    static_params = torax_config.solver.build_static_params()
+    dynamic_params = torax_config.solver.build_dynamic_params
+
+    self.assertTrue(static_params.frozen_transport)
+    self.assertEqual(dynamic_params.frozen_transport_max_iterations, 5)
+
+    config['solver']['jacobian_reuse'] = True
+    with self.assertRaisesRegex(ValueError, 'frozen_transport'):
+      model_config.ToraxConfig.from_dict(config)
+
+  def test_newton_krylov_params(self):
+    config = default_configs.get_default_config_dict()
+    config['solver'] = {
+        'solver_type': 'newton_krylov',
+        'krylov_method': 'bicgstab',
+        'krylov_tol': 1e-4,
+        'krylov_max_iterations': 50,
+    }
+    torax_config = model_config.ToraxConfig.from_dict(config)
+
+    static_params = torax_config.solver.build_static_params()
+    dynamic_params = torax_config.solver.build_dynamic_params
+
+    self.assertIsInstance(
+        static_params, nonlinear_theta_method.StaticNewtonKrylovRuntimeParams
+    )
+    self.assertEqual(static_params.krylov_method, enums.KrylovMethod.BICGSTAB)
+    self.assertEqual(static_params.krylov_restart, 20)
+    self.assertEqual(static_params.krylov_max_iterations, 50)
+    self.assertEqual(dynamic_params.krylov_tol, 1e-4)
+
 
 if __name__ == '__main__':
   absltest.main()
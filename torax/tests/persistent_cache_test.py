@@ -22,6 +22,7 @@ import subprocess
 from absl.testing import absltest
 from absl.testing import parameterized
 from torax import run_simulation_main
+from torax.output_tools import output
 import torax
 
 
@@ -162,6 +163,42 @@ class PersistentCacheTest(parameterized.TestCase):
 
       raise AssertionError(msg.getvalue())
 
+  def test_prewarm_cache(self):
+    """Test that a run after --prewarm_cache loads all programs from cache."""
+    cache = self.create_tempdir('cache').full_path
+    output_dir = self.create_tempdir('output').full_path
+    run_simulation_main_path = os.path.join(
+        torax.__path__[0], 'run_simulation_main.py'
+    )
+    command = [
+        'python3',
+        run_simulation_main_path,
+        '--config=tests/test_data/test_iterhybrid_rampup_short.py',
+    ]
+    new_env = dict(os.environ)
+    new_env['TORAX_COMPILATION_CACHE_DIR'] = cache
+    # Errors use callbacks, which can't be serialized to the persistent cache.
+    new_env['TORAX_ERRORS_ENABLED'] = 'False'
+
+    subprocess.run(
+        command + ['--prewarm_cache'], env=new_env, check=True
+    )
+    self.assertNotEmpty(os.listdir(cache))
+    subprocess.run(
+        command + ['--quit', f'--output_dir={output_dir}'],
+        env=new_env,
+        check=True,
+    )
+
+    [output_file] = os.listdir(output_dir)
+    data_tree = output.load_state_file(os.path.join(output_dir, output_file))
+    self.assertGreater(
+        data_tree.numerics[output.COMPILATION_CACHE_HITS].values, 0
+    )
+    self.assertEqual(
+        data_tree.numerics[output.COMPILATION_CACHE_MISSES].values, 0
+    )
+
 
 if __name__ == '__main__':
   absltest.main()
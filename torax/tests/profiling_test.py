@@ -0,0 +1,66 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from absl.testing import absltest
+import jax
+from jax import numpy as jnp
+from torax import profiling
+
+
+class ProfilingTest(absltest.TestCase):
+
+  def test_timed_records_only_while_tracking(self):
+    profiling.timed('untracked', jnp.ones, 3)
+    with profiling.track_performance() as stats:
+      output = profiling.timed('ones', jnp.ones, 3)
+      profiling.timed('ones', jnp.ones, 4)
+      profiling.increment(profiling.NEWTON_ITERATIONS, 2)
+      profiling.increment(profiling.NEWTON_ITERATIONS)
+    profiling.timed('ones', jnp.ones, 5)
+    profiling.increment(profiling.NEWTON_ITERATIONS)
+
+    self.assertEqual(output.shape, (3,))
+    self.assertEqual(stats.stages, ('ones',))
+    self.assertEqual(stats.stage_calls, {'ones': 2})
+    self.assertGreater(stats.stage_times['ones'], 0.0)
+    self.assertEqual(stats.counters, {profiling.NEWTON_ITERATIONS: 3})
+    self.assertGreaterEqual(stats.wall_clock_time, stats.stage_times['ones'])
+
+  def test_traced_stages_are_not_timed(self):
+    @jax.jit
+    def f(x):
+      return profiling.timed('inner', jnp.sin, x)
+
+    with profiling.track_performance() as stats:
+      profiling.timed('outer', f, jnp.ones(3))
+
+    self.assertEqual(stats.stage_calls, {'outer': 1})
+
+  def test_counts_compiles(self):
+    f = jax.jit(lambda x: x + 1)
+    g = jax.jit(lambda x: x * 2)
+    f(jnp.ones(1))
+
+    with profiling.track_performance(
+        [('stage', f), ('stage', g), ('unused', jax.jit(lambda x: x))]
+    ) as stats:
+      f(jnp.ones(1))
+      f(jnp.ones(2))
+      g(jnp.ones(3))
+
+    self.assertEqual(stats.stage_compiles, {'stage': 2, 'unused': 0})
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,265 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Script to benchmark the performance of a curated set of test_data configs.
+
+Each config is run in a fresh process, several times. The first run includes
+tracing and compilation, the following runs only execute the compiled code.
+The following metrics are recorded for each config:
+
+* compile_time: Time of the first run minus the time of the fastest later run,
+  in seconds.
+* step_time: Time per time step of the fastest later run, in seconds.
+* num_steps: Number of time steps.
+* newton_iterations: Total number of inner solver iterations.
+* peak_rss_mb: Peak resident set size of the process, in MB.
+* output_size_mb: Size of the netCDF output file, in MB.
+
+The results are written to a JSON file. If a baseline JSON file, written by an
+earlier run of this script, is given, the results are compared against it and
+the script exits with a non-zero status if any metric regressed by more than
+its threshold.
+"""
+
+from collections.abc import Mapping, Sequence
+import datetime
+import functools
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from typing import Any
+
+from absl import app
+from absl import flags
+import jax
+import numpy as np
+import torax
+from torax.config import config_loader
+from torax.orchestration import run_simulation
+from torax.tests.test_lib import paths
+from torax.torax_pydantic import model_config
+
+import multiprocessing
+
+
+# Covers circular vs CHEASE geometry, linear vs Newton-Raphson vs optimizer
+# solvers and constant vs QLKNN transport.
+_DEFAULT_CONFIGS = (
+    'test_implicit',  # Circular, linear, constant transport.
+    'test_chease',  # CHEASE, linear, constant transport.
+    'test_psi_and_heat',  # Circular, linear, QLKNN.
+    'test_implicit_short_optimizer',  # Circular, optimizer, constant.
+    'test_iterhybrid_rampup',  # CHEASE, Newton-Raphson, QLKNN.
+    'test_iterhybrid_predictor_corrector',  # CHEASE, predictor-corrector.
+)
+
+# Relative increase of each metric above which it is a regression.
+_DEFAULT_THRESHOLDS = {
+    'compile_time': 0.25,
+    'step_time': 0.15,
+    'num_steps': 0.0,
+    'newton_iterations': 0.05,
+    'peak_rss_mb': 0.2,
+    'output_size_mb': 0.1,
+}
+# Absolute increase of each metric below which it is not a regression, to
+# avoid flagging timing noise of fast configs.
+_ABSOLUTE_TOLERANCES = {
+    'compile_time': 1.0,
+    'step_time': 1e-3,
+    'num_steps': 0,
+    'newton_iterations': 0,
+    'peak_rss_mb': 50.0,
+    'output_size_mb': 0.1,
+}
+
+_CONFIGS = flags.DEFINE_list(
+    'configs',
+    list(_DEFAULT_CONFIGS),
+    'Names of the test_data configs to benchmark.',
+)
+_OUTPUT_FILE = flags.DEFINE_string(
+    'output_file',
+    '/tmp/torax_performance_benchmarks.json',
+    'Where to save the benchmark results.',
+)
+_BASELINE_FILE = flags.DEFINE_string(
+    'baseline_file',
+    None,
+    'Results of an earlier run of this script to compare against.',
+)
+_THRESHOLDS = flags.DEFINE_list(
+    'thresholds',
+    [],
+    'Overrides of the regression thresholds, as metric=relative_increase, e.g.'
+    f' step_time=0.1. Defaults: {_DEFAULT_THRESHOLDS}.',
+)
+_NUM_REPEATS = flags.DEFINE_integer(
+    'num_repeats',
+    2,
+    'Number of runs after the first one, used to measure the step time.',
+)
+
+
+def _benchmark(
+    config_name: str, test_data_dir: str, num_repeats: int
+) -> dict[str, float]:
+  """Benchmarks a single config. Called in a fresh process."""
+  flags.FLAGS.mark_as_parsed()
+  print(f'Benchmarking {config_name}')
+  path = os.path.join(test_data_dir, config_name + '.py')
+  config_module = config_loader.import_module(path)
+  if 'CONFIG' not in config_module:
+    raise ValueError(
+        f'Config module {config_name} must define a CONFIG dictionary.'
+    )
+  torax_config = model_config.ToraxConfig.from_dict(config_module['CONFIG'])
+
+  start_time = time.perf_counter()
+  history = run_simulation.run_simulation(torax_config, progress_bar=False)
+  first_run_time = time.perf_counter() - start_time
+  run_times = []
+  for _ in range(num_repeats):
+    start_time = time.perf_counter()
+    run_simulation.run_simulation(torax_config, progress_bar=False)
+    run_times.append(time.perf_counter() - start_time)
+  run_time = min(run_times)
+
+  with tempfile.TemporaryDirectory() as output_dir:
+    output_file = os.path.join(output_dir, 'state_history.nc')
+    history.simulation_output_to_xr().to_netcdf(output_file)
+    output_size = os.path.getsize(output_file)
+
+  num_steps = len(history.times) - 1
+  return {
+      'compile_time': first_run_time - run_time,
+      'step_time': run_time / max(num_steps, 1),
+      'num_steps': num_steps,
+      'newton_iterations': int(
+          np.sum(history.solver_numeric_outputs.inner_solver_iterations[1:])
+      ),
+      # ru_maxrss is in kB on Linux.
+      'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+      'output_size_mb': output_size / 1024**2,
+  }
+
+
+def _parse_thresholds(overrides: Sequence[str]) -> dict[str, float]:
+  """Returns the default thresholds updated with the given overrides."""
+  thresholds = dict(_DEFAULT_THRESHOLDS)
+  for override in overrides:
+    metric, sep, value = override.partition('=')
+    if not sep or metric not in thresholds:
+      raise app.UsageError(
+          f'Invalid threshold {override}, expected metric=value with metric'
+          f' one of {list(thresholds)}.'
+      )
+    thresholds[metric] = float(value)
+  return thresholds
+
+
+def _compare(
+    benchmarks: Mapping[str, Mapping[str, float]],
+    baseline_benchmarks: Mapping[str, Mapping[str, float]],
+    thresholds: Mapping[str, float],
+) -> list[str]:
+  """Prints the change of each metric and returns the regressions."""
+  regressions = []
+  for config_name, metrics in benchmarks.items():
+    if config_name not in baseline_benchmarks:
+      print(f'{config_name}: not in baseline, skipping comparison.')
+      continue
+    print(f'{config_name}:')
+    baseline_metrics = baseline_benchmarks[config_name]
+    for metric, threshold in thresholds.items():
+      if metric not in metrics or metric not in baseline_metrics:
+        continue
+      value = metrics[metric]
+      baseline_value = baseline_metrics[metric]
+      increase = value - baseline_value
+      relative_increase = increase / baseline_value if baseline_value else 0.0
+      regressed = (
+          increase > _ABSOLUTE_TOLERANCES[metric]
+          and increase > threshold * abs(baseline_value)
+      )
+      print(
+          f'  {metric}: {baseline_value:.4g} -> {value:.4g}'
+          f' ({relative_increase:+.1%})'
+          + (' REGRESSION' if regressed else '')
+      )
+      if regressed:
+        regressions.append(
+            f'{config_name} {metric}: {baseline_value:.4g} -> {value:.4g}'
+            f' ({relative_increase:+.1%}, threshold {threshold:.1%})'
+        )
+  return regressions
+
+
+def _metadata() -> dict[str, Any]:
+  return {
+      'torax_version': torax.__version__,
+      'jax_version': jax.__version__,
+      'python_version': platform.python_version(),
+      'platform': platform.platform(),
+      'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+  }
+
+
+def main(argv: Sequence[str]) -> int:
+  if len(argv) > 1:
+    raise app.UsageError('Too many command-line arguments.')
+  thresholds = _parse_thresholds(_THRESHOLDS.value)
+  benchmark = functools.partial(
+      _benchmark,
+      test_data_dir=paths.test_data_dir(),
+      num_repeats=_NUM_REPEATS.value,
+  )
+  # Important to use 'spawn' over 'forkserver' as JAX is not fork-safe. The
+  # configs are run one at a time, each in a fresh process, so that they do
+  # not share compilation caches or compete for the CPU, and the peak memory
+  # is measured per config.
+  mp_context = multiprocessing.get_context('spawn')
+  with mp_context.Pool(processes=1, maxtasksperchild=1) as pool:
+    results = pool.map(benchmark, _CONFIGS.value, chunksize=1)
+  benchmarks = dict(zip(_CONFIGS.value, results))
+
+  output = {'metadata': _metadata(), 'benchmarks': benchmarks}
+  output_dir = os.path.dirname(_OUTPUT_FILE.value)
+  if output_dir:
+    os.makedirs(output_dir, exist_ok=True)
+  with open(_OUTPUT_FILE.value, 'w') as f:
+    json.dump(output, f, indent=2)
+  print(f'Benchmark results saved to {_OUTPUT_FILE.value}')
+
+  if _BASELINE_FILE.value is None:
+    return 0
+  with open(_BASELINE_FILE.value) as f:
+    baseline = json.load(f)
+  print(f'Comparing against baseline {_BASELINE_FILE.value}')
+  print(f'Baseline metadata: {baseline.get("metadata")}')
+  regressions = _compare(benchmarks, baseline['benchmarks'], thresholds)
+  if regressions:
+    print('Performance regressions:', file=sys.stderr)
+    for regression in regressions:
+      print(f'  {regression}', file=sys.stderr)
+    return 1
+  print('No performance regressions.')
+  return 0
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -177,6 +177,16 @@ class SimTest(sim_test_case.SimTestCase):
           'test_iterhybrid_predictor_corrector_eqdsk',
           'test_iterhybrid_predictor_corrector_eqdsk.py',
       ),
+      # Predictor-corrector solver with block-tridiagonal linear solves. The
+      # linear systems are block-tridiagonal, so this matches the dense solve.
+      (
+          'test_iterhybrid_predictor_corrector_block_tridiagonal',
+          'test_iterhybrid_predictor_corrector_block_tridiagonal.py',
+          _ALL_PROFILES,
+          None,
+          None,
+          'test_iterhybrid_predictor_corrector.nc',
+      ),
       # Predictor-corrector solver with clipped QLKNN inputs.
       (
           'test_iterhybrid_predictor_corrector_clip_inputs',
@@ -355,6 +365,55 @@ class SimTest(sim_test_case.SimTestCase):
             )
             raise AssertionError(msg)
 
+  def test_jacobian_reuse_matches_newton_raphson(self):
+    """Tests that reusing the Jacobian converges to the same solution."""
+    results = []
+    for broyden_update in (None, False, True):
+      torax_config = self._get_torax_config('test_iterhybrid_rampup.py')
+      torax_config.update_fields({'numerics.t_final': 10.0})
+      if broyden_update is not None:
+        torax_config.update_fields({
+            'solver.jacobian_reuse': True,
+            'solver.broyden_update': broyden_update,
+        })
+      results.append(
+          run_simulation.run_simulation(torax_config, progress_bar=False)
+      )
+
+    reference = results[0]
+    for history in results[1:]:
+      np.testing.assert_array_equal(history.times, reference.times)
+      for name in ('T_i', 'T_e', 'psi', 'n_e'):
+        np.testing.assert_allclose(
+            getattr(history.core_profiles, name).value,
+            getattr(reference.core_profiles, name).value,
+            rtol=1e-5,
+            err_msg=name,
+        )
+
+  def test_frozen_transport_matches_newton_raphson(self):
+    """Tests that lagging the transport converges to the same solution."""
+    results = []
+    for frozen_transport in (False, True):
+      torax_config = self._get_torax_config('test_iterhybrid_rampup.py')
+      torax_config.update_fields({
+          'numerics.t_final': 10.0,
+          'solver.frozen_transport': frozen_transport,
+      })
+      results.append(
+          run_simulation.run_simulation(torax_config, progress_bar=False)
+      )
+
+    reference, history = results
+    np.testing.assert_array_equal(history.times, reference.times)
+    for name in ('T_i', 'T_e', 'psi', 'n_e'):
+      np.testing.assert_allclose(
+          getattr(history.core_profiles, name).value,
+          getattr(reference.core_profiles, name).value,
+          rtol=1e-5,
+          err_msg=name,
+      )
+
   # pylint: disable=invalid-name
   @parameterized.parameters(
       'test_psi_heat_dens',
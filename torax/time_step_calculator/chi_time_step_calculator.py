@@ -42,6 +42,7 @@ class ChiTimeStepCalculator(time_step_calculator.TimeStepCalculator):
       geo: geometry.Geometry,
       core_profiles: state_module.CoreProfiles,
       core_transport: state_module.CoreTransport,
+      controller_state: state_module.TimeStepControllerState | None = None,
   ) -> jax.Array:
     """Calculates the next time step duration.
 
@@ -54,11 +55,13 @@ class ChiTimeStepCalculator(time_step_calculator.TimeStepCalculator):
       geo: Geometry for the tokamak being simulated.
       core_profiles: Current core plasma profiles.
       core_transport: Used to calculate maximum step size.
+      controller_state: Unused.
 
     Returns:
       dt: Scalar time step duration.
     """
 
+    del controller_state  # Unused.
     chi_max = core_transport.chi_max(geo)
 
     basic_dt = (3.0 / 4.0) * (geo.drho_norm**2) / chi_max
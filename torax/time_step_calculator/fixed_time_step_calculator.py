@@ -39,6 +39,7 @@ class FixedTimeStepCalculator(time_step_calculator.TimeStepCalculator):
       geo: geometry.Geometry,
       core_profiles: state_module.CoreProfiles,
       core_transport: state_module.CoreTransport,
+      controller_state: state_module.TimeStepControllerState | None = None,
   ) -> jax.Array:
     """Calculates the next time step duration.
 
@@ -48,11 +49,13 @@ class FixedTimeStepCalculator(time_step_calculator.TimeStepCalculator):
       geo: Geometry for the tokamak being simulated.
       core_profiles: Current core plasma profiles.
       core_transport: Used to calculate chi, which determines maximum step size.
+      controller_state: Unused.
 
     Returns:
       dt: Scalar time step duration.
     """
 
+    del controller_state  # Unused.
     dt = jnp.array(dynamic_runtime_params_slice.numerics.fixed_dt)
 
     return dt
@@ -0,0 +1,219 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The PITimeStepCalculator class.
+
+Steps through time with a PI controller on an estimate of the local error.
+"""
+
+import functools
+
+import jax
+from jax import numpy as jnp
+from torax import jax_utils
+from torax import state as state_module
+from torax.config import runtime_params_slice
+from torax.fvm import cell_variable
+from torax.fvm import fvm_conversions
+from torax.geometry import geometry
+from torax.time_step_calculator import chi_time_step_calculator
+
+# Exponents of the PI controller for a method with local error O(dt^2), as
+# recommended in Hairer and Wanner, Solving Ordinary Differential Equations II,
+# section IV.2: dt_new = dt * error^-alpha * previous_error^beta.
+_ERROR_ORDER = 2
+_ALPHA = 0.7 / _ERROR_ORDER
+_BETA = 0.4 / _ERROR_ORDER
+# Floor of the error estimate, to avoid dividing by zero for stationary states.
+_MIN_ERROR = 1e-10
+
+
+def _to_vec(x: tuple[cell_variable.CellVariable, ...]) -> jax.Array:
+  """Concatenates the evolving variables, which may be empty."""
+  if not x:
+    return jnp.zeros((0,), dtype=jax_utils.get_dtype())
+  return fvm_conversions.cell_variable_tuple_to_vec(x)
+
+
+class PITimeStepCalculator(chi_time_step_calculator.ChiTimeStepCalculator):
+  """TimeStepCalculator controlling the local error with a PI controller.
+
+  After each time step, the local truncation error is estimated from the change
+  of the rate of change of the evolving variables between consecutive time
+  steps. For the backward Euler method, the local error is dt^2 / 2 times the
+  second time derivative, estimated as
+
+    error = dt^2 / (dt + dt_previous) * (rate - rate_previous),
+
+  with `rate = (x_new - x_old) / dt`. It is measured in the root mean square
+  norm weighted by `1 / (error_atol + error_rtol * |x|)`, such that the step is
+  accurate enough if the error is below 1. For theta_implicit < 1 this
+  overestimates the error of the higher order method.
+
+  The next time step is grown or shrunk by a PI controller on the error of the
+  last two time steps, which avoids the oscillations of dt of a pure integral
+  controller. The step is additionally shrunk if the solver needed more than
+  `target_solver_iterations` iterations, and is not grown right after a time
+  step which needed dt backtracking. Unlike calculators which recompute dt from
+  scratch, dt thus stays close to the largest value the solver handles, instead
+  of repeatedly failing at a too large dt.
+
+  The first time step uses the chi heuristic of `ChiTimeStepCalculator`. All
+  time steps are limited to `[min_dt, max_dt]` from the numerics config.
+
+  Attributes:
+    error_rtol: Relative tolerance of the local error.
+    error_atol: Absolute tolerance of the local error, in the units of the
+      evolving variables.
+    target_solver_iterations: Number of inner solver iterations per time step
+      above which dt is reduced.
+    safety_factor: Factor applied to the dt proposed by the error controller.
+    max_dt_increase: Maximum factor by which dt increases between time steps.
+    min_dt_decrease: Minimum factor by which dt decreases between time steps.
+  """
+
+  def __init__(
+      self,
+      tolerance: float = 1e-7,
+      error_rtol: float = 1e-3,
+      error_atol: float = 1e-3,
+      target_solver_iterations: int = 5,
+      safety_factor: float = 0.9,
+      max_dt_increase: float = 2.0,
+      min_dt_decrease: float = 0.2,
+  ):
+    super().__init__(tolerance=tolerance)
+    self.error_rtol = error_rtol
+    self.error_atol = error_atol
+    self.target_solver_iterations = target_solver_iterations
+    self.safety_factor = safety_factor
+    self.max_dt_increase = max_dt_increase
+    self.min_dt_decrease = min_dt_decrease
+
+  @functools.partial(jax_utils.jit, static_argnames=['self'])
+  def next_dt(
+      self,
+      dynamic_runtime_params_slice: runtime_params_slice.DynamicRuntimeParamsSlice,
+      geo: geometry.Geometry,
+      core_profiles: state_module.CoreProfiles,
+      core_transport: state_module.CoreTransport,
+      controller_state: state_module.TimeStepControllerState | None = None,
+  ) -> jax.Array:
+    """Calculates the next time step duration.
+
+    Args:
+      dynamic_runtime_params_slice: Input runtime parameters that can change
+        without triggering a JAX recompilation.
+      geo: Geometry for the tokamak being simulated.
+      core_profiles: Current core plasma profiles.
+      core_transport: Used to calculate the first time step.
+      controller_state: State of the controller after the last time step.
+
+    Returns:
+      dt: Scalar time step duration.
+    """
+    chi_dt = super().next_dt(
+        dynamic_runtime_params_slice, geo, core_profiles, core_transport
+    )
+    if controller_state is None:
+      return chi_dt
+
+    error = jnp.maximum(controller_state.error, _MIN_ERROR)
+    # Integral control only, until the error of two time steps is known.
+    previous_error = jnp.where(
+        controller_state.previous_error > 0.0,
+        jnp.maximum(controller_state.previous_error, _MIN_ERROR),
+        error,
+    )
+    error_factor = (
+        self.safety_factor * error**-_ALPHA * previous_error**_BETA
+    )
+    # Until the error is known, only the solver iterations limit the growth.
+    error_factor = jnp.where(
+        controller_state.error > 0.0, error_factor, self.max_dt_increase
+    )
+    iteration_factor = self.target_solver_iterations / jnp.maximum(
+        controller_state.solver_iterations, 1
+    )
+    factor = jnp.clip(
+        jnp.minimum(error_factor, iteration_factor),
+        self.min_dt_decrease,
+        self.max_dt_increase,
+    )
+    factor = jnp.where(
+        controller_state.backtracked, jnp.minimum(factor, 1.0), factor
+    )
+    numerics = dynamic_runtime_params_slice.numerics
+    dt = jnp.clip(
+        controller_state.dt * factor, numerics.min_dt, numerics.max_dt
+    )
+    return jnp.where(controller_state.num_steps > 0, dt, chi_dt)
+
+  def initial_controller_state(
+      self,
+      x: tuple[cell_variable.CellVariable, ...],
+  ) -> state_module.TimeStepControllerState:
+    """See TimeStepCalculator.initial_controller_state docstring."""
+    x_vec = _to_vec(x)
+    return state_module.TimeStepControllerState(
+        rate=jnp.zeros_like(x_vec, dtype=jax_utils.get_dtype()),
+        dt=jnp.array(0.0, dtype=jax_utils.get_dtype()),
+        error=jnp.array(0.0, dtype=jax_utils.get_dtype()),
+        previous_error=jnp.array(0.0, dtype=jax_utils.get_dtype()),
+        solver_iterations=jnp.array(0, dtype=jax_utils.get_int_dtype()),
+        backtracked=jnp.array(False),
+        num_steps=jnp.array(0, dtype=jax_utils.get_int_dtype()),
+    )
+
+  @functools.partial(jax_utils.jit, static_argnames=['self'])
+  def update_controller_state(
+      self,
+      controller_state: state_module.TimeStepControllerState | None,
+      x_old: tuple[cell_variable.CellVariable, ...],
+      x_new: tuple[cell_variable.CellVariable, ...],
+      dt: jax.Array,
+      solver_numeric_outputs: state_module.SolverNumericOutputs,
+  ) -> state_module.TimeStepControllerState | None:
+    """See TimeStepCalculator.update_controller_state docstring."""
+    if controller_state is None:
+      return None
+    x_old_vec = _to_vec(x_old)
+    x_new_vec = _to_vec(x_new)
+    rate = (x_new_vec - x_old_vec) / dt
+    local_error = (
+        dt**2 / (dt + controller_state.dt) * (rate - controller_state.rate)
+    )
+    scale = self.error_atol + self.error_rtol * jnp.maximum(
+        jnp.abs(x_old_vec), jnp.abs(x_new_vec)
+    )
+    if x_new_vec.size:
+      error = jnp.sqrt(jnp.mean((local_error / scale) ** 2))
+    else:
+      error = jnp.array(0.0)
+    # The rate of the first time step is only used for the next estimate.
+    error = jnp.where(controller_state.num_steps > 0, error, 0.0)
+    return state_module.TimeStepControllerState(
+        rate=rate.astype(controller_state.rate.dtype),
+        dt=jnp.asarray(dt, dtype=controller_state.dt.dtype),
+        error=error.astype(controller_state.error.dtype),
+        previous_error=controller_state.error,
+        solver_iterations=jnp.asarray(
+            solver_numeric_outputs.inner_solver_iterations,
+            dtype=controller_state.solver_iterations.dtype,
+        ),
+        backtracked=jnp.asarray(
+            solver_numeric_outputs.outer_solver_iterations > 1
+        ),
+        num_steps=controller_state.num_steps + 1,
+    )
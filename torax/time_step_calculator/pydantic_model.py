@@ -15,8 +15,11 @@
 """Pydantic config for time step calculators."""
 
 import enum
+
+import pydantic
 from torax.time_step_calculator import chi_time_step_calculator
 from torax.time_step_calculator import fixed_time_step_calculator
+from torax.time_step_calculator import pi_time_step_calculator
 from torax.time_step_calculator import time_step_calculator
 from torax.torax_pydantic import torax_pydantic
 
@@ -27,6 +30,7 @@ class TimeStepCalculatorType(enum.Enum):
 
   CHI = 'chi'
   FIXED = 'fixed'
+  PI = 'pi'
 
 
 class TimeStepCalculator(torax_pydantic.BaseModelFrozen):
@@ -36,10 +40,28 @@ class TimeStepCalculator(torax_pydantic.BaseModelFrozen):
     calculator_type: The type of time step calculator to use.
     tolerance: The tolerance within the final time for which the simulation
       will be considered done.
+    error_rtol: For the `pi` calculator, the relative tolerance of the local
+      error of each time step.
+    error_atol: For the `pi` calculator, the absolute tolerance of the local
+      error of each time step, in the units of the evolving variables.
+    target_solver_iterations: For the `pi` calculator, the number of inner
+      solver iterations per time step above which dt is reduced.
+    safety_factor: For the `pi` calculator, the factor applied to the dt
+      proposed by the error controller.
+    max_dt_increase: For the `pi` calculator, the maximum factor by which dt
+      increases between time steps.
+    min_dt_decrease: For the `pi` calculator, the minimum factor by which dt
+      decreases between time steps.
   """
 
   calculator_type: TimeStepCalculatorType = TimeStepCalculatorType.CHI
   tolerance: float = 1e-7
+  error_rtol: pydantic.PositiveFloat = 1e-3
+  error_atol: pydantic.PositiveFloat = 1e-3
+  target_solver_iterations: pydantic.PositiveInt = 5
+  safety_factor: pydantic.PositiveFloat = 0.9
+  max_dt_increase: float = pydantic.Field(default=2.0, gt=1.0)
+  min_dt_decrease: float = pydantic.Field(default=0.2, gt=0.0, lt=1.0)
 
   @property
   def time_step_calculator(self) -> time_step_calculator.TimeStepCalculator:
@@ -52,3 +74,13 @@ class TimeStepCalculator(torax_pydantic.BaseModelFrozen):
         return fixed_time_step_calculator.FixedTimeStepCalculator(
             tolerance=self.tolerance
         )
+      case TimeStepCalculatorType.PI:
+        return pi_time_step_calculator.PITimeStepCalculator(
+            tolerance=self.tolerance,
+            error_rtol=self.error_rtol,
+            error_atol=self.error_atol,
+            target_solver_iterations=self.target_solver_iterations,
+            safety_factor=self.safety_factor,
+            max_dt_increase=self.max_dt_increase,
+            min_dt_decrease=self.min_dt_decrease,
+        )
@@ -0,0 +1,173 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from absl.testing import absltest
+from absl.testing import absltest
+from absl.testing import parameterized
+from jax import numpy as jnp
+import numpy as np
+from torax import state
+from torax.config import build_runtime_params
+from torax.fvm import cell_variable
+from torax.tests.test_lib import default_configs
+from torax.time_step_calculator import pi_time_step_calculator
+from torax.torax_pydantic import model_config
+
+
+def _make_x(value: float) -> tuple[cell_variable.CellVariable, ...]:
+  return (
+      cell_variable.CellVariable(
+          value=jnp.full((4,), value),
+          dr=jnp.array(0.25),
+      ),
+  )
+
+
+def _make_solver_numeric_outputs(
+    inner_solver_iterations: int = 1, outer_solver_iterations: int = 1
+) -> state.SolverNumericOutputs:
+  return state.SolverNumericOutputs(
+      outer_solver_iterations=outer_solver_iterations,
+      inner_solver_iterations=inner_solver_iterations,
+  )
+
+
+class PITimeStepCalculatorTest(parameterized.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    torax_config = model_config.ToraxConfig.from_dict(
+        default_configs.get_default_config_dict()
+    )
+    provider = (
+        build_runtime_params.DynamicRuntimeParamsSliceProvider.from_config(
+            torax_config
+        )
+    )
+    self.dynamic_runtime_params_slice = provider(t=0.0)
+    self.geo = torax_config.geometry.build_provider(t=0.0)
+    self.core_transport = state.CoreTransport.zeros(self.geo)
+    self.core_transport.chi_face_el = jnp.ones_like(
+        self.core_transport.chi_face_el
+    )
+
+  def _next_dt(self, calculator, controller_state):
+    return calculator.next_dt(
+        self.dynamic_runtime_params_slice,
+        self.geo,
+        None,
+        self.core_transport,
+        controller_state,
+    )
+
+  def test_error_estimate_of_quadratic_evolution(self):
+    """The local error of backward Euler for x = t^2 is dt^2."""
+    calculator = pi_time_step_calculator.PITimeStepCalculator(
+        error_rtol=0.0, error_atol=1.0
+    )
+    dt1, dt2 = 0.1, 0.3
+    controller_state = calculator.initial_controller_state(_make_x(0.0))
+    controller_state = calculator.update_controller_state(
+        controller_state,
+        _make_x(0.0),
+        _make_x(dt1**2),
+        jnp.array(dt1),
+        _make_solver_numeric_outputs(),
+    )
+    # No error estimate is available after the first time step.
+    self.assertEqual(controller_state.error, 0.0)
+    controller_state = calculator.update_controller_state(
+        controller_state,
+        _make_x(dt1**2),
+        _make_x((dt1 + dt2) ** 2),
+        jnp.array(dt2),
+        _make_solver_numeric_outputs(),
+    )
+    np.testing.assert_allclose(controller_state.error, dt2**2, rtol=1e-6)
+    self.assertEqual(controller_state.num_steps, 2)
+
+  def test_first_time_step_uses_chi_heuristic(self):
+    calculator = pi_time_step_calculator.PITimeStepCalculator()
+    controller_state = calculator.initial_controller_state(_make_x(1.0))
+    chi_dt = super(
+        pi_time_step_calculator.PITimeStepCalculator, calculator
+    ).next_dt(
+        self.dynamic_runtime_params_slice,
+        self.geo,
+        None,
+        self.core_transport,
+    )
+    np.testing.assert_allclose(
+        self._next_dt(calculator, controller_state), chi_dt
+    )
+
+  @parameterized.named_parameters(
+      dict(testcase_name='small_error', error=1e-4, expected_factor=2.0),
+      dict(testcase_name='large_error', error=1e6, expected_factor=0.2),
+      # With equal errors, dt is constant at error = safety_factor^(1 / 0.15).
+      dict(
+          testcase_name='target_error',
+          error=0.9 ** (1 / 0.15),
+          expected_factor=1.0,
+      ),
+  )
+  def test_dt_follows_error(self, error, expected_factor):
+    calculator = pi_time_step_calculator.PITimeStepCalculator()
+    controller_state = calculator.initial_controller_state(_make_x(1.0))
+    controller_state = controller_state.replace(
+        dt=jnp.array(0.01),
+        error=jnp.array(error),
+        previous_error=jnp.array(error),
+        solver_iterations=jnp.array(1),
+        num_steps=jnp.array(2),
+    )
+    np.testing.assert_allclose(
+        self._next_dt(calculator, controller_state),
+        0.01 * expected_factor,
+        rtol=1e-5,
+    )
+
+  def test_dt_shrinks_with_solver_iterations(self):
+    calculator = pi_time_step_calculator.PITimeStepCalculator(
+        target_solver_iterations=4
+    )
+    controller_state = calculator.initial_controller_state(_make_x(1.0))
+    controller_state = controller_state.replace(
+        dt=jnp.array(0.01),
+        error=jnp.array(1e-4),
+        previous_error=jnp.array(1e-4),
+        solver_iterations=jnp.array(8),
+        num_steps=jnp.array(2),
+    )
+    np.testing.assert_allclose(
+        self._next_dt(calculator, controller_state), 0.005, rtol=1e-5
+    )
+
+  def test_dt_does_not_grow_after_backtracking(self):
+    calculator = pi_time_step_calculator.PITimeStepCalculator()
+    controller_state = calculator.initial_controller_state(_make_x(1.0))
+    controller_state = calculator.update_controller_state(
+        controller_state.replace(dt=jnp.array(0.01), num_steps=jnp.array(1)),
+        _make_x(1.0),
+        _make_x(1.0),
+        jnp.array(0.01),
+        _make_solver_numeric_outputs(outer_solver_iterations=2),
+    )
+    self.assertTrue(controller_state.backtracked)
+    np.testing.assert_allclose(
+        self._next_dt(calculator, controller_state), 0.01, rtol=1e-5
+    )
+
+
+if __name__ == '__main__':
+  absltest.main()
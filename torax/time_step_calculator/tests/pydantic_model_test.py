@@ -16,6 +16,7 @@ from absl.testing import parameterized
 import pydantic
 from torax.time_step_calculator import chi_time_step_calculator
 from torax.time_step_calculator import fixed_time_step_calculator
+from torax.time_step_calculator import pi_time_step_calculator
 from torax.time_step_calculator import pydantic_model as time_step_pydantic_model
 
 
@@ -48,6 +49,11 @@ class PydanticModelTest(parameterized.TestCase):
           calculator_type='chi',
           expected_type=chi_time_step_calculator.ChiTimeStepCalculator,
       ),
+      dict(
+          testcase_name='pi',
+          calculator_type='pi',
+          expected_type=pi_time_step_calculator.PITimeStepCalculator,
+      ),
   )
   def test_build_time_step_calculator_from_config(
       self, calculator_type, expected_type
@@ -58,6 +64,31 @@ class PydanticModelTest(parameterized.TestCase):
     ).time_step_calculator
     self.assertIsInstance(time_stepper, expected_type)
 
+  def test_pi_time_step_calculator_params(self):
+    time_stepper = time_step_pydantic_model.TimeStepCalculator.from_dict({
+        'calculator_type': 'pi',
+        'error_rtol': 1e-2,
+        'target_solver_iterations': 3,
+        'max_dt_increase': 1.5,
+    }).time_step_calculator
+    self.assertIsInstance(
+        time_stepper, pi_time_step_calculator.PITimeStepCalculator
+    )
+    self.assertEqual(time_stepper.error_rtol, 1e-2)
+    self.assertEqual(time_stepper.target_solver_iterations, 3)
+    self.assertEqual(time_stepper.max_dt_increase, 1.5)
+
+  @parameterized.parameters(
+      {'max_dt_increase': 1.0},
+      {'min_dt_decrease': 1.0},
+      {'min_dt_decrease': 0.0},
+  )
+  def test_invalid_pi_time_step_calculator_params_raise_error(self, **kwargs):
+    with self.assertRaises(pydantic.ValidationError):
+      time_step_pydantic_model.TimeStepCalculator.from_dict(
+          {'calculator_type': 'pi', **kwargs}
+      )
+
 
 if __name__ == '__main__':
   absltest.main()
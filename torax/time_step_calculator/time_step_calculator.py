@@ -22,6 +22,7 @@ import abc
 import jax
 from torax import state as state_module
 from torax.config import runtime_params_slice
+from torax.fvm import cell_variable
 from torax.geometry import geometry
 
 
@@ -58,6 +59,7 @@ class TimeStepCalculator(abc.ABC):
       geo: geometry.Geometry,
       core_profiles: state_module.CoreProfiles,
       core_transport: state_module.CoreTransport,
+      controller_state: state_module.TimeStepControllerState | None = None,
   ) -> jax.Array:
     """Returns the next time step duration and internal time stepper state.
 
@@ -67,4 +69,48 @@ class TimeStepCalculator(abc.ABC):
       geo: Geometry for the Tokamak.
       core_profiles: Core plasma profiles in the tokamak.
       core_transport: Transport coefficients.
+      controller_state: State of the time step controller after the last time
+        step, for calculators which use one.
     """
+
+  def initial_controller_state(
+      self,
+      x: tuple[cell_variable.CellVariable, ...],
+  ) -> state_module.TimeStepControllerState | None:
+    """Returns the time step controller state of the initial state.
+
+    Calculators which adapt the time step to the past time steps return a
+    state with the shapes used over the whole simulation.
+
+    Args:
+      x: The evolving variables at the start of the simulation.
+
+    Returns:
+      The initial controller state, None if the calculator does not use it.
+    """
+    del x  # Unused.
+    return None
+
+  def update_controller_state(
+      self,
+      controller_state: state_module.TimeStepControllerState | None,
+      x_old: tuple[cell_variable.CellVariable, ...],
+      x_new: tuple[cell_variable.CellVariable, ...],
+      dt: jax.Array,
+      solver_numeric_outputs: state_module.SolverNumericOutputs,
+  ) -> state_module.TimeStepControllerState | None:
+    """Returns the time step controller state after a solved time step.
+
+    Args:
+      controller_state: The controller state before the time step.
+      x_old: The evolving variables at the start of the time step.
+      x_new: The evolving variables at the end of the time step.
+      dt: Duration of the time step.
+      solver_numeric_outputs: Iteration and error info of the solver, over all
+        attempts at the time step.
+
+    Returns:
+      The updated controller state, None if the calculator does not use it.
+    """
+    del x_old, x_new, dt, solver_numeric_outputs  # Unused.
+    return controller_state
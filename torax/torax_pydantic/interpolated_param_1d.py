@@ -63,6 +63,22 @@ class TimeVaryingScalar(model_base.BaseModelFrozen):
     """
     return self._get_cached_interpolated_param.get_value(t)
 
+  def with_fixed_value(self, value: chex.Array) -> Self:
+    """Returns a copy of this parameter whose `get_value` returns `value`.
+
+    This is used to substitute values which were interpolated ahead of time,
+    see `build_runtime_params.CompiledDynamicRuntimeParamsSliceProvider`.
+
+    Args:
+      value: The value returned at any time. If `is_bool_param`, this should
+        already be converted to a bool.
+    """
+    model = self.model_copy()
+    model.__dict__['_get_cached_interpolated_param'] = (
+        interpolated_param.ConstantInterpolatedParam(value)
+    )
+    return model
+
   def __eq__(self, other):
     return (
         np.array_equal(self.time, other.time)
@@ -131,6 +131,27 @@ class TimeVaryingArray(model_base.BaseModelFrozen):
       case _:
         raise ValueError(f'Unknown grid type: {grid_type}')
 
+  def with_fixed_values(
+      self,
+      values: Mapping[Literal['cell', 'face', 'face_right'], chex.Array],
+  ) -> Self:
+    """Returns a copy of this parameter with fixed values on each grid.
+
+    This is used to substitute values which were interpolated ahead of time,
+    see `build_runtime_params.CompiledDynamicRuntimeParamsSliceProvider`.
+
+    Args:
+      values: Mapping from grid type to the value returned by `get_value` at
+        any time on that grid. Grid types which are not in `values` are
+        interpolated as usual.
+    """
+    model = self.model_copy()
+    for grid_type, value in values.items():
+      model.__dict__[f'_get_cached_interpolated_param_{grid_type}'] = (
+          interpolated_param.ConstantInterpolatedParam(value)
+      )
+    return model
+
   def __eq__(self, other: Self):
     try:
       chex.assert_trees_all_equal(self.value, other.value)
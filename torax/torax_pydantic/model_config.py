@@ -26,6 +26,7 @@ from torax.fvm import enums
 from torax.geometry import pydantic_model as geometry_pydantic_model
 from torax.mhd import pydantic_model as mhd_pydantic_model
 from torax.neoclassical import pydantic_model as neoclassical_pydantic_model
+from torax.output_tools import pydantic_model as output_pydantic_model
 from torax.pedestal_model import pydantic_model as pedestal_pydantic_model
 from torax.sources import pydantic_model as sources_pydantic_model
 from torax.stepper import pydantic_model as solver_pydantic_model
@@ -57,6 +58,8 @@ class ToraxConfig(torax_pydantic.BaseModelFrozen):
       provided the default chi time step calculator is used.
     restart: Optional config for file restart. If None, no file restart is
       performed.
+    output: Config for the selection of the recorded simulation outputs. By
+      default, every time step and all variables are recorded.
   """
 
   profile_conditions: profile_conditions_lib.ProfileConditions
@@ -83,6 +86,9 @@ class ToraxConfig(torax_pydantic.BaseModelFrozen):
   neoclassical: neoclassical_pydantic_model.Neoclassical = (
       neoclassical_pydantic_model.Neoclassical()
   )
+  output: output_pydantic_model.OutputConfig = pydantic.Field(
+      default_factory=output_pydantic_model.OutputConfig
+  )
 
   @pydantic.model_validator(mode='before')
   @classmethod
@@ -14,6 +14,7 @@
 """Class for handling QLKNN10D models."""
 
 from collections.abc import Mapping
+import dataclasses
 import json
 import os
 from typing import Any, Callable, Final
@@ -96,6 +97,7 @@ class QuaLiKizNDNN:
       del model_config[f'layer{i+1}/biases/Variable:0']
       del model_config[f'layer{i+1}/weights/Variable:0']
     self._params = {'params': params}
+    self._activations = activations
     self._model = MLP(hidden_sizes=hidden_sizes, activations=activations)
 
   def _load_prescale(self, key: str, names: list[str]) -> np.ndarray:
@@ -124,6 +126,128 @@ class QuaLiKizNDNN:
     return cls(model_dict)
 
 
+@dataclasses.dataclass(frozen=True)
+class _FusedGroup:
+  """Stacked parameters of networks with the same architecture.
+
+  Attributes:
+    names: Names of the networks, in the order of the stacked axis.
+    kernels: Kernel of each layer, of shape `(num_networks, in, out)`.
+    biases: Bias of each layer, of shape `(num_networks, 1, out)`.
+    activations: Activation of each layer.
+    target_prescale_factor: Output prescale factor, of shape `(num_networks,
+      1, num_targets)`, or None if it is folded into the last layer.
+    target_prescale_bias: Output prescale bias, as `target_prescale_factor`.
+  """
+
+  names: tuple[str, ...]
+  kernels: tuple[np.ndarray, ...]
+  biases: tuple[np.ndarray, ...]
+  activations: tuple[str, ...]
+  target_prescale_factor: np.ndarray | None
+  target_prescale_bias: np.ndarray | None
+
+
+class FusedQuaLiKizNDNN:
+  """Evaluates several QuaLiKizNDNNs on the same inputs in a single pass.
+
+  The parameters of networks with the same features and architecture are
+  stacked, such that each layer of all of them is evaluated by one batched
+  matmul instead of one small matmul per network. The input prescaling is
+  folded into the first layer, and the output prescaling into the last layer
+  if its activation is linear. The outputs are equal to those of the separate
+  networks up to floating point rounding.
+  """
+
+  def __init__(self, networks: Mapping[str, QuaLiKizNDNN]):
+    groups = {}
+    for name, network in networks.items():
+      # pylint: disable=protected-access
+      key = (
+          tuple(network._feature_names),
+          tuple(network._activations),
+          tuple(
+              layer['kernel'].shape
+              for layer in network._params['params'].values()
+          ),
+      )
+      # pylint: enable=protected-access
+      groups.setdefault(key, []).append(name)
+    self._groups = tuple(
+        self._fuse(names, [networks[name] for name in names])
+        for names in groups.values()
+    )
+
+  @staticmethod
+  def _fuse(
+      names: list[str], networks: list[QuaLiKizNDNN]
+  ) -> _FusedGroup:
+    """Stacks the parameters of networks with the same architecture."""
+    # pylint: disable=protected-access
+    activations = networks[0]._activations
+    kernels = []
+    biases = []
+    for i in range(len(activations)):
+      layers = [network._params['params'][f'Dense_{i}'] for network in networks]
+      kernels.append(np.stack([layer['kernel'] for layer in layers]))
+      biases.append(
+          np.stack([layer['bias'] for layer in layers])[:, np.newaxis, :]
+      )
+    feature_factor = np.stack(
+        [network._feature_prescale_factor for network in networks]
+    )
+    feature_bias = np.stack(
+        [network._feature_prescale_bias for network in networks]
+    )
+    target_factor = np.stack(
+        [network._target_prescale_factor for network in networks]
+    )
+    target_bias = np.stack(
+        [network._target_prescale_bias for network in networks]
+    )
+    # pylint: enable=protected-access
+
+    # (x * f + b) @ W + c = x @ (f^T * W) + (b @ W + c).
+    biases[0] = biases[0] + feature_bias @ kernels[0]
+    kernels[0] = np.swapaxes(feature_factor, 1, 2) * kernels[0]
+    if activations[-1] == 'none':
+      # (x @ W + c - b) / f = x @ (W / f) + (c - b) / f.
+      kernels[-1] = kernels[-1] / target_factor
+      biases[-1] = (biases[-1] - target_bias) / target_factor
+      target_factor = None
+      target_bias = None
+    return _FusedGroup(
+        names=tuple(names),
+        kernels=tuple(kernels),
+        biases=tuple(biases),
+        activations=tuple(activations),
+        target_prescale_factor=target_factor,
+        target_prescale_bias=target_bias,
+    )
+
+  def __call__(self, inputs: jax.Array) -> dict[str, jax.Array]:
+    """Returns the outputs of each network, by name, given shared inputs."""
+    outputs = {}
+    for group in self._groups:
+      x = inputs
+      for i, (kernel, bias, activation) in enumerate(
+          zip(group.kernels, group.biases, group.activations)
+      ):
+        if i == 0:
+          # The inputs are shared: (batch, in) -> (num_networks, batch, out).
+          x = jnp.einsum('bi,nio->nbo', x, kernel) + bias
+        else:
+          x = jnp.matmul(x, kernel) + bias
+        x = _ACTIVATION_FNS[activation](x)
+      if group.target_prescale_factor is not None:
+        x = (
+            x - group.target_prescale_bias
+        ) / group.target_prescale_factor
+      for name, output in zip(group.names, x):
+        outputs[name] = output
+    return outputs
+
+
 class QLKNN10D(base_qlknn_model.BaseQLKNNModel):
   """Class holding QLKNN10D networks.
 
@@ -151,6 +275,15 @@ class QLKNN10D(base_qlknn_model.BaseQLKNNModel):
     self.net_tempfediv = self._load('pfetem_gb_div_efetem_gb.json')
     self.net_etgleading = self._load('efeetg_gb.json')
     self.net_itgpfediv = self._load('pfeitg_gb_div_efiitg_gb.json')
+    self._fused_nets = FusedQuaLiKizNDNN({
+        'itgleading': self.net_itgleading,
+        'itgqediv': self.net_itgqediv,
+        'itgpfediv': self.net_itgpfediv,
+        'temleading': self.net_temleading,
+        'temqidiv': self.net_temqidiv,
+        'tempfediv': self.net_tempfediv,
+        'etgleading': self.net_etgleading,
+    })
 
   def _load(self, path) -> QuaLiKizNDNN:
     full_path = os.path.join(self.path, path)
@@ -160,20 +293,17 @@ class QLKNN10D(base_qlknn_model.BaseQLKNNModel):
       self,
       inputs: jax.Array,
   ) -> base_qlknn_model.ModelOutput:
-    """Feed forward through the network and compute fluxes."""
+    """Feed forward through the networks and compute fluxes."""
 
+    net_output = self._fused_nets(inputs)
     model_output = {}
-    model_output['qi_itg'] = self.net_itgleading(inputs).clip(0)
-    model_output['qe_itg'] = self.net_itgqediv(inputs) * model_output['qi_itg']
-    model_output['pfe_itg'] = (
-        self.net_itgpfediv(inputs) * model_output['qi_itg']
-    )
-    model_output['qe_tem'] = self.net_temleading(inputs).clip(0)
-    model_output['qi_tem'] = self.net_temqidiv(inputs) * model_output['qe_tem']
-    model_output['pfe_tem'] = (
-        self.net_tempfediv(inputs) * model_output['qe_tem']
-    )
-    model_output['qe_etg'] = self.net_etgleading(inputs).clip(0)
+    model_output['qi_itg'] = net_output['itgleading'].clip(0)
+    model_output['qe_itg'] = net_output['itgqediv'] * model_output['qi_itg']
+    model_output['pfe_itg'] = net_output['itgpfediv'] * model_output['qi_itg']
+    model_output['qe_tem'] = net_output['temleading'].clip(0)
+    model_output['qi_tem'] = net_output['temqidiv'] * model_output['qe_tem']
+    model_output['pfe_tem'] = net_output['tempfediv'] * model_output['qe_tem']
+    model_output['qe_etg'] = net_output['etgleading'].clip(0)
     return model_output
 
   def get_model_inputs_from_qualikiz_inputs(
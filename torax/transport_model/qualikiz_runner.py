@@ -0,0 +1,140 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Asynchronous execution of QuaLiKiz runs.
+
+QuaLiKiz is an MPI executable which reads its inputs from, and writes its
+outputs to, a run directory. `QualikizRunner` keeps a pool of worker threads,
+each with its own persistent run directory, alive across calls. Runs are
+submitted without blocking, so that the caller can do other work, e.g.
+post-processing, while QuaLiKiz runs, and several runs can be in flight at
+once.
+"""
+
+from collections.abc import Callable, Sequence
+from concurrent import futures
+import dataclasses
+import os
+import queue
+import subprocess
+
+import numpy as np
+
+
+@dataclasses.dataclass(frozen=True)
+class QualikizOutputs:
+  """Gyro-Bohm normalized fluxes of a QuaLiKiz run.
+
+  Attributes:
+    qi: Ion heat flux of the main ion.
+    qe: Electron heat flux.
+    pfe: Electron particle flux.
+  """
+
+  qi: np.ndarray
+  qe: np.ndarray
+  pfe: np.ndarray
+
+
+class QualikizRunner:
+  """Runs QuaLiKiz in a pool of persistent worker threads and run directories.
+
+  Each worker has its own run directory in `parent_dir`, which is prepared on
+  its first run and reused by the following ones. The run directories are
+  named `name`, or `name_0`, `name_1`, ... if `max_workers > 1`.
+  """
+
+  def __init__(self, parent_dir: str, name: str, max_workers: int = 1):
+    """Initializes the runner.
+
+    Args:
+      parent_dir: Directory in which the run directories are created.
+      name: Name of the run directories.
+      max_workers: Maximum number of concurrent QuaLiKiz runs.
+    """
+    self.parent_dir = parent_dir
+    if max_workers == 1:
+      self.run_names = (name,)
+    else:
+      self.run_names = tuple(f'{name}_{i}' for i in range(max_workers))
+    self._free_run_names = queue.SimpleQueue()
+    for run_name in self.run_names:
+      self._free_run_names.put(run_name)
+    self._executor = futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix='qualikiz'
+    )
+
+  def submit(
+      self,
+      prepare_fn: Callable[[str], None],
+      command: Sequence[str],
+      verbose: bool = True,
+  ) -> futures.Future[QualikizOutputs]:
+    """Submits a QuaLiKiz run.
+
+    Args:
+      prepare_fn: Writes the QuaLiKiz inputs. Called in the worker thread with
+        the name of the run directory, relative to `parent_dir`.
+      command: The command running QuaLiKiz in the run directory.
+      verbose: Whether to print the output of QuaLiKiz.
+
+    Returns:
+      A future of the outputs of the run.
+    """
+    return self._executor.submit(self._run, prepare_fn, command, verbose)
+
+  def shutdown(self):
+    """Waits for the submitted runs and stops the worker threads."""
+    self._executor.shutdown()
+
+  def _run(
+      self,
+      prepare_fn: Callable[[str], None],
+      command: Sequence[str],
+      verbose: bool,
+  ) -> QualikizOutputs:
+    run_name = self._free_run_names.get()
+    try:
+      prepare_fn(run_name)
+      run_path = os.path.join(self.parent_dir, run_name)
+      process = subprocess.Popen(
+          command,
+          stdout=subprocess.PIPE,
+          stderr=subprocess.PIPE,
+          cwd=run_path,
+      )
+      # Waiting for the process releases the GIL.
+      stdout, stderr = process.communicate()
+      if verbose:
+        print(stdout.decode())
+        if stderr:
+          print(stderr.decode())
+      if process.returncode != 0:
+        raise RuntimeError(
+            f'QuaLiKiz failed with return code {process.returncode}:'
+            f' {stderr.decode()}'
+        )
+      return read_outputs(run_path)
+    finally:
+      self._free_run_names.put(run_name)
+
+
+def read_outputs(run_path: str) -> QualikizOutputs:
+  """Reads the gyro-Bohm normalized fluxes from a QuaLiKiz run directory."""
+  output_dir = os.path.join(run_path, 'output')
+  return QualikizOutputs(
+      qi=np.loadtxt(os.path.join(output_dir, 'efi_GB.dat'))[:, 0],
+      qe=np.loadtxt(os.path.join(output_dir, 'efe_GB.dat')),
+      pfe=np.loadtxt(os.path.join(output_dir, 'pfe_GB.dat')),
+  )
@@ -17,10 +17,11 @@
 Must be run with TORAX_COMPILATION_ENABLED=False. Used for generating ground
 truth for surrogate model evaluations.
 """
+from concurrent import futures
 import dataclasses
 import datetime
+import hashlib
 import os
-import subprocess
 import tempfile
 from typing import Literal
 
@@ -36,6 +37,7 @@ from torax.geometry import geometry
 from torax.pedestal_model import pedestal_model as pedestal_model_lib
 from torax.transport_model import pydantic_model_base
 from torax.transport_model import qualikiz_based_transport_model
+from torax.transport_model import qualikiz_runner
 
 
 @chex.dataclass(frozen=True)
@@ -56,15 +58,56 @@ class QualikizTransportModel(
 ):
   """Calculates turbulent transport coefficients with QuaLiKiz."""
 
-  def __init__(self):
+  def __init__(self, max_workers: int = 1):
     self._qlkrun_parentdir = tempfile.TemporaryDirectory()
     self._qlkrun_name = (
         _DEFAULT_QLKRUN_NAME_PREFIX
         + datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
     )
     self._runpath = os.path.join(self._qlkrun_parentdir.name, self._qlkrun_name)
+    self._runner = qualikiz_runner.QualikizRunner(
+        parent_dir=self._qlkrun_parentdir.name,
+        name=self._qlkrun_name,
+        max_workers=max_workers,
+    )
+    # Runs started by `prefetch`, keyed by their inputs.
+    self._prefetched_runs: dict[
+        str, futures.Future[qualikiz_runner.QualikizOutputs]
+    ] = {}
     self._frozen = True
 
+  def prefetch(
+      self,
+      dynamic_runtime_params_slice: runtime_params_slice.DynamicRuntimeParamsSlice,
+      geo: geometry.Geometry,
+      core_profiles: state.CoreProfiles,
+  ) -> None:
+    """Starts a QuaLiKiz run in the background.
+
+    A following call of the model with the same inputs waits for this run
+    instead of starting a new one. This allows e.g. overlapping the evaluation
+    of the explicit transport coefficients of the next step with the
+    post-processing of the current step.
+
+    Args:
+      dynamic_runtime_params_slice: Input runtime parameters
+      geo: Geometry of the torus.
+      core_profiles: Core plasma profiles.
+    """
+    qualikiz_inputs = self._get_qualikiz_inputs(
+        dynamic_runtime_params_slice, geo, core_profiles
+    )
+    scan_dict = _extract_scan_dict(
+        qualikiz_inputs, dynamic_runtime_params_slice, geo, core_profiles
+    )
+    run_key = _get_run_key(
+        scan_dict, dynamic_runtime_params_slice, geo, core_profiles
+    )
+    if run_key not in self._prefetched_runs:
+      self._prefetched_runs[run_key] = self._submit_qualikiz_run(
+          scan_dict, dynamic_runtime_params_slice, geo, core_profiles
+      )
+
   def _call_implementation(
       self,
       dynamic_runtime_params_slice: runtime_params_slice.DynamicRuntimeParamsSlice,
@@ -98,25 +141,24 @@ class QualikizTransportModel(
     )
     transport = dynamic_runtime_params_slice.transport
 
-    qualikiz_inputs = self._prepare_qualikiz_inputs(
-        Z_eff_face=dynamic_runtime_params_slice.plasma_composition.Z_eff_face,
-        density_reference=dynamic_runtime_params_slice.numerics.density_reference,
-        transport=transport,
-        geo=geo,
-        core_profiles=core_profiles,
+    qualikiz_inputs = self._get_qualikiz_inputs(
+        dynamic_runtime_params_slice, geo, core_profiles
     )
-    # Generate nested ordered dict that will correspond to the input
-    # QuaLiKiz json file
-    qualikiz_plan = _extract_qualikiz_plan(
-        qualikiz_inputs=qualikiz_inputs,
-        dynamic_runtime_params_slice=dynamic_runtime_params_slice,
-        geo=geo,
-        core_profiles=core_profiles,
+    scan_dict = _extract_scan_dict(
+        qualikiz_inputs, dynamic_runtime_params_slice, geo, core_profiles
     )
-    self._run_qualikiz(
-        qualikiz_plan, dynamic_runtime_params_slice.transport.n_processes
+    run_key = _get_run_key(
+        scan_dict, dynamic_runtime_params_slice, geo, core_profiles
     )
+    run = self._prefetched_runs.pop(run_key, None)
+    # Prefetched runs which were not used are stale.
+    self._prefetched_runs.clear()
+    if run is None:
+      run = self._submit_qualikiz_run(
+          scan_dict, dynamic_runtime_params_slice, geo, core_profiles
+      )
     core_transport = self._extract_run_data(
+        qualikiz_outputs=run.result(),
         qualikiz_inputs=qualikiz_inputs,
         transport=transport,
         geo=geo,
@@ -125,78 +167,87 @@ class QualikizTransportModel(
 
     return core_transport
 
-  def _run_qualikiz(
+  def _get_qualikiz_inputs(
       self,
-      qualikiz_plan: qualikiz_inputtools.QuaLiKizPlan,
-      n_processes: int,
-      verbose: bool = True,
-  ) -> None:
-    """Runs QuaLiKiz using command line tools. Loose coupling with TORAX."""
+      dynamic_runtime_params_slice: runtime_params_slice.DynamicRuntimeParamsSlice,
+      geo: geometry.Geometry,
+      core_profiles: state.CoreProfiles,
+  ) -> qualikiz_based_transport_model.QualikizInputs:
+    assert isinstance(
+        dynamic_runtime_params_slice.transport, DynamicRuntimeParams
+    )
+    return self._prepare_qualikiz_inputs(
+        Z_eff_face=dynamic_runtime_params_slice.plasma_composition.Z_eff_face,
+        density_reference=dynamic_runtime_params_slice.numerics.density_reference,
+        transport=dynamic_runtime_params_slice.transport,
+        geo=geo,
+        core_profiles=core_profiles,
+    )
 
-    run = qualikiz_runtools.QuaLiKizRun(
-        parent_dir=self._qlkrun_parentdir.name,
-        binaryrelpath=_QLK_EXEC_PATH,
-        name=self._qlkrun_name,
-        qualikiz_plan=qualikiz_plan,
-        verbose=verbose,
+  def _submit_qualikiz_run(
+      self,
+      scan_dict: dict[str, np.ndarray],
+      dynamic_runtime_params_slice: runtime_params_slice.DynamicRuntimeParamsSlice,
+      geo: geometry.Geometry,
+      core_profiles: state.CoreProfiles,
+      verbose: bool = True,
+  ) -> futures.Future[qualikiz_runner.QualikizOutputs]:
+    """Starts QuaLiKiz using command line tools. Loose coupling with TORAX."""
+    assert isinstance(
+        dynamic_runtime_params_slice.transport, DynamicRuntimeParams
+    )
+    # Generate nested ordered dict that will correspond to the input
+    # QuaLiKiz json file
+    qualikiz_plan = _extract_qualikiz_plan(
+        scan_dict=scan_dict,
+        dynamic_runtime_params_slice=dynamic_runtime_params_slice,
+        geo=geo,
+        core_profiles=core_profiles,
     )
 
-    # Prepare run directory
-    if not os.path.exists(self._runpath):
-      run.prepare()
-    else:
-      qualikiz_plan.to_json(
-          os.path.join(
-              self._qlkrun_parentdir.name, self._qlkrun_name, 'parameters.json'
-          )
+    def prepare(run_name: str):
+      run = qualikiz_runtools.QuaLiKizRun(
+          parent_dir=self._qlkrun_parentdir.name,
+          binaryrelpath=_QLK_EXEC_PATH,
+          name=run_name,
+          qualikiz_plan=qualikiz_plan,
+          verbose=verbose,
       )
 
-    # Generate QuaLiKiz input binaries
-    run.generate_input()
+      # Prepare run directory
+      if not os.path.exists(os.path.join(self._qlkrun_parentdir.name, run_name)):
+        run.prepare()
+      else:
+        qualikiz_plan.to_json(
+            os.path.join(
+                self._qlkrun_parentdir.name, run_name, 'parameters.json'
+            )
+        )
+
+      # Generate QuaLiKiz input binaries
+      run.generate_input()
 
-    # Run QuaLiKiz
     command = [
         'mpirun',
         '-np',
-        str(n_processes),
+        str(dynamic_runtime_params_slice.transport.n_processes),
         _QLK_EXEC_PATH,
     ]
-    process = subprocess.Popen(
-        command,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        cwd=f'{self._qlkrun_parentdir.name}/{self._qlkrun_name}',
-    )
-
-    if verbose:
-      # Get output and error messages
-      stdout, stderr = process.communicate()
-
-      # Print the output
-      print(stdout.decode())
-
-      # Print any error messages
-      if stderr:
-        print(stderr.decode())
+    return self._runner.submit(prepare, command, verbose=verbose)
 
   def _extract_run_data(
       self,
+      qualikiz_outputs: qualikiz_runner.QualikizOutputs,
       qualikiz_inputs: qualikiz_based_transport_model.QualikizInputs,
       transport: DynamicRuntimeParams,
       geo: geometry.Geometry,
       core_profiles: state.CoreProfiles,
   ) -> state.CoreTransport:
-    """Extracts QuaLiKiz run data from runpath."""
-
-    # Extract QuaLiKiz outputs
-    qi = np.loadtxt(self._runpath + '/output/efi_GB.dat')[:, 0]
-    qe = np.loadtxt(self._runpath + '/output/efe_GB.dat')
-    pfe = np.loadtxt(self._runpath + '/output/pfe_GB.dat')
-
+    """Converts QuaLiKiz outputs to transport coefficients."""
     return self._make_core_transport(
-        qi=qi,
-        qe=qe,
-        pfe=pfe,
+        qi=qualikiz_outputs.qi,
+        qe=qualikiz_outputs.qe,
+        pfe=qualikiz_outputs.pfe,
         quasilinear_inputs=qualikiz_inputs,
         transport=transport,
         geo=geo,
@@ -215,16 +266,100 @@ class QualikizTransportModel(
     )
 
 
-def _extract_qualikiz_plan(
+def _extract_scan_dict(
     qualikiz_inputs: qualikiz_based_transport_model.QualikizInputs,
     dynamic_runtime_params_slice: runtime_params_slice.DynamicRuntimeParamsSlice,
     geo: geometry.Geometry,
     core_profiles: state.CoreProfiles,
+) -> dict[str, np.ndarray]:
+  """Returns the QuaLiKiz scan variables, one value per face.
+
+  Args:
+      qualikiz_inputs: Precomputed physics data.
+      dynamic_runtime_params_slice: Runtime params at time t.
+      geo: TORAX geometry object.
+      core_profiles: TORAX CoreProfiles object, containing time-evolvable
+        quantities like q
+
+  Returns:
+      A dict of the scan variables, used in the QuaLiKiz plan.
+  """
+  # pylint: disable=invalid-name
+  Zi0 = core_profiles.Z_i_face
+  Zi1 = core_profiles.Z_impurity_face
+
+  # Calculate main ion dilution
+  ni0 = core_profiles.n_i.face_value() / core_profiles.n_e.face_value()
+  ni1 = (1 - ni0 * Zi0) / Zi1  # quasineutrality
+
+  return {
+      'x': np.array(qualikiz_inputs.x),
+      'rho': np.array(geo.rho_face_norm),
+      'q': np.array(qualikiz_inputs.q),
+      'smag': np.array(qualikiz_inputs.smag),
+      'alpha': np.array(qualikiz_inputs.alpha),
+      'Te': np.array(core_profiles.T_e.face_value()),
+      'ne': (
+          np.array(
+              core_profiles.n_e.face_value()
+              * dynamic_runtime_params_slice.numerics.density_reference
+          )
+          / 1e19
+      ),
+      'Ate': np.array(qualikiz_inputs.Ate),
+      'Ane': np.array(qualikiz_inputs.Ane),
+      'Ti0': np.array(core_profiles.T_i.face_value()),
+      'ni0': np.array(ni0),
+      'Ati0': np.array(qualikiz_inputs.Ati),
+      'Ani0': np.array(qualikiz_inputs.Ani0),
+      'Zi0': np.array(Zi0),
+      'Ti1': np.array(core_profiles.T_i.face_value()),
+      'ni1': np.array(ni1),
+      'Ati1': np.array(qualikiz_inputs.Ati),
+      'Ani1': np.array(qualikiz_inputs.Ani1),
+      'Zi1': np.array(Zi1),
+  }
+  # pylint: enable=invalid-name
+
+
+def _get_run_key(
+    scan_dict: dict[str, np.ndarray],
+    dynamic_runtime_params_slice: runtime_params_slice.DynamicRuntimeParamsSlice,
+    geo: geometry.Geometry,
+    core_profiles: state.CoreProfiles,
+) -> str:
+  """Returns a digest of all the inputs of a QuaLiKiz run."""
+  assert isinstance(
+      dynamic_runtime_params_slice.transport, DynamicRuntimeParams
+  )
+  hasher = hashlib.sha256()
+  for name in sorted(scan_dict):
+    hasher.update(name.encode())
+    hasher.update(np.ascontiguousarray(scan_dict[name]).tobytes())
+  # Inputs of the base QuaLiKiz x-point.
+  for value in (
+      geo.R_major,
+      geo.a_minor,
+      geo.B_0,
+      core_profiles.A_i,
+      core_profiles.A_impurity,
+      dynamic_runtime_params_slice.transport.n_max_runs,
+      dynamic_runtime_params_slice.transport.n_processes,
+  ):
+    hasher.update(np.asarray(value, dtype=np.float64).tobytes())
+  return hasher.hexdigest()
+
+
+def _extract_qualikiz_plan(
+    scan_dict: dict[str, np.ndarray],
+    dynamic_runtime_params_slice: runtime_params_slice.DynamicRuntimeParamsSlice,
+    geo: geometry.Geometry,
+    core_profiles: state.CoreProfiles,
 ):
   """Converts TORAX parameters to QuaLiKiz input JSON.
 
   Args:
-      qualikiz_inputs: Precomputed physics data.
+      scan_dict: The QuaLiKiz scan variables, from `_extract_scan_dict`.
       dynamic_runtime_params_slice: Runtime params at time t.
       geo: TORAX geometry object.
       core_profiles: TORAX CoreProfiles object, containing time-evolvable
@@ -303,13 +438,6 @@ def _extract_qualikiz_plan(
       danisdr=0,
   )
 
-  # pylint: disable=invalid-name
-  Zi0 = core_profiles.Z_i_face
-  Zi1 = core_profiles.Z_impurity_face
-
-  # Calculate main ion dilution
-  ni0 = core_profiles.n_i.face_value() / core_profiles.n_e.face_value()
-
   ion0 = qualikiz_inputtools.Ion(
       T=8,  # will be scan variable
       n=1,  # will be scan variable
@@ -322,8 +450,6 @@ def _extract_qualikiz_plan(
       Z=1,  # will be a scan variable
   )
 
-  ni1 = (1 - ni0 * Zi0) / Zi1  # quasineutrality
-
   ion1 = qualikiz_inputtools.Ion(
       T=8,  # will be scan variable
       n=0,  # will be scan variable
@@ -348,35 +474,6 @@ def _extract_qualikiz_plan(
       **options,
   )
 
-  scan_dict = {
-      'x': np.array(qualikiz_inputs.x),
-      'rho': np.array(geo.rho_face_norm),
-      'q': np.array(qualikiz_inputs.q),
-      'smag': np.array(qualikiz_inputs.smag),
-      'alpha': np.array(qualikiz_inputs.alpha),
-      'Te': np.array(core_profiles.T_e.face_value()),
-      'ne': (
-          np.array(
-              core_profiles.n_e.face_value()
-              * dynamic_runtime_params_slice.numerics.density_reference
-          )
-          / 1e19
-      ),
-      'Ate': np.array(qualikiz_inputs.Ate),
-      'Ane': np.array(qualikiz_inputs.Ane),
-      'Ti0': np.array(core_profiles.T_i.face_value()),
-      'ni0': np.array(ni0),
-      'Ati0': np.array(qualikiz_inputs.Ati),
-      'Ani0': np.array(qualikiz_inputs.Ani0),
-      'Zi0': np.array(Zi0),
-      'Ti1': np.array(core_profiles.T_i.face_value()),
-      'ni1': np.array(ni1),
-      'Ati1': np.array(qualikiz_inputs.Ati),
-      'Ani1': np.array(qualikiz_inputs.Ani1),
-      'Zi1': np.array(Zi1),
-  }
-  # pylint: enable=invalid-name
-
   qualikiz_plan = qualikiz_inputtools.QuaLiKizPlan(
       scan_dict=scan_dict, scan_type='parallel', xpoint_base=xpoint_base
   )
@@ -392,6 +489,9 @@ class QualikizTransportModelConfig(pydantic_model_base.TransportBase):
     transport_model: The transport model to use. Hardcoded to 'qualikiz'.
     n_max_runs: Set frequency of full QuaLiKiz contour solutions.
     n_processes: Set number of cores used QuaLiKiz calculations.
+    max_workers: Maximum number of concurrent QuaLiKiz runs, e.g. runs started
+      in the background with `QualikizTransportModel.prefetch`. Each run uses
+      `n_processes` cores.
     collisionality_multiplier: Collisionality multiplier.
     avoid_big_negative_s: Ensure that smag - alpha > -0.2 always, to compensate
       for no slab modes.
@@ -407,6 +507,7 @@ class QualikizTransportModelConfig(pydantic_model_base.TransportBase):
   transport_model: Literal['qualikiz'] = 'qualikiz'
   n_max_runs: pydantic.PositiveInt = 2
   n_processes: pydantic.PositiveInt = 8
+  max_workers: pydantic.PositiveInt = 1
   collisionality_multiplier: pydantic.PositiveFloat = 1.0
   avoid_big_negative_s: bool = True
   smag_alpha_correction: bool = True
@@ -415,7 +516,7 @@ class QualikizTransportModelConfig(pydantic_model_base.TransportBase):
   An_min: pydantic.PositiveFloat = 0.05
 
   def build_transport_model(self) -> QualikizTransportModel:
-    return QualikizTransportModel()
+    return QualikizTransportModel(max_workers=self.max_workers)
 
   def build_dynamic_params(self, t: chex.Numeric) -> DynamicRuntimeParams:
     base_kwargs = dataclasses.asdict(super().build_dynamic_params(t))
@@ -0,0 +1,131 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+
+from absl.testing import absltest
+from absl.testing import parameterized
+import numpy as np
+from torax.transport_model import qlknn_10d
+
+_FEATURE_NAMES = (
+    'Zeff',
+    'Ati',
+    'Ate',
+    'An',
+    'q',
+    'smag',
+    'x',
+    'Ti_Te',
+    'logNustar',
+)
+_NETWORK_FILES = (
+    'efiitg_gb.json',
+    'efeitg_gb_div_efiitg_gb.json',
+    'efetem_gb.json',
+    'efitem_gb_div_efetem_gb.json',
+    'pfetem_gb_div_efetem_gb.json',
+    'efeetg_gb.json',
+    'pfeitg_gb_div_efiitg_gb.json',
+)
+
+
+def _random_model_config(
+    rng: np.random.Generator,
+    hidden_sizes: tuple[int, ...] = (16, 16),
+    output_activation: str = 'none',
+) -> dict[str, object]:
+  """Returns a QuaLiKizNDNN config with random parameters."""
+  target_names = ['target']
+  names = list(_FEATURE_NAMES) + target_names
+  model_config = {
+      'feature_names': list(_FEATURE_NAMES),
+      'target_names': target_names,
+      'prescale_factor': {k: rng.uniform(0.5, 2.0) for k in names},
+      'prescale_bias': {k: rng.uniform(-1.0, 1.0) for k in names},
+      'hidden_activation': ['tanh'] * len(hidden_sizes),
+      'output_activation': output_activation,
+  }
+  sizes = (len(_FEATURE_NAMES),) + hidden_sizes + (len(target_names),)
+  for i, (size_in, size_out) in enumerate(zip(sizes[:-1], sizes[1:])):
+    model_config[f'layer{i+1}/weights/Variable:0'] = rng.normal(
+        size=(size_in, size_out)
+    ).tolist()
+    model_config[f'layer{i+1}/biases/Variable:0'] = rng.normal(
+        size=(size_out,)
+    ).tolist()
+  return model_config
+
+
+class QLKNN10DTest(parameterized.TestCase):
+
+  def test_predict_matches_separate_networks(self):
+    rng = np.random.default_rng(seed=0)
+    path = self.create_tempdir().full_path
+    for network_file in _NETWORK_FILES:
+      with open(os.path.join(path, network_file), 'w') as f:
+        json.dump(_random_model_config(rng), f)
+    model = qlknn_10d.QLKNN10D(path, qlknn_10d.QLKNN10D_NAME)
+    inputs = rng.uniform(size=(25, len(_FEATURE_NAMES)))
+
+    model_output = model.predict(inputs)
+
+    qi_itg = model.net_itgleading(inputs).clip(0)
+    qe_tem = model.net_temleading(inputs).clip(0)
+    expected_output = {
+        'qi_itg': qi_itg,
+        'qe_itg': model.net_itgqediv(inputs) * qi_itg,
+        'pfe_itg': model.net_itgpfediv(inputs) * qi_itg,
+        'qe_tem': qe_tem,
+        'qi_tem': model.net_temqidiv(inputs) * qe_tem,
+        'pfe_tem': model.net_tempfediv(inputs) * qe_tem,
+        'qe_etg': model.net_etgleading(inputs).clip(0),
+    }
+    self.assertSameElements(model_output, expected_output)
+    for name, expected in expected_output.items():
+      with self.subTest(name=name):
+        np.testing.assert_allclose(
+            model_output[name], expected, rtol=1e-10, atol=1e-12
+        )
+
+  @parameterized.named_parameters(
+      ('same_architecture', (16, 16), 'none'),
+      ('different_hidden_sizes', (8,), 'none'),
+      ('nonlinear_output', (16, 16), 'sigmoid'),
+  )
+  def test_fused_networks_match_separate_networks(
+      self, hidden_sizes: tuple[int, ...], output_activation: str
+  ):
+    rng = np.random.default_rng(seed=1)
+    networks = {
+        'a': qlknn_10d.QuaLiKizNDNN(_random_model_config(rng)),
+        'b': qlknn_10d.QuaLiKizNDNN(_random_model_config(rng)),
+        'c': qlknn_10d.QuaLiKizNDNN(
+            _random_model_config(rng, hidden_sizes, output_activation)
+        ),
+    }
+    inputs = rng.uniform(size=(10, len(_FEATURE_NAMES)))
+
+    outputs = qlknn_10d.FusedQuaLiKizNDNN(networks)(inputs)
+
+    self.assertSameElements(outputs, networks)
+    for name, network in networks.items():
+      with self.subTest(name=name):
+        np.testing.assert_allclose(
+            outputs[name], network(inputs), rtol=1e-10, atol=1e-12
+        )
+
+
+if __name__ == '__main__':
+  absltest.main()
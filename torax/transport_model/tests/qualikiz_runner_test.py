@@ -0,0 +1,110 @@
+# Copyright 2024 DeepMind Technologies Limited
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import textwrap
+
+from absl.testing import absltest
+import numpy as np
+from torax.transport_model import qualikiz_runner
+
+
+# Mock QuaLiKiz executable, which writes fluxes proportional to the input.
+_MOCK_QUALIKIZ = textwrap.dedent("""
+    import os
+    import sys
+    import numpy as np
+
+    x = np.loadtxt(os.path.join('input', 'x.dat'), ndmin=1)
+    if np.any(x < 0):
+      sys.exit('Negative input.')
+    os.makedirs('output', exist_ok=True)
+    np.savetxt(os.path.join('output', 'efi_GB.dat'), np.stack([x, -x], 1))
+    np.savetxt(os.path.join('output', 'efe_GB.dat'), 2 * x)
+    np.savetxt(os.path.join('output', 'pfe_GB.dat'), 3 * x)
+""")
+
+
+class QualikizRunnerTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.parent_dir = self.create_tempdir().full_path
+    executable = os.path.join(self.parent_dir, 'mock_qualikiz.py')
+    with open(executable, 'w') as f:
+      f.write(_MOCK_QUALIKIZ)
+    self.command = [sys.executable, executable]
+    self.prepared_runs = []
+
+  def _get_prepare_fn(self, x):
+    def prepare(run_name):
+      input_dir = os.path.join(self.parent_dir, run_name, 'input')
+      os.makedirs(input_dir, exist_ok=True)
+      np.savetxt(os.path.join(input_dir, 'x.dat'), x)
+      self.prepared_runs.append(run_name)
+
+    return prepare
+
+  def test_runs_reuse_run_directory(self):
+    runner = qualikiz_runner.QualikizRunner(self.parent_dir, 'run')
+    x1 = np.array([1.0, 2.0, 3.0])
+    x2 = np.array([4.0, 5.0, 6.0])
+
+    outputs1 = runner.submit(
+        self._get_prepare_fn(x1), self.command, verbose=False
+    ).result()
+    outputs2 = runner.submit(
+        self._get_prepare_fn(x2), self.command, verbose=False
+    ).result()
+    runner.shutdown()
+
+    self.assertEqual(self.prepared_runs, ['run', 'run'])
+    np.testing.assert_allclose(outputs1.qi, x1)
+    np.testing.assert_allclose(outputs1.qe, 2 * x1)
+    np.testing.assert_allclose(outputs1.pfe, 3 * x1)
+    np.testing.assert_allclose(outputs2.qi, x2)
+
+  def test_concurrent_runs_use_separate_run_directories(self):
+    runner = qualikiz_runner.QualikizRunner(
+        self.parent_dir, 'run', max_workers=2
+    )
+    xs = [np.full(4, i, dtype=float) for i in range(1, 5)]
+
+    runs = [
+        runner.submit(self._get_prepare_fn(x), self.command, verbose=False)
+        for x in xs
+    ]
+    outputs = [run.result() for run in runs]
+    runner.shutdown()
+
+    self.assertContainsSubset(self.prepared_runs, {'run_0', 'run_1'})
+    for x, output in zip(xs, outputs):
+      np.testing.assert_allclose(output.qe, 2 * x)
+
+  def test_failed_run_raises(self):
+    runner = qualikiz_runner.QualikizRunner(self.parent_dir, 'run')
+
+    run = runner.submit(
+        self._get_prepare_fn(np.array([-1.0, 1.0])),
+        self.command,
+        verbose=False,
+    )
+
+    with self.assertRaisesRegex(RuntimeError, 'Negative input'):
+      run.result()
+    runner.shutdown()
+
+
+if __name__ == '__main__':
+  absltest.main()
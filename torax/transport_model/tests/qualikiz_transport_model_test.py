@@ -80,6 +80,7 @@ class QualikizTransportModelTest(absltest.TestCase):
     # Mocking the actual call to QuaLiKiz and its results.
     mock_process = mock.Mock()
     mock_process.communicate.return_value = (b'stdout', b'stderr')
+    mock_process.returncode = 0
     # The first call is expecting a 2D array, the others should be 1D arrays.
     num_data = core_profiles.n_e.face_value().shape[0]
     fake_qualikiz_results = [
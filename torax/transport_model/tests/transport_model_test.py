@@ -16,6 +16,7 @@ from typing import Literal
 
 from absl.testing import absltest
 from absl.testing import parameterized
+import jax
 import numpy as np
 from torax import state
 from torax.config import build_runtime_params
@@ -405,6 +406,39 @@ class TransportSmoothingTest(parameterized.TestCase):
     )
 
 
+  def test_smooth_coeffs_matches_smoothing_each_coeff(self):
+    rng = np.random.default_rng(seed=0)
+    num_faces = 11
+    smoothing_matrix = rng.uniform(size=(num_faces, num_faces))
+    transport_coeffs = state.CoreTransport(
+        chi_face_ion=rng.uniform(size=num_faces),
+        chi_face_el=rng.uniform(size=num_faces),
+        d_face_el=rng.uniform(size=num_faces),
+        v_face_el=np.zeros(num_faces),
+    )
+
+    smoothed_coeffs = transport_model_lib.smooth_coeffs(
+        smoothing_matrix, transport_coeffs
+    )
+
+    for name in ('chi_face_ion', 'chi_face_el', 'd_face_el'):
+      np.testing.assert_allclose(
+          smoothed_coeffs[name],
+          smoothing_matrix @ transport_coeffs[name],
+          rtol=1e-6,
+          err_msg=name,
+      )
+    np.testing.assert_array_equal(smoothed_coeffs['v_face_el'], 0.0)
+    np.testing.assert_array_equal(smoothed_coeffs['chi_face_el_bohm'], 0.0)
+    # All zero coefficients are not smoothed, also for their derivatives.
+    jacobian = jax.jacfwd(
+        lambda v: transport_model_lib.smooth_coeffs(
+            smoothing_matrix, transport_coeffs.replace(v_face_el=v)
+        )['v_face_el']
+    )(transport_coeffs['v_face_el'])
+    np.testing.assert_array_equal(jacobian, np.eye(num_faces))
+
+
 class FakeTransportModel(transport_model_lib.TransportModel):
   """Fake TransportModel for testing purposes."""
 
@@ -20,14 +20,17 @@ coefficients.
 
 import abc
 import dataclasses
+import functools
 
 import jax
 from jax import numpy as jnp
+import numpy as np
 from torax import constants
 from torax import state
 from torax.config import runtime_params_slice
 from torax.geometry import geometry
 from torax.pedestal_model import pedestal_model as pedestal_model_lib
+from torax.torax_pydantic import torax_pydantic
 
 
 class TransportModel(abc.ABC):
@@ -60,6 +63,44 @@ class TransportModel(abc.ABC):
       core_profiles: state.CoreProfiles,
       pedestal_model_outputs: pedestal_model_lib.PedestalModelOutput,
   ) -> state.CoreTransport:
+    transport_coeffs = self.call_unsmoothed(
+        dynamic_runtime_params_slice,
+        geo,
+        core_profiles,
+        pedestal_model_outputs,
+    )
+
+    # Return smoothed coefficients if smoothing is enabled
+    return self._smooth_coeffs(
+        geo,
+        dynamic_runtime_params_slice,
+        transport_coeffs,
+        pedestal_model_outputs,
+    )
+
+  def call_unsmoothed(
+      self,
+      dynamic_runtime_params_slice: runtime_params_slice.DynamicRuntimeParamsSlice,
+      geo: geometry.Geometry,
+      core_profiles: state.CoreProfiles,
+      pedestal_model_outputs: pedestal_model_lib.PedestalModelOutput,
+  ) -> state.CoreTransport:
+    """Calculates the transport coefficients before smoothing.
+
+    The smoothing is linear, with the matrix given by `build_smoothing_matrix`,
+    and couples all the faces of the smoothed region. Calculating the
+    unsmoothed coefficients separately allows treating this nonlocal coupling
+    apart from the local dependence of the coefficients on the profiles.
+
+    Args:
+      dynamic_runtime_params_slice: Input runtime parameters at this time step.
+      geo: Geometry of the torus.
+      core_profiles: Core plasma profiles.
+      pedestal_model_outputs: Output of the pedestal model.
+
+    Returns:
+      The clipped and patched transport coefficients, without smoothing.
+    """
     if not getattr(self, "_frozen", False):
       raise RuntimeError(
           f"Subclass implementation {type(self)} forgot to "
@@ -83,20 +124,12 @@ class TransportModel(abc.ABC):
     )
 
     # Apply inner and outer transport patch
-    transport_coeffs = self._apply_transport_patches(
+    return self._apply_transport_patches(
         dynamic_runtime_params_slice,
         geo,
         transport_coeffs,
     )
 
-    # Return smoothed coefficients if smoothing is enabled
-    return self._smooth_coeffs(
-        geo,
-        dynamic_runtime_params_slice,
-        transport_coeffs,
-        pedestal_model_outputs,
-    )
-
   @abc.abstractmethod
   def _call_implementation(
       self,
@@ -311,21 +344,42 @@ class TransportModel(abc.ABC):
     smoothing_matrix = build_smoothing_matrix(
         geo, dynamic_runtime_params_slice, pedestal_model_outputs
     )
+    return smooth_coeffs(smoothing_matrix, transport_coeffs)
 
-    # Iterate over fields of the CoreTransport dataclass.
-    # Ignore optional fields that are made all zero in post_init.
-    def smooth_single_coeff(coeff):
-      return jax.lax.cond(
-          jnp.all(coeff == 0.0),
-          lambda: coeff,
-          lambda: jnp.dot(smoothing_matrix, coeff),
-      )
 
-    smoothed_coeffs = jax.tree_util.tree_map(
-        smooth_single_coeff, transport_coeffs
-    )
+def smooth_coeffs(
+    smoothing_matrix: jax.Array,
+    transport_coeffs: state.CoreTransport,
+) -> state.CoreTransport:
+  """Applies a smoothing matrix to each transport coefficient.
 
-    return state.CoreTransport(**smoothed_coeffs)
+  All coefficients are smoothed together by a single matrix product.
+
+  Args:
+    smoothing_matrix: Matrix built by `build_smoothing_matrix`.
+    transport_coeffs: The unsmoothed transport coefficients.
+
+  Returns:
+    The smoothed transport coefficients.
+  """
+  coeffs, treedef = jax.tree_util.tree_flatten(transport_coeffs)
+  coeffs = jnp.stack(coeffs)
+  smoothed_coeffs = jnp.dot(coeffs, smoothing_matrix.T)
+  # Coefficients which are all zero, such as the optional fields made all zero
+  # in post_init, are left unsmoothed, also for their derivatives.
+  smoothed_coeffs = jnp.where(
+      jnp.all(coeffs == 0.0, axis=1, keepdims=True), coeffs, smoothed_coeffs
+  )
+  return jax.tree_util.tree_unflatten(treedef, list(smoothed_coeffs))
+
+
+# The TORAX meshes generally have the same grid parameters, so a global cache
+# avoids recomputing the distances for each geometry.
+@functools.cache
+def _squared_face_distances(torax_mesh: torax_pydantic.Grid1D) -> np.ndarray:
+  """Squared distances between all pairs of faces, in rho_norm."""
+  rho_face_norm = torax_mesh.face_centers
+  return (rho_face_norm[:, np.newaxis] - rho_face_norm) ** 2
 
 
 def build_smoothing_matrix(
@@ -354,10 +408,10 @@ def build_smoothing_matrix(
   # used for eps, small number to avoid divisions by zero for sigma = 0
   consts = constants.CONSTANTS
 
-  # 1. Kernel matrix
+  # 1. Kernel matrix. The distances only depend on the mesh and are constants.
   kernel = jnp.exp(
       -jnp.log(2)
-      * (geo.rho_face_norm[:, jnp.newaxis] - geo.rho_face_norm) ** 2
+      * _squared_face_distances(geo.torax_mesh)
       / (dynamic_runtime_params_slice.transport.smoothing_width**2 + consts.eps)
   )
 
@@ -370,50 +424,40 @@ def build_smoothing_matrix(
   # rho_norm_ped_top. In the case where set_pedestal is False this is inf
   # which when we use to make the mask means that we will not mask anything.
   # If set pedestal is True, we want to mask according to rho_norm_ped_top.
-  mask_outer_edge = jax.lax.cond(
+  mask_outer_edge = jnp.where(
       jnp.logical_and(
           jnp.logical_not(
               dynamic_runtime_params_slice.pedestal.set_pedestal
           ),
           dynamic_runtime_params_slice.transport.apply_outer_patch,
       ),
-      lambda: dynamic_runtime_params_slice.transport.rho_outer - consts.eps,
-      lambda: pedestal_model_outputs.rho_norm_ped_top - consts.eps,
+      dynamic_runtime_params_slice.transport.rho_outer - consts.eps,
+      pedestal_model_outputs.rho_norm_ped_top - consts.eps,
   )
 
-  mask_inner_edge = jax.lax.cond(
+  mask_inner_edge = jnp.where(
       dynamic_runtime_params_slice.transport.apply_inner_patch,
-      lambda: dynamic_runtime_params_slice.transport.rho_inner + consts.eps,
-      lambda: 0.0,
+      dynamic_runtime_params_slice.transport.rho_inner + consts.eps,
+      0.0,
   )
 
-  mask = jnp.where(
-      jnp.logical_or(
-          dynamic_runtime_params_slice.transport.smooth_everywhere,
-          jnp.logical_and(
-              geo.rho_face_norm > mask_inner_edge,
-              geo.rho_face_norm < mask_outer_edge,
-          ),
+  mask = jnp.logical_or(
+      dynamic_runtime_params_slice.transport.smooth_everywhere,
+      jnp.logical_and(
+          geo.rho_face_norm > mask_inner_edge,
+          geo.rho_face_norm < mask_outer_edge,
       ),
-      1.0,
-      0.0,
   )
 
-  # remove impact of smoothing on inner and outer patch, or pedestal zone
-
-  # first zero out all rows corresponding to grid points not to be impacted
-  diag_mask = jnp.diag(mask)
-  kernel = jnp.dot(diag_mask, kernel)
-  # now zero out all columns corresponding to grid points not to be impacted,
-  # such that they don't impact the smoothing of the other grid points
-  num_rows = len(mask)
-  mask_mat = jnp.tile(mask, (num_rows, 1))
-  kernel *= mask_mat
-  # now restore identity to the zero rows, such that smoothing is a no-op for
-  # on the grid points where it shouldn't impact
-  zero_row_mask = jnp.all(kernel == 0, axis=1)
+  # remove impact of smoothing on inner and outer patch, or pedestal zone:
+  # zero out the rows corresponding to grid points not to be impacted, and the
+  # columns such that they don't impact the smoothing of the other grid points.
+  # Then restore identity to the zero rows, such that smoothing is a no-op on
+  # the grid points where it shouldn't impact.
   kernel = jnp.where(
-      zero_row_mask[:, jnp.newaxis], jnp.eye(kernel.shape[0]), kernel
+      mask[:, jnp.newaxis],
+      jnp.where(mask, kernel, 0.0),
+      jnp.eye(kernel.shape[0]),
   )
 
   # 3. Normalization